@@ -0,0 +1,59 @@
+// app/api/chat/stream/route.ts
+// Server-side proxy for the streaming chat endpoint.
+// Pipes the FastAPI Server-Sent Events body straight through to the browser
+// so tokens reach the UI as soon as the backend emits them.
+
+import { NextRequest, NextResponse } from "next/server"
+
+const FASTAPI_URL =
+  process.env.FASTAPI_URL ?? "http://localhost:8000"
+
+export async function POST(request: NextRequest) {
+  try {
+    const body = await request.json()
+
+    if (!body.message || typeof body.message !== "string") {
+      return NextResponse.json({ error: "message is required" }, { status: 400 })
+    }
+
+    const upstream = await fetch(`${FASTAPI_URL}/api/chat/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body),
+      // Cancel the upstream stream if the browser goes away
+      signal: request.signal,
+    })
+
+    if (!upstream.ok || !upstream.body) {
+      const data = await upstream.json().catch(() => null)
+      return NextResponse.json(
+        { error: data?.detail ?? "AI backend error" },
+        { status: upstream.status }
+      )
+    }
+
+    return new Response(upstream.body, {
+      headers: {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache, no-transform",
+        Connection: "keep-alive",
+      },
+    })
+  } catch (err) {
+    const msg =
+      err instanceof Error ? err.message : "Unexpected error reaching AI backend"
+
+    if (msg.includes("ECONNREFUSED") || msg.includes("fetch failed")) {
+      return NextResponse.json(
+        {
+          error:
+            "AI assistant is offline. Make sure the FastAPI backend is running on port 8000.",
+        },
+        { status: 503 }
+      )
+    }
+
+    console.error("[/api/chat/stream] upstream error:", msg)
+    return NextResponse.json({ error: msg }, { status: 500 })
+  }
+}
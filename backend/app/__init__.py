@@ -0,0 +1,11 @@
+"""
+backend/app/__init__.py
+
+Loads backend/.env (when present) once, before any module of the app reads
+its settings from the environment.  Variables already set in the
+environment win.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,148 @@
+"""
+backend/app/api/admin.py
+
+GET /api/admin/stats                — message totals, error rate, mean reply length
+GET /api/admin/stats/messages       — messages per hour, by role
+GET /api/admin/stats/questions      — most frequently asked questions
+GET /api/admin/stats/errors         — error rate, overall and per hour
+GET /api/admin/stats/reply-lengths  — distribution of reply lengths
+GET /api/admin/search               — full-text search over logged messages
+GET /api/admin/status               — counters of every subsystem in this worker
+
+Every stats route takes an optional ``since`` / ``until`` (ISO-8601; naive
+values are UTC) and defaults to the last 24 hours.  Windows resolve to whole
+UTC hours.  The figures come from the rollup tables via read-only
+connections (see app/database/analytics.py), so they stay cheap on a large
+chat log.  Search uses the FTS5 index (app/database/search.py) and covers
+all time unless ``since`` / ``until`` are given.
+
+``/status`` reports startup timings and the cache, session, chat-log,
+context, OpenRouter, limiter and tracing counters of the worker that
+answers; app/main.py registers the sections (``register_status``).  It
+runs on the event loop, the thread that updates the breaker, admission and
+single-flight counters.  ``/health`` stays a cheap liveness check.
+
+Access requires ``Authorization: Bearer <ADMIN_TOKEN>``.  With no
+``ADMIN_TOKEN`` configured the admin API is disabled.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from app.database import analytics, search as chat_search
+
+_ADMIN_TOKEN    = os.getenv("ADMIN_TOKEN", "")
+_DEFAULT_WINDOW = timedelta(hours=24)
+
+_status: dict[str, Callable[[], Any]] = {}     # section → stats function
+
+
+def _require_admin(authorization: str | None = Header(None)) -> None:
+    if not _ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_TOKEN is not set).")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, _ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=401, detail="Invalid admin token.", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(_require_admin)])
+
+
+def _utc(moment: datetime | None) -> datetime | None:
+    """``moment`` as an aware UTC datetime; naive query values are UTC."""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _window(
+    since: datetime | None = Query(None, description="Window start (ISO-8601, default: until - 24h)"),
+    until: datetime | None = Query(None, description="Window end (ISO-8601, default: now)"),
+) -> tuple[datetime, datetime]:
+    until = _utc(until) or datetime.now(tz=timezone.utc)
+    since = _utc(since) or until - _DEFAULT_WINDOW
+    if since > until:
+        raise HTTPException(status_code=422, detail="'since' must not be after 'until'.")
+    return since, until
+
+
+def _echo(window: tuple[datetime, datetime]) -> dict[str, str]:
+    return {"since": window[0].isoformat(), "until": window[1].isoformat()}
+
+
+@router.get("/stats")
+def overview(window: tuple[datetime, datetime] = Depends(_window)) -> dict:
+    """Message totals by role, error rate and mean reply length."""
+    return {**_echo(window), **analytics.overview(*window)}
+
+
+@router.get("/stats/messages")
+def messages(window: tuple[datetime, datetime] = Depends(_window)) -> dict:
+    """Messages per hour, by role (hours without messages are omitted)."""
+    return {**_echo(window), "hours": analytics.messages_per_hour(*window)}
+
+
+@router.get("/stats/questions")
+def questions(
+    window: tuple[datetime, datetime] = Depends(_window),
+    limit: int = Query(10, ge=1, le=100),
+) -> dict:
+    """The most frequently asked questions (compared case-insensitively)."""
+    return {**_echo(window), "questions": analytics.top_questions(*window, limit=limit)}
+
+
+@router.get("/stats/errors")
+def errors(window: tuple[datetime, datetime] = Depends(_window)) -> dict:
+    """Share of questions that ended in an error, overall and per hour."""
+    return {**_echo(window), **analytics.error_rates(*window)}
+
+
+@router.get("/stats/reply-lengths")
+def reply_lengths(window: tuple[datetime, datetime] = Depends(_window)) -> dict:
+    """Distribution of assistant reply lengths in characters."""
+    return {**_echo(window), **analytics.reply_lengths(*window)}
+
+
+@router.get("/search")
+def search(
+    q: str = Query(..., min_length=1, max_length=500, description='Words and "quoted phrases"; word* matches a prefix'),
+    since: datetime | None = Query(None, description="Only rows logged at or after this time (ISO-8601)"),
+    until: datetime | None = Query(None, description="Only rows logged before this time (ISO-8601)"),
+    role: Literal["user", "assistant", "error"] | None = Query(None),
+    order: Literal["rank", "newest"] = Query("rank"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10_000),
+) -> dict:
+    """Logged messages containing every term, best matches first, with highlighted snippets."""
+    since, until = _utc(since), _utc(until)
+    if since is not None and until is not None and since > until:
+        raise HTTPException(status_code=422, detail="'since' must not be after 'until'.")
+    try:
+        return chat_search.search(
+            q, since=since, until=until, role=role, order=order, limit=limit, offset=offset
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except chat_search.SearchUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+def register_status(name: str, fn: Callable[[], Any]) -> None:
+    """Add a section to ``GET /api/admin/status``; ``fn`` is called per request."""
+    _status[name] = fn
+
+
+@router.get("/status")
+async def status() -> dict:
+    """Startup timings and the counters of every subsystem in this worker."""
+    return {"pid": os.getpid(), **{name: fn() for name, fn in _status.items()}}
@@ -2,27 +2,42 @@
 backend/app/api/chat.py
 
 POST /api/chat  — main endpoint consumed by the Next.js frontend.
-GET  /api/chat/suggestions — returns seed questions for the chat UI.
+POST /api/chat/stream — same request, answer streamed as Server-Sent Events.
+GET  /api/chat/suggestions — returns seed questions for the chat UI, and
+                             which of them have a precomputed answer.
 
-Request body for POST:
-    { "message": "...", "session_id": "...", "history": [...] }
+Request body for both POST routes:
+    { "message": "...", "session_id": "..." }
 
-The session_id and history fields are optional; when supplied the
-client can maintain multi-turn context across page reloads.
+session_id is optional; when supplied, the server rebuilds the conversation
+history for that session itself (see services/session_store.py), so clients
+only send the new message.  Older clients may still send "history": [...],
+which then takes precedence over the server-side history.
+
+Both POST routes answer ``429`` with ``Retry-After`` when the client's rate
+limit is used up (services/rate_limit.py) or when no upstream slot frees up
+in time (services/admission.py).
 """
 
 from __future__ import annotations
 
 import logging
+import math
+import time
 import uuid
-from typing import Literal
+from typing import AsyncIterator, Awaitable, Callable, Literal
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 
+from app.api.responses import FastJSONResponse, dumps
 from app.database.db import log_message
-from app.services.context_builder import build_prompt
-from app.services.openrouter_service import ask_openrouter, OpenRouterError
+from app.services import answer_cache, metrics, prefilter, rate_limit, session_store, tracing, warm_answers
+from app.services.admission import Overloaded
+from app.services.context_builder import assemble_prompt
+from app.services.openrouter_service import ask_openrouter, stream_openrouter, OpenRouterError
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -40,7 +55,8 @@ class ChatRequest(BaseModel):
     session_id: str | None = Field(None, description="Opaque session identifier")
     history:    list[HistoryMessage] = Field(
         default_factory=list,
-        description="Prior conversation turns (newest last, max 10 honoured)",
+        description="Prior conversation turns (newest last). Optional — omit it "
+                    "and the server rebuilds the history from session_id.",
     )
 
 
@@ -51,54 +67,332 @@ class ChatResponse(BaseModel):
 
 # ── POST /api/chat ─────────────────────────────────────────────────────────
 
-@router.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest) -> ChatResponse:
+@router.post("/chat", response_model=ChatResponse, response_class=FastJSONResponse)
+async def chat(request: ChatRequest, http_request: Request) -> FastJSONResponse:
     """
     Accepts a user question about the portfolio owner and returns an
     AI-generated answer grounded in resume data.
 
     - session_id is generated server-side when not supplied by the client.
-    - history (up to last 10 turns) is included in the prompt so the model
-      can give contextually coherent follow-up answers.
+    - The session's history (trimmed to the prompt's token budget) is
+      included in the prompt so the model can give contextually coherent
+      follow-up answers.
+    - The endpoint is async: the upstream call awaits on the shared
+      connection pool instead of occupying a threadpool worker.
+    - Each stage is timed into the ``/metrics`` histograms.
+    - Over-limit clients and requests that find the upstream saturated
+      get ``429`` with ``Retry-After`` (see the module docstring).
+    - A seed question opening a conversation is answered from the
+      precomputed answers (services/warm_answers.py) without building a
+      prompt.
+    - Greetings, noise, injection attempts, resent questions and plain
+      resume-section questions opening a conversation are answered by the
+      local prefilter (services/prefilter.py), also without a prompt or an
+      upstream call.
+    - The body is encoded once, without re-validating it against
+      ``ChatResponse`` (see api/responses.py).
+    - The request is traced (services/tracing.py); the trace id is
+      returned as ``X-Trace-Id``.
+    - The question and its answer are written to the session history
+      together, before the response; a question that fails (``502``,
+      ``429``) is logged but stays out of the history, so a retry does not
+      repeat it in the prompt.
     """
+    received   = _observe_validation(http_request)
     session_id = request.session_id or str(uuid.uuid4())
+    with tracing.trace("chat", session_id, started=received):
+        trace_id = tracing.current_id()
+        headers  = {"X-Trace-Id": trace_id} if trace_id else None
+        tracing.record("validation", received)
+        try:
+            with tracing.span("rate_limit"):
+                _check_rate_limit(request, http_request)
+
+            # 1. Rebuild the conversation so far
+            with tracing.span("history"):
+                history = await _history_for(request, session_id)
+
+            # 2. Serve a precomputed or prefiltered answer, or answer the question now
+            with tracing.span("warm_answers"):
+                answer = warm_answers.lookup(request.message, history)
+            if answer is None:
+                verdict = prefilter.check(request.message, session_id, history)
+                if verdict is not None:
+                    answer = verdict.answer
+                else:
+                    answer = await _answer(request.message, history, session_id)
+                    prefilter.remember(session_id, request.message, answer)
+        except HTTPException as exc:
+            if headers:
+                exc.headers = {**(exc.headers or {}), **headers}
+            raise
+
+        # 3. Record the question and its reply as the session's next turns
+        await _record(session_id, request.message, answer)
+
+        metrics.observe("chat_total", time.perf_counter() - received)
+    return FastJSONResponse({"response": answer, "session_id": session_id}, headers=headers)
+
+
+async def _answer(message: str, history: list[dict[str, str]], session_id: str) -> str:
+    """Build the prompt, then serve a cached answer or call OpenRouter and cache the reply."""
+    started = time.perf_counter()
+    prompt = assemble_prompt(message, history=history).parts
+    metrics.observe("build_prompt", time.perf_counter() - started)
+
+    with tracing.span("answer_cache"):
+        answer = answer_cache.lookup(message, history)
+    if answer is None:
+        try:
+            answer = await ask_openrouter(prompt)
+        except Overloaded as exc:
+            _log_unanswered(session_id, message)
+            raise _too_many_requests(str(exc), exc.retry_after)
+        except OpenRouterError as exc:
+            logger.error("OpenRouter error [session=%s trace=%s]: %s", session_id, tracing.current_id(), exc)
+            _log_unanswered(session_id, message, exc)
+            raise HTTPException(status_code=502, detail=str(exc))
+        answer_cache.store(message, history, answer)
+    return answer
+
+
+def _observe_validation(http_request: Request) -> float:
+    """
+    Record how long reading and validating the request took (since
+    ``RequestClockMiddleware`` stamped it) and return the arrival time.
+    """
+    now = time.perf_counter()
+    received = getattr(http_request.state, "received_at", None)
+    if received is None:
+        return now
+    metrics.observe("validation", now - received)
+    return received
+
+
+def _too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
 
-    # 1. Log incoming user message
-    log_message("user", request.message)
 
-    # 2. Build full prompt string (system context + optional history + question)
-    history_dicts = [
-        {"role": h.role, "content": h.content}
-        for h in request.history[-10:]
-    ]
-    prompt: str = build_prompt(request.message, history=history_dicts)
+def _check_rate_limit(request: ChatRequest, http_request: Request) -> None:
+    """Take a token for the client's IP and session, or fail with 429."""
+    wait = rate_limit.check(rate_limit.client_ip(http_request), request.session_id)
+    if wait is not None:
+        raise _too_many_requests("Rate limit exceeded, slow down.", wait)
 
-    # 3. Call OpenRouter
+
+async def _history_for(request: ChatRequest, session_id: str) -> list[dict[str, str]]:
+    """
+    Return the prior turns for the prompt: the client-supplied history when
+    present, otherwise the server-side history of the session.  Trimming to
+    the token budget happens in ``build_prompt``.
+    """
+    if request.history:
+        return [{"role": h.role, "content": h.content} for h in request.history]
+    return await session_store.history(session_id)
+
+
+async def _record(session_id: str, question: str, answer: str) -> None:
+    """Write an answered question to the session history (and chat log)."""
+    with tracing.span("log_message", turns=2):
+        await session_store.record(session_id, question, answer)
+
+
+def _log_unanswered(session_id: str, question: str, exc: Exception | None = None) -> None:
+    """
+    Log a question that got no answer, and the error if there was one.  The
+    row has no turn index, so it stays out of the session history and a
+    retry does not send the question twice.
+    """
+    with tracing.span("log_message", turns=0):
+        log_message("user", question, session_id=session_id)
+        if exc is not None:
+            log_message("error", str(exc), session_id=session_id)
+
+
+# ── POST /api/chat/stream ──────────────────────────────────────────────────
+
+def _sse(event: str, data: dict) -> bytes:
+    """Format one Server-Sent Event frame."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """
+    Streaming variant of ``POST /api/chat``.
+
+    The answer is forwarded token by token as Server-Sent Events::
+
+        event: token
+        data: {"token": "Hanzala"}
+
+        event: done
+        data: {"session_id": "..."}
+
+    Failures before the first token (bad key, 429, upstream down) are
+    returned as a regular 502 so clients can handle them like the
+    non-streaming route.  A failure after streaming has begun is sent as an
+    ``error`` event.  The question and the complete answer join the
+    session history once the stream ends; a question left without one (an
+    error, or the client leaving early) is only logged.
+    A precomputed, prefiltered or cached answer is sent as a single
+    ``token`` event.  The upstream slot (services/admission.py) is held
+    until the stream ends.  The request is traced with the same spans as
+    ``POST /api/chat`` (``X-Trace-Id``), the upstream call as
+    ``stream_openrouter`` up to the first token and ``stream_body`` for the
+    rest; the trace ends when the stream closes.
+    """
+    received   = _observe_validation(http_request)
+    session_id = request.session_id or str(uuid.uuid4())
+    root       = tracing.trace("chat_stream", session_id, started=received)
+    headers    = {"X-Trace-Id": root.id} if root.id else {}
     try:
-        answer = ask_openrouter(prompt)
+        with root.active():
+            tracing.record("validation", received)
+            frames, finish = await _open_stream(request, http_request, session_id, root)
+    except BaseException as exc:
+        root.finish(exc)
+        if isinstance(exc, HTTPException) and headers:
+            exc.headers = {**(exc.headers or {}), **headers}
+        raise
+
+    async def close() -> None:
+        # Also runs when the client disconnects before the stream has
+        # started, which the generator's finally would not see; closing the
+        # upstream stream hands its slot on
+        if finish is not None:
+            await finish()
+        root.finish()
+
+    return _event_stream(frames, on_close=close, headers=headers)
+
+
+async def _open_stream(
+    request: ChatRequest, http_request: Request, session_id: str, root: tracing.Trace
+) -> tuple[AsyncIterator[bytes], Callable[[], Awaitable[None]] | None]:
+    """
+    Everything up to the first upstream token: the frames to send, and a
+    callback for when the response closes that closes the upstream stream
+    (``None`` for an answer replayed in one frame).
+    """
+    with tracing.span("rate_limit"):
+        _check_rate_limit(request, http_request)
+
+    # 1. Rebuild the conversation so far
+    with tracing.span("history"):
+        history = await _history_for(request, session_id)
+
+    # 2. Serve a precomputed answer without building a prompt
+    with tracing.span("warm_answers"):
+        warm = warm_answers.lookup(request.message, history)
+    if warm is not None:
+        await _record(session_id, request.message, warm)
+        return _replay(warm, session_id), None
+
+    # 3. Answer locally when the prefilter can, still without a prompt
+    verdict = prefilter.check(request.message, session_id, history)
+    if verdict is not None:
+        await _record(session_id, request.message, verdict.answer)
+        return _replay(verdict.answer, session_id), None
+
+    # 4. Build the prompt
+    started = time.perf_counter()
+    prompt = assemble_prompt(request.message, history=history).parts
+    metrics.observe("build_prompt", time.perf_counter() - started)
+
+    # 5. Serve a cached answer without touching OpenRouter
+    with tracing.span("answer_cache"):
+        cached = answer_cache.lookup(request.message, history)
+    if cached is not None:
+        await _record(session_id, request.message, cached)
+        prefilter.remember(session_id, request.message, cached)
+        return _replay(cached, session_id), None
+
+    # 6. Open the upstream stream and wait for the first token so that
+    #    early failures can still be reported with a proper status code.
+    tokens = stream_openrouter(prompt)
+    try:
+        with tracing.span("stream_openrouter"):
+            first = await anext(tokens)
+    except Overloaded as exc:
+        _log_unanswered(session_id, request.message)
+        raise _too_many_requests(str(exc), exc.retry_after)
     except OpenRouterError as exc:
-        logger.error("OpenRouter error [session=%s]: %s", session_id, exc)
-        log_message("error", str(exc))
+        logger.error("OpenRouter error [session=%s trace=%s]: %s", session_id, root.id, exc)
+        _log_unanswered(session_id, request.message, exc)
         raise HTTPException(status_code=502, detail=str(exc))
 
-    # 4. Log assistant reply
-    log_message("assistant", answer)
+    logged = False     # the question is in the chat log, answered or not
+
+    async def events() -> AsyncIterator[bytes]:
+        nonlocal logged
+        parts        = [first]
+        body_started = time.perf_counter()
+        try:
+            yield _sse("token", {"token": first})
+            async for token in tokens:
+                parts.append(token)
+                yield _sse("token", {"token": token})
+        except OpenRouterError as exc:
+            logger.error("OpenRouter stream error [session=%s trace=%s]: %s", session_id, root.id, exc)
+            logged = True
+            _log_unanswered(session_id, request.message, exc)
+            root.finish(exc)
+            yield _sse("error", {"detail": str(exc)})
+            return
+        finally:
+            await tokens.aclose()
+
+        # 7. Record and cache the complete exchange (the body runs
+        #    after the route returned: make its trace current again)
+        answer = "".join(parts).strip()
+        logged = True
+        with root.active():
+            tracing.record("stream_body", body_started, tokens=len(parts))
+            await _record(session_id, request.message, answer)
+            answer_cache.store(request.message, history, answer)
+            prefilter.remember(session_id, request.message, answer)
+        yield _sse("done", {"session_id": session_id})
+
+    async def close() -> None:
+        await tokens.aclose()
+        if not logged:          # the client left before the reply was complete
+            _log_unanswered(session_id, request.message)
 
-    return ChatResponse(response=answer, session_id=session_id)
+    return events(), close
+
+
+async def _replay(answer: str, session_id: str) -> AsyncIterator[bytes]:
+    yield _sse("token", {"token": answer})
+    yield _sse("done", {"session_id": session_id})
+
+
+def _event_stream(
+    frames: AsyncIterator[bytes],
+    on_close: Callable[[], Awaitable[None]] | None = None,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})},
+        background=BackgroundTask(on_close) if on_close else None,
+    )
 
 
 # ── GET /api/chat/suggestions ──────────────────────────────────────────────
 
-@router.get("/chat/suggestions")
-def suggestions() -> dict:
-    """Return seed questions to populate the chat UI quick-prompt buttons."""
-    return {
-        "questions": [
-            "What projects has Hanzala built?",
-            "What are his main technical skills?",
-            "Explain the MarketMuse AI project.",
-            "What certifications does he hold?",
-            "Has he worked with RAG or LLMs?",
-            "What databases and cloud platforms does he use?",
-        ]
-    }
+@router.get("/chat/suggestions", response_class=FastJSONResponse)
+def suggestions() -> FastJSONResponse:
+    """
+    Return seed questions to populate the chat UI quick-prompt buttons.
+    ``warm`` lists those that will be answered instantly from a
+    precomputed answer.
+    """
+    warm = warm_answers.warm_questions()
+    return FastJSONResponse({
+        "questions": list(warm_answers.SUGGESTIONS),
+        "warm":      [q for q in warm_answers.SUGGESTIONS if q in warm],
+    })
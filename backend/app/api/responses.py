@@ -0,0 +1,53 @@
+"""
+backend/app/api/responses.py
+
+JSON responses for the hot routes (chat, suggestions, health).
+
+FastAPI's default path for a route with a ``response_model`` validates the
+returned value against the model again, runs it through
+``jsonable_encoder`` and only then encodes it — three passes over a body
+the handler has just built from trusted values.  Routes that return a
+``FastJSONResponse`` skip all of that: the ``response_model`` still
+documents the body in the OpenAPI schema, but the content is encoded once.
+
+Encoding uses ``orjson`` when it is installed and the standard library
+otherwise (compact separators, UTF-8 rather than ``\\uXXXX`` escapes).
+Both produce the same JSON for the str / int / float / bool / list / dict
+values these routes return.  ``benchmarks/bench_responses.py`` measures
+the difference per request.
+
+Public API
+──────────
+  dumps(obj) -> bytes
+  FastJSONResponse
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:  # optional; the standard library is used without it
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return _encode(obj).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` encoded with ``dumps``; return it directly from a route."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
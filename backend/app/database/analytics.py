@@ -0,0 +1,301 @@
+"""
+backend/app/database/analytics.py
+
+Read-side aggregates over the chat log, for the admin stats API.
+
+Every query reads the rollup tables that ``db.py`` keeps current with a
+trigger (see its "Rollups" section), never ``chat_logs`` itself, so its
+cost grows with the number of hours in the window, not with the number
+of messages logged.  Windows are therefore resolved to whole UTC hours.
+
+Top questions
+─────────────
+  Ranking questions has to add up every distinct question in the window,
+  and the long tail of one-off questions makes that the one aggregate
+  that grows with traffic.  Windows up to ``_HOURLY_QUESTIONS_MAX`` are
+  summed from the hourly rollup.  Longer ones resolve to whole UTC days
+  and use the daily rollup with a threshold cut:
+
+    1. candidates = questions asked at least ``m`` times on some day of
+       the window (a range seek per day on the (day, asked) index);
+    2. exact window totals are summed for the candidates only;
+    3. any other question was asked at most ``m - 1`` times a day, so at
+       most ``(m - 1) × days`` in total.  If the ``limit``-th candidate
+       total reaches that bound, the ranking is exact (ties with
+       unseen questions may order differently).  Otherwise ``m`` is
+       lowered to fit the candidate total once, then the whole window
+       is aggregated as a last resort.
+
+Connections
+───────────
+  Queries run on a small pool of read-only connections (``mode=ro``,
+  ``PRAGMA query_only``) opened lazily up to ``ANALYTICS_POOL_SIZE``.  With
+  the database in WAL mode a reader sees the last committed snapshot and
+  neither blocks nor waits for the chat-log writer; the writer's ``_lock``
+  is never taken here.
+
+Public API
+──────────
+  messages_per_hour(since, until) -> list[dict]   – per hour and role
+  top_questions(since, until, limit) -> list[dict]
+  error_rates(since, until) -> dict               – overall and per hour
+  reply_lengths(since, until) -> dict             – length histogram of replies
+  overview(since, until) -> dict                  – totals for the window
+  reader()                                        – borrow a read-only connection
+  close_readers()
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+
+from app.database.db import DB_PATH
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_POOL_SIZE    = int(os.getenv("ANALYTICS_POOL_SIZE", "4"))
+_POOL_TIMEOUT = 10.0    # seconds to wait for a free reader when all are busy
+
+_HOURLY_QUESTIONS_MAX = timedelta(hours=48)   # longer windows rank by whole days
+_QUESTION_CUTOFF      = 8                     # first per-day cut of the threshold scan
+_MAX_CANDIDATES       = 500                   # beyond this, aggregate the window instead
+
+_ROLES = ("user", "assistant", "error")
+
+
+# ── Reader pool ────────────────────────────────────────────────────────────
+
+_pool:      "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+_pool_lock: threading.Lock = threading.Lock()
+_opened:    int = 0
+
+
+def _open_reader() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        f"{DB_PATH.as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,   # handed between threadpool threads by the pool
+    )
+    conn.execute("PRAGMA query_only=1;")
+    return conn
+
+
+@contextmanager
+def reader() -> Iterator[sqlite3.Connection]:
+    """Borrow a read-only connection, opening one if the pool is not full."""
+    global _opened
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        with _pool_lock:
+            can_open = _opened < _POOL_SIZE
+            if can_open:
+                _opened += 1
+        try:
+            conn = _open_reader() if can_open else _pool.get(timeout=_POOL_TIMEOUT)
+        except BaseException:
+            if can_open:
+                with _pool_lock:
+                    _opened -= 1
+            raise
+    try:
+        yield conn
+    finally:
+        _pool.put(conn)
+
+
+def close_readers() -> None:
+    """Close every pooled reader (they are reopened on demand)."""
+    global _opened
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            break
+        conn.close()
+        with _pool_lock:
+            _opened -= 1
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────
+
+def _utc(moment: datetime) -> datetime:
+    """``moment`` as an aware UTC datetime (naive = UTC)."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _hour(moment: datetime) -> str:
+    """Rollup key of the UTC hour containing ``moment`` ("2026-02-21T14")."""
+    return _utc(moment).strftime("%Y-%m-%dT%H")
+
+
+def _window(since: datetime, until: datetime) -> tuple[str, str]:
+    return _hour(since), _hour(until)
+
+
+# Every UTC day from ?1 to ?2, as a table
+_DAYS_CTE = (
+    "WITH RECURSIVE days(day) AS ("
+    "SELECT ?1 UNION ALL SELECT date(day, '+1 day') FROM days WHERE day < ?2) "
+)
+
+
+def _top_questions_daily(
+    conn: sqlite3.Connection, first: str, last: str, days: int, limit: int
+) -> list[tuple[str, int]]:
+    """Exact top ``limit`` over whole days (see "Top questions")."""
+    cutoff = _QUESTION_CUTOFF
+    for _ in range(2):
+        candidates = [row[0] for row in conn.execute(
+            _DAYS_CTE + "SELECT DISTINCT q.question FROM days "
+            "JOIN chat_questions_daily q ON q.day = days.day AND q.asked >= ?3;",
+            (first, last, cutoff),
+        )]
+        if len(candidates) > _MAX_CANDIDATES:
+            break
+        ranked: list[tuple[str, int]] = []
+        if candidates:
+            placeholders = ",".join(f"?{i}" for i in range(4, 4 + len(candidates)))
+            ranked = conn.execute(
+                _DAYS_CTE + "SELECT q.question, sum(q.asked) AS asked FROM days "
+                "JOIN chat_questions_daily q "
+                f"ON q.day = days.day AND q.question IN ({placeholders}) "
+                "GROUP BY q.question ORDER BY asked DESC, q.question LIMIT ?3;",
+                (first, last, limit, *candidates),
+            ).fetchall()
+        threshold = ranked[-1][1] if len(ranked) == limit else 0
+        if threshold >= (cutoff - 1) * days:
+            return ranked
+        cutoff = threshold // days + 1
+        if cutoff <= 1:
+            break
+    return conn.execute(
+        "SELECT question, sum(asked) AS asked FROM chat_questions_daily "
+        "WHERE day BETWEEN ? AND ? GROUP BY question ORDER BY asked DESC, question LIMIT ?;",
+        (first, last, limit),
+    ).fetchall()
+
+
+# ── Public API ─────────────────────────────────────────────────────────────
+
+def messages_per_hour(since: datetime, until: datetime) -> list[dict[str, Any]]:
+    """Messages logged in each hour of the window, by role; empty hours omitted."""
+    with reader() as conn:
+        rows = conn.execute(
+            "SELECT hour, role, messages FROM chat_hourly "
+            "WHERE hour BETWEEN ? AND ? ORDER BY hour;",
+            _window(since, until),
+        ).fetchall()
+    hours: dict[str, dict[str, Any]] = {}
+    for hour, role, messages in rows:
+        bucket = hours.setdefault(hour, {"hour": hour, **dict.fromkeys(_ROLES, 0)})
+        bucket[role] = bucket.get(role, 0) + messages
+    return list(hours.values())
+
+
+def top_questions(since: datetime, until: datetime, limit: int = 10) -> list[dict[str, Any]]:
+    """
+    The most frequently asked questions in the window.  Questions are
+    compared trimmed and lower-cased (first 200 characters).  Windows
+    longer than 48 hours resolve to whole UTC days.
+    """
+    with reader() as conn:
+        if _utc(until) - _utc(since) <= _HOURLY_QUESTIONS_MAX:
+            rows = conn.execute(
+                "SELECT question, sum(asked) AS asked FROM chat_questions "
+                "WHERE hour BETWEEN ? AND ? GROUP BY question ORDER BY asked DESC, question LIMIT ?;",
+                (*_window(since, until), limit),
+            ).fetchall()
+        else:
+            first, last = _hour(since)[:10], _hour(until)[:10]
+            days = (datetime.fromisoformat(last) - datetime.fromisoformat(first)).days + 1
+            rows = _top_questions_daily(conn, first, last, days, limit)
+    return [{"question": question, "asked": asked} for question, asked in rows]
+
+
+def error_rates(since: datetime, until: datetime) -> dict[str, Any]:
+    """
+    Share of user messages that ended in an error row instead of a reply,
+    over the whole window and per hour.
+    """
+    hours = messages_per_hour(since, until)
+
+    def rate(errors: int, questions: int) -> float:
+        return round(errors / questions, 4) if questions else 0.0
+
+    questions = sum(h["user"] for h in hours)
+    errors    = sum(h["error"] for h in hours)
+    return {
+        "questions":  questions,
+        "errors":     errors,
+        "error_rate": rate(errors, questions),
+        "by_hour": [
+            {"hour": h["hour"], "questions": h["user"], "errors": h["error"],
+             "error_rate": rate(h["error"], h["user"])}
+            for h in hours if h["user"] or h["error"]
+        ],
+    }
+
+
+def reply_lengths(since: datetime, until: datetime) -> dict[str, Any]:
+    """
+    Distribution of assistant reply lengths in characters: 100-character
+    buckets (the last one open-ended at 2000), the mean, and the median
+    estimated within its bucket.
+    """
+    lower, upper = _window(since, until)
+    with reader() as conn:
+        buckets = conn.execute(
+            "SELECT bucket, sum(replies) FROM chat_reply_lengths "
+            "WHERE hour BETWEEN ? AND ? GROUP BY bucket ORDER BY bucket;",
+            (lower, upper),
+        ).fetchall()
+        replies, chars = conn.execute(
+            "SELECT coalesce(sum(messages), 0), coalesce(sum(chars), 0) FROM chat_hourly "
+            "WHERE hour BETWEEN ? AND ? AND role = 'assistant';",
+            (lower, upper),
+        ).fetchone()
+
+    median: float | None = None
+    seen = 0
+    for bucket, count in buckets:
+        if seen + count >= replies / 2 and bucket < 2000:
+            median = bucket + 100 * (replies / 2 - seen) / count
+            break
+        seen += count
+    return {
+        "replies":      replies,
+        "mean_chars":   round(chars / replies, 1) if replies else None,
+        "median_chars": None if median is None else round(median),
+        "buckets": [
+            {"min_chars": bucket, "max_chars": bucket + 99 if bucket < 2000 else None, "replies": count}
+            for bucket, count in buckets
+        ],
+    }
+
+
+def overview(since: datetime, until: datetime) -> dict[str, Any]:
+    """Message totals by role, error rate and mean reply length for the window."""
+    with reader() as conn:
+        rows = conn.execute(
+            "SELECT role, sum(messages), sum(chars) FROM chat_hourly "
+            "WHERE hour BETWEEN ? AND ? GROUP BY role;",
+            _window(since, until),
+        ).fetchall()
+    messages = {**dict.fromkeys(_ROLES, 0), **{role: n for role, n, _ in rows}}
+    chars    = {role: c for role, _, c in rows}
+    return {
+        "messages":   messages,
+        "error_rate": round(messages["error"] / messages["user"], 4) if messages["user"] else 0.0,
+        "mean_reply_chars": (
+            round(chars["assistant"] / messages["assistant"], 1) if messages["assistant"] else None
+        ),
+    }
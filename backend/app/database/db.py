@@ -6,50 +6,163 @@ Lightweight SQLite chat logger using only the Python standard library.
 Schema
 ------
   chat_logs
-    id        INTEGER  PRIMARY KEY AUTOINCREMENT
-    role      TEXT     NOT NULL   -- "user" | "assistant" | "error"
-    message   TEXT     NOT NULL
-    timestamp TEXT     NOT NULL   -- ISO-8601 UTC, e.g. "2026-02-21T14:30:00.123456"
+    id         INTEGER  PRIMARY KEY AUTOINCREMENT
+    role       TEXT     NOT NULL   -- "user" | "assistant" | "error"
+    message    TEXT     NOT NULL
+    timestamp  TEXT     NOT NULL   -- ISO-8601 UTC, e.g. "2026-02-21T14:30:00.123456"
+    session_id TEXT              -- chat session the row belongs to (nullable)
+    turn       INTEGER           -- 0-based turn index within the session
+
+  Indexes: (timestamp), (session_id, id)
+  Databases created before session_id / turn existed are migrated in place
+  by init_db().
+
+  Rollups — kept current by an AFTER INSERT trigger on chat_logs, so the
+  admin stats (app/database/analytics.py) never scan chat_logs itself.
+  ``hour`` is the first 13 characters of the timestamp ("2026-02-21T14").
+    chat_hourly          (hour, role)           → messages, chars
+    chat_reply_lengths   (hour, bucket)         → replies   -- assistant rows;
+                                                  bucket = 100-char band, 2000+ last
+    chat_questions       (hour, question)       → asked     -- user rows, trimmed
+                                                  and lower-cased, first 200 chars
+    chat_questions_daily (day, question)        → asked     -- the same per UTC day,
+                                                  indexed by (day, asked)
+  A database that predates the rollups is backfilled once by init_db().
+
+  Search — ``chat_search`` is an FTS5 index of ``chat_logs.message``
+  (external content, porter-stemmed unicode61 tokens), kept in sync by
+  AFTER INSERT / DELETE / UPDATE triggers.  When it is added to a database
+  that already has rows, those rows are indexed later in small chunks (see
+  app/database/search.py): ``chat_search_backfill`` holds the id range
+  still to index, and the delete / update triggers skip rows in it.
+  ``CHAT_LOG_SEARCH=0`` drops the index and its triggers; turning it back on
+  rebuilds it the same way.  Skipped if SQLite was built without FTS5.
+
+  New databases are created with ``auto_vacuum=INCREMENTAL`` so that
+  app/database/retention.py can hand the pages of expired rows back to the
+  filesystem.
+
+  Nothing touches the file at import time: the schema is created by the
+  first ``init_db()`` call (the FastAPI ``lifespan``) or, in scripts, on
+  first use of the connection.
 
 Public API
 ----------
   init_db()                   -- create the DB file + table if they don't exist
-  log_message(role, message)  -- insert one row; silently swallows errors so
+  log_message(role, message, session_id=None, turn=None)
+                              -- queue one row; silently swallows errors so
                                  logging never breaks the chat flow
+  append_turns(session_id, turns) -> int
+                              -- write consecutive turns of a session now, in
+                                 one transaction; returns the first turn index
+  last_turn(session_id)       -- index of the session's newest turn, or None
+  recent_turns(session_id, limit)
+                              -- newest user/assistant turns of a session
+  rebuild_rollups()           -- recompute the rollup tables from chat_logs
+  connection()                -- hold the lock and yield the shared connection
+  LockedConnection()          -- connection() as a callable, timing the longest hold
+  immediate(conn)             -- one BEGIN IMMEDIATE transaction (inside connection())
+  close_connection()          -- close the shared connection (before fork)
+  DB_PATH, DB_DIR             -- location of the database file
+  SEARCH_ENABLED              -- CHAT_LOG_SEARCH is on
+  start_writer()              -- start the background batch writer
+  stop_writer()               -- flush the queue and stop the writer
+  writer_stats()              -- queue / batch / drop counters
+
+Background writer
+-----------------
+  While the writer is running, ``log_message`` only appends to a bounded
+  in-memory queue.  A daemon thread drains it and inserts rows with
+  ``executemany`` in one transaction per batch, flushing when
+  ``CHAT_LOG_BATCH_SIZE`` rows are waiting or ``CHAT_LOG_FLUSH_INTERVAL``
+  seconds have passed.  The fsync and the ``_lock`` are therefore off the
+  request path.  When the queue is full the row is dropped and counted
+  (``CHAT_LOG_FULL_POLICY=drop``), or the caller waits up to
+  ``CHAT_LOG_BLOCK_TIMEOUT`` seconds for space first (``block``).
+  Without a running writer (scripts, tests) rows are inserted synchronously.
+
+  Turns of a conversation are the exception: ``append_turns`` writes them
+  before the reply is returned (on a worker thread, see
+  app/services/session_store.py), because the next request of the session
+  may reach another process and must find them.
+
+Several processes
+-----------------
+  Each uvicorn worker has its own connection and writer thread.  The
+  database is in WAL mode, so readers never block, and writers take turns:
+  a writer that finds the database locked waits up to
+  ``CHAT_LOG_BUSY_TIMEOUT`` seconds.  Batching keeps that rare.  Schema
+  creation is atomic across processes (see ``init_db``).
 """
 
 from __future__ import annotations
 
 import logging
+import os
+import queue
 import sqlite3
 import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterator
+
+from app.services import metrics
 
 logger = logging.getLogger(__name__)
 
 # ── Paths ──────────────────────────────────────────────────────────────────
+# CHAT_LOG_DB_PATH relocates the database (benchmarks point it at a temp dir).
 
-_DB_DIR:  Path = Path(__file__).parent
-_DB_PATH: Path = _DB_DIR / "chat_logs.db"
+DB_PATH: Path = Path(
+    os.getenv("CHAT_LOG_DB_PATH", str(Path(__file__).parent / "chat_logs.db"))
+)
+DB_DIR:  Path = DB_PATH.parent
 
 # ── Thread safety ──────────────────────────────────────────────────────────
 # SQLite connections are not thread-safe by default.  We keep one shared
 # connection (check_same_thread=False) guarded by a reentrant lock so that
 # concurrent FastAPI worker threads can safely log without contention.
+# With the background writer running, only the writer thread takes the lock
+# for inserts.
 
-_lock:       threading.Lock      = threading.Lock()
-_connection: sqlite3.Connection | None = None
+_lock:         threading.Lock      = threading.Lock()
+_connection:   sqlite3.Connection | None = None
+_schema_ready: bool = False             # set once init_db has run in this process
+
+# ── Background writer configuration ────────────────────────────────────────
+
+_QUEUE_SIZE     = int(os.getenv("CHAT_LOG_QUEUE_SIZE", "10000"))
+_BATCH_SIZE     = int(os.getenv("CHAT_LOG_BATCH_SIZE", "200"))
+_FLUSH_INTERVAL = float(os.getenv("CHAT_LOG_FLUSH_INTERVAL", "0.5"))   # seconds
+_FULL_POLICY    = os.getenv("CHAT_LOG_FULL_POLICY", "drop")            # "drop" | "block"
+_BLOCK_TIMEOUT  = float(os.getenv("CHAT_LOG_BLOCK_TIMEOUT", "0.05"))   # seconds
+_BUSY_TIMEOUT   = float(os.getenv("CHAT_LOG_BUSY_TIMEOUT", "5"))       # seconds
+SEARCH_ENABLED  = os.getenv("CHAT_LOG_SEARCH", "1") != "0"
+
+# (role, message, timestamp, session_id, turn)
+_Row = tuple[str, str, str, str | None, int | None]
+
+_STOP = object()   # queue sentinel
+
+_queue:  "queue.Queue[_Row | object]" = queue.Queue(maxsize=_QUEUE_SIZE)
+_writer: threading.Thread | None = None
+_stats:  dict[str, int] = {
+    "enqueued": 0, "written": 0, "dropped": 0, "batches": 0, "failed": 0,
+}
 
 
 # ── DDL ────────────────────────────────────────────────────────────────────
 
 _CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS chat_logs (
-    id        INTEGER PRIMARY KEY AUTOINCREMENT,
-    role      TEXT    NOT NULL,
-    message   TEXT    NOT NULL,
-    timestamp TEXT    NOT NULL
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    role       TEXT    NOT NULL,
+    message    TEXT    NOT NULL,
+    timestamp  TEXT    NOT NULL,
+    session_id TEXT,
+    turn       INTEGER
 );
 """
 
@@ -58,24 +171,174 @@ CREATE INDEX IF NOT EXISTS idx_chat_logs_timestamp
     ON chat_logs (timestamp);
 """
 
+_CREATE_SESSION_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_chat_logs_session
+    ON chat_logs (session_id, id);
+"""
+
+_CREATE_ROLLUPS_SQL = """
+CREATE TABLE IF NOT EXISTS chat_hourly (
+    hour     TEXT    NOT NULL,
+    role     TEXT    NOT NULL,
+    messages INTEGER NOT NULL,
+    chars    INTEGER NOT NULL,
+    PRIMARY KEY (hour, role)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS chat_reply_lengths (
+    hour    TEXT    NOT NULL,
+    bucket  INTEGER NOT NULL,
+    replies INTEGER NOT NULL,
+    PRIMARY KEY (hour, bucket)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS chat_questions (
+    hour     TEXT    NOT NULL,
+    question TEXT    NOT NULL,
+    asked    INTEGER NOT NULL,
+    PRIMARY KEY (hour, question)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS chat_questions_daily (
+    day      TEXT    NOT NULL,
+    question TEXT    NOT NULL,
+    asked    INTEGER NOT NULL,
+    PRIMARY KEY (day, question)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_chat_questions_daily_asked
+    ON chat_questions_daily (day, asked);
+"""
+
+# Rollup keys, shared by the trigger (NEW.*) and the backfill (chat_logs.*)
+_HOUR_EXPR     = "substr({t}.timestamp, 1, 13)"
+_DAY_EXPR      = "substr({t}.timestamp, 1, 10)"
+_BUCKET_EXPR   = "min(length({t}.message) / 100, 20) * 100"
+_QUESTION_EXPR = "lower(trim(substr({t}.message, 1, 200)))"
+
+_CREATE_ROLLUP_TRIGGER_SQL = f"""
+CREATE TRIGGER IF NOT EXISTS chat_logs_rollup AFTER INSERT ON chat_logs
+BEGIN
+    INSERT INTO chat_hourly (hour, role, messages, chars)
+        VALUES ({_HOUR_EXPR.format(t="NEW")}, NEW.role, 1, length(NEW.message))
+        ON CONFLICT (hour, role) DO UPDATE
+            SET messages = messages + 1, chars = chars + excluded.chars;
+    INSERT INTO chat_reply_lengths (hour, bucket, replies)
+        SELECT {_HOUR_EXPR.format(t="NEW")}, {_BUCKET_EXPR.format(t="NEW")}, 1
+        WHERE NEW.role = 'assistant'
+        ON CONFLICT (hour, bucket) DO UPDATE SET replies = replies + 1;
+    INSERT INTO chat_questions (hour, question, asked)
+        SELECT {_HOUR_EXPR.format(t="NEW")}, {_QUESTION_EXPR.format(t="NEW")}, 1
+        WHERE NEW.role = 'user'
+        ON CONFLICT (hour, question) DO UPDATE SET asked = asked + 1;
+    INSERT INTO chat_questions_daily (day, question, asked)
+        SELECT {_DAY_EXPR.format(t="NEW")}, {_QUESTION_EXPR.format(t="NEW")}, 1
+        WHERE NEW.role = 'user'
+        ON CONFLICT (day, question) DO UPDATE SET asked = asked + 1;
+END;
+"""
+
+_BACKFILL_ROLLUPS_SQL = f"""
+DELETE FROM chat_hourly;
+DELETE FROM chat_reply_lengths;
+DELETE FROM chat_questions;
+DELETE FROM chat_questions_daily;
+INSERT INTO chat_hourly (hour, role, messages, chars)
+    SELECT {_HOUR_EXPR.format(t="chat_logs")}, role, count(*), sum(length(message))
+    FROM chat_logs GROUP BY 1, 2;
+INSERT INTO chat_reply_lengths (hour, bucket, replies)
+    SELECT {_HOUR_EXPR.format(t="chat_logs")}, {_BUCKET_EXPR.format(t="chat_logs")}, count(*)
+    FROM chat_logs WHERE role = 'assistant' GROUP BY 1, 2;
+INSERT INTO chat_questions (hour, question, asked)
+    SELECT {_HOUR_EXPR.format(t="chat_logs")}, {_QUESTION_EXPR.format(t="chat_logs")}, count(*)
+    FROM chat_logs WHERE role = 'user' GROUP BY 1, 2;
+INSERT INTO chat_questions_daily (day, question, asked)
+    SELECT substr(hour, 1, 10), question, sum(asked) FROM chat_questions GROUP BY 1, 2;
+"""
+
+_CREATE_SEARCH_SQL = """
+CREATE VIRTUAL TABLE chat_search USING fts5(
+    message,
+    content       = 'chat_logs',
+    content_rowid = 'id',
+    tokenize      = 'porter unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE chat_search_backfill (
+    done INTEGER NOT NULL,      -- rows up to this id are indexed
+    upto INTEGER NOT NULL       -- rows after this id were indexed by the trigger
+);
+"""
+
+# Rows in (done, upto] are not in the index yet: deleting them from an
+# external-content index would corrupt it, so the triggers leave them alone
+_SEARCH_PENDING = (
+    "EXISTS (SELECT 1 FROM chat_search_backfill WHERE OLD.id > done AND OLD.id <= upto)"
+)
+
+_CREATE_SEARCH_TRIGGERS_SQL = (
+    """
+CREATE TRIGGER chat_logs_search_insert AFTER INSERT ON chat_logs
+BEGIN
+    INSERT INTO chat_search (rowid, message) VALUES (NEW.id, NEW.message);
+END;
+""",
+    f"""
+CREATE TRIGGER chat_logs_search_delete AFTER DELETE ON chat_logs
+WHEN NOT {_SEARCH_PENDING}
+BEGIN
+    INSERT INTO chat_search (chat_search, rowid, message) VALUES ('delete', OLD.id, OLD.message);
+END;
+""",
+    f"""
+CREATE TRIGGER chat_logs_search_update AFTER UPDATE OF message ON chat_logs
+WHEN NOT {_SEARCH_PENDING}
+BEGIN
+    INSERT INTO chat_search (chat_search, rowid, message) VALUES ('delete', OLD.id, OLD.message);
+    INSERT INTO chat_search (rowid, message) VALUES (NEW.id, NEW.message);
+END;
+""",
+)
+
+_DROP_SEARCH_SQL = """
+DROP TRIGGER IF EXISTS chat_logs_search_insert;
+DROP TRIGGER IF EXISTS chat_logs_search_delete;
+DROP TRIGGER IF EXISTS chat_logs_search_update;
+DROP TABLE IF EXISTS chat_search_backfill;
+DROP TABLE IF EXISTS chat_search;
+"""
+
+# Columns added after the first release — created by ALTER TABLE when missing
+_ADDED_COLUMNS: dict[str, str] = {
+    "session_id": "TEXT",
+    "turn":       "INTEGER",
+}
+
 
 # ── Internal helpers ───────────────────────────────────────────────────────
 
 def _get_connection() -> sqlite3.Connection:
     """
-    Return the module-level SQLite connection, creating it on first call.
-    Must be called with _lock held.
+    Return the module-level SQLite connection, creating it on first call
+    and the schema on first use in this process.  Must be called with
+    _lock held.
     """
     global _connection
     if _connection is None:
-        _DB_DIR.mkdir(parents=True, exist_ok=True)
+        DB_DIR.mkdir(parents=True, exist_ok=True)
         _connection = sqlite3.connect(
-            str(_DB_PATH),
+            str(DB_PATH),
+            timeout=_BUSY_TIMEOUT,      # wait for other processes' writes
             check_same_thread=False,   # guarded by _lock
             isolation_level=None,       # autocommit
         )
+        # Only takes effect on a new, empty file; it must precede journal_mode
+        # (app/database/retention.py converts older files with --vacuum)
+        _connection.execute("PRAGMA auto_vacuum=INCREMENTAL;")
         _connection.execute("PRAGMA journal_mode=WAL;")   # better concurrency
         _connection.execute("PRAGMA synchronous=NORMAL;") # safe + fast
+    if not _schema_ready:
+        _create_schema(_connection)
     return _connection
 
 
@@ -84,51 +347,376 @@ def _utc_now() -> str:
     return datetime.now(tz=timezone.utc).isoformat()
 
 
+_INSERT_SQL = (
+    "INSERT INTO chat_logs (role, message, timestamp, session_id, turn) "
+    "VALUES (?, ?, ?, ?, ?);"
+)
+
+_LAST_TURN_SQL = (
+    "SELECT turn FROM chat_logs WHERE session_id = ? AND turn IS NOT NULL "
+    "ORDER BY id DESC LIMIT 1;"
+)
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add columns introduced after the table was first created.  Hold _lock."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(chat_logs);")}
+    for column, decl in _ADDED_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE chat_logs ADD COLUMN {column} {decl};")
+            logger.info("chat_logs migrated: added column %s", column)
+
+
+def _run_script(conn: sqlite3.Connection, script: str) -> None:
+    """Execute ``;``-separated statements (unlike executescript, inside the open transaction)."""
+    for statement in script.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """The body of ``init_db``.  Hold _lock."""
+    global _schema_ready
+    with immediate(conn):
+        conn.execute(_CREATE_TABLE_SQL)
+        _migrate(conn)
+        conn.execute(_CREATE_INDEX_SQL)
+        conn.execute(_CREATE_SESSION_INDEX_SQL)
+        has_trigger = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'chat_logs_rollup';"
+        ).fetchone()
+        if not has_trigger:
+            _run_script(conn, _CREATE_ROLLUPS_SQL)
+            _backfill_rollups(conn)
+            conn.execute(_CREATE_ROLLUP_TRIGGER_SQL)
+        _create_search(conn)
+    _schema_ready = True
+
+
+def _create_search(conn: sqlite3.Connection) -> None:
+    """
+    Add (or, with CHAT_LOG_SEARCH=0, drop) the search index.  Existing rows
+    are only queued for the backfill, so this stays instant on a large log.
+    Hold _lock, inside a transaction.
+    """
+    has_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'chat_logs_search_insert';"
+    ).fetchone()
+    if not SEARCH_ENABLED:
+        if has_index:
+            _run_script(conn, _DROP_SEARCH_SQL)
+            logger.info("chat_logs search index dropped (CHAT_LOG_SEARCH=0)")
+        return
+    if has_index:
+        return
+    _run_script(conn, _DROP_SEARCH_SQL)         # leftovers of a half-built index
+    try:
+        _run_script(conn, _CREATE_SEARCH_SQL)
+    except sqlite3.OperationalError as exc:     # SQLite built without FTS5
+        logger.warning("chat_logs search index unavailable: %s", exc)
+        return
+    conn.execute(
+        "INSERT INTO chat_search_backfill (done, upto) "
+        "SELECT 0, max(id) FROM chat_logs HAVING max(id) IS NOT NULL;"
+    )
+    for trigger in _CREATE_SEARCH_TRIGGERS_SQL:
+        conn.execute(trigger)
+
+
+def _backfill_rollups(conn: sqlite3.Connection) -> None:
+    """Recompute the rollup tables from chat_logs.  Hold _lock, inside a transaction."""
+    started = time.perf_counter()
+    _run_script(conn, _BACKFILL_ROLLUPS_SQL)
+    logger.info("chat_logs rollups rebuilt in %.1fs", time.perf_counter() - started)
+
+
+def _write_rows(rows: list[_Row]) -> None:
+    """Insert rows in a single transaction.  Acquires _lock."""
+    with _lock:
+        conn = _get_connection()
+        conn.execute("BEGIN;")
+        try:
+            conn.executemany(_INSERT_SQL, rows)
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+        conn.execute("COMMIT;")
+
+
+def _next_turn(conn: sqlite3.Connection, session_id: str) -> int:
+    """The turn index the session's next row gets.  Inside ``immediate(conn)``."""
+    row = conn.execute(_LAST_TURN_SQL, (session_id,)).fetchone()
+    return 0 if row is None else row[0] + 1
+
+
+def _flush(batch: list[_Row]) -> None:
+    try:
+        _write_rows(batch)
+        _stats["written"] += len(batch)
+        _stats["batches"] += 1
+        logger.debug("chat_logs ← batch of %d rows", len(batch))
+    except Exception as exc:  # noqa: BLE001
+        _stats["failed"] += len(batch)
+        logger.warning("Failed to write %d chat log rows: %s", len(batch), exc)
+
+
+def _writer_loop() -> None:
+    """
+    Drain the queue into batched transactions.  A batch is flushed when it
+    reaches _BATCH_SIZE rows or _FLUSH_INTERVAL seconds after its first row.
+    Exits after flushing everything queued before the _STOP sentinel.
+    """
+    batch: list[_Row] = []
+    deadline = 0.0
+    while True:
+        timeout = None if not batch else max(deadline - time.monotonic(), 0.0)
+        try:
+            item = _queue.get(timeout=timeout)
+        except queue.Empty:
+            item = None
+
+        if item is _STOP:
+            if batch:
+                _flush(batch)
+            return
+        if item is not None:
+            if not batch:
+                deadline = time.monotonic() + _FLUSH_INTERVAL
+            batch.append(item)  # type: ignore[arg-type]
+
+        if batch and (len(batch) >= _BATCH_SIZE or time.monotonic() >= deadline):
+            _flush(batch)
+            batch = []
+
+
 # ── Public API ─────────────────────────────────────────────────────────────
 
 def init_db() -> None:
     """
-    Create the ``chat_logs`` table (and a timestamp index) if they do not
-    already exist.  Safe to call multiple times — all statements use
-    ``IF NOT EXISTS``.
+    Create the ``chat_logs`` table, its indexes, the rollup tables and the
+    search index with their triggers if they do not already exist, add any
+    missing columns to older databases and backfill the rollups of a
+    database that predates them.
+    Safe to call multiple times, and from several processes at once: it
+    all runs in one ``BEGIN IMMEDIATE`` transaction, so the first caller
+    creates the schema and the others find it in place.
+
+    Called once from the FastAPI ``lifespan``; code that never calls it
+    gets the schema on first use of the connection instead.
+    """
+    with _lock:
+        ready = _schema_ready
+        conn  = _get_connection()       # creates the schema unless ready
+        if ready:
+            _create_schema(conn)
+    logger.info("chat_logs DB initialised at %s", DB_PATH)
 
-    Called automatically at module import so the database is always ready
-    before the first request arrives.
+
+def rebuild_rollups() -> None:
+    """
+    Recompute every rollup table from ``chat_logs`` in one transaction.
+    Holds the writer's lock for the duration of a full scan — a
+    maintenance operation, not something to run on the request path.
     """
     with _lock:
         conn = _get_connection()
-        conn.execute(_CREATE_TABLE_SQL)
-        conn.execute(_CREATE_INDEX_SQL)
-    logger.info("chat_logs DB initialised at %s", _DB_PATH)
+        with immediate(conn):
+            _backfill_rollups(conn)
 
 
-def log_message(role: str, message: str) -> None:
+def log_message(
+    role: str,
+    message: str,
+    *,
+    session_id: str | None = None,
+    turn: int | None = None,
+) -> None:
     """
-    Insert one row into ``chat_logs``.
+    Record one row for ``chat_logs``.
 
     Args:
-        role:    Speaker identifier — typically ``"user"`` or ``"assistant"``.
-                 Pass ``"error"`` to log failed exchanges.
-        message: The raw text to persist.
+        role:       Speaker identifier — typically ``"user"`` or ``"assistant"``.
+                    Pass ``"error"`` to log failed exchanges.
+        message:    The raw text to persist.
+        session_id: Chat session the message belongs to, if known.
+        turn:       Position of the message within the session's conversation.
+
+    With the background writer running the row is only queued; otherwise it
+    is inserted immediately.
 
     This function never raises.  Any database error is caught and logged at
     WARNING level so that a storage failure never interrupts the chat flow.
     """
+    started = time.perf_counter()
+    row: _Row = (role, message, _utc_now(), session_id, turn)
+
+    if _writer is not None:
+        try:
+            if _FULL_POLICY == "block":
+                _queue.put(row, timeout=_BLOCK_TIMEOUT)
+            else:
+                _queue.put_nowait(row)
+            _stats["enqueued"] += 1
+        except queue.Full:
+            _stats["dropped"] += 1
+            logger.warning("Chat log queue full — dropped %s message", role)
+        metrics.observe("log_message", time.perf_counter() - started)
+        return
+
+    try:
+        _write_rows([row])
+        logger.debug("chat_logs ← [%s] %d chars at %s", role, len(message), row[2])
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to log chat message (role=%s): %s", role, exc)
+    metrics.observe("log_message", time.perf_counter() - started)
+
+
+def append_turns(session_id: str, turns: list[tuple[str, str]]) -> int:
+    """
+    Write ``(role, message)`` turns of a session synchronously, in one
+    ``BEGIN IMMEDIATE`` transaction, and return the turn index of the first.
+
+    Turn indices are allocated inside the transaction from the session's
+    newest row, so they stay unique and in order when several processes
+    serve the same session.  Unlike ``log_message`` this bypasses the
+    background writer: the rows are visible to every process on return.
+    Raises ``sqlite3.Error`` on failure.
+    """
+    started   = time.perf_counter()
     timestamp = _utc_now()
+    with _lock:
+        conn = _get_connection()
+        with immediate(conn):
+            first = _next_turn(conn, session_id)
+            conn.executemany(_INSERT_SQL, [
+                (role, message, timestamp, session_id, first + offset)
+                for offset, (role, message) in enumerate(turns)
+            ])
+    metrics.observe("log_message", time.perf_counter() - started)
+    return first
+
+
+def last_turn(session_id: str) -> int | None:
+    """
+    Return the turn index of the session's newest turn (``None`` for a new
+    session), served by the ``(session_id, id)`` index.  Raises
+    ``sqlite3.Error`` on failure.
+    """
+    with _lock:
+        row = _get_connection().execute(_LAST_TURN_SQL, (session_id,)).fetchone()
+    return None if row is None else row[0]
+
+
+def recent_turns(session_id: str, limit: int) -> list[tuple[str, str, int | None]]:
+    """
+    Return up to ``limit`` of the newest turns of a session as ``(role,
+    message, turn)`` tuples, oldest first.  Served by the ``(session_id,
+    id)`` index.  Returns an empty list on any database error.
+
+    Only rows with a turn index count: a question whose answer failed is
+    logged without one and is not part of the conversation.
+    """
     try:
         with _lock:
-            conn = _get_connection()
-            conn.execute(
-                "INSERT INTO chat_logs (role, message, timestamp) VALUES (?, ?, ?);",
-                (role, message, timestamp),
-            )
-        logger.debug("chat_logs ← [%s] %d chars at %s", role, len(message), timestamp)
+            rows = _get_connection().execute(
+                "SELECT role, message, turn FROM chat_logs "
+                "WHERE session_id = ? AND turn IS NOT NULL "
+                "ORDER BY id DESC LIMIT ?;",
+                (session_id, limit),
+            ).fetchall()
     except Exception as exc:  # noqa: BLE001
-        logger.warning("Failed to log chat message (role=%s): %s", role, exc)
+        logger.warning("Failed to read session %s history: %s", session_id, exc)
+        return []
+    rows.reverse()
+    return rows
+
+
+def start_writer() -> None:
+    """Start the background batch writer (no-op if it is already running)."""
+    global _writer
+    if _writer is not None:
+        return
+    _writer = threading.Thread(target=_writer_loop, name="chat-log-writer", daemon=True)
+    _writer.start()
+    logger.info(
+        "Chat log writer started (batch=%d, interval=%.2fs, queue=%d)",
+        _BATCH_SIZE, _FLUSH_INTERVAL, _QUEUE_SIZE,
+    )
+
+
+def stop_writer(timeout: float = 10.0) -> None:
+    """
+    Flush every queued row and stop the writer.  Rows logged after this call
+    are written synchronously again.
+    """
+    global _writer
+    if _writer is None:
+        return
+    writer, _writer = _writer, None
+    _queue.put(_STOP)
+    writer.join(timeout)
+    if writer.is_alive():
+        logger.warning("Chat log writer did not drain within %.1fs", timeout)
+    else:
+        logger.info("Chat log writer stopped (%d rows written)", _stats["written"])
+
+
+@contextmanager
+def immediate(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    One ``BEGIN IMMEDIATE`` transaction: the database write lock is taken
+    up front, so other processes wait for the whole block instead of
+    interleaving with it.  Hold _lock (use it inside ``connection()``).
+    """
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK;")
+        raise
+    conn.execute("COMMIT;")
+
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    """
+    Hold _lock and yield the shared connection, for maintenance code
+    (retention, the search backfill) that writes outside ``log_message``.
+    """
+    with _lock:
+        yield _get_connection()
+
+
+class LockedConnection:
+    """``connection()`` as a reusable callable, timing the longest hold."""
+
+    def __init__(self) -> None:
+        self.longest = 0.0
+
+    @contextmanager
+    def __call__(self) -> Iterator[sqlite3.Connection]:
+        with connection() as conn:
+            started = time.perf_counter()
+            try:
+                yield conn
+            finally:
+                self.longest = max(self.longest, time.perf_counter() - started)
+
+
+def close_connection() -> None:
+    """
+    Close the shared connection; the next call reopens it.  A process that
+    forks workers calls this first, so no child inherits an open SQLite
+    handle.  Stop the writer before calling it.
+    """
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
 
 
-# ── Auto-init on import ────────────────────────────────────────────────────
-# Ensures the table exists as soon as this module is imported, with no
-# explicit setup step required by the caller.
+def writer_stats() -> dict[str, int | bool]:
+    """Counters for ``/api/admin/status``: queued, written, dropped and failed rows."""
+    return {"running": _writer is not None, "queued": _queue.qsize(), **_stats}
 
-init_db()
@@ -0,0 +1,390 @@
+"""
+backend/app/database/retention.py
+
+Retention, archival and compaction for the chat log (chat_logs.db).
+
+Without it the database grows without bound and the WAL is only ever
+checkpointed passively by SQLite.  One maintenance run:
+
+  1. expire   — rows older than ``CHAT_LOG_RETENTION_DAYS`` are read,
+                appended to the archive and deleted, ``CHAT_LOG_DELETE_BATCH``
+                rows at a time.  The writer's ``_lock`` is taken once to read
+                a batch and once to delete it, so queued chat-log inserts
+                wait at most one small statement.  The question rollups hold
+                message text too and are pruned with the same cutoff; the
+                count-only rollups (``chat_hourly``, ``chat_reply_lengths``)
+                are kept, so the admin stats still cover expired hours.
+  2. vacuum   — freed pages are returned to the filesystem with
+                ``PRAGMA incremental_vacuum``, ``CHAT_LOG_VACUUM_STEP`` pages
+                per step.  This needs ``auto_vacuum=INCREMENTAL``, which
+                ``db.py`` sets on new databases; an older database is
+                converted once with ``--vacuum`` (a full ``VACUUM``).
+  3. truncate — ``PRAGMA wal_checkpoint(TRUNCATE)`` copies the WAL back into
+                the database and truncates it to zero bytes.
+
+Each run returns a report (rows expired, archive files written, pages
+vacuumed, database + WAL bytes before and after) that is also kept for
+``/api/admin/status``.
+
+Archive
+───────
+  Expired rows are written as gzip-compressed NDJSON, one file per UTC day
+  of their timestamp:
+
+      <CHAT_LOG_ARCHIVE_DIR>/2026/02/chat_logs-2026-02-21.ndjson.gz
+
+  Each batch appends a gzip member, which ``gzip``/``zcat`` read as one
+  stream.  A batch is flushed and fsynced before its rows are deleted, so
+  a crash in between archives those rows twice rather than losing them
+  (``id`` identifies duplicates).
+
+Scheduling
+──────────
+  ``start_maintenance()`` runs a pass every ``CHAT_LOG_MAINTENANCE_INTERVAL``
+  seconds on a daemon thread (started from ``lifespan``).  A file lock next
+  to the database lets only one process run a pass at a time, and its
+  mtime records the last pass: with several workers, a timer that finds a
+  pass younger than half an interval skips its turn, so the host still
+  runs about one pass per interval.  From the command line (stop the
+  server first for ``--vacuum``):
+
+      python -m app.database.retention [--retention-days N] [--dry-run] [--vacuum]
+
+Public API
+──────────
+  run_maintenance(...) -> dict    – one pass; returns its report
+  start_maintenance()             – run passes on a timer
+  stop_maintenance()
+  maintenance_stats() -> dict     – settings, run count and last report
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.database import db
+
+try:  # POSIX only; elsewhere concurrent passes are not prevented
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_RETENTION_DAYS = float(os.getenv("CHAT_LOG_RETENTION_DAYS", "0"))           # 0 keeps everything
+_ARCHIVE        = os.getenv("CHAT_LOG_ARCHIVE", "1") != "0"
+_ARCHIVE_DIR    = Path(os.getenv("CHAT_LOG_ARCHIVE_DIR", str(db.DB_DIR / "archive")))
+_DELETE_BATCH   = int(os.getenv("CHAT_LOG_DELETE_BATCH", "1000"))
+_VACUUM_STEP    = int(os.getenv("CHAT_LOG_VACUUM_STEP", "1024"))             # pages
+_INTERVAL       = float(os.getenv("CHAT_LOG_MAINTENANCE_INTERVAL", "3600"))  # seconds; 0 disables
+
+_LOCK_PATH = db.DB_PATH.with_name(db.DB_PATH.name + ".maintenance.lock")
+
+_COLUMNS = ("id", "role", "message", "timestamp", "session_id", "turn")
+
+_timer:      threading.Thread | None = None
+_timer_stop: threading.Event = threading.Event()
+_run_lock:   threading.Lock = threading.Lock()
+_stats: dict[str, Any] = {"runs": 0, "failed": 0, "skipped": 0, "last": None}
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────
+
+@contextmanager
+def _exclusive() -> Iterator[bool]:
+    """Hold the cross-process maintenance lock; yields False if it is taken."""
+    if not _run_lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+        db.DB_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_LOCK_PATH, "a") as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+    finally:
+        _run_lock.release()
+
+
+def _file_bytes() -> int:
+    """Size of the database file plus its WAL."""
+    total = 0
+    for path in (db.DB_PATH, db.DB_PATH.with_name(db.DB_PATH.name + "-wal")):
+        try:
+            total += path.stat().st_size
+        except FileNotFoundError:
+            pass
+    return total
+
+
+def _archive_path(archive_dir: Path, day: str) -> Path:
+    return archive_dir / day[:4] / day[5:7] / f"chat_logs-{day}.ndjson.gz"
+
+
+def _archive(rows: list[tuple], archive_dir: Path) -> set[Path]:
+    """Append ``rows`` to their day files and fsync them."""
+    import gzip     # only needed once rows expire; kept off the import path
+
+    by_day: dict[str, list[tuple]] = {}
+    for row in rows:
+        by_day.setdefault(row[3][:10], []).append(row)
+
+    written: set[Path] = set()
+    for day, day_rows in by_day.items():
+        path = _archive_path(archive_dir, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(
+            json.dumps(dict(zip(_COLUMNS, row)), ensure_ascii=False) + "\n" for row in day_rows
+        )
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as member:
+                member.write(lines.encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        written.add(path)
+    return written
+
+
+def _expire(locked: db.LockedConnection, cutoff: str, archive_dir: Path | None) -> tuple[int, set[Path]]:
+    """Archive and delete chat_logs rows older than ``cutoff``, batch by batch."""
+    deleted, files = 0, set()
+    while True:
+        with locked() as conn:
+            rows = conn.execute(
+                "SELECT id, role, message, timestamp, session_id, turn FROM chat_logs "
+                "WHERE timestamp < ? ORDER BY timestamp, id LIMIT ?;",
+                (cutoff, _DELETE_BATCH),
+            ).fetchall()
+        if not rows:
+            return deleted, files
+        if archive_dir is not None:
+            files |= _archive(rows, archive_dir)
+        ids = [row[0] for row in rows]
+        with locked() as conn:
+            conn.execute(f"DELETE FROM chat_logs WHERE id IN ({','.join('?' * len(ids))});", ids)
+        deleted += len(ids)
+
+
+def _prune_questions(locked: db.LockedConnection, cutoff: str) -> int:
+    """Delete question rollup rows for hours / days before ``cutoff``."""
+    pruned = 0
+    for table, key, bound in (
+        ("chat_questions", "hour", cutoff[:13]),
+        ("chat_questions_daily", "day", cutoff[:10]),
+    ):
+        while True:
+            with locked() as conn:
+                removed = conn.execute(
+                    f"DELETE FROM {table} WHERE ({key}, question) IN "
+                    f"(SELECT {key}, question FROM {table} WHERE {key} < ? LIMIT ?);",
+                    (bound, _DELETE_BATCH),
+                ).rowcount
+            pruned += removed
+            if removed < _DELETE_BATCH:
+                break
+    return pruned
+
+
+def _incremental_vacuum(locked: db.LockedConnection) -> int:
+    """Release free pages in ``_VACUUM_STEP`` chunks; returns pages released."""
+    with locked() as conn:
+        if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+            return 0
+    released = 0
+    while True:
+        with locked() as conn:
+            free = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+            if not free:
+                return released
+            conn.execute(f"PRAGMA incremental_vacuum({_VACUUM_STEP});").fetchall()
+            released += free - conn.execute("PRAGMA freelist_count;").fetchone()[0]
+
+
+# ── Public API ─────────────────────────────────────────────────────────────
+
+def run_maintenance(
+    *,
+    retention_days: float | None = None,
+    archive: bool | None = None,
+    archive_dir: Path | None = None,
+    dry_run: bool = False,
+    full_vacuum: bool = False,
+) -> dict[str, Any]:
+    """
+    One maintenance pass (see the module docstring); arguments default to
+    the environment settings.  ``dry_run`` only counts the rows that would
+    expire.  ``full_vacuum`` rebuilds the whole file with ``VACUUM`` instead
+    of the incremental step, switching the database to incremental
+    auto-vacuum — it holds the writer's lock throughout.
+
+    Returns the report; ``{"skipped": True}`` if another pass is running.
+    """
+    retention_days = _RETENTION_DAYS if retention_days is None else retention_days
+    archive_dir    = (archive_dir or _ARCHIVE_DIR) if (_ARCHIVE if archive is None else archive) else None
+    cutoff = (
+        (datetime.now(tz=timezone.utc) - timedelta(days=retention_days)).isoformat()
+        if retention_days > 0 else None
+    )
+
+    with _exclusive() as acquired:
+        if not acquired:
+            _stats["skipped"] += 1
+            return {"skipped": True}
+
+        started = time.perf_counter()
+        locked  = db.LockedConnection()
+        report: dict[str, Any] = {"cutoff": cutoff, "dry_run": dry_run}
+
+        if dry_run:
+            if cutoff is not None:
+                with locked() as conn:
+                    report["expired_rows"] = conn.execute(
+                        "SELECT count(*) FROM chat_logs WHERE timestamp < ?;", (cutoff,)
+                    ).fetchone()[0]
+            return report
+
+        bytes_before = _file_bytes()
+        deleted, files, pruned = 0, set(), 0
+        try:
+            if cutoff is not None:
+                deleted, files = _expire(locked, cutoff, archive_dir)
+                pruned = _prune_questions(locked, cutoff)
+            if full_vacuum:
+                with locked() as conn:
+                    conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+                    conn.execute("VACUUM;")
+                vacuumed = None
+            else:
+                vacuumed = _incremental_vacuum(locked)
+            with locked() as conn:
+                busy, wal_pages, checkpointed = conn.execute(
+                    "PRAGMA wal_checkpoint(TRUNCATE);"
+                ).fetchone()
+        except Exception:
+            _stats["failed"] += 1
+            raise
+        bytes_after = _file_bytes()
+
+        report.update({
+            "expired_rows":     deleted,
+            "pruned_questions": pruned,
+            "archive_files":    sorted(str(path) for path in files),
+            "vacuumed_pages":   vacuumed,
+            "checkpoint":       {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed": checkpointed},
+            "bytes_before":     bytes_before,
+            "bytes_after":      bytes_after,
+            "reclaimed_bytes":  bytes_before - bytes_after,
+            "max_lock_ms":      round(locked.longest * 1000, 2),
+            "seconds":          round(time.perf_counter() - started, 3),
+        })
+        if fcntl is not None:
+            os.utime(_LOCK_PATH)    # marks the pass for the other workers' timers
+        _stats["runs"] += 1
+        _stats["last"] = {"finished_at": datetime.now(tz=timezone.utc).isoformat(), **report}
+        logger.info(
+            "chat_logs maintenance: %d rows expired, %d bytes reclaimed in %.2fs (longest lock %.1f ms)",
+            deleted, report["reclaimed_bytes"], report["seconds"], report["max_lock_ms"],
+        )
+        return report
+
+
+def _ran_recently() -> bool:
+    """Whether any process finished a pass within the last half interval."""
+    try:
+        return time.time() - _LOCK_PATH.stat().st_mtime < _INTERVAL / 2
+    except FileNotFoundError:
+        return False
+
+
+def _maintenance_loop() -> None:
+    while not _timer_stop.wait(_INTERVAL):
+        if _ran_recently():
+            _stats["skipped"] += 1
+            continue
+        try:
+            run_maintenance()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("chat_logs maintenance failed: %s", exc)
+
+
+def start_maintenance() -> None:
+    """Run a maintenance pass every ``CHAT_LOG_MAINTENANCE_INTERVAL`` seconds (0 disables)."""
+    global _timer
+    if _timer is not None or _INTERVAL <= 0:
+        return
+    _timer_stop.clear()
+    _timer = threading.Thread(target=_maintenance_loop, name="chat-log-maintenance", daemon=True)
+    _timer.start()
+    logger.info(
+        "Chat log maintenance every %.0fs (retention %s)",
+        _INTERVAL, f"{_RETENTION_DAYS:g} days" if _RETENTION_DAYS > 0 else "unlimited",
+    )
+
+
+def stop_maintenance(timeout: float = 30.0) -> None:
+    """Stop the timer, waiting for a pass in progress to finish."""
+    global _timer
+    if _timer is None:
+        return
+    timer, _timer = _timer, None
+    _timer_stop.set()
+    timer.join(timeout)
+
+
+def maintenance_stats() -> dict[str, Any]:
+    """Settings, run counters and the last report, for ``/api/admin/status``."""
+    return {
+        "scheduled":      _timer is not None,
+        "interval":       _INTERVAL,
+        "retention_days": _RETENTION_DAYS,
+        **_stats,
+    }
+
+
+# ── Command line ───────────────────────────────────────────────────────────
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Expire, archive and compact the chat log.")
+    parser.add_argument("--retention-days", type=float, default=None,
+                        help=f"keep this many days of rows (default CHAT_LOG_RETENTION_DAYS={_RETENTION_DAYS:g}; 0 keeps all)")
+    parser.add_argument("--archive-dir", type=Path, default=None, help=f"default {_ARCHIVE_DIR}")
+    parser.add_argument("--no-archive", action="store_true", help="delete expired rows without archiving them")
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows that would expire")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="full VACUUM, enabling incremental auto-vacuum on an older database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    report = run_maintenance(
+        retention_days=args.retention_days,
+        archive=False if args.no_archive else None,
+        archive_dir=args.archive_dir,
+        dry_run=args.dry_run,
+        full_vacuum=args.vacuum,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
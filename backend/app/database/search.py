@@ -0,0 +1,355 @@
+"""
+backend/app/database/search.py
+
+Full-text search over the chat log, for the admin API.
+
+Queries run against the ``chat_search`` FTS5 index that ``db.py`` keeps in
+sync with ``chat_logs`` (see its "Search" section), instead of a
+``LIKE '%…%'`` scan of every message.
+
+Queries
+───────
+  The query is a list of words and ``"quoted phrases"``; a row must
+  contain all of them.  Words are matched after stemming and without case
+  or accents ("projects" finds "project"), and ``word*`` matches a prefix.
+  FTS5 operators are not interpreted, so any input is a valid query.
+  Results are ordered by BM25 relevance (or newest first), filtered by a
+  time window and role, and paged with ``limit`` / ``offset``.  Each hit
+  carries a snippet of the message around the matched terms, which are
+  wrapped in ``<mark>…</mark>``.
+
+  The time window is also turned into a rowid range, so the index only
+  reads and scores the matches inside it.  Ids grow with timestamps except
+  for rows logged within a flush interval of each other, so the range is
+  looked up ``_ID_ORDER_SLACK`` wider on the timestamp index and the exact
+  window is applied to the rows it returns.  Ranking scores every match in
+  the window; ``order="newest"`` stops after one page, which keeps very
+  common terms cheap.
+
+Backfill
+────────
+  A database that had rows before the index existed records their id range
+  in ``chat_search_backfill``; new rows are indexed by the trigger straight
+  away.  ``start_backfill()`` (FastAPI ``lifespan``) indexes the old rows
+  on a daemon thread, ``CHAT_LOG_SEARCH_CHUNK`` rows per transaction with a
+  ``CHAT_LOG_SEARCH_PAUSE`` pause in between, so chat-log inserts wait at
+  most one chunk.  Each chunk reads and advances the range in its own
+  ``BEGIN IMMEDIATE`` transaction, so several workers can share the work.
+  Until it finishes, searches only see the rows indexed so far and say so
+  (``"partial": true``).  From the command line:
+
+      python -m app.database.search "MarketMuse" [--since ISO] [--role user]
+      python -m app.database.search --backfill
+
+Public API
+──────────
+  search(query, since, until, role, order, limit, offset) -> dict
+  backfill(chunk, pause) -> int     – index pending rows; returns how many
+  start_backfill() / stop_backfill()
+  search_stats() -> dict
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.database import db
+from app.database.analytics import reader
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_CHUNK = int(os.getenv("CHAT_LOG_SEARCH_CHUNK", "1000"))     # rows per backfill transaction
+_PAUSE = float(os.getenv("CHAT_LOG_SEARCH_PAUSE", "0.05"))   # seconds between chunks
+
+_SNIPPET_TOKENS = 24
+_MARK           = ("<mark>", "</mark>")
+
+_ORDERS = {
+    "rank":   "ORDER BY chat_search.rank",
+    "newest": "ORDER BY chat_search.rowid DESC",
+}
+
+# A row is written within seconds of its timestamp (one flush interval, or
+# a busy timeout), so ids follow timestamps up to this slack
+_ID_ORDER_SLACK = timedelta(minutes=5)
+
+_TERM = re.compile(r'"([^"]*)"?|(\S+)')
+
+
+class SearchUnavailable(RuntimeError):
+    """The search index does not exist (CHAT_LOG_SEARCH=0, or no FTS5)."""
+
+
+_thread: threading.Thread | None = None
+_stop:   threading.Event = threading.Event()
+_stats:  dict[str, Any] = {"queries": 0, "backfilled": 0, "chunks": 0, "max_lock_ms": 0.0}
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────
+
+def _match_expression(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression: every word or quoted
+    phrase becomes a quoted FTS5 phrase (``word*`` a prefix query), joined
+    by the implicit AND.  Raises ValueError if nothing searchable is left.
+    """
+    phrases = []
+    for phrase, word in _TERM.findall(query):
+        text   = (phrase or word).strip()
+        prefix = bool(word) and text.endswith("*")
+        text   = text.rstrip("*") if prefix else text
+        if text:
+            phrases.append('"' + text.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if not phrases:
+        raise ValueError("Empty search query.")
+    return " ".join(phrases)
+
+
+def _timestamp(moment: datetime) -> str:
+    """``moment`` in the format chat_logs.timestamp is stored in (naive = UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+def _id_before(conn: sqlite3.Connection, moment: datetime) -> int | None:
+    """Id of the last row logged before ``moment`` (timestamp index), if any."""
+    row = conn.execute(
+        "SELECT id FROM chat_logs WHERE timestamp < ? ORDER BY timestamp DESC LIMIT 1;",
+        (_timestamp(moment),),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _id_from(conn: sqlite3.Connection, moment: datetime) -> int | None:
+    """Id of the first row logged at or after ``moment`` (timestamp index), if any."""
+    row = conn.execute(
+        "SELECT id FROM chat_logs WHERE timestamp >= ? ORDER BY timestamp LIMIT 1;",
+        (_timestamp(moment),),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _pending(conn: sqlite3.Connection) -> int:
+    """Upper bound on rows the backfill has yet to index (ids, not rows)."""
+    row = conn.execute("SELECT upto - done FROM chat_search_backfill;").fetchone()
+    return row[0] if row else 0
+
+
+def _backfill_chunk(locked: db.LockedConnection, chunk: int) -> int | None:
+    """Index the next ``chunk`` ids of the pending range; None once it is empty."""
+    with locked() as conn, db.immediate(conn):
+        row = conn.execute("SELECT done, upto FROM chat_search_backfill;").fetchone()
+        if row is None:
+            return None
+        done, upto = row
+        last = min(done + chunk, upto)
+        indexed = conn.execute(
+            "INSERT INTO chat_search (rowid, message) "
+            "SELECT id, message FROM chat_logs WHERE id > ? AND id <= ?;",
+            (done, last),
+        ).rowcount
+        if last >= upto:
+            conn.execute("DELETE FROM chat_search_backfill;")
+        else:
+            conn.execute("UPDATE chat_search_backfill SET done = ?;", (last,))
+    return indexed
+
+
+# ── Public API ─────────────────────────────────────────────────────────────
+
+def search(
+    query: str,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    role: str | None = None,
+    order: str = "rank",
+    limit: int = 20,
+    offset: int = 0,
+) -> dict[str, Any]:
+    """
+    Chat-log rows matching ``query`` (see "Queries"), logged in
+    ``[since, until)`` and by ``role`` when given.  Returns the total number
+    of matches, one page of hits with snippets, and whether rows are still
+    waiting for the backfill.
+
+    Raises ValueError for an empty query or unknown order, and
+    SearchUnavailable when there is no index.
+    """
+    if order not in _ORDERS:
+        raise ValueError(f"Unknown order {order!r} (expected one of {', '.join(_ORDERS)}).")
+    where  = ["chat_search MATCH :match"]
+    params: dict[str, Any] = {
+        "match": _match_expression(query), "limit": limit, "offset": offset,
+        "open": _MARK[0], "close": _MARK[1], "tokens": _SNIPPET_TOKENS,
+    }
+    if role is not None:
+        where.append("l.role = :role")
+        params["role"] = role
+
+    try:
+        with reader() as conn:
+            if since is not None:
+                where.append("l.timestamp >= :since")
+                params["since"] = _timestamp(since)
+                low = _id_before(conn, since - _ID_ORDER_SLACK)
+                if low is not None:
+                    where.append("chat_search.rowid > :low")
+                    params["low"] = low
+            if until is not None:
+                where.append("l.timestamp < :until")
+                params["until"] = _timestamp(until)
+                high = _id_from(conn, until + _ID_ORDER_SLACK)
+                if high is not None:
+                    where.append("chat_search.rowid < :high")
+                    params["high"] = high
+            matches = (
+                "FROM chat_search JOIN chat_logs l ON l.id = chat_search.rowid WHERE " + " AND ".join(where)
+            )
+            if len(where) == 1:         # no filters: count the index alone, without the join
+                total = conn.execute(
+                    "SELECT count(*) FROM chat_search WHERE chat_search MATCH :match;", params
+                ).fetchone()[0]
+            else:
+                total = conn.execute(f"SELECT count(*) {matches};", params).fetchone()[0]
+            rows = conn.execute(
+                "SELECT l.id, l.role, l.timestamp, l.session_id, l.turn, "
+                "snippet(chat_search, 0, :open, :close, '…', :tokens), chat_search.rank "
+                f"{matches} {_ORDERS[order]} LIMIT :limit OFFSET :offset;",
+                params,
+            ).fetchall()
+            pending = _pending(conn)
+    except sqlite3.OperationalError as exc:
+        if "no such table" in str(exc):
+            raise SearchUnavailable("The chat log has no search index.") from exc
+        raise
+    _stats["queries"] += 1
+
+    return {
+        "total":       total,
+        "offset":      offset,
+        "limit":       limit,
+        "next_offset": offset + len(rows) if offset + len(rows) < total else None,
+        "partial":     pending > 0,
+        "results": [
+            {"id": id_, "role": role_, "timestamp": ts, "session_id": session, "turn": turn,
+             "snippet": snippet, "score": round(-rank, 6)}
+            for id_, role_, ts, session, turn, snippet, rank in rows
+        ],
+    }
+
+
+def backfill(chunk: int | None = None, pause: float | None = None) -> int:
+    """
+    Index the rows that predate the search index, ``chunk`` rows per
+    transaction with ``pause`` seconds in between (defaults from the
+    environment).  Returns the number of rows indexed by this call; stops
+    early when ``stop_backfill()`` is called.
+    """
+    chunk = chunk or _CHUNK
+    pause = _PAUSE if pause is None else pause
+    locked  = db.LockedConnection()
+    started = time.perf_counter()
+    total   = 0
+    try:
+        while not _stop.is_set():
+            indexed = _backfill_chunk(locked, chunk)
+            if indexed is None:
+                break
+            total += indexed
+            _stats["backfilled"] += indexed
+            _stats["chunks"] += 1
+            if pause:
+                _stop.wait(pause)
+    except sqlite3.OperationalError as exc:
+        if "no such table" not in str(exc):     # no index to fill
+            raise
+    finally:
+        _stats["max_lock_ms"] = max(_stats["max_lock_ms"], round(locked.longest * 1000, 2))
+    if total:
+        logger.info(
+            "chat_search backfill: %d rows indexed in %.1fs (longest lock %.1f ms)",
+            total, time.perf_counter() - started, locked.longest * 1000,
+        )
+    return total
+
+
+def _backfill_loop() -> None:
+    try:
+        backfill()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("chat_search backfill failed: %s", exc)
+
+
+def start_backfill() -> None:
+    """Index rows that predate the search index on a daemon thread (no-op if running)."""
+    global _thread
+    if _thread is not None or not db.SEARCH_ENABLED:
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_backfill_loop, name="chat-search-backfill", daemon=True)
+    _thread.start()
+
+
+def stop_backfill(timeout: float = 10.0) -> None:
+    """Stop the backfill after its current chunk; the next start resumes it."""
+    global _thread
+    if _thread is None:
+        return
+    thread, _thread = _thread, None
+    _stop.set()
+    thread.join(timeout)
+
+
+def search_stats() -> dict[str, Any]:
+    """Query and backfill counters, for ``/api/admin/status``."""
+    return {
+        "enabled":          db.SEARCH_ENABLED,
+        "backfill_running": _thread is not None and _thread.is_alive(),
+        **_stats,
+    }
+
+
+# ── Command line ───────────────────────────────────────────────────────────
+
+def main() -> None:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Search the chat log, or index rows that predate the index.")
+    parser.add_argument("query", nargs="?", help='words and "quoted phrases"; word* matches a prefix')
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--role", choices=("user", "assistant", "error"), default=None)
+    parser.add_argument("--order", choices=tuple(_ORDERS), default="rank")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--backfill", action="store_true", help="index every pending row now, without pauses")
+    args = parser.parse_args()
+    if not args.backfill and args.query is None:
+        parser.error("give a query or --backfill")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    db.init_db()
+    if args.backfill:
+        print(json.dumps({"indexed": backfill(pause=0)}))
+    if args.query is not None:
+        result = search(
+            args.query, since=args.since, until=args.until, role=args.role,
+            order=args.order, limit=args.limit, offset=args.offset,
+        )
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+backend/app/evaluate.py
+
+Offline batch evaluation: run a file of questions through the same prompt
+assembly and OpenRouter client as ``/api/chat`` (``assemble_prompt`` +
+``ask_openrouter``, without the answer cache, precomputed answers or the
+prefilter) and write one result per question, to compare prompt, context
+or model changes on more than a handful of questions:
+
+    python -m app.evaluate questions.jsonl -o results.jsonl --concurrency 8
+    python -m app.evaluate questions.jsonl -o results.jsonl --resume
+    python -m app.evaluate questions.jsonl -o results.jsonl --stub      # offline
+
+Input
+─────
+  JSONL, one question per line; blank lines and ``#`` comments are skipped::
+
+      {"id": "q1", "question": "What projects has Hanzala built?"}
+      {"id": "q2", "question": "Which one used RAG?",
+       "history": [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}]}
+
+  ``id`` defaults to the line number and ``message`` is accepted for
+  ``question``; any other fields are copied to the result as ``meta``.
+  A line that cannot be used is reported as an error of category
+  ``"input"``.
+
+Output
+──────
+  JSONL, one line per question in the order they finish::
+
+      {"id", "question", "answer", "error": null | {"category", "message"},
+       "latency_ms", "total_ms", "prompt_ms", "prompt_tokens", "reply_tokens",
+       "history_turns", "attempts", "meta"}
+
+  ``latency_ms`` is the successful (or last) OpenRouter call, ``total_ms``
+  includes rate-limit waits and retries.  Token counts are the estimates
+  of app/services/token_counter.py, the ones the prompt budget uses; the
+  client only returns the reply text.  A summary (counts, error
+  categories, latency percentiles, throughput, models and context
+  fingerprint) is printed to stderr at the end and written to
+  ``--summary`` as JSON.
+
+Concurrency and memory
+──────────────────────
+  A reader task parses the input line by line into a queue of
+  ``2 × --concurrency`` items, and ``--concurrency`` workers take
+  questions from it.  Latencies go into fixed-bucket histograms, so
+  memory stays flat however long the file is; only the ids of finished
+  questions are kept, for ``--resume``.  Identical questions are not
+  coalesced into one upstream call (``OPENROUTER_COALESCE=0`` unless set).
+
+Rate limits
+───────────
+  ``ask_openrouter`` retries a 429 itself (``OPENROUTER_RETRIES``).  When
+  one still surfaces — or the circuit breaker is open — every worker
+  pauses until its ``Retry-After`` (else an exponential backoff) has
+  passed and the question is asked again, up to ``--retries`` times.
+  ``--rps`` additionally caps the request rate with a token bucket.
+
+Resuming
+────────
+  The output file is the checkpoint: each result is flushed as soon as it
+  is written, and ``--resume`` skips the ids already in it (``--retry-errors``
+  asks again those that only have errors).  A last line cut short by a
+  crash is truncated first.  Without ``--resume`` an existing output file
+  is refused rather than overwritten.
+
+Offline runs
+────────────
+  ``--stub`` starts benchmarks/fake_openrouter.py on a free local port and
+  points the client at it, so the runner (and CI) work without a key or
+  network.  ``--api-url`` targets any other compatible endpoint.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+logger = logging.getLogger("app.evaluate")
+
+# Categories that mean "slow down": pause every worker and ask again
+_BACKPRESSURE = frozenset({"rate_limit", "circuit_open"})
+
+_MAX_BACKOFF = 60.0     # seconds, when the upstream gave no Retry-After
+
+
+@dataclass
+class _Item:
+    id:       str
+    question: str
+    history:  list[dict[str, str]] = field(default_factory=list)
+    meta:     dict[str, Any] = field(default_factory=dict)
+
+
+class _InputError(ValueError):
+    """A line of the input file that cannot be evaluated; reported under its line number."""
+
+    def __init__(self, number: int, problem: str) -> None:
+        super().__init__(f"line {number}: {problem}")
+        self.id = str(number)
+
+
+# ── Input and checkpoint ───────────────────────────────────────────────────
+
+def _parse(line: str, number: int) -> _Item:
+    try:
+        data = json.loads(line)
+    except ValueError as exc:
+        raise _InputError(number, f"not JSON ({exc})") from exc
+    if not isinstance(data, dict):
+        raise _InputError(number, "expected a JSON object")
+    question = data.pop("question", None) or data.pop("message", None)
+    if not isinstance(question, str) or not question.strip():
+        raise _InputError(number, "no question")
+    history = data.pop("history", None) or []
+    if not isinstance(history, list) or not all(
+        isinstance(turn, dict) and turn.get("role") in ("user", "assistant")
+        and isinstance(turn.get("content"), str)
+        for turn in history
+    ):
+        raise _InputError(number, "history must be a list of user/assistant turns")
+    item_id = data.pop("id", None)
+    return _Item(
+        id=str(number) if item_id is None else str(item_id),
+        question=question,
+        history=[{"role": turn["role"], "content": turn["content"]} for turn in history],
+        meta=data,
+    )
+
+
+def _read_input(path: Path) -> Iterator[_Item | _InputError]:
+    """Questions (or input errors) one line at a time, never the whole file."""
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                yield _parse(line, number)
+            except _InputError as exc:
+                yield exc
+
+
+def _finished_ids(path: Path, retry_errors: bool) -> set[str]:
+    """
+    Ids that already have a result in ``path`` (with ``retry_errors``, a
+    successful one).  A trailing partial line is cut off first.
+    """
+    finished: set[str] = set()
+    good_bytes = 0
+    with open(path, "rb") as handle:
+        for raw in handle:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                result = json.loads(raw)
+            except ValueError:
+                break
+            good_bytes += len(raw)
+            if not retry_errors or result.get("error") is None:
+                finished.add(str(result["id"]))
+    if good_bytes != path.stat().st_size:
+        logger.warning("Truncating an incomplete last line of %s", path)
+        os.truncate(path, good_bytes)
+    return finished
+
+
+# ── Pacing ─────────────────────────────────────────────────────────────────
+
+class _Gate:
+    """Shared pause: after a rate limit no worker calls upstream until it ends."""
+
+    def __init__(self) -> None:
+        self._until = 0.0
+        self.pauses = 0
+
+    def pause(self, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        if until > self._until:
+            self._until = until
+            self.pauses += 1
+
+    async def wait(self) -> None:
+        while (delay := self._until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+
+class _Pacer:
+    """Token bucket of ``rate`` requests a second (burst 1); 0 disables it."""
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next     = 0.0
+
+    async def take(self) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        slot = max(self._next, now)
+        self._next = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# ── Runner ─────────────────────────────────────────────────────────────────
+
+class _Runner:
+    def __init__(self, args: argparse.Namespace, out: TextIO, skip: set[str]) -> None:
+        from app.services.histogram import Histogram
+
+        self.args   = args
+        self.out    = out
+        self.skip   = skip
+        self.gate   = _Gate()
+        self.pacer  = _Pacer(args.rps)
+        self.counts: dict[str, int] = {"ok": 0, "errors": 0, "skipped": 0, "retries": 0}
+        self.errors: dict[str, int] = {}
+        self.latency = Histogram()
+        self.total   = Histogram()
+        self.tokens  = {"prompt": 0, "reply": 0}
+
+    def _write(self, result: dict[str, Any]) -> None:
+        self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.out.flush()
+        if result["error"] is None:
+            self.counts["ok"] += 1
+        else:
+            self.counts["errors"] += 1
+            category = result["error"]["category"]
+            self.errors[category] = self.errors.get(category, 0) + 1
+
+    async def _evaluate(self, item: _Item) -> dict[str, Any]:
+        from app.services.context_builder import assemble_prompt
+        from app.services.openrouter_service import OpenRouterError, ask_openrouter
+        from app.services.token_counter import estimate_tokens
+
+        started   = time.perf_counter()
+        assembled = assemble_prompt(item.question, history=item.history)
+        prompt_ms = (time.perf_counter() - started) * 1000
+
+        answer: str | None = None
+        error:  dict[str, str] | None = None
+        latency = 0.0
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.gate.wait()
+            await self.pacer.take()
+            called = time.perf_counter()
+            try:
+                answer = await ask_openrouter(
+                    assembled.parts, max_tokens=self.args.max_tokens, temperature=self.args.temperature
+                )
+            except OpenRouterError as exc:
+                latency = time.perf_counter() - called
+                if exc.category in _BACKPRESSURE and attempt <= self.args.retries:
+                    delay = exc.retry_after or min(_MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.0)
+                    self.gate.pause(delay)
+                    self.counts["retries"] += 1
+                    logger.info("Rate limited on %s; pausing %.1fs (attempt %d)", item.id, delay, attempt)
+                    continue
+                error = {"category": exc.category, "message": str(exc)}
+            else:
+                latency = time.perf_counter() - called
+                self.latency.observe(latency)
+            break
+
+        total = time.perf_counter() - started
+        self.total.observe(total)
+        reply_tokens = estimate_tokens(answer) if answer else 0
+        self.tokens["prompt"] += assembled.tokens
+        self.tokens["reply"]  += reply_tokens
+        return {
+            "id":            item.id,
+            "question":      item.question,
+            "answer":        answer,
+            "error":         error,
+            "latency_ms":    round(latency * 1000, 1),
+            "total_ms":      round(total * 1000, 1),
+            "prompt_ms":     round(prompt_ms, 2),
+            "prompt_tokens": assembled.tokens,
+            "reply_tokens":  reply_tokens,
+            "history_turns": assembled.history_turns,
+            "attempts":      attempt,
+            "meta":          item.meta,
+        }
+
+    async def _read(self, queue: asyncio.Queue) -> None:
+        try:
+            for item in _read_input(self.args.input):
+                if isinstance(item, _InputError):
+                    if item.id not in self.skip:
+                        self._write({"id": item.id, "question": None, "answer": None,
+                                     "error": {"category": "input", "message": str(item)}})
+                    continue
+                if item.id in self.skip:
+                    self.counts["skipped"] += 1
+                    continue
+                await queue.put(item)
+        finally:
+            for _ in range(self.args.concurrency):
+                await queue.put(None)
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while (item := await queue.get()) is not None:
+            try:
+                result = await self._evaluate(item)
+            except Exception as exc:  # noqa: BLE001 — one bad item must not stop the run
+                logger.exception("Evaluating %s failed", item.id)
+                result = {"id": item.id, "question": item.question, "answer": None,
+                          "error": {"category": "internal", "message": str(exc)}, "meta": item.meta}
+            self._write(result)
+
+    async def _report(self, started: float) -> None:
+        while True:
+            await asyncio.sleep(self.args.progress)
+            done = self.counts["ok"] + self.counts["errors"]
+            logger.info(
+                "%d done (%d errors, %d skipped), %.1f/s, p50 %s ms",
+                done, self.counts["errors"], self.counts["skipped"],
+                done / (time.perf_counter() - started), self.latency.snapshot()["p50_ms"],
+            )
+
+    async def run(self) -> dict[str, Any]:
+        from app.services.context_builder import context_fingerprint
+        from app.services.openrouter_service import close_client, models, open_client
+
+        started = time.perf_counter()
+        await open_client()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * self.args.concurrency)
+        reporter = asyncio.create_task(self._report(started)) if self.args.progress > 0 else None
+        try:
+            await asyncio.gather(
+                self._read(queue), *(self._work(queue) for _ in range(self.args.concurrency))
+            )
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            await close_client()
+        seconds = time.perf_counter() - started
+        done = self.counts["ok"] + self.counts["errors"]
+        return {
+            **self.counts,
+            "error_categories":  self.errors,
+            "rate_limit_pauses": self.gate.pauses,
+            "seconds":           round(seconds, 2),
+            "per_second":        round(done / seconds, 2) if seconds else None,
+            "latency":           self.latency.snapshot(),
+            "total":             self.total.snapshot(),
+            "prompt_tokens":     self.tokens["prompt"],
+            "reply_tokens":      self.tokens["reply"],
+            "models":            ",".join(models()),
+            "context":           context_fingerprint(),
+        }
+
+
+# ── Command line ───────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of questions through the prompt and model.")
+    parser.add_argument("input", type=Path, help="JSONL questions")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="JSONL results (also the checkpoint)")
+    parser.add_argument("--summary", type=Path, default=None, help="also write the summary here as JSON")
+    parser.add_argument("--concurrency", type=int, default=4, help="questions in flight")
+    parser.add_argument("--rps", type=float, default=0.0, help="max upstream requests per second (0: no cap)")
+    parser.add_argument("--retries", type=int, default=5, help="attempts after a rate limit or open breaker")
+    parser.add_argument("--resume", action="store_true", help="skip ids already in --output and append")
+    parser.add_argument("--retry-errors", action="store_true", help="with --resume, ask failed ids again")
+    parser.add_argument("--model", default=None, help="OPENROUTER_MODELS for this run (model[@timeout],…)")
+    parser.add_argument("--max-tokens", type=int, default=int(os.getenv("OPENROUTER_MAX_TOKENS", "512")))
+    parser.add_argument("--temperature", type=float, default=float(os.getenv("OPENROUTER_TEMPERATURE", "0.7")))
+    parser.add_argument("--api-url", default=None, help="chat-completions URL (default OPENROUTER_API_URL)")
+    parser.add_argument("--stub", action="store_true", help="answer from a local fake OpenRouter (offline)")
+    parser.add_argument("--stub-latency-ms", type=float, default=200.0)
+    parser.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines (0: off)")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.output.exists() and not args.resume:
+        parser.error(f"{args.output} exists; pass --resume to continue it, or remove it")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s", stream=sys.stderr)
+    logging.getLogger("httpx").setLevel(logging.WARNING)       # one line per request otherwise
+
+    with contextlib.ExitStack() as stack:
+        # openrouter_service reads its settings at import, so they are set first
+        if args.stub:
+            from benchmarks.fake_openrouter import fake_server
+
+            args.api_url = stack.enter_context(fake_server(latency_ms=args.stub_latency_ms))
+            os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+        if args.api_url:
+            os.environ["OPENROUTER_API_URL"] = args.api_url
+        if args.model:
+            os.environ["OPENROUTER_MODELS"] = args.model
+        os.environ.setdefault("OPENROUTER_COALESCE", "0")
+        os.environ.setdefault("UPSTREAM_CONCURRENCY", "0")  # --concurrency is the cap here
+
+        skip = _finished_ids(args.output, args.retry_errors) if args.output.exists() else set()
+        if skip:
+            logger.info("Resuming: %d ids already have results", len(skip))
+        with open(args.output, "a", encoding="utf-8") as out:
+            summary = asyncio.run(_Runner(args, out, skip).run())
+
+    text = json.dumps(summary, indent=2)
+    print(text, file=sys.stderr)
+    if args.summary is not None:
+        args.summary.write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
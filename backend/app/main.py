@@ -1,22 +1,86 @@
 """
 backend/app/main.py
 Entry point for the Portfolio AI Assistant FastAPI application.
+
+Startup is kept short for scale-to-zero hosting: importing the app opens
+no files, ``lifespan`` creates the database schema once, and the resume
+context renders on a background thread.  ``GET /api/admin/status`` reports
+how long each startup step took; ``python -m app.serve --profile-startup``
+prints a full breakdown.
 """
 
-from contextlib import asynccontextmanager
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Iterator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.admin import register_status, router as admin_router
 from app.api.chat import router as chat_router
-from app.database.db import init_db
+from app.api.responses import FastJSONResponse
+from app.database.analytics import close_readers
+from app.database.db import init_db, start_writer, stop_writer, writer_stats
+from app.database.retention import maintenance_stats, start_maintenance, stop_maintenance
+from app.database.search import search_stats, start_backfill, stop_backfill
+from app.services import (
+    answer_cache, compression, metrics, openrouter_service, prefilter, rate_limit, session_store, warm_answers,
+)
+from app.services.admission import upstream
+from app.services.context_builder import (
+    context_stats,
+    preload_context,
+    prompt_stats,
+    start_watcher,
+    stop_watcher,
+)
+from app.services.openrouter_service import close_client, start_client
+from app.services.tracing import start_exporter, stop_exporter, tracing_stats
+
+_startup: dict[str, float] = {}     # step → milliseconds, for /api/admin/status
+
+
+@contextmanager
+def _startup_step(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    _startup[name] = round((time.perf_counter() - started) * 1000, 2)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Run startup tasks (DB initialisation) before serving requests."""
-    init_db()
+    """
+    Run startup tasks (DB initialisation, chat-log and trace writers,
+    maintenance timer and search backfill, resume file watcher) before serving requests.  The resume
+    context renders, the OpenRouter connection pool is created and the
+    seed answers are precomputed in the background.  On shutdown the pool is released and
+    queued chat-log rows are flushed.
+    """
+    started = time.perf_counter()
+    preload_context(background=True)
+    start_client()
+    with _startup_step("init_db_ms"):
+        init_db()
+    with _startup_step("chat_log_writer_ms"):
+        start_writer()
+        start_exporter()
+    with _startup_step("maintenance_ms"):
+        start_maintenance()
+        start_backfill()
+    with _startup_step("resume_watcher_ms"):
+        start_watcher()
+    warm_answers.start_warmer()
+    _startup["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
     yield
+    await warm_answers.stop_warmer()
+    await close_client()
+    stop_watcher()
+    stop_backfill()
+    stop_maintenance()
+    stop_writer()
+    stop_exporter()
+    close_readers()
 
 
 app = FastAPI(
@@ -39,11 +103,145 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip / Brotli for responses of COMPRESSION_MIN_SIZE bytes and up; SSE is left alone
+app.add_middleware(compression.CompressionMiddleware)
+
+# Outermost: stamps request arrival for the "validation" stage metric
+app.add_middleware(metrics.RequestClockMiddleware)
+
 # Register routers
 app.include_router(chat_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+
+
+@app.get("/health", response_class=FastJSONResponse)
+async def health() -> FastJSONResponse:
+    """
+    Liveness check, plus the circuit breaker state of each model so a load
+    balancer or an operator without the admin token can see an upstream
+    outage.  Counters are on ``/metrics`` and ``/api/admin/status``.
+    """
+    return FastJSONResponse({
+        "status":   "ok",
+        "service":  "portfolio-ai-assistant",
+        "pid":      os.getpid(),
+        "breakers": openrouter_service.breaker_states(),
+    })
+
+
+# ── Status ─────────────────────────────────────────────────────────────────
+
+def _register_status() -> None:
+    """The sections of ``GET /api/admin/status``."""
+    for name, fn in (
+        ("startup",      lambda: _startup),
+        ("answer_cache", answer_cache.stats),
+        ("warm_answers", warm_answers.stats),
+        ("prefilter",    prefilter.stats),
+        ("sessions",     session_store.stats),
+        ("chat_log",     writer_stats),
+        ("maintenance",  maintenance_stats),
+        ("search",       search_stats),
+        ("prompts",      prompt_stats),
+        ("context",      context_stats),
+        ("openrouter",   openrouter_service.stats),
+        ("rate_limit",   rate_limit.stats),
+        ("admission",    upstream.stats),
+        ("compression",  compression.stats),
+        ("tracing",      tracing_stats),
+    ):
+        register_status(name, fn)
+
+
+_register_status()
+
+
+# ── Metrics ────────────────────────────────────────────────────────────────
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _register_metrics() -> None:
+    """Export the counters that /api/admin/status reports as Prometheus series too."""
+    metrics.register(
+        "answer_cache_lookups_total", "counter", "Answer cache lookups by result.",
+        lambda: {k: answer_cache.stats()[k] for k in ("hits", "similar_hits", "misses", "bypassed")},
+        label="result",
+    )
+    metrics.register(
+        "answer_cache_entries", "gauge", "Answers currently cached.",
+        lambda: answer_cache.stats()["entries"],
+    )
+    metrics.register(
+        "warm_answer_hits_total", "counter", "Requests answered from a precomputed answer.",
+        lambda: warm_answers.stats()["hits"],
+    )
+    metrics.register(
+        "chat_log_queue_depth", "gauge", "Chat-log rows waiting for the writer.",
+        lambda: writer_stats()["queued"],
+    )
+    metrics.register(
+        "chat_log_rows_total", "counter", "Chat-log rows by outcome.",
+        lambda: {k: writer_stats()[k] for k in ("written", "dropped", "failed")},
+        label="outcome",
+    )
+    metrics.register(
+        "sessions_in_memory", "gauge", "Conversation histories held in memory.",
+        lambda: session_store.stats()["sessions"],
+    )
+    metrics.register(
+        "openrouter_events_total", "counter", "Upstream attempts, retries, fallbacks and hedges.",
+        lambda: {k: openrouter_service.stats()[k]
+                 for k in ("attempts", "retries", "fallbacks", "hedged", "hedge_wins")},
+        label="event",
+    )
+    metrics.register(
+        "openrouter_breaker_state", "gauge", "Circuit breaker per model (0 closed, 1 half-open, 2 open).",
+        lambda: {model: _BREAKER_STATES[info["breaker"]["state"]]
+                 for model, info in openrouter_service.stats()["models"].items()},
+        label="model",
+    )
+    metrics.register(
+        "rate_limit_decisions_total", "counter", "Chat requests admitted or refused by the rate limiter.",
+        lambda: {k: rate_limit.stats()[k] for k in ("allowed", "limited_ip", "limited_session")},
+        label="decision",
+    )
+    metrics.register(
+        "upstream_slots", "gauge", "Upstream admission slots in use and requests waiting for one.",
+        lambda: {k: upstream.stats()[k] for k in ("active", "waiting")},
+        label="state",
+    )
+    metrics.register(
+        "upstream_rejected_total", "counter", "Requests refused for lack of an upstream slot.",
+        lambda: {k: upstream.stats()[f"rejected_{k}"] for k in ("full", "timeout")},
+        label="reason",
+    )
+    metrics.register(
+        "traces_total", "counter", "Finished request traces kept, by reason, and dropped or failed on export.",
+        lambda: {k: tracing_stats()[k] for k in ("sampled", "slow", "error", "dropped", "failed")},
+        label="outcome",
+    )
+    metrics.register(
+        "compressed_responses_total", "counter", "Responses compressed, by encoding.",
+        lambda: {k: compression.stats()[k] for k in ("gzip", "br")},
+        label="encoding",
+    )
+    metrics.register(
+        "compression_bytes_total", "counter", "Response body bytes before and after compression.",
+        lambda: {k: compression.stats()[f"bytes_{k}"] for k in ("in", "out")},
+        label="direction",
+    )
+    metrics.register(
+        "prefilter_decisions_total", "counter", "Chat messages checked by the prefilter, by decision.",
+        lambda: {**prefilter.stats()["decisions"], "passed": prefilter.stats()["passed"]},
+        label="decision",
+    )
+
+
+_register_metrics()
 
 
-@app.get("/health")
-def health() -> dict:
-    """Simple liveness check."""
-    return {"status": "ok", "service": "portfolio-ai-assistant"}
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint() -> Response:
+    """Prometheus scrape endpoint (text exposition format)."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
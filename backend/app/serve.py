@@ -0,0 +1,325 @@
+"""
+backend/app/serve.py
+
+Multi-worker launcher.  One parent process prepares everything the workers
+can share, then forks the uvicorn workers:
+
+    python -m app.serve --workers 4 --host 0.0.0.0 --port 8000
+
+(``uvicorn --workers`` starts each worker as a fresh interpreter instead,
+so every worker imports the app, races the others to create the schema and
+renders its own copy of the resume context.)
+
+Parent
+──────
+  1. imports the app and runs ``init_db()``, so the schema exists before
+     any worker starts;
+  2. preloads the resume context (rendered prompt, escaped request
+     fragment, BM25 index, token counts), the uvicorn protocol classes and
+     the OpenRouter client (its CA bundle; the pool itself stays empty),
+     then ``gc.freeze()``s the heap so the collector does not touch those
+     objects and the forked workers keep sharing their pages
+     copy-on-write;
+  3. closes its SQLite connection, binds the listening socket and forks
+     ``--workers`` workers, each running uvicorn on the inherited socket
+     (the kernel hands each connection to one of them);
+  4. supervises: a worker that exits unexpectedly is replaced, ``SIGTTIN``
+     adds a worker and ``SIGTTOU`` retires the newest one gracefully.
+
+Each worker runs the normal ``lifespan``: its own chat-log writer, resume
+watcher, maintenance timer and OpenRouter connection pool, all started
+after the fork.  ``init_db()`` and ``preload_context()`` find their work
+already done.  How the workers share the chat log is described in
+app/database/db.py ("Several processes"); rate limits are shared with
+``RATE_LIMIT_STATE=sqlite``.  Conversation history is read from and
+written to the chat log on every request (services/session_store.py), so
+consecutive requests of a session may land on different workers.  The
+answer cache stays per worker.
+
+Shutdown
+────────
+  On ``SIGTERM`` or ``SIGINT`` the parent forwards ``SIGTERM`` to every
+  worker.  uvicorn stops accepting connections and waits up to
+  ``--graceful-timeout`` seconds for requests in flight, including open
+  SSE streams, to finish.  Then the lifespan shutdown flushes the
+  chat-log queue.  A worker still running ``--graceful-timeout + 5``
+  seconds after the signal is killed.
+
+Startup profile
+───────────────
+  ``python -m app.serve --profile-startup`` does not serve; it prints
+  where a cold start spends its time: the import time of every app module
+  and of the largest third-party packages (``python -X importtime`` in a
+  fresh interpreter), then a real one-worker start on a free port — time
+  until the port accepts, until the first ``/health`` and
+  ``/api/chat/suggestions`` answers, and the ``lifespan`` steps that
+  ``/api/admin/status`` reports.
+
+POSIX only (``os.fork``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import uvicorn
+
+logger = logging.getLogger("app.serve")
+
+_KILL_MARGIN   = 5.0    # seconds past the graceful timeout before SIGKILL
+_RESPAWN_DELAY = 1.0    # seconds to wait before replacing a worker that died young
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _prepare(args: argparse.Namespace) -> uvicorn.Config:
+    """Everything the parent does once, before forking; returns the workers' server config."""
+    import uvicorn
+
+    from app.database import analytics, db
+    from app.main import app
+    from app.services.context_builder import preload_context
+    from app.services.openrouter_service import preload_client
+
+    config = uvicorn.Config(
+        app,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keep_alive,
+    )
+    config.load()                   # imports the protocol classes once, for every worker
+    db.init_db()
+    preload_context()
+    preload_client()
+    db.close_connection()
+    analytics.close_readers()
+    if threading.active_count() > 1:
+        logger.warning("%d threads running before fork", threading.active_count())
+    gc.freeze()
+    return config
+
+
+def _run_worker(sock: socket.socket, config: uvicorn.Config) -> None:
+    """Body of a forked worker; never returns."""
+    import uvicorn
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_DFL)       # uvicorn installs its own
+    for signum in (signal.SIGTTIN, signal.SIGTTOU):
+        signal.signal(signum, signal.SIG_IGN)       # meant for the parent only
+
+    status = 0
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:  # noqa: BLE001
+        logger.exception("Worker %d crashed", os.getpid())
+        status = 1
+    finally:
+        os._exit(status)
+
+
+class _Supervisor:
+    """Forks, replaces, adds, retires and finally stops the workers."""
+
+    def __init__(self, sock: socket.socket, config: uvicorn.Config, args: argparse.Namespace) -> None:
+        self._sock     = sock
+        self._config   = config
+        self._args     = args
+        self._target   = args.workers
+        self._workers: dict[int, float] = {}     # pid → started at
+        self._retiring: set[int] = set()
+        self._stopping = False
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self._sock, self._config)
+        self._workers[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+
+    def _reap(self) -> None:
+        while self._workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            started = self._workers.pop(pid, None)
+            if started is None:
+                continue
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                logger.info("Worker %d retired", pid)
+            elif not self._stopping:
+                logger.warning("Worker %d exited (status %d); replacing it", pid, os.waitstatus_to_exitcode(status))
+                if time.monotonic() - started < _RESPAWN_DELAY:
+                    time.sleep(_RESPAWN_DELAY)       # do not spin on a worker that cannot start
+
+    def _on_signal(self, signum: int, _frame) -> None:
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self._stopping = True
+        elif signum == signal.SIGTTIN:
+            self._target += 1
+        elif signum == signal.SIGTTOU and self._target > 1:
+            self._target -= 1
+
+    def run(self) -> None:
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, self._on_signal)
+
+        while not self._stopping:
+            self._reap()
+            active = [pid for pid in self._workers if pid not in self._retiring]
+            if len(active) < self._target:
+                self._spawn()
+                continue
+            if len(active) > self._target:
+                newest = max(active, key=self._workers.__getitem__)
+                self._retiring.add(newest)
+                os.kill(newest, signal.SIGTERM)
+                logger.info("Retiring worker %d (%d workers)", newest, self._target)
+            time.sleep(0.2)
+        self._stop()
+
+    def _stop(self) -> None:
+        self._sock.close()          # the workers close their copies as they stop accepting
+        logger.info("Shutting down %d workers (graceful timeout %.0fs)", len(self._workers), self._args.graceful_timeout)
+        for pid in self._workers:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self._args.graceful_timeout + _KILL_MARGIN
+        while self._workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._workers):
+            logger.warning("Worker %d did not drain in time; killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+
+# ── Startup profile ───────────────────────────────────────────────────────
+
+def _import_times() -> list[tuple[str, float, float]]:
+    """(module, self ms, cumulative ms) for ``import app.main`` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=_BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "[us]" not in line:
+            self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+            rows.append((name.strip(), float(self_us) / 1000, float(cumulative_us) / 1000))
+    return rows
+
+
+def _get(url: str, headers: dict[str, str] | None = None) -> tuple[float, bytes]:
+    from urllib.request import Request, urlopen
+
+    started = time.perf_counter()
+    with urlopen(Request(url, headers=headers or {}), timeout=30) as response:
+        body = response.read()
+    return (time.perf_counter() - started) * 1000, body
+
+
+def _profile_startup(args: argparse.Namespace) -> None:
+    import json
+
+    rows  = _import_times()
+    total = next(cumulative for name, _, cumulative in rows if name == "app.main")
+    print(f"import app.main: {total:.0f} ms\n")
+    print(f"  {'app module':<40} {'self ms':>8} {'total ms':>9}")
+    for name, self_ms, cumulative in rows:
+        if name == "app" or name.startswith("app."):
+            print(f"  {name:<40} {self_ms:>8.1f} {cumulative:>9.1f}")
+    packages = [
+        (name, cumulative) for name, _, cumulative in rows
+        if "." not in name and name != "app" and name not in sys.stdlib_module_names
+    ]
+    print(f"\n  {'third-party package':<40} {'':>8} {'total ms':>9}")
+    for name, cumulative in sorted(packages, key=lambda p: -p[1])[:8]:
+        print(f"  {name:<40} {'':>8} {cumulative:>9.1f}")
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    token    = os.urandom(16).hex()       # for /api/admin/status of this one-off server
+    started  = time.perf_counter()
+    proc     = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", "1", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=_BACKEND_DIR, env={**os.environ, "ADMIN_TOKEN": token},
+    )
+    try:
+        while True:
+            with socket.socket() as conn:
+                if conn.connect_ex(("127.0.0.1", port)) == 0:
+                    break
+            if proc.poll() is not None or time.perf_counter() - started > 60:
+                raise SystemExit("the server did not start")
+            time.sleep(0.005)
+        listening = (time.perf_counter() - started) * 1000
+        health_ms, _ = _get(f"{base_url}/health")
+        first     = (time.perf_counter() - started) * 1000
+        suggest_ms, _ = _get(f"{base_url}/api/chat/suggestions")
+        _, body   = _get(f"{base_url}/api/admin/status", {"Authorization": f"Bearer {token}"})
+        status    = json.loads(body)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+
+    print(f"\ncold start (python -m app.serve --workers 1)")
+    print(f"  port accepting                           {listening:>9.0f} ms")
+    print(f"  first /health answered                   {first:>9.0f} ms  (request {health_ms:.1f} ms)")
+    print(f"  first /api/chat/suggestions              {'':>9}     (request {suggest_ms:.1f} ms)")
+    print(f"  resume context preload (in the worker)   {status['context']['preload_ms'] or 0:>9.1f} ms")
+    for step, ms in status["startup"].items():
+        print(f"  lifespan: {step.removesuffix('_ms'):<30} {ms:>9.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the backend with forked, preloaded workers.")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds in-flight requests get to finish on shutdown")
+    parser.add_argument("--keep-alive", type=int, default=5, help="idle keep-alive timeout (seconds)")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print where a cold start spends its time, then exit")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        _profile_startup(args)
+        return
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     [%(process)d] %(message)s")
+    config = _prepare(args)
+    sock   = _bind(args.host, args.port, args.backlog)
+    logger.info("Listening on http://%s:%d with %d workers", args.host, args.port, args.workers)
+    _Supervisor(sock, config, args).run()
+
+
+if __name__ == "__main__":
+    main()
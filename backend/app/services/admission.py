@@ -0,0 +1,148 @@
+"""
+backend/app/services/admission.py
+
+Admission control for upstream (OpenRouter) calls.
+
+At most ``UPSTREAM_CONCURRENCY`` chat requests per process call OpenRouter
+at once.  Up to ``UPSTREAM_QUEUE`` more wait for a free slot in arrival
+order, for at most ``UPSTREAM_QUEUE_TIMEOUT`` seconds.  Anything beyond
+that — a full queue, or a wait that timed out — raises ``Overloaded``,
+which the API turns into ``429`` with ``Retry-After``.  Requests therefore
+fail in milliseconds instead of piling up until they time out, and the
+provider's own rate limit is not tripped for every visitor at once.
+
+The slot is taken by app/services/openrouter_service.py around the upstream
+call itself, so answers served from the answer cache never take one and
+identical questions coalesced into one call share the leader's.  A streamed
+reply holds its slot until the stream ends.  The cap is per process: with
+several uvicorn workers the host makes up to ``workers ×
+UPSTREAM_CONCURRENCY`` concurrent calls.  ``UPSTREAM_CONCURRENCY=0``
+disables the gate.
+
+The gate is not thread-safe — it is used from a single event loop.
+
+Public API
+──────────
+  AdmissionGate(limit, queue_size, timeout)
+  await AdmissionGate.acquire() -> Slot      – raises Overloaded
+  Slot.release()                              – idempotent
+  async with AdmissionGate.slot(): ...
+  AdmissionGate.stats() -> dict
+  upstream                                    – the gate in front of OpenRouter
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.services import tracing
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_CONCURRENCY   = int(os.getenv("UPSTREAM_CONCURRENCY", "32"))
+_QUEUE_SIZE    = int(os.getenv("UPSTREAM_QUEUE", "32"))
+_QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "2"))   # seconds
+
+
+class Overloaded(RuntimeError):
+    """No upstream slot is available; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Slot:
+    """One admitted call; ``release()`` hands the slot on (once)."""
+
+    __slots__ = ("_gate", "_released")
+
+    def __init__(self, gate: AdmissionGate) -> None:
+        self._gate     = gate
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._gate._release()
+
+
+class AdmissionGate:
+    """A counting semaphore with a bounded FIFO wait queue and a wait timeout."""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float) -> None:
+        self._limit      = limit
+        self._queue_size = queue_size
+        self._timeout    = timeout
+        self._active     = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._stats: dict[str, int] = {"admitted": 0, "queued": 0, "rejected_full": 0, "rejected_timeout": 0}
+
+    def _retry_after(self) -> float:
+        return max(1.0, math.ceil(self._timeout))
+
+    async def acquire(self) -> Slot:
+        """Wait for a slot (see the module docstring); raises ``Overloaded``."""
+        if self._limit <= 0:
+            return Slot(self)
+        if self._active < self._limit and not self._waiters:
+            self._active += 1
+            self._stats["admitted"] += 1
+            return Slot(self)
+        if len(self._waiters) >= self._queue_size:
+            self._stats["rejected_full"] += 1
+            raise Overloaded("Too many requests in progress, try again shortly.", self._retry_after())
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        try:
+            with tracing.span("upstream_queue", waiting=len(self._waiters)):
+                await asyncio.wait_for(asyncio.shield(waiter), self._timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                self._release()              # the slot arrived as we gave up: pass it on
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                self._stats["rejected_timeout"] += 1
+                raise Overloaded("Timed out waiting for capacity, try again shortly.", self._retry_after())
+            raise
+        self._stats["admitted"] += 1
+        return Slot(self)
+
+    def _release(self) -> None:
+        if self._limit <= 0:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)      # the slot moves to the waiter
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Slot]:
+        """``async with gate.slot():`` — hold a slot for the block."""
+        slot = await self.acquire()
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "limit":   self._limit,
+            "active":  self._active,
+            "waiting": len(self._waiters),
+            **self._stats,
+        }
+
+
+upstream = AdmissionGate(_CONCURRENCY, _QUEUE_SIZE, _QUEUE_TIMEOUT)
@@ -0,0 +1,307 @@
+"""
+backend/app/services/answer_cache.py
+
+In-memory answer cache that sits between ``build_prompt`` and
+``ask_openrouter``.
+
+Tiers
+─────
+  exact     – SHA-256 of the normalised question + history + the resume
+              context fingerprint.  Normalisation lower-cases, drops
+              punctuation and collapses whitespace, so "What projects has
+              Hanzala built?" and "what projects has hanzala built" share a key.
+  similar   – optional (``ANSWER_CACHE_SIMILARITY`` > 0).  A TF-IDF index over
+              the questions of history-free entries; a lookup that misses the
+              exact tier returns the answer of the most similar past question
+              if its cosine similarity reaches the threshold.  Paraphrases of
+              the seed questions are the main target.
+
+Eviction and invalidation
+─────────────────────────
+  Bounded to ``ANSWER_CACHE_MAX_ENTRIES`` with LRU eviction; entries older
+  than ``ANSWER_CACHE_TTL`` seconds are dropped on access.  Every entry is
+  tied to ``context_fingerprint()`` — when the rendered resume context
+  changes, the whole cache is cleared.
+
+Sampling
+────────
+  With ``temperature > 0`` answers are not deterministic, so the cache is
+  bypassed unless ``ANSWER_CACHE_ALLOW_SAMPLED=1``.
+
+Public API
+──────────
+  lookup(question, history, temperature=...) -> str | None
+  store(question, history, answer, temperature=...) -> None
+  stats() -> dict      – hit / miss / bypass / eviction counters
+  clear() -> None
+  normalise(text) -> str   – the question normalisation behind the exact key
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from app.services.context_builder import context_fingerprint
+from app.services.openrouter_service import TEMPERATURE
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_ENABLED       = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+_MAX_ENTRIES   = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+_TTL           = float(os.getenv("ANSWER_CACHE_TTL", "3600"))          # seconds
+_SIMILARITY    = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0"))      # 0 = exact only
+_ALLOW_SAMPLED = os.getenv("ANSWER_CACHE_ALLOW_SAMPLED", "0") == "1"
+
+_STOPWORDS = frozenset(
+    "a an and are about any be can could did do does for from give has have he "
+    "his how i in is it me of on or please tell the to was what which who with "
+    "would you".split()
+)
+
+
+# ── Text normalisation ─────────────────────────────────────────────────────
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalise(text: str) -> str:
+    """Lower-case, strip punctuation and collapse whitespace."""
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", text.lower())).strip()
+
+
+_IRREGULAR = {"built": "build", "made": "make", "held": "hold", "got": "get", "knows": "know"}
+
+
+def _stem(word: str) -> str:
+    """Very small suffix stripper so 'projects'/'project', 'built'/'building' meet."""
+    if word in _IRREGULAR:
+        return _IRREGULAR[word]
+    for suffix in ("ings", "ing", "ies", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def _terms(normalised: str) -> Counter[str]:
+    return Counter(_stem(w) for w in normalised.split() if w not in _STOPWORDS)
+
+
+def _key(normalised_question: str, history: list[dict[str, str]], fingerprint: str) -> str:
+    digest = hashlib.sha256(fingerprint.encode())
+    for turn in history:
+        digest.update(f"\x1e{turn['role']}\x1f{normalise(turn['content'])}".encode())
+    digest.update(f"\x1d{normalised_question}".encode())
+    return digest.hexdigest()
+
+
+# ── Cache state ────────────────────────────────────────────────────────────
+
+@dataclass
+class _Entry:
+    answer:   str
+    created:  float
+    terms:    Counter[str] | None = None   # set for history-free entries only
+
+
+@dataclass
+class _Stats:
+    hits:          int = 0
+    similar_hits:  int = 0
+    misses:        int = 0
+    bypassed:      int = 0
+    stores:        int = 0
+    evictions:     int = 0
+    expirations:   int = 0
+    invalidations: int = 0
+
+
+_lock:        threading.Lock = threading.Lock()
+_entries:     OrderedDict[str, _Entry] = OrderedDict()
+_doc_freq:    Counter[str] = Counter()          # term → number of indexed questions
+_postings:    dict[str, set[str]] = {}          # term → keys of indexed questions
+_fingerprint: str | None = None
+_stats:       _Stats = _Stats()
+
+
+def _active(temperature: float) -> bool:
+    return _ENABLED and (temperature <= 0 or _ALLOW_SAMPLED)
+
+
+def _check_fingerprint() -> str:
+    """Clear the cache if the resume context changed.  Must hold _lock."""
+    global _fingerprint
+    current = context_fingerprint()
+    if current != _fingerprint:
+        if _entries:
+            logger.info("Resume context changed — clearing %d cached answers", len(_entries))
+            _stats.invalidations += 1
+        _reset()
+        _fingerprint = current
+    return current
+
+
+def _reset() -> None:
+    _entries.clear()
+    _doc_freq.clear()
+    _postings.clear()
+
+
+def _drop(key: str) -> None:
+    """Remove one entry and its similarity-index postings.  Must hold _lock."""
+    entry = _entries.pop(key)
+    if entry.terms:
+        for term in entry.terms:
+            _doc_freq[term] -= 1
+            if _doc_freq[term] <= 0:
+                del _doc_freq[term]
+            keys = _postings.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del _postings[term]
+
+
+def _weights(terms: Counter[str]) -> dict[str, float]:
+    """TF-IDF weights using the current document frequencies.  Must hold _lock."""
+    n = len(_entries) + 1
+    return {t: c * (math.log(n / (1 + _doc_freq.get(t, 0))) + 1) for t, c in terms.items()}
+
+
+def _most_similar(terms: Counter[str], now: float) -> tuple[float, str | None]:
+    """Return the best cosine match among indexed questions.  Must hold _lock."""
+    candidates: set[str] = set()
+    for term in terms:
+        candidates |= _postings.get(term, set())
+    if not candidates:
+        return 0.0, None
+
+    query = _weights(terms)
+    q_norm = math.sqrt(sum(w * w for w in query.values()))
+    best_score, best_key = 0.0, None
+    for key in candidates:
+        entry = _entries[key]
+        if now - entry.created > _TTL:
+            continue
+        doc = _weights(entry.terms)
+        dot = sum(w * doc.get(t, 0.0) for t, w in query.items())
+        d_norm = math.sqrt(sum(w * w for w in doc.values()))
+        score = dot / (q_norm * d_norm) if q_norm and d_norm else 0.0
+        if score > best_score:
+            best_score, best_key = score, key
+
+    return best_score, best_key
+
+
+# ── Public API ─────────────────────────────────────────────────────────────
+
+def lookup(
+    question: str,
+    history: list[dict[str, str]] | None = None,
+    *,
+    temperature: float = TEMPERATURE,
+) -> str | None:
+    """
+    Return a cached answer for the question (and history), or ``None``.
+
+    Tries the exact tier first, then — for history-free questions and when
+    enabled — the similarity tier.
+    """
+    if not _active(temperature):
+        with _lock:
+            _stats.bypassed += 1
+        return None
+
+    history = history or []
+    normalised = normalise(question)
+    now = time.monotonic()
+
+    with _lock:
+        key = _key(normalised, history, _check_fingerprint())
+        entry = _entries.get(key)
+        if entry is not None:
+            if now - entry.created <= _TTL:
+                _entries.move_to_end(key)
+                _stats.hits += 1
+                return entry.answer
+            _drop(key)
+            _stats.expirations += 1
+
+        if _SIMILARITY > 0 and not history:
+            terms = _terms(normalised)
+            score, match = _most_similar(terms, now) if terms else (0.0, None)
+            if match is not None and score >= _SIMILARITY:
+                _entries.move_to_end(match)
+                _stats.similar_hits += 1
+                logger.debug("Answer cache similar hit (score=%.3f)", score)
+                return _entries[match].answer
+
+        _stats.misses += 1
+        return None
+
+
+def store(
+    question: str,
+    history: list[dict[str, str]] | None,
+    answer: str,
+    *,
+    temperature: float = TEMPERATURE,
+) -> None:
+    """Cache an answer, evicting the least recently used entry when full."""
+    if not _active(temperature):
+        return
+
+    history = history or []
+    normalised = normalise(question)
+
+    with _lock:
+        key = _key(normalised, history, _check_fingerprint())
+        if key in _entries:
+            _drop(key)
+
+        terms = _terms(normalised) if (_SIMILARITY > 0 and not history) else None
+        _entries[key] = _Entry(answer=answer, created=time.monotonic(), terms=terms or None)
+        if terms:
+            for term in terms:
+                _doc_freq[term] += 1
+                _postings.setdefault(term, set()).add(key)
+        _stats.stores += 1
+
+        while len(_entries) > _MAX_ENTRIES:
+            _drop(next(iter(_entries)))
+            _stats.evictions += 1
+
+
+def stats() -> dict[str, int | float | bool]:
+    """Return cache counters for ``/api/admin/status``."""
+    with _lock:
+        lookups = _stats.hits + _stats.similar_hits + _stats.misses
+        return {
+            "enabled":       _ENABLED,
+            "entries":       len(_entries),
+            "hits":          _stats.hits,
+            "similar_hits":  _stats.similar_hits,
+            "misses":        _stats.misses,
+            "bypassed":      _stats.bypassed,
+            "stores":        _stats.stores,
+            "evictions":     _stats.evictions,
+            "expirations":   _stats.expirations,
+            "invalidations": _stats.invalidations,
+            "hit_rate":      round((_stats.hits + _stats.similar_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def clear() -> None:
+    """Drop every cached answer (counters are kept)."""
+    with _lock:
+        _reset()
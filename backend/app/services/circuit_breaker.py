@@ -0,0 +1,136 @@
+"""
+backend/app/services/circuit_breaker.py
+
+Error-rate circuit breaker for an upstream dependency.
+
+States
+──────
+  closed     calls go through; the outcome of the last ``window`` calls is
+             kept.  Once at least ``min_calls`` are recorded and the share
+             of failures reaches ``error_rate`` the breaker opens.
+  open       calls are rejected immediately (no network, no timeout) for
+             ``open_seconds``.
+  half_open  after that, up to ``half_open_probes`` concurrent calls are let
+             through as probes.  A successful probe closes the breaker and
+             forgets the old outcomes; a failed one opens it again.
+
+The breaker is not thread-safe — it is used from a single event loop.
+
+Public API
+──────────
+  CircuitBreaker(...)
+  CircuitBreaker.allow() -> Permit | None   – None when the call must fail fast
+  CircuitBreaker.record(permit, ok)         – report the outcome of a call
+  CircuitBreaker.release(permit)            – the call ended without an outcome
+  CircuitBreaker.retry_in() -> float        – seconds until the next probe
+  CircuitBreaker.stats() -> dict
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+CLOSED    = "closed"
+OPEN      = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class Permit:
+    """Handed out by ``allow()``; ``probe`` marks a half-open trial call."""
+
+    probe: bool
+
+
+class CircuitBreaker:
+    """Opens on a high recent error rate, recovers through half-open probes."""
+
+    def __init__(
+        self,
+        *,
+        window:           int   = 20,
+        min_calls:        int   = 10,
+        error_rate:       float = 0.5,
+        open_seconds:     float = 30.0,
+        half_open_probes: int   = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._min_calls        = min_calls
+        self._error_rate       = error_rate
+        self._open_seconds     = open_seconds
+        self._half_open_probes = half_open_probes
+        self._clock            = clock
+
+        self._state     = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes    = 0
+        self._stats: dict[str, int] = {"opened": 0, "rejected": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._open_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> Permit | None:
+        """Return a permit for one call, or None if the call must fail fast."""
+        state = self.state
+        if state == CLOSED:
+            return Permit(probe=False)
+        if state == HALF_OPEN and self._probes < self._half_open_probes:
+            self._probes += 1
+            self._stats["probes"] += 1
+            return Permit(probe=True)
+        self._stats["rejected"] += 1
+        return None
+
+    def record(self, permit: Permit, ok: bool) -> None:
+        """Report whether the call made under ``permit`` succeeded."""
+        if permit.probe:
+            self._probes -= 1
+            if ok:
+                self._state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+
+        if self._state != CLOSED:
+            return      # a call admitted before the breaker opened
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if (
+            len(self._outcomes) >= self._min_calls
+            and failures / len(self._outcomes) >= self._error_rate
+        ):
+            self._open()
+
+    def release(self, permit: Permit) -> None:
+        """Give back a permit whose call was cancelled before it finished."""
+        if permit.probe:
+            self._probes -= 1
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a probe through (0 unless open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self._open_seconds - (self._clock() - self._opened_at), 0.0)
+
+    def _open(self) -> None:
+        self._state     = OPEN
+        self._opened_at = self._clock()
+        self._stats["opened"] += 1
+
+    def stats(self) -> dict[str, object]:
+        """State and counters for ``/api/admin/status``."""
+        failures = self._outcomes.count(False)
+        return {
+            "state":      self.state,
+            "retry_in":   round(self.retry_in(), 1),
+            "error_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+            **self._stats,
+        }
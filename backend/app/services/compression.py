@@ -0,0 +1,219 @@
+"""
+backend/app/services/compression.py
+
+Response compression (gzip, or Brotli when the optional ``brotli`` package
+is installed), as pure ASGI middleware.
+
+Starlette's ``GZipMiddleware`` is not used because it also compresses
+``text/event-stream``: zlib holds the small SSE frames back until it has a
+block's worth, so streamed tokens would reach the browser in bursts.  Here:
+
+  - Server-Sent Events and responses that already carry a
+    ``Content-Encoding`` pass through untouched.
+  - A single-body response smaller than ``COMPRESSION_MIN_SIZE`` bytes is
+    sent as is; the headers and the framing would eat most of the saving.
+  - Other single-body responses are compressed in one call.  Streamed
+    bodies are compressed chunk by chunk, each chunk flushed, so nothing is
+    held back.
+  - The encoding is picked from ``Accept-Encoding``: ``br`` over ``gzip``;
+    a coding with ``q=0`` is refused, also when ``*`` is accepted.
+
+Levels favour CPU over the last few bytes.  On chat and admin JSON gzip 6
+is as small as gzip 9; Brotli quality 4 takes about 40 µs on a 5 KB body
+and is 10–20 % smaller than gzip, where quality 11 takes milliseconds
+(``benchmarks/bench_responses.py``).
+
+Public API
+──────────
+  CompressionMiddleware
+  stats() -> dict                 – responses compressed / skipped, bytes in / out
+"""
+
+from __future__ import annotations
+
+import os
+import zlib
+from typing import Any
+
+try:  # optional; without it only gzip is offered
+    import brotli
+except ImportError:
+    brotli = None  # type: ignore[assignment]
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_ENABLED         = os.getenv("COMPRESSION_ENABLED", "1") != "0"
+_MIN_SIZE        = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))        # bytes
+_GZIP_LEVEL      = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+_BROTLI_QUALITY  = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+_BROTLI          = brotli is not None and os.getenv("COMPRESSION_BROTLI", "1") != "0"
+
+_SKIPPED_TYPES = (b"text/event-stream",)
+
+
+# ── State ──────────────────────────────────────────────────────────────────
+
+_stats: dict[str, int] = {
+    "gzip": 0, "br": 0, "skipped_small": 0, "skipped_type": 0, "bytes_in": 0, "bytes_out": 0,
+}
+
+
+def stats() -> dict[str, Any]:
+    """Counters for ``/api/admin/status``."""
+    return {
+        "enabled":   _ENABLED,
+        "encodings": ["br", "gzip"] if _BROTLI else ["gzip"],
+        "min_size":  _MIN_SIZE,
+        **_stats,
+    }
+
+
+# ── Encoders ───────────────────────────────────────────────────────────────
+
+def _accepted(header: bytes) -> str | None:
+    """
+    The encoding to use for this ``Accept-Encoding`` value, if any.  A
+    coding listed with ``q=0`` is refused, and ``*`` only stands for codings
+    that are not (RFC 9110 §12.5.3).
+    """
+    offered: set[str] = set()
+    refused: set[str] = set()
+    for item in header.decode("latin-1").lower().split(","):
+        coding, _, params = item.partition(";")
+        coding, q = coding.strip(), params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    refused.add(coding)
+                    continue
+            except ValueError:
+                continue
+        offered.add(coding)
+    for coding in ("br", "gzip") if _BROTLI else ("gzip",):
+        if coding in offered or ("*" in offered and coding not in refused):
+            return coding
+    return None
+
+
+class _Encoder:
+    """Incremental compressor with a common interface for both encodings."""
+
+    def __init__(self, coding: str) -> None:
+        self.coding = coding
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, 31)   # 31: gzip framing
+
+    def whole(self, data: bytes) -> bytes:
+        if self.coding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress ``data`` and flush it, so the client can decode it now."""
+        if self.coding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.coding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+# ── Middleware ─────────────────────────────────────────────────────────────
+
+def _set_header(headers: list[tuple[bytes, bytes]], name: bytes, value: bytes | None) -> list:
+    """``headers`` without ``name``, plus ``name: value`` unless value is None."""
+    kept = [(k, v) for k, v in headers if k.lower() != name]
+    if value is not None:
+        kept.append((name, value))
+    return kept
+
+
+def _add_vary(headers: list[tuple[bytes, bytes]]) -> list:
+    for i, (k, v) in enumerate(headers):
+        if k.lower() == b"vary":
+            if b"accept-encoding" not in v.lower():
+                headers[i] = (k, v + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """
+    Compresses HTTP responses for clients that accept gzip or Brotli (see
+    the module docstring for what is skipped).
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if not _ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                coding = _accepted(value)
+                break
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: dict | None = None
+        encoder: _Encoder | None = None
+        passthrough = False
+
+        async def send_compressed(message: dict) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                for name, value in headers:
+                    name = name.lower()
+                    if name == b"content-encoding" or (
+                        name == b"content-type" and value.startswith(_SKIPPED_TYPES)
+                    ):
+                        passthrough = True
+                        _stats["skipped_type"] += 1
+                        break
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message         # held until the first body shows its size
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body      = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers, start_message, start = list(start.get("headers", [])), start, None
+                if not more_body and len(body) < _MIN_SIZE:
+                    _stats["skipped_small"] += 1
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _Encoder(coding)
+                _stats[coding] += 1
+                _stats["bytes_in"] += len(body)
+                body = encoder.whole(body) if not more_body else encoder.chunk(body)
+                _stats["bytes_out"] += len(body)
+                headers = _set_header(headers, b"content-encoding", coding.encode())
+                headers = _set_header(headers, b"content-length", None if more_body else str(len(body)).encode())
+                start_message["headers"] = _add_vary(headers)
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            _stats["bytes_in"] += len(body)
+            body = encoder.chunk(body) if more_body else encoder.chunk(body) + encoder.finish()
+            _stats["bytes_out"] += len(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -5,36 +5,115 @@ Builds a clean, LLM-readable prompt string from resume_data.json.
 
 Architecture
 ────────────
-  _load_resume()          – reads & caches resume_data.json (once per process)
   _section_summary()      – owner identity + professional summary
   _section_skills()       – skill categories with comma-separated names
   _section_projects()     – project details including tech stack and features
   _section_certifications() – certification name, issuer, year, description
-  _build_system_context() – assembles all sections (cached)
-  build_prompt()          – public API: appends the user question and returns
-                            the complete prompt as a single string
+  _build_context()        – renders resume_data.json into an immutable
+                            _Context: the full system context, the BM25
+                            index over per-project / per-skill-category /
+                            per-certification chunks, every token count and
+                            the fingerprint
+  _build_retrieval_context() – instructions + summary + only the chunks
+                            relevant to the question
+  reload_context()        – re-reads resume_data.json if it changed and swaps
+                            in a new _Context
+  start_watcher() / stop_watcher() – poll the file for changes in the background
+  context_fingerprint()   – short hash of the system context, used to key and
+                            invalidate caches derived from it
+  resume_snapshot()       – fingerprint + parsed resume of the current context,
+                            for views derived from the raw data
+  context_stats()         – reload counters, for /api/admin/status
+  assemble_prompt()       – public API: fits context, history and question into
+                            the model's context window; returns the text and
+                            its token count
+  build_prompt()          – public API: the text of assemble_prompt()
+  prompt_stats()          – token counts of assembled prompts, for /api/admin/status
+  preload_context()       – renders the context (and builds the index) at
+                            startup, optionally on a background thread
+
+Context modes
+─────────────
+  CONTEXT_MODE=full        (default) every prompt carries the whole resume.
+  CONTEXT_MODE=retrieval   every prompt carries the owner summary plus the
+                           CONTEXT_TOP_K chunks that best match the question.
+                           Questions that name a whole section ("what
+                           projects…", "which certifications…") get every
+                           chunk of that section; questions that match nothing
+                           fall back to the full context.
+
+Token budget
+────────────
+  The prompt may use MODEL_CONTEXT_TOKENS minus the OPENROUTER_MAX_TOKENS
+  reserved for the reply (minus a small margin for the chat template and
+  estimator error).  Token counts for the full context and for every
+  retrieval chunk are computed once, next to the text they describe, so a
+  request only estimates its question and history.  History is then fitted
+  newest-first into whatever the context and question leave over, capped at
+  HISTORY_TOKEN_BUDGET.
+
+Hot reload
+──────────
+  Everything derived from the resume lives in one frozen _Context held by
+  a module global.  A request reads that global once and uses the same
+  snapshot throughout, so a reload swaps a single reference and readers
+  never take a lock.  The watcher thread stats the file every
+  RESUME_RELOAD_INTERVAL seconds (0 disables it); when the mtime, size or
+  inode changes, the JSON is parsed and a new _Context is built.  A file
+  that is being written (or fails to parse or render) keeps the current
+  context and is retried when it changes again.
+
+  Each section and chunk is memoised by the hash of its source data, so
+  a reload only re-renders — and re-counts tokens for — the entries that
+  actually changed.  Derived caches need no explicit invalidation: the
+  token counts and the index belong to the snapshot, and the answer cache
+  is keyed on context_fingerprint().
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
-from functools import lru_cache
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+from app.services import metrics, tracing
+from app.services.openrouter_service import MAX_TOKENS, PromptParts, json_fragment
+from app.services.retrieval import BM25Index
+from app.services.token_counter import estimate_tokens, fit_history
+
+logger = logging.getLogger(__name__)
 
 
 # ── File path ─────────────────────────────────────────────────────────────
+# RESUME_DATA_PATH relocates the file (checks point it at a temp copy).
+
+_DATA_PATH: Path = Path(
+    os.getenv("RESUME_DATA_PATH", str(Path(__file__).parent.parent / "data" / "resume_data.json"))
+)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_CONTEXT_MODE = os.getenv("CONTEXT_MODE", "full").strip().lower()   # "full" | "retrieval"
+_TOP_K        = int(os.getenv("CONTEXT_TOP_K", "4"))
 
-_DATA_PATH: Path = Path(__file__).parent.parent / "data" / "resume_data.json"
+# Token budget for prior conversation turns; the newest turns that fit are kept
+_HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
 
+# Model context window; OPENROUTER_MAX_TOKENS of it is reserved for the reply
+_CONTEXT_WINDOW = int(os.getenv("MODEL_CONTEXT_TOKENS", "8192"))
+_PROMPT_MARGIN  = 64    # chat-template tokens + estimator slack
 
-# ── Data loader ───────────────────────────────────────────────────────────
+# How often the watcher checks resume_data.json for changes; 0 disables it
+_RELOAD_INTERVAL = float(os.getenv("RESUME_RELOAD_INTERVAL", "2"))   # seconds
 
-@lru_cache(maxsize=1)
-def _load_resume() -> dict[str, Any]:
-    """Read resume_data.json once and cache the result for the process lifetime."""
-    with open(_DATA_PATH, "r", encoding="utf-8") as fh:
-        return json.load(fh)
+_DIVIDER        = "=" * 60
+_DIVIDER_TOKENS = estimate_tokens(_DIVIDER)
 
 
 # ── Section builders ──────────────────────────────────────────────────────
@@ -162,23 +241,9 @@ def _section_certifications(certifications: list[dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
-# ── System context (cached) ────────────────────────────────────────────────
-
-@lru_cache(maxsize=1)
-def _build_system_context() -> str:
-    """
-    Assemble the full static system context from all resume sections.
-    Cached after the first call — the JSON is parsed and formatted only once.
-
-    Returns:
-        A multi-section plain-text string suitable as the LLM system prompt.
-    """
-    data  = _load_resume()
-    owner = data.get("owner", {})
-    name  = owner.get("name", "the portfolio owner")
-
-    # ── Persona + instructions ────────────────────────────────────────
-    instructions = "\n".join([
+def _instructions(name: str, *, partial: bool = False) -> str:
+    """Persona + answering guidelines that open every system context."""
+    lines = [
         f"You are an AI assistant representing {name}'s professional portfolio.",
         f"Your role is to help recruiters and hiring managers learn about {name}.",
         "",
@@ -188,28 +253,455 @@ def _build_system_context() -> str:
         "  3. If a question falls outside the provided data, say so clearly.",
         "  4. Respond in plain text only — no markdown, no bullet symbols in replies.",
         "  5. Target 100–200 words per answer; expand only when explicitly asked.",
-    ])
+    ]
+    if partial:
+        lines.append(
+            "  6. Only the resume sections relevant to this question are included below."
+        )
+    return "\n".join(lines)
+
+
+# ── Retrieval mode ─────────────────────────────────────────────────────────
 
-    divider = "=" * 60
+# Plural words that ask about a whole section rather than one entry in it
+_SECTION_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "projects":       ("projects", "portfolio"),
+    "skills":         ("skills", "tech stack", "technologies", "languages"),
+    "certifications": ("certifications", "certificates", "credentials", "courses"),
+}
+
+
+def _build_retrieval_context(ctx: _Context, query: str) -> tuple[str, int]:
+    """
+    Assemble a system context holding the instructions, the owner summary
+    and only the resume chunks relevant to ``query``.  Falls back to the
+    full context when nothing in the resume matches.
 
+    Returns:
+        ``(context, tokens)`` — the token count is summed from the
+        precomputed per-chunk counts rather than re-estimated.
+    """
+    data = ctx.data
+
+    lowered  = query.lower()
+    selected = set(ctx.index.search(query, _TOP_K))
+    for section, keywords in _SECTION_KEYWORDS.items():
+        if any(k in lowered for k in keywords):
+            selected.update(f"{section}:{i}" for i in range(len(data.get(section, []))))
+    if not selected:
+        return ctx.system_context, ctx.system_tokens
+
+    def pick(section: str) -> list[dict[str, Any]]:
+        items = data.get(section, [])
+        return [item for i, item in enumerate(items) if f"{section}:{i}" in selected]
+
+    sections = [ctx.retrieval_head]
+    for rendered in (
+        _section_skills(pick("skills")),
+        _section_projects(pick("projects")),
+        _section_certifications(pick("certifications")),
+    ):
+        if rendered:
+            sections.extend(["", rendered])
+    sections.append(_DIVIDER)
+
+    tokens = ctx.retrieval_base_tokens + sum(ctx.chunk_tokens[c] for c in selected)
+    return "\n".join(sections), tokens
+
+
+# ── Rendered context ───────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class _Context:
+    """Everything derived from one version of resume_data.json.  Never mutated."""
+
+    data:                  dict[str, Any]
+    signature:             tuple[int, int, int] | None   # (mtime_ns, size, inode) it was read at
+    system_context:        str
+    system_json:           bytes                         # json_fragment(system_context)
+    system_tokens:         int
+    chunk_tokens:          dict[str, int]                # chunk id → tokens
+    index:                 BM25Index                     # over the rendered chunks
+    retrieval_head:        str                           # instructions + summary (retrieval mode)
+    retrieval_base_tokens: int                           # retrieval_head + closing divider
+    fingerprint:           str
+    loaded_at:             float                         # time.time()
+
+
+class _SectionMemo:
+    """
+    Rendered sections keyed by renderer and a hash of their source data.
+    Built fresh for every reload from the previous reload's entries, so it
+    only ever holds what the current context uses.
+    """
+
+    def __init__(self, previous: dict[str, tuple[str, int]]) -> None:
+        self._previous = previous
+        self.entries: dict[str, tuple[str, int]] = {}
+        self.rendered = 0
+        self.reused   = 0
+
+    def __call__(self, renderer: Callable[..., str], value: Any, **kwargs: Any) -> tuple[str, int]:
+        """Return ``(text, tokens)`` of ``renderer(value, **kwargs)``."""
+        source = json.dumps([value, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+        key    = f"{renderer.__name__}:{hashlib.sha256(source.encode('utf-8')).hexdigest()}"
+        hit    = self.entries.get(key) or self._previous.get(key)
+        if hit is None:
+            text = renderer(value, **kwargs)
+            hit  = (text, estimate_tokens(text))
+            self.rendered += 1
+        else:
+            self.reused += 1
+        self.entries[key] = hit
+        return hit
+
+
+def _build_context(
+    data: dict[str, Any], signature: tuple[int, int, int] | None, memo: _SectionMemo
+) -> _Context:
+    """
+    Render every section, chunk and token count of ``data``.
+
+    Pieces are joined with newlines, which the token estimator never
+    counts, so the token count of a joined block is the sum of its parts.
+    """
+    owner = data.get("owner", {})
+    name  = owner.get("name", "the portfolio owner")
+
+    instructions, instructions_tokens = memo(_instructions, name)
+    summary, summary_tokens           = memo(_section_summary, owner)
     sections = [
-        instructions,
-        divider,
-        _section_summary(owner),
-        "",
-        _section_skills(data.get("skills", [])),
-        "",
-        _section_projects(data.get("projects", [])),
-        "",
-        _section_certifications(data.get("certifications", [])),
-        divider,
+        memo(_section_skills, data.get("skills", [])),
+        memo(_section_projects, data.get("projects", [])),
+        memo(_section_certifications, data.get("certifications", [])),
     ]
-
-    return "\n".join(sections)
+    system_context = "\n".join([
+        instructions, _DIVIDER, summary, "",
+        sections[0][0], "", sections[1][0], "", sections[2][0],
+        _DIVIDER,
+    ])
+    system_tokens = (
+        instructions_tokens + summary_tokens + sum(t for _, t in sections) + 2 * _DIVIDER_TOKENS
+    )
+
+    # Retrieval chunks: one per project, skill category and certification.
+    # Each carries its own section heading, so summing them slightly
+    # over-counts a multi-chunk section — the safe direction for budgeting.
+    chunks: list[tuple[str, str]] = []
+    chunk_tokens: dict[str, int] = {}
+    for section, renderer in (
+        ("projects", _section_projects),
+        ("skills", _section_skills),
+        ("certifications", _section_certifications),
+    ):
+        for i, item in enumerate(data.get(section, [])):
+            text, tokens = memo(renderer, [item])
+            chunks.append((f"{section}:{i}", text))
+            chunk_tokens[f"{section}:{i}"] = tokens
+
+    partial, partial_tokens = memo(_instructions, name, partial=True)
+    return _Context(
+        data=data,
+        signature=signature,
+        system_context=system_context,
+        system_json=json_fragment(system_context),
+        system_tokens=system_tokens,
+        chunk_tokens=chunk_tokens,
+        index=BM25Index(chunks),
+        retrieval_head="\n".join([partial, _DIVIDER, summary]),
+        retrieval_base_tokens=partial_tokens + summary_tokens + 2 * _DIVIDER_TOKENS,
+        fingerprint=hashlib.sha256(system_context.encode("utf-8")).hexdigest()[:16],
+        loaded_at=time.time(),
+    )
+
+
+# ── Loading and hot reload ─────────────────────────────────────────────────
+
+_current:          _Context | None = None    # swapped whole; read without a lock
+_reload_lock:      threading.Lock = threading.Lock()
+_first_load_lock:  threading.Lock = threading.Lock()
+_memo_entries:     dict[str, tuple[str, int]] = {}
+_failed_signature: tuple[int, int, int] | None = None
+_reload_stats:     dict[str, int | float | None] = {
+    "reloads": 0, "reload_errors": 0, "sections_rendered": 0, "sections_reused": 0, "preload_ms": None,
+}
+
+_watcher:      threading.Thread | None = None
+_watcher_stop: threading.Event = threading.Event()
+
+
+def _file_signature() -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(_DATA_PATH)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _read_resume(signature: tuple[int, int, int] | None) -> dict[str, Any]:
+    """Parse resume_data.json, refusing a file that changed while it was read."""
+    data = json.loads(_DATA_PATH.read_bytes())
+    if not isinstance(data, dict):
+        raise ValueError("resume_data.json must hold a JSON object")
+    if _file_signature() != signature:
+        raise ValueError("resume_data.json changed while it was being read")
+    return data
+
+
+def _context() -> _Context:
+    """The current context, loading it on first use."""
+    ctx = _current
+    if ctx is None:
+        with _first_load_lock:          # callers arriving meanwhile wait for this load
+            if _current is None:
+                reload_context(force=True)
+        ctx = _current
+        assert ctx is not None
+    return ctx
+
+
+def _preload() -> None:
+    started = time.perf_counter()
+    try:
+        _context()
+    except Exception:  # noqa: BLE001 — the first request retries and reports it
+        logger.exception("Preloading the resume context failed")
+        return
+    _reload_stats["preload_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _watch_loop() -> None:
+    while not _watcher_stop.wait(_RELOAD_INTERVAL):
+        try:
+            reload_context()
+        except Exception:  # noqa: BLE001 — keep watching
+            logger.exception("Resume watcher failed")
+
+
+# ── Prompt statistics ──────────────────────────────────────────────────────
+
+_stats_lock: threading.Lock = threading.Lock()
+_stats: dict[str, int] = {"prompts": 0, "tokens_total": 0, "tokens_max": 0, "over_budget": 0}
+
+
+def _record_prompt(tokens: int, budget: int) -> None:
+    metrics.observe_prompt_tokens(tokens)
+    with _stats_lock:
+        _stats["prompts"]      += 1
+        _stats["tokens_total"] += tokens
+        _stats["tokens_max"]    = max(_stats["tokens_max"], tokens)
+        if tokens > budget:
+            _stats["over_budget"] += 1
 
 
 # ── Public API ─────────────────────────────────────────────────────────────
 
+@dataclass(frozen=True)
+class AssembledPrompt:
+    """A prompt ready to send, with its estimated size."""
+
+    parts:         PromptParts  # context + history and question, for ask_openrouter
+    tokens:        int          # estimated prompt tokens
+    budget:        int          # prompt tokens available in the context window
+    history_turns: int          # prior turns that made it into the prompt
+
+    @property
+    def text(self) -> str:
+        return self.parts.text
+
+
+def context_fingerprint() -> str:
+    """
+    Return a short, stable hash of the current system context.
+
+    Anything derived from the resume context (cached answers, token counts)
+    should be keyed on this value so it is invalidated when the data changes.
+    """
+    return _context().fingerprint
+
+
+def resume_snapshot() -> tuple[str, dict[str, Any]]:
+    """
+    The fingerprint and parsed resume_data.json of the current context, from
+    one snapshot.  The dict is shared with the context: do not mutate it.
+    """
+    ctx = _context()
+    return ctx.fingerprint, ctx.data
+
+
+def preload_context(*, background: bool = False) -> None:
+    """
+    Render the system context, the chunk index and their token counts so
+    the first request does not pay for them.
+
+    The FastAPI ``lifespan`` hook passes ``background=True``: a thread
+    renders while startup continues, and a request that needs the context
+    before it is ready waits for that render instead of starting another.
+    """
+    if background:
+        threading.Thread(target=_preload, name="context-preload", daemon=True).start()
+    else:
+        _preload()
+
+
+def reload_context(*, force: bool = False) -> bool:
+    """
+    Re-read resume_data.json if it changed since it was last loaded (or
+    unconditionally with ``force``) and swap in the new context.
+
+    Returns:
+        True if a context with new content was swapped in.
+
+    Raises:
+        OSError / ValueError only when there is no context yet to fall back
+        on; afterwards a bad file is logged and the current context kept.
+    """
+    global _current, _memo_entries, _failed_signature
+    with _reload_lock:
+        current   = _current
+        signature = _file_signature()
+        if not force and current is not None and signature in (current.signature, _failed_signature):
+            return False
+
+        started = time.perf_counter()
+        memo    = _SectionMemo(_memo_entries)
+        try:
+            ctx = _build_context(_read_resume(signature), signature, memo)
+        except Exception as exc:
+            if current is None:
+                raise
+            _failed_signature = signature
+            _reload_stats["reload_errors"] += 1
+            logger.warning("Keeping the current resume context — reload failed: %s", exc)
+            return False
+
+        _current, _memo_entries, _failed_signature = ctx, memo.entries, None
+        _reload_stats["sections_rendered"] += memo.rendered
+        _reload_stats["sections_reused"]   += memo.reused
+        changed = current is None or ctx.fingerprint != current.fingerprint
+        if current is not None and changed:
+            _reload_stats["reloads"] += 1
+            logger.info(
+                "Resume context reloaded in %.1f ms: %d sections re-rendered, %d reused (%s → %s)",
+                (time.perf_counter() - started) * 1000, memo.rendered, memo.reused,
+                current.fingerprint, ctx.fingerprint,
+            )
+        return changed
+
+
+def start_watcher() -> None:
+    """Poll resume_data.json in the background (no-op if disabled or running)."""
+    global _watcher
+    if _watcher is not None or _RELOAD_INTERVAL <= 0:
+        return
+    _watcher_stop.clear()
+    _watcher = threading.Thread(target=_watch_loop, name="resume-watcher", daemon=True)
+    _watcher.start()
+    logger.info("Watching %s for changes every %.1fs", _DATA_PATH.name, _RELOAD_INTERVAL)
+
+
+def stop_watcher() -> None:
+    """Stop the background watcher."""
+    global _watcher
+    if _watcher is None:
+        return
+    watcher, _watcher = _watcher, None
+    _watcher_stop.set()
+    watcher.join()
+
+
+def context_stats() -> dict[str, Any]:
+    """Reload counters and the current fingerprint, for ``/api/admin/status``."""
+    ctx = _current
+    return {
+        "fingerprint": ctx.fingerprint if ctx else None,
+        "loaded_at":   ctx.loaded_at if ctx else None,
+        "watching":    _watcher is not None,
+        **_reload_stats,
+    }
+
+
+def prompt_budget() -> int:
+    """Prompt tokens available once the reply's ``max_tokens`` is reserved."""
+    return _CONTEXT_WINDOW - MAX_TOKENS - _PROMPT_MARGIN
+
+
+def prompt_stats() -> dict[str, int]:
+    """Token counts of the prompts assembled so far, for ``/api/admin/status``."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_mean"] = stats["tokens_total"] // stats["prompts"] if stats["prompts"] else 0
+    stats["budget"]      = prompt_budget()
+    return stats
+
+
+def assemble_prompt(
+    user_question: str,
+    *,
+    history: list[dict[str, str]] | None = None,
+) -> AssembledPrompt:
+    """
+    Assemble the prompt for ``user_question`` within the model's context
+    window, split into the context and the rest (``AssembledPrompt.parts``)
+    so the context need not be copied or re-encoded per request.
+
+    The context and the question always go in; prior turns are added
+    newest-first while they fit in what is left of ``prompt_budget()``
+    (and in ``HISTORY_TOKEN_BUDGET``).  See ``build_prompt`` for the layout.
+    """
+    started = time.perf_counter()
+    ctx = _context()     # one snapshot for the whole prompt, even across a reload
+    if _CONTEXT_MODE == "retrieval":
+        last_user = next(
+            (t["content"] for t in reversed(history or []) if t["role"] == "user"), ""
+        )
+        context, context_tokens = _build_retrieval_context(ctx, f"{user_question} {last_user}")
+        context_json = context_id = None
+    else:
+        context, context_tokens = ctx.system_context, ctx.system_tokens
+        context_json, context_id = ctx.system_json, ctx.fingerprint
+
+    question = f"User question:\n{user_question.strip()}"
+    budget   = prompt_budget()
+    used     = context_tokens + estimate_tokens(question)
+
+    # The context is never copied here: it travels separately (and, when
+    # static, pre-escaped) to ask_openrouter, which writes the request body.
+    parts: list[str] = []
+
+    # ── Prior conversation turns ────────────────────────────────────────
+    history_budget = min(_HISTORY_TOKEN_BUDGET, budget - used)
+    turns, history_tokens = (
+        fit_history(history, history_budget) if history and history_budget > 0 else ([], 0)
+    )
+    if turns:
+        history_lines: list[str] = ["## Conversation so far"]
+        for turn in turns:
+            role_label = "Recruiter" if turn["role"] == "user" else "Assistant"
+            history_lines.append(f"{role_label}: {turn['content']}")
+        parts.append("\n".join(history_lines))
+        used += history_tokens
+
+    # ── Current question ───────────────────────────────────────────────
+    parts.append(question)
+
+    _record_prompt(used, budget)
+    tracing.record("build_prompt", started, tokens=used, history_turns=len(turns), mode=_CONTEXT_MODE)
+    if used > budget:
+        logger.warning("Prompt is over budget: %d tokens (budget %d)", used, budget)
+    else:
+        logger.debug(
+            "Prompt assembled: %d tokens (budget %d), %d history turns",
+            used, budget, len(turns),
+        )
+    return AssembledPrompt(
+        parts=PromptParts(context, "\n\n".join(parts), context_json, context_id),
+        tokens=used,
+        budget=budget,
+        history_turns=len(turns),
+    )
+
+
 def build_prompt(
     user_question: str,
     *,
@@ -218,15 +710,19 @@ def build_prompt(
     """
     Build the complete prompt string to be sent to the LLM.
 
-    Concatenates the cached system context, an optional prior-turn history
-    block, and the user's question into a single string, so the model
-    receives full portfolio knowledge and conversation context.
+    Concatenates the system context, an optional prior-turn history block,
+    and the user's question into a single string, so the model receives
+    portfolio knowledge and conversation context.  In retrieval mode the
+    context only holds the resume chunks relevant to the question (and the
+    latest recruiter turn, so follow-ups keep their subject).
 
     Args:
         user_question: The raw question from a recruiter or site visitor.
         history:       Optional list of prior turns, each a dict with
                        ``{"role": "user"|"assistant", "content": "..."}``.
-                       Only the last 10 turns are included to keep the
+                       Only the newest turns that fit in the token budget
+                       left by the context and question (at most
+                       ``HISTORY_TOKEN_BUDGET``) are included, to keep the
                        prompt within the model's context window.
 
     Returns:
@@ -247,18 +743,4 @@ def build_prompt(
                      {"role": "assistant", "content": "..."}],
         )
     """
-    parts: list[str] = [_build_system_context()]
-
-    # ── Prior conversation turns ────────────────────────────────────────
-    if history:
-        turns = history[-10:]  # cap to stay within token budget
-        history_lines: list[str] = ["## Conversation so far"]
-        for turn in turns:
-            role_label = "Recruiter" if turn["role"] == "user" else "Assistant"
-            history_lines.append(f"{role_label}: {turn['content']}")
-        parts.append("\n".join(history_lines))
-
-    # ── Current question ───────────────────────────────────────────────
-    parts.append(f"User question:\n{user_question.strip()}")
-
-    return "\n\n".join(parts)
+    return assemble_prompt(user_question, history=history).text
@@ -0,0 +1,95 @@
+"""
+backend/app/services/histogram.py
+
+Fixed-bucket latency histogram.
+
+Observations are counted into buckets with fixed upper bounds (seconds),
+so recording one is a bisect plus an increment and memory does not grow
+with traffic.  Quantiles are estimated by linear interpolation inside the
+bucket that holds the requested rank — the same estimate Prometheus'
+``histogram_quantile`` makes — so their precision is set by the bucket
+spacing.
+
+Public API
+──────────
+  Histogram(buckets)
+  Histogram.observe(seconds)
+  Histogram.quantile(q) -> float | None
+  Histogram.buckets() -> (cumulative buckets, count, sum)   – for exporters
+  Histogram.snapshot() -> dict             – count, mean and p50/p95/p99
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+
+# 10 ms … ~60 s, each bound 25 % above the previous one: fine enough to
+# place a p95 between "usually 1.2 s" and "usually 1.5 s".
+LATENCY_BUCKETS: tuple[float, ...] = tuple(round(0.01 * 1.25 ** i, 4) for i in range(40))
+
+
+class Histogram:
+    """Counts observations into fixed buckets; safe to share between threads."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)     # last bucket is +Inf
+        self._count  = 0
+        self._sum    = 0.0
+        self._max    = 0.0
+        self._lock   = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(self._bounds, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum   += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Estimated ``q``-quantile (0 < q < 1) in seconds, or None if empty."""
+        with self._lock:
+            counts, total, largest = list(self._counts), self._count, self._max
+        if not total:
+            return None
+
+        rank  = q * total
+        seen  = 0
+        lower = 0.0
+        for bound, n in zip(self._bounds, counts):
+            if n and seen + n >= rank:
+                return lower + (bound - lower) * (rank - seen) / n
+            seen += n
+            lower = bound
+        return largest      # rank falls in the +Inf bucket
+
+    def buckets(self) -> tuple[list[tuple[float, int]], int, float]:
+        """``([(upper_bound, cumulative_count), …], count, sum)`` for exporters."""
+        with self._lock:
+            counts, total, summed = list(self._counts), self._count, self._sum
+        cumulative: list[tuple[float, int]] = []
+        running = 0
+        for bound, n in zip(self._bounds, counts):
+            running += n
+            cumulative.append((bound, running))
+        return cumulative, total, summed
+
+    def snapshot(self) -> dict[str, float | int | None]:
+        """Summary for ``/api/admin/status``: count, mean and p50/p95/p99 in milliseconds."""
+        def ms(value: float | None) -> float | None:
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "count":   self._count,
+            "mean_ms": ms(self._sum / self._count) if self._count else None,
+            "p50_ms":  ms(self.quantile(0.50)),
+            "p95_ms":  ms(self.quantile(0.95)),
+            "p99_ms":  ms(self.quantile(0.99)),
+        }
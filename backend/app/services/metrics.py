@@ -0,0 +1,184 @@
+"""
+backend/app/services/metrics.py
+
+Process-local metrics in the Prometheus text format, without a client
+library.
+
+Recording is meant to sit on the request path, so it is kept to a
+``perf_counter()`` pair and a histogram bucket increment — callers time a
+stage inline rather than through a context manager, which would double
+the cost (see ``benchmarks/bench_metrics.py``).  Everything is rendered on
+demand by ``GET /metrics``.  Set ``METRICS_ENABLED=0`` to turn every
+recording call into a no-op.
+
+Metrics
+───────
+  chat_stage_duration_seconds{stage}   histogram — one series per stage:
+      validation            request read + JSON decode + model validation
+      prefilter             prefilter.check (local answers ahead of the prompt)
+      build_prompt          context_builder.build_prompt
+      upstream_connect      TCP (+ TLS) setup of a new pooled connection
+      upstream_ttfb         upstream request start → response headers
+      upstream_first_token  upstream request start → first streamed token
+      upstream_total        upstream request start → full reply
+      parse                 decoding and validating the reply body
+      log_message           each db.log_message call
+      chat_total            POST /api/chat, received → response ready
+  chat_prompt_tokens                   histogram — estimated prompt size
+  openrouter_errors_total{category}    counter — failed upstream attempts
+  openrouter_in_flight                 gauge — upstream calls in progress
+  …plus whatever is registered with ``register()`` (cache, writer, breaker).
+
+Public API
+──────────
+  observe(stage, seconds)
+  observe_prompt_tokens(tokens)
+  count_error(category)
+  in_flight(delta)                      – +1 when a call starts, -1 when it ends
+  register(name, kind, help_text, fn, label=None)   – value read at scrape time
+  render() -> str
+  RequestClockMiddleware                – stamps request arrival for "validation"
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable
+
+from app.services.histogram import Histogram
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# 10 µs … 60 s: in-process stages sit at the low end, upstream at the high end
+STAGE_BUCKETS: tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+TOKEN_BUCKETS: tuple[float, ...] = (256, 512, 1024, 2048, 3072, 4096, 6144, 8192, 16384, 32768)
+
+
+# ── State ──────────────────────────────────────────────────────────────────
+
+_stages:        dict[str, Histogram] = {}
+_prompt_tokens: Histogram = Histogram(TOKEN_BUCKETS)
+_errors:        dict[str, int] = {}
+_in_flight:     int = 0
+_collectors:    list[tuple[str, str, str, Callable[[], Any], str | None]] = []
+
+
+# ── Recording ──────────────────────────────────────────────────────────────
+
+def observe(stage: str, seconds: float) -> None:
+    """Record that ``stage`` took ``seconds``."""
+    if not ENABLED:
+        return
+    histogram = _stages.get(stage)
+    if histogram is None:
+        histogram = _stages.setdefault(stage, Histogram(STAGE_BUCKETS))
+    histogram.observe(seconds)
+
+
+def observe_prompt_tokens(tokens: int) -> None:
+    if ENABLED:
+        _prompt_tokens.observe(tokens)
+
+
+def count_error(category: str) -> None:
+    """Count one failed upstream attempt of the given OpenRouterError category."""
+    if ENABLED:
+        _errors[category] = _errors.get(category, 0) + 1
+
+
+def in_flight(delta: int) -> None:
+    """Adjust the number of upstream calls in progress."""
+    global _in_flight
+    _in_flight += delta
+
+
+def register(
+    name: str,
+    kind: str,
+    help_text: str,
+    fn: Callable[[], Any],
+    label: str | None = None,
+) -> None:
+    """
+    Export a value computed at scrape time.
+
+    Args:
+        kind:  ``"gauge"`` or ``"counter"``.
+        fn:    Returns a number, or — with ``label`` — a ``{label_value: number}``
+               dict rendered as one series per entry.
+    """
+    _collectors.append((name, kind, help_text, fn, label))
+
+
+# ── Exposition ─────────────────────────────────────────────────────────────
+
+def _number(value: Any) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str = "") -> list[str]:
+    buckets, count, total = histogram.buckets()
+    sep = "," if labels else ""
+    lines = [f'{name}_bucket{{{labels}{sep}le="{bound:g}"}} {cumulative}' for bound, cumulative in buckets]
+    lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {total:.9g}")
+    lines.append(f"{name}_count{suffix} {count}")
+    return lines
+
+
+def render() -> str:
+    """Return every metric in the Prometheus text exposition format (0.0.4)."""
+    lines: list[str] = [
+        "# HELP chat_stage_duration_seconds Time spent in each stage of a chat request.",
+        "# TYPE chat_stage_duration_seconds histogram",
+    ]
+    for stage in sorted(_stages):
+        lines.extend(_histogram_lines("chat_stage_duration_seconds", _stages[stage], f'stage="{stage}"'))
+
+    lines += [
+        "# HELP chat_prompt_tokens Estimated size of assembled prompts in tokens.",
+        "# TYPE chat_prompt_tokens histogram",
+        *_histogram_lines("chat_prompt_tokens", _prompt_tokens),
+        "# HELP openrouter_errors_total Failed upstream attempts by error category.",
+        "# TYPE openrouter_errors_total counter",
+        *(f'openrouter_errors_total{{category="{c}"}} {n}' for c, n in sorted(_errors.items())),
+        "# HELP openrouter_in_flight Upstream calls in progress.",
+        "# TYPE openrouter_in_flight gauge",
+        f"openrouter_in_flight {_in_flight}",
+    ]
+
+    for name, kind, help_text, fn, label in _collectors:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        value = fn()
+        if label is None:
+            lines.append(f"{name} {_number(value)}")
+        else:
+            lines.extend(f'{name}{{{label}="{key}"}} {_number(v)}' for key, v in sorted(value.items()))
+
+    return "\n".join(lines) + "\n"
+
+
+# ── ASGI middleware ────────────────────────────────────────────────────────
+
+class RequestClockMiddleware:
+    """
+    Stamps ``request.state.received_at`` (``perf_counter``) before anything
+    else runs, so an endpoint can tell how long reading and validating its
+    request took.  Pure ASGI — it does not wrap the response.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["received_at"] = time.perf_counter()
+        await self.app(scope, receive, send)
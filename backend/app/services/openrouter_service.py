@@ -5,40 +5,330 @@ Reliable OpenRouter Chat Completions client.
 
 Public API
 ──────────
-  ask_openrouter(prompt: str) -> str
-      Accepts a plain-text prompt, calls
-      https://openrouter.ai/api/v1/chat/completions with
+  await ask_openrouter(prompt: str | PromptParts) -> str
+      Accepts a plain-text prompt (or one split into context and tail),
+      calls https://openrouter.ai/api/v1/chat/completions with
       model mistralai/mistral-7b-instruct, and returns the
       generated reply as a clean string.
 
+  stream_openrouter(prompt: str | PromptParts) -> AsyncIterator[str]
+      Same request with ``"stream": true``; yields reply tokens as the
+      upstream Server-Sent Events arrive.
+
+  PromptParts(context, tail, context_json=None, context_id=None)
+  json_fragment(text) -> bytes        – ``text`` escaped for a JSON string
+
+  start_client() / await open_client() / await close_client()
+      Create and dispose of the shared connection pool.  The FastAPI
+      ``lifespan`` hook starts creating it on a worker thread without
+      waiting; ``ask_openrouter`` waits for it, or opens the pool itself
+      so scripts can use it without a running app.  ``preload_client()``
+      creates it synchronously before app/serve.py forks its workers.
+
+  stats() -> dict
+      Client counters for ``/api/admin/status``.
+
+  models() -> list[str]               – the model pool, in fallback order
+  breaker_states() -> dict            – model → "closed" | "open" | "half_open",
+                                        for ``/health``
+  MAX_TOKENS, TEMPERATURE             – default sampling settings
+
+Connection pooling
+──────────────────
+  All calls share one ``httpx.AsyncClient`` with keep-alive connections, so
+  only the first request to OpenRouter pays the DNS/TCP/TLS handshake.
+  HTTP/2 is negotiated when the optional ``h2`` package is installed.
+  Because the client is async, a single worker can hold hundreds of
+  in-flight completions without tying up threadpool slots.
+
+Request coalescing
+──────────────────
+  Concurrent ``ask_openrouter`` calls with an identical payload (prompt,
+  model, max_tokens, temperature) share one upstream request and all get
+  its reply — or its OpenRouterError.  This matters when a shared link
+  sends many visitors to the same suggested question at once.  Disable
+  with ``OPENROUTER_COALESCE=0``.  Streaming calls are not coalesced.
+
+Admission
+─────────
+  Every upstream call holds a slot of ``admission.upstream``
+  (app/services/admission.py) while it runs and raises ``Overloaded`` when
+  none frees up in time.  A coalesced call takes one slot, in the leader,
+  so a burst of identical questions needs one slot rather than one per
+  caller; its waiters share the leader's reply or its ``Overloaded``.  A
+  stream holds its slot until it is exhausted or closed.
+
+Model pool, fallback and hedging
+────────────────────────────────
+  ``OPENROUTER_MODELS`` lists the models to use, in order of preference, each
+  with an optional per-attempt timeout::
+
+      OPENROUTER_MODELS=mistralai/mistral-7b-instruct@20,meta-llama/llama-3.1-8b-instruct@15
+
+  (default: ``OPENROUTER_MODEL`` with ``OPENROUTER_TIMEOUT``).  When a model
+  fails — after its own retries — or times out, the next one is tried.
+  Errors that no other model would fix (missing or rejected key) are not
+  retried elsewhere.
+
+  With ``OPENROUTER_HEDGE=1`` a non-streaming call does not wait for a slow
+  model to fail: if it has not answered within its observed p95 latency
+  (``OPENROUTER_HEDGE_QUANTILE``), the next model is asked as well, the
+  first reply wins and the other request is cancelled.  By construction
+  about one call in twenty is hedged, which trims the p99 that users
+  notice for a few percent of extra upstream calls.  Each model keeps a
+  latency histogram (``app/services/histogram.py``) of its successful calls;
+  until it has OPENROUTER_HEDGE_MIN_SAMPLES of them ``OPENROUTER_HEDGE_DELAY``
+  is used.  Once every model of the pool is in flight the call just waits
+  for them.  Latencies and per-model breaker state are reported on
+  ``/api/admin/status``, with ``hedged`` (hedges started) and
+  ``hedge_wins`` (calls answered by a hedge, even after the model it
+  hedged failed).
+
+Retries and circuit breaker
+───────────────────────────
+  Rate limits (429), 5xx responses and connection failures are retried up
+  to OPENROUTER_RETRIES times with capped exponential backoff and full
+  jitter.  A ``Retry-After`` header replaces the computed delay; if it asks
+  for longer than OPENROUTER_RETRY_MAX_DELAY the error is returned at once
+  rather than holding the request.  Read timeouts are not retried — the
+  caller has already waited OPENROUTER_TIMEOUT.
+
+  Every attempt goes through its model's circuit breaker.  When most recent attempts
+  failed (429, 5xx, connection errors, timeouts) it opens and calls fail
+  immediately instead of each waiting for a timeout; after
+  OPENROUTER_BREAKER_OPEN_SECONDS a probe request is let through and its
+  outcome closes or re-opens the breaker.  An open breaker makes the call
+  fall back to the next model at once.  Streaming calls are retried (and
+  fall back) only before the first token.  The breaker state is reported
+  on ``/api/admin/status`` and ``/metrics``.
+
+Request bodies
+──────────────
+  The request body is written directly as bytes, not built as a dict and
+  then JSON-encoded.  A prompt arrives as ``PromptParts``: the resume
+  context plus the per-request tail (history and question).  When the
+  caller passes the context already escaped (``context_json``, computed
+  once per context by ``context_builder``), only the tail is escaped per
+  call, and the body is a single ``b"".join`` of fixed fragments.  The bytes
+  are identical to what ``httpx``'s ``json=`` would send.  With
+  ``OPENROUTER_SYSTEM_MESSAGE=1`` the context goes in its own ``system``
+  message instead of prefixing the ``user`` message.  That gives every
+  request the same leading message, which provider-side prompt caching
+  can reuse.
+
+Metrics
+───────
+  Every attempt records connection setup (new connections only), time to
+  response headers, time to first token (streams), total time and reply
+  parsing in ``app/services/metrics.py``, counts failures by category and
+  keeps a gauge of calls in flight.
+
 Error handling
 ──────────────
   All recoverable errors surface as OpenRouterError (subclass of RuntimeError)
-  so callers can catch a single, typed exception.
+  so callers can catch a single, typed exception.  ``exc.category`` says
+  what went wrong (``"timeout"``, ``"rate_limit"``, ``"server"``, ``"parse"``…)
+  and ``exc.retry_after`` carries the upstream's ``Retry-After`` hint.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import importlib.util
+import itertools
+import json
 import os
 import logging
-from typing import Any
+import random
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator
 
-import requests
-from dotenv import load_dotenv
+import httpx
 
-load_dotenv()
+from app.services.admission import Overloaded, upstream
+from app.services.circuit_breaker import CircuitBreaker, Permit
+from app.services import metrics, tracing
+from app.services.histogram import Histogram
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 # ── Configuration ───────────────────────────────────────────────────────────
 
-_API_URL     = "https://openrouter.ai/api/v1/chat/completions"
+_API_URL     = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
 _MODEL       = os.getenv("OPENROUTER_MODEL", "mistralai/mistral-7b-instruct")
 _SITE_URL    = os.getenv("SITE_URL",  "http://localhost:3000")
 _SITE_NAME   = os.getenv("SITE_NAME", "Portfolio AI Assistant")
 _TIMEOUT     = int(os.getenv("OPENROUTER_TIMEOUT", "30"))   # seconds
-_MAX_TOKENS  = int(os.getenv("OPENROUTER_MAX_TOKENS", "512"))
-_TEMPERATURE = float(os.getenv("OPENROUTER_TEMPERATURE", "0.7"))
+MAX_TOKENS   = int(os.getenv("OPENROUTER_MAX_TOKENS", "512"))
+TEMPERATURE  = float(os.getenv("OPENROUTER_TEMPERATURE", "0.7"))
+
+# Connection pool sizing — max_connections bounds concurrent upstream calls,
+# keep-alive connections are reused across requests.
+_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "200"))
+_MAX_KEEPALIVE   = int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "50"))
+_KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "60"))  # seconds
+
+# Send the resume context as a separate "system" message (provider prompt caching)
+_SYSTEM_MESSAGE = os.getenv("OPENROUTER_SYSTEM_MESSAGE", "0") == "1"
+
+# Share one upstream call between identical concurrent prompts
+_COALESCE = os.getenv("OPENROUTER_COALESCE", "1") != "0"
+
+# Retries: capped exponential backoff with full jitter, or Retry-After
+_RETRIES         = int(os.getenv("OPENROUTER_RETRIES", "2"))
+_RETRY_BASE      = float(os.getenv("OPENROUTER_RETRY_BASE", "0.5"))       # seconds
+_RETRY_MAX_DELAY = float(os.getenv("OPENROUTER_RETRY_MAX_DELAY", "8"))    # seconds
+
+# Circuit breaker over the recent attempts
+_BREAKER_WINDOW       = int(os.getenv("OPENROUTER_BREAKER_WINDOW", "20"))
+_BREAKER_MIN_CALLS    = int(os.getenv("OPENROUTER_BREAKER_MIN_CALLS", "10"))
+_BREAKER_ERROR_RATE   = float(os.getenv("OPENROUTER_BREAKER_ERROR_RATE", "0.5"))
+_BREAKER_OPEN_SECONDS = float(os.getenv("OPENROUTER_BREAKER_OPEN_SECONDS", "30"))
+_BREAKER_PROBES       = int(os.getenv("OPENROUTER_BREAKER_PROBES", "1"))
+
+# Ordered model pool: "model[@timeout_seconds],…"
+_MODELS_SPEC = os.getenv("OPENROUTER_MODELS", "").strip()
+
+# Hedged requests: ask the next model too once the current one is slower than its p95
+_HEDGE             = os.getenv("OPENROUTER_HEDGE", "0") == "1"
+_HEDGE_QUANTILE    = float(os.getenv("OPENROUTER_HEDGE_QUANTILE", "0.95"))
+_HEDGE_DELAY       = float(os.getenv("OPENROUTER_HEDGE_DELAY", "3"))      # seconds, until warmed up
+_HEDGE_MIN_SAMPLES = int(os.getenv("OPENROUTER_HEDGE_MIN_SAMPLES", "20"))
+
+# Error categories worth another attempt, those that count against the
+# breaker, and those another model cannot fix
+_RETRYABLE        = frozenset({"rate_limit", "server", "connect"})
+_BREAKER_FAILURES = frozenset({"rate_limit", "server", "connect", "timeout"})
+_NO_FALLBACK      = frozenset({"config", "auth"})
+
+# HTTP/2 support is optional — httpx needs the ``h2`` package for it, and
+# imports it only when the client is created
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+# ── Connection pool ─────────────────────────────────────────────────────────
+
+_client:  httpx.AsyncClient | None = None
+_opening: asyncio.Task[httpx.AsyncClient] | None = None     # client being created by start_client()
+_flights: SingleFlight[str] = SingleFlight()
+_stats: dict[str, int] = {"attempts": 0, "retries": 0, "fallbacks": 0, "hedged": 0, "hedge_wins": 0}
+
+
+def _new_client() -> httpx.AsyncClient:
+    client = httpx.AsyncClient(
+        http2=_HTTP2,
+        timeout=httpx.Timeout(_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=_MAX_CONNECTIONS,
+            max_keepalive_connections=_MAX_KEEPALIVE,
+            keepalive_expiry=_KEEPALIVE_EXPIRY,
+        ),
+    )
+    logger.info(
+        "OpenRouter client pool opened (http2=%s, max_connections=%d)",
+        _HTTP2, _MAX_CONNECTIONS,
+    )
+    return client
+
+
+def preload_client() -> None:
+    """
+    Create the shared client now, without an event loop.  For a process
+    that forks workers: each inherits the configured client with an empty
+    pool, instead of loading the CA bundle itself.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _new_client()
+
+
+def start_client() -> None:
+    """
+    Start creating the shared client on a worker thread and return at once
+    (loading the CA bundle takes ~100 ms).  ``open_client()`` waits for it.
+    """
+    global _opening
+    if (_client is None or _client.is_closed) and _opening is None:
+        _opening = asyncio.get_running_loop().create_task(asyncio.to_thread(_new_client))
+
+
+async def open_client() -> httpx.AsyncClient:
+    """
+    Create the shared ``httpx.AsyncClient`` if it does not exist yet and
+    return it.  Safe to call more than once, and concurrently.
+    """
+    global _client, _opening
+    if _client is None or _client.is_closed:
+        start_client()
+        opening = _opening
+        try:
+            client = await asyncio.shield(opening)
+        except Exception:
+            if _opening is opening and opening.done():
+                _opening = None             # let the next call try again
+            raise
+        if _opening is opening:
+            _client, _opening = client, None
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client and release its pooled connections."""
+    global _client
+    if _opening is not None:
+        await open_client()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("OpenRouter client pool closed")
+
+
+# ── Model pool ─────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class _Route:
+    """One model of the pool, with its own timeout, breaker and latencies."""
+
+    model:   str
+    timeout: float
+    breaker: CircuitBreaker
+    latency: Histogram
+
+
+def _parse_models(spec: str) -> list[_Route]:
+    """Build the pool from ``OPENROUTER_MODELS`` (or the single-model settings)."""
+    routes: list[_Route] = []
+    for item in filter(None, (part.strip() for part in (spec or _MODEL).split(","))):
+        model, _, timeout = item.partition("@")
+        routes.append(_Route(
+            model=model.strip(),
+            timeout=float(timeout) if timeout else float(_TIMEOUT),
+            breaker=CircuitBreaker(
+                window=_BREAKER_WINDOW,
+                min_calls=_BREAKER_MIN_CALLS,
+                error_rate=_BREAKER_ERROR_RATE,
+                open_seconds=_BREAKER_OPEN_SECONDS,
+                half_open_probes=_BREAKER_PROBES,
+            ),
+            latency=Histogram(),
+        ))
+    return routes
+
+
+_ROUTES: list[_Route] = _parse_models(_MODELS_SPEC)
+
+
+def _hedge_delay(route: _Route) -> float:
+    """How long to wait for ``route`` before also asking the next model."""
+    if route.latency.count < _HEDGE_MIN_SAMPLES:
+        return _HEDGE_DELAY
+    return route.latency.quantile(_HEDGE_QUANTILE) or _HEDGE_DELAY
 
 
 def _api_key() -> str:
@@ -51,7 +341,8 @@ def _api_key() -> str:
     if not key:
         raise OpenRouterError(
             "OPENROUTER_API_KEY is not set. "
-            "Copy backend/.env.example to backend/.env and add your key."
+            "Copy backend/.env.example to backend/.env and add your key.",
+            category="config",
         )
     return key
 
@@ -65,6 +356,139 @@ def _build_headers() -> dict[str, str]:
     }
 
 
+# ── Request bodies ─────────────────────────────────────────────────────────
+
+# The C string encoder behind json.dumps(ensure_ascii=False) — what httpx uses
+_json_string = json.encoder.encode_basestring
+
+
+def json_fragment(text: str) -> bytes:
+    """``text`` escaped as the inside of a JSON string literal (no quotes), UTF-8."""
+    return _json_string(text)[1:-1].encode("utf-8")
+
+
+@dataclass(frozen=True)
+class PromptParts:
+    """
+    A prompt split into the resume context and the per-request tail
+    (history and question).  ``context_json`` is ``json_fragment(context)``
+    when the caller keeps it precomputed; ``context_id`` is a short stable
+    id of ``context`` (its fingerprint) used in coalescing keys instead of
+    hashing the whole text.
+    """
+
+    context:      str
+    tail:         str
+    context_json: bytes | None = None
+    context_id:   str | None = None
+
+    @property
+    def text(self) -> str:
+        """The prompt as one string, as sent when there is no system message."""
+        return f"{self.context}\n\n{self.tail}" if self.context else self.tail
+
+
+def _as_parts(prompt: str | PromptParts) -> PromptParts:
+    return prompt if isinstance(prompt, PromptParts) else PromptParts("", prompt.strip())
+
+
+def _encode_payload(
+    prompt: PromptParts,
+    max_tokens: int,
+    temperature: float,
+    *,
+    model:  str  = _MODEL,
+    stream: bool = False,
+) -> bytes:
+    """
+    The chat-completions request body, byte-for-byte what ``httpx`` would
+    send for the equivalent dict, built without re-encoding the context.
+    """
+    tail = json_fragment(prompt.tail)
+    if not prompt.context:
+        messages: tuple[bytes, ...] = (b'[{"role":"user","content":"', tail, b'"}]')
+    else:
+        context = prompt.context_json if prompt.context_json is not None else json_fragment(prompt.context)
+        if _SYSTEM_MESSAGE:
+            messages = (
+                b'[{"role":"system","content":"', context,
+                b'"},{"role":"user","content":"', tail, b'"}]',
+            )
+        else:
+            messages = (b'[{"role":"user","content":"', context, b"\\n\\n", tail, b'"}]')
+    return b"".join((
+        b'{"model":', _json_string(model).encode("utf-8"),
+        b',"messages":', *messages,
+        b',"max_tokens":%d,"temperature":%s' % (max_tokens, json.dumps(temperature).encode("ascii")),
+        b',"stream":true}' if stream else b"}",
+    ))
+
+
+def _transport_error(exc: httpx.HTTPError, timeout: float = _TIMEOUT) -> OpenRouterError:
+    """Map an httpx-level failure to an OpenRouterError."""
+    if isinstance(exc, httpx.TimeoutException):
+        # Nothing was sent yet when connecting timed out, so that one is safe to retry
+        category = "connect" if isinstance(exc, (httpx.ConnectTimeout, httpx.PoolTimeout)) else "timeout"
+        return OpenRouterError(
+            f"OpenRouter request timed out after {timeout:g}s. "
+            "Try a shorter prompt or increase OPENROUTER_TIMEOUT.",
+            category=category,
+        )
+    if isinstance(exc, httpx.TransportError):
+        return OpenRouterError(
+            f"Could not reach OpenRouter API ({_API_URL}): {exc}", category="connect"
+        )
+    # Catch-all for any other httpx-level failure
+    return OpenRouterError(f"HTTP request failed: {exc}", category="http")
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _check_status(response: httpx.Response) -> None:
+    """
+    Raise OpenRouterError for any non-200 response.  For streamed responses
+    the body must have been read (``await response.aread()``) first.
+    """
+    if response.status_code == 401:
+        raise OpenRouterError(
+            "OpenRouter rejected the API key (401 Unauthorized). "
+            "Verify OPENROUTER_API_KEY in backend/.env.",
+            category="auth",
+        )
+    retry_after = _retry_after(response.headers.get("Retry-After"))
+    if response.status_code == 429:
+        raise OpenRouterError(
+            f"OpenRouter rate limit exceeded (429). "
+            f"Retry after: {response.headers.get('Retry-After', 'unknown')}s.",
+            category="rate_limit",
+            retry_after=retry_after,
+        )
+    if response.status_code >= 500:
+        raise OpenRouterError(
+            f"OpenRouter server error ({response.status_code}): {response.text[:300]}",
+            category="server",
+            retry_after=retry_after,
+        )
+    if response.status_code != 200:
+        raise OpenRouterError(
+            f"OpenRouter returned HTTP {response.status_code}: {response.text[:300]}",
+            category="http",
+        )
+
+
 def _parse_response(data: dict[str, Any]) -> str:
     """
     Extract the assistant message text from a chat-completions response.
@@ -82,26 +506,58 @@ def _parse_response(data: dict[str, Any]) -> str:
         err = data["error"]
         code = err.get("code", "unknown")
         msg  = err.get("message", str(err))
-        raise OpenRouterError(f"Model error [{code}]: {msg}")
+        raise OpenRouterError(f"Model error [{code}]: {msg}", category="model")
 
     try:
         choices = data["choices"]
         if not choices:
-            raise OpenRouterError("OpenRouter returned an empty choices list.")
+            raise OpenRouterError("OpenRouter returned an empty choices list.", category="parse")
 
         content: str = choices[0]["message"]["content"]
     except (KeyError, IndexError, TypeError) as exc:
         raise OpenRouterError(
-            f"Unexpected response structure from OpenRouter: {data}"
+            f"Unexpected response structure from OpenRouter: {data}", category="parse"
         ) from exc
 
     text = content.strip()
     if not text:
-        raise OpenRouterError("OpenRouter returned an empty reply.")
+        raise OpenRouterError("OpenRouter returned an empty reply.", category="parse")
 
     return text
 
 
+def _parse_stream_chunk(data: str) -> str:
+    """
+    Extract the text delta from one streamed ``data:`` payload.
+
+    Expected shape:
+        { "choices": [ { "delta": { "content": "..." } } ] }
+
+    Returns an empty string for chunks that carry no text (role headers,
+    the final ``finish_reason`` chunk, usage reports).
+
+    Raises:
+        OpenRouterError: If the chunk is not JSON or reports a model error.
+    """
+    try:
+        chunk: dict[str, Any] = json.loads(data)
+    except ValueError as exc:
+        raise OpenRouterError(
+            f"OpenRouter stream chunk is not valid JSON: {data[:300]}", category="parse"
+        ) from exc
+
+    if "error" in chunk:
+        err = chunk["error"]
+        code = err.get("code", "unknown")
+        msg  = err.get("message", str(err))
+        raise OpenRouterError(f"Model error [{code}]: {msg}", category="model")
+
+    try:
+        return chunk["choices"][0].get("delta", {}).get("content") or ""
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return ""
+
+
 # ── Public API ─────────────────────────────────────────────────────────────
 
 class OpenRouterError(RuntimeError):
@@ -112,23 +568,49 @@ class OpenRouterError(RuntimeError):
       - Non-200 HTTP status
       - Unexpected or empty response
       - Model-level errors in the response body
+      - The circuit breaker being open
+
+    Attributes:
+        category:    ``"config"``, ``"auth"``, ``"timeout"``, ``"connect"``,
+                     ``"rate_limit"``, ``"server"``, ``"http"``, ``"parse"``,
+                     ``"model"``, ``"circuit_open"`` or ``"internal"``.
+        retry_after: Seconds the upstream (or the breaker) asked to wait,
+                     if it said.
     """
 
+    def __init__(
+        self,
+        message: str,
+        *,
+        category:    str = "internal",
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.category    = category
+        self.retry_after = retry_after
 
-def ask_openrouter(
-    prompt: str,
+
+async def ask_openrouter(
+    prompt: str | PromptParts,
     *,
-    max_tokens:  int   = _MAX_TOKENS,
-    temperature: float = _TEMPERATURE,
+    max_tokens:  int   = MAX_TOKENS,
+    temperature: float = TEMPERATURE,
 ) -> str:
     """
     Send a plain-text prompt to OpenRouter and return the generated reply.
 
     The prompt is sent as a single ``user`` message so that it carries the
-    full system context assembled by ``context_builder.build_prompt()``.
+    full system context assembled by ``context_builder.build_prompt()`` —
+    or, with ``OPENROUTER_SYSTEM_MESSAGE=1``, as a ``system`` message with
+    the context and a ``user`` message with the rest (see "Request bodies").
+    Identical concurrent calls share one upstream request (see "Request
+    coalescing" above); transient failures are retried and then fall back
+    to the next model of the pool, optionally hedged (see "Model pool,
+    fallback and hedging").
 
     Args:
-        prompt:      The complete prompt string (system context + user question).
+        prompt:      The complete prompt string (system context + user question),
+                     or the same split into ``PromptParts``.
         max_tokens:  Maximum reply length in tokens (default: 512, overridable
                      via ``OPENROUTER_MAX_TOKENS`` env var).
         temperature: Sampling temperature — 0 is deterministic, 1 is creative
@@ -140,76 +622,405 @@ def ask_openrouter(
     Raises:
         OpenRouterError: For any failure — missing key, network issue,
                          bad status code, or malformed response.
+        Overloaded:      No upstream slot freed up in time (see "Admission").
 
     Example::
 
         from app.services.openrouter_service import ask_openrouter, OpenRouterError
 
         try:
-            reply = ask_openrouter(prompt)
+            reply = await ask_openrouter(prompt)
         except OpenRouterError as exc:
             # surface to caller as 502
             ...
     """
-    payload: dict[str, Any] = {
-        "model":       _MODEL,
-        "messages":    [{"role": "user", "content": prompt.strip()}],
-        "max_tokens":  max_tokens,
-        "temperature": temperature,
-    }
+    prompt = _as_parts(prompt)
+    with tracing.span("ask_openrouter"):
+        if not _COALESCE:
+            return await _admitted(prompt, max_tokens, temperature)
 
-    logger.debug("POST %s  model=%s  prompt_len=%d", _API_URL, _MODEL, len(prompt))
+        context = prompt.context if prompt.context_id is None else f"#{prompt.context_id}"
+        key = hashlib.sha256(
+            f"{max_tokens}\x00{temperature}\x00{context}\x00{prompt.tail}".encode("utf-8")
+        ).hexdigest()
+        try:
+            return await _flights.do(key, lambda: _admitted(prompt, max_tokens, temperature))
+        except (OpenRouterError, Overloaded):
+            raise
+        except Exception as exc:  # shared with every waiter — keep the typed contract
+            logger.exception("Unexpected error during OpenRouter call")
+            raise OpenRouterError(
+                f"Unexpected error calling OpenRouter: {exc}", category="internal"
+            ) from exc
 
-    # ── Network call with explicit timeout ────────────────────────────────
-    try:
-        response = requests.post(
-            _API_URL,
-            headers=_build_headers(),
-            json=payload,
-            timeout=_TIMEOUT,
-        )
-    except requests.exceptions.Timeout:
-        raise OpenRouterError(
-            f"OpenRouter request timed out after {_TIMEOUT}s. "
-            "Try a shorter prompt or increase OPENROUTER_TIMEOUT."
-        )
-    except requests.exceptions.ConnectionError as exc:
-        raise OpenRouterError(
-            f"Could not reach OpenRouter API ({_API_URL}): {exc}"
-        ) from exc
-    except requests.exceptions.RequestException as exc:
-        # Catch-all for any other requests-level failure
-        raise OpenRouterError(f"HTTP request failed: {exc}") from exc
 
-    # ── HTTP status check ────────────────────────────────────────────────
-    if response.status_code == 401:
-        raise OpenRouterError(
-            "OpenRouter rejected the API key (401 Unauthorized). "
-            "Verify OPENROUTER_API_KEY in backend/.env."
-        )
-    if response.status_code == 429:
-        retry_after = response.headers.get("Retry-After", "unknown")
-        raise OpenRouterError(
-            f"OpenRouter rate limit exceeded (429). "
-            f"Retry after: {retry_after}s."
-        )
-    if response.status_code >= 500:
-        raise OpenRouterError(
-            f"OpenRouter server error ({response.status_code}): {response.text[:300]}"
-        )
-    if response.status_code != 200:
-        raise OpenRouterError(
-            f"OpenRouter returned HTTP {response.status_code}: {response.text[:300]}"
+# ── Connection timing ──────────────────────────────────────────────────────
+
+# httpcore trace event that ends connection setup (TLS handshake for https)
+_CONNECT_DONE = (
+    "connection.start_tls.complete" if _API_URL.startswith("https")
+    else "connection.connect_tcp.complete"
+)
+
+
+class _ConnectTrace:
+    """httpx ``trace`` hook that times the setup of new pooled connections."""
+
+    __slots__ = ("_started",)
+
+    async def __call__(self, event: str, info: dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.started":
+            self._started = time.perf_counter()
+        elif event == _CONNECT_DONE:
+            metrics.observe("upstream_connect", time.perf_counter() - self._started)
+
+
+def _trace_extensions() -> dict[str, Any] | None:
+    return {"trace": _ConnectTrace()} if metrics.ENABLED else None
+
+
+# ── Retries and circuit breaker ────────────────────────────────────────────
+
+def _admit(route: _Route) -> Permit:
+    """Return a breaker permit for one attempt, or raise if the circuit is open."""
+    permit = route.breaker.allow()
+    if permit is None:
+        wait = route.breaker.retry_in()
+        exc = OpenRouterError(
+            f"OpenRouter is temporarily unavailable for {route.model} "
+            f"(circuit open); retry in {wait:.0f}s.",
+            category="circuit_open",
+            retry_after=wait,
         )
+        metrics.count_error(exc.category)
+        raise exc
+    _stats["attempts"] += 1
+    return permit
+
+
+def _retry_delay(exc: OpenRouterError, attempt: int) -> float | None:
+    """
+    Seconds to wait before retrying after ``exc`` on attempt ``attempt``
+    (0-based), or None if the error should be returned to the caller.
+    """
+    if exc.category not in _RETRYABLE or attempt >= _RETRIES:
+        return None
+    if exc.retry_after is not None:
+        delay = exc.retry_after
+    else:
+        delay = random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_BASE * 2 ** attempt))
+    if delay > _RETRY_MAX_DELAY:
+        return None
+    _stats["retries"] += 1
+    logger.warning(
+        "OpenRouter %s error, retry %d/%d in %.2fs: %s",
+        exc.category, attempt + 1, _RETRIES, delay, exc,
+    )
+    return delay
+
+
+def _can_fall_back(exc: BaseException) -> bool:
+    return isinstance(exc, OpenRouterError) and exc.category not in _NO_FALLBACK
+
+
+# ── Non-streaming calls ────────────────────────────────────────────────────
+
+async def _admitted(prompt: PromptParts, max_tokens: int, temperature: float) -> str:
+    """``_complete`` holding an upstream slot (see "Admission")."""
+    async with upstream.slot():
+        return await _complete(prompt, max_tokens, temperature)
+
+
+async def _complete(prompt: PromptParts, max_tokens: int, temperature: float) -> str:
+    """
+    Ask the models of the pool in order until one answers.  The next model
+    is started when the current one fails or — with hedging on — when it
+    is slower than its hedge delay; the first reply wins.
+    """
+    routes    = iter(_ROUTES)
+    running:  dict[asyncio.Task[str], _Route] = {}
+    hedges:   set[asyncio.Task[str]] = set()     # started by the hedge timer
+    last:     _Route | None = None
+    error:    BaseException | None = None
+    exhausted = False                           # every model has been started
+
+    def launch() -> asyncio.Task[str] | None:
+        nonlocal last, exhausted
+        route = next(routes, None)
+        if route is None:
+            exhausted = True
+            return None
+        if last is not None:
+            logger.warning("Trying %s after %s", route.model, last.model)
+        task = asyncio.ensure_future(_complete_on(route, prompt, max_tokens, temperature))
+        running[task] = route
+        last = route
+        return task
+
+    launch()
+    try:
+        while running:
+            hedge = _HEDGE and len(running) == 1 and not exhausted
+            done, _ = await asyncio.wait(
+                running, timeout=_hedge_delay(last) if hedge else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                task = launch()
+                if task is not None:
+                    hedges.add(task)
+                    _stats["hedged"] += 1
+                continue
+
+            for task in done:
+                route = running.pop(task)
+                exc = task.exception()
+                if exc is None:
+                    if task in hedges:
+                        _stats["hedge_wins"] += 1
+                    return task.result()
+                if not _can_fall_back(exc):
+                    raise exc
+                error = exc
+            if not running and launch() is not None:
+                _stats["fallbacks"] += 1
+        assert error is not None
+        raise error
+    finally:
+        for task in running:
+            task.cancel()
+
+
+async def _complete_on(route: _Route, prompt: PromptParts, max_tokens: int, temperature: float) -> str:
+    """A non-streaming completion on one model, retried and guarded by its breaker."""
+    for attempt in itertools.count():
+        permit = _admit(route)
+        try:
+            with tracing.span("openrouter_attempt", model=route.model, attempt=attempt):
+                text = await _complete_once(route, prompt, max_tokens, temperature)
+        except OpenRouterError as exc:
+            metrics.count_error(exc.category)
+            route.breaker.record(permit, exc.category not in _BREAKER_FAILURES)
+            delay = _retry_delay(exc, attempt)
+            if delay is None:
+                raise
+            with tracing.span("retry_wait"):
+                await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            route.breaker.release(permit)
+            raise
+        route.breaker.record(permit, True)
+        return text
+
+
+async def _complete_once(route: _Route, prompt: PromptParts, max_tokens: int, temperature: float) -> str:
+    """One non-streaming chat-completions round trip."""
+    body = _encode_payload(prompt, max_tokens, temperature, model=route.model)
+
+    logger.debug("POST %s  model=%s  body_bytes=%d", _API_URL, route.model, len(body))
+
+    headers = _build_headers()
+    client  = await open_client()
+    started = time.perf_counter()
+
+    # ── Network call over the pooled client ──────────────────────────────
+    metrics.in_flight(1)
+    try:
+        async with client.stream(
+            "POST", _API_URL, headers=headers, content=body,
+            timeout=route.timeout, extensions=_trace_extensions(),
+        ) as response:
+            ttfb = time.perf_counter() - started
+            metrics.observe("upstream_ttfb", ttfb)
+            tracing.annotate(status=response.status_code, ttfb_ms=round(ttfb * 1000, 3))
+            await response.aread()
+    except httpx.HTTPError as exc:
+        raise _transport_error(exc, route.timeout) from exc
+    finally:
+        metrics.in_flight(-1)
+    elapsed = time.perf_counter() - started
+    metrics.observe("upstream_total", elapsed)
+
+    _check_status(response)
 
     # ── Parse and validate the response body ─────────────────────────────
+    parse_started = time.perf_counter()
     try:
         data: dict[str, Any] = response.json()
     except ValueError as exc:
         raise OpenRouterError(
-            f"OpenRouter response is not valid JSON: {response.text[:300]}"
+            f"OpenRouter response is not valid JSON: {response.text[:300]}", category="parse"
         ) from exc
 
     text = _parse_response(data)
+    metrics.observe("parse", time.perf_counter() - parse_started)
+    route.latency.observe(elapsed)
     logger.debug("OpenRouter reply length: %d chars", len(text))
     return text
+
+
+# ── Streaming calls ────────────────────────────────────────────────────────
+
+async def stream_openrouter(
+    prompt: str | PromptParts,
+    *,
+    max_tokens:  int   = MAX_TOKENS,
+    temperature: float = TEMPERATURE,
+) -> AsyncIterator[str]:
+    """
+    Stream a reply from OpenRouter token by token.
+
+    Sends the same payload as ``ask_openrouter`` with ``"stream": true`` and
+    parses the upstream Server-Sent Events incrementally, yielding each text
+    delta as soon as it arrives.  Keep-alive comments (``: OPENROUTER
+    PROCESSING``) are skipped and ``data: [DONE]`` ends the stream.
+
+    Leading whitespace of the reply is dropped so that the concatenated
+    tokens match what ``ask_openrouter`` would have returned.
+
+    Failed attempts are retried, and fall back to the next model of the
+    pool, like ``ask_openrouter``'s — but only until the first token has
+    been yielded.  Streams are never hedged.
+
+    The upstream slot (see "Admission") is taken before the first token
+    and held until the stream is exhausted or closed — close an abandoned
+    stream with ``aclose()`` to hand it on.
+
+    Raises:
+        OpenRouterError: For the same failures as ``ask_openrouter``, either
+                         before the first token or mid-stream.
+        Overloaded:      No upstream slot freed up in time.
+
+    Example::
+
+        async for token in stream_openrouter(prompt):
+            print(token, end="", flush=True)
+    """
+    prompt = _as_parts(prompt)
+    async with upstream.slot():
+        for index, route in enumerate(_ROUTES):
+            started = False
+            try:
+                async with aclosing(_stream_on(route, prompt, max_tokens, temperature)) as tokens:
+                    async for token in tokens:
+                        started = True
+                        yield token
+                return
+            except OpenRouterError as exc:
+                if started or not _can_fall_back(exc) or index == len(_ROUTES) - 1:
+                    raise
+                _stats["fallbacks"] += 1
+                logger.warning("Trying %s after %s: %s", _ROUTES[index + 1].model, route.model, exc)
+
+
+async def _stream_on(
+    route: _Route, prompt: PromptParts, max_tokens: int, temperature: float
+) -> AsyncIterator[str]:
+    """A streamed completion on one model, retried before its first token."""
+    body = _encode_payload(prompt, max_tokens, temperature, model=route.model, stream=True)
+
+    logger.debug("POST %s (stream)  model=%s  body_bytes=%d", _API_URL, route.model, len(body))
+
+    for attempt in itertools.count():
+        permit  = _admit(route)
+        started = False
+        began   = time.perf_counter()
+        try:
+            async with aclosing(_stream_once(body, route.timeout)) as tokens:
+                async for token in tokens:
+                    if not started:
+                        started = True
+                        # A span cannot stay open across yields: the attempt is
+                        # traced up to its first token
+                        tracing.record("openrouter_attempt", began, model=route.model, attempt=attempt)
+                    yield token
+        except OpenRouterError as exc:
+            metrics.count_error(exc.category)
+            route.breaker.record(permit, exc.category not in _BREAKER_FAILURES)
+            if not started:
+                tracing.record("openrouter_attempt", began, model=route.model, attempt=attempt,
+                               error=exc.category)
+            # Tokens already sent cannot be taken back — only retry before the first
+            delay = None if started else _retry_delay(exc, attempt)
+            if delay is None:
+                raise
+            with tracing.span("retry_wait"):
+                await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            route.breaker.release(permit)
+            raise
+        route.breaker.record(permit, True)
+        return
+
+
+async def _stream_once(body: bytes, timeout: float) -> AsyncIterator[str]:
+    """One streamed chat-completions round trip; yields reply tokens."""
+    headers = _build_headers()
+    client  = await open_client()
+    started = False
+    began   = time.perf_counter()
+
+    metrics.in_flight(1)
+    try:
+        async with client.stream(
+            "POST", _API_URL, headers=headers, content=body,
+            timeout=timeout, extensions=_trace_extensions(),
+        ) as response:
+            metrics.observe("upstream_ttfb", time.perf_counter() - began)
+            if response.status_code != 200:
+                await response.aread()
+                _check_status(response)
+
+            async for line in response.aiter_lines():
+                # Blank separators and ": comment" keep-alives carry no data
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                token = _parse_stream_chunk(data)
+                if not started:
+                    token = token.lstrip()
+                if token:
+                    if not started:
+                        metrics.observe("upstream_first_token", time.perf_counter() - began)
+                    started = True
+                    yield token
+        metrics.observe("upstream_total", time.perf_counter() - began)
+    except httpx.HTTPError as exc:
+        raise _transport_error(exc, timeout) from exc
+    finally:
+        metrics.in_flight(-1)
+
+    if not started:
+        raise OpenRouterError("OpenRouter returned an empty reply.", category="parse")
+
+
+def models() -> list[str]:
+    """The model pool (``OPENROUTER_MODELS`` or ``OPENROUTER_MODEL``), in fallback order."""
+    return [route.model for route in _ROUTES]
+
+
+def breaker_states() -> dict[str, str]:
+    """The circuit breaker state of every model of the pool."""
+    return {route.model: route.breaker.state for route in _ROUTES}
+
+
+def stats() -> dict[str, Any]:
+    """Client counters for ``/api/admin/status``."""
+    return {
+        **_stats,
+        "hedging":    {"enabled": _HEDGE, "quantile": _HEDGE_QUANTILE},
+        "coalescing": {"enabled": _COALESCE, **_flights.stats()},
+        "models": {
+            route.model: {
+                "timeout":       route.timeout,
+                "hedge_delay_s": round(_hedge_delay(route), 3),
+                "breaker":       route.breaker.stats(),
+                "latency":       route.latency.snapshot(),
+            }
+            for route in _ROUTES
+        },
+    }
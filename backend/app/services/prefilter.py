@@ -0,0 +1,518 @@
+"""
+backend/app/services/prefilter.py
+
+Local checks that answer a chat message before a prompt is built, so the
+messages that do not need the model never reach OpenRouter.
+
+Stages
+──────
+  ``check()`` runs these in order and stops at the first that decides:
+
+    noise      no letters or digits, or keyboard mashing    → ask for a question
+    greeting   the whole message is a hello / thanks / bye  → canned reply
+    injection  one compiled alternation of orders to the
+               assistant ("ignore previous instructions",
+               "reveal your system prompt", persona switches,
+               chat-template tokens, …)                       → canned refusal
+    spam       several links, long character runs, a word
+               repeated over and over, advertising phrases   → canned refusal
+    duplicate  near-identical to a message this session
+               already asked                                  → the answer it got
+    canned     asks for one whole resume section (skills,
+               projects, certifications, contact, about) and
+               nothing else                                   → rendered from the resume
+    retrieval  names one project and asks nothing beyond it  → that project's entry
+
+  The last two only open a conversation: with prior turns, "the projects"
+  may mean the ones just discussed, so the message goes to the model.
+  Injection phrasings must be addressed to the assistant — an imperative
+  opening a clause, "your instructions", a persona switch — so a question
+  that merely mentions prompts or instructions is not refused.
+
+  Anything else — most real questions — returns ``None`` and takes the
+  normal path.  The classifier errs on that side: one unexplained content
+  word, two sections at once, or a word pointing back at the conversation
+  ("it", "those", "that one") is enough to pass the message on.
+
+Duplicates
+──────────
+  Each answered message is kept per session (the last ``PREFILTER_RECENT``,
+  for the ``PREFILTER_SESSIONS`` most recent sessions) as the set of
+  Rabin–Karp rolling hashes of its normalised 5-character shingles.  A new
+  message whose set has a Jaccard similarity of at least
+  ``PREFILTER_DUPLICATE_SIMILARITY`` with a remembered one gets that
+  message's answer back, so a resent or retyped question costs no second
+  call.  Messages whose lengths are too far apart to reach the threshold
+  are skipped before anything is hashed.  Answers produced for an older
+  resume context are not reused.
+
+Canned answers are rendered once per resume context fingerprint.  All of
+it is plain string work: 5–20 µs for a typical message, about 0.1 ms at
+the 1000-character limit and 0.25 ms when that message is also compared
+against a full session (``benchmarks/bench_prefilter.py``).
+
+Public API
+──────────
+  Verdict(decision, answer)
+  check(message, session_id, history) -> Verdict | None
+  remember(session_id, message, answer)   – after a normally answered message
+  stats() -> dict                         – decisions, hit rate, check time
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any
+
+from app.services import context_builder, metrics, tracing
+from app.services.answer_cache import normalise
+from app.services.histogram import Histogram
+from app.services.retrieval import tokenize
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_ENABLED        = os.getenv("PREFILTER_ENABLED", "1") != "0"
+_CANNED         = os.getenv("PREFILTER_CANNED", "1") != "0"
+_SIMILARITY     = float(os.getenv("PREFILTER_DUPLICATE_SIMILARITY", "0.9"))   # 0 = off
+_MIN_CHARS      = int(os.getenv("PREFILTER_DUPLICATE_MIN_CHARS", "16"))
+_RECENT         = int(os.getenv("PREFILTER_RECENT", "8"))                   # messages per session
+_SESSIONS       = int(os.getenv("PREFILTER_SESSIONS", "1000"))
+
+DECISIONS = ("noise", "greeting", "injection", "spam", "duplicate", "canned", "retrieval")
+
+
+@dataclass(frozen=True)
+class Verdict:
+    decision: str     # one of DECISIONS
+    answer:   str
+
+
+# ── Patterns ───────────────────────────────────────────────────────────────
+
+# Every branch of _INJECTION_RE contains one of these (lower-cased).  Python's
+# re tries each alternative at every position, so a substring scan first
+# keeps ordinary messages from paying for the full pattern.
+_INJECTION_HINTS = (
+    "instruction", "prompt", "rule", "guideline", "direction", "constraint", "you are", "pretend",
+    "from now on", "role", "jailb", "developer mode", "anything now", "dan", "im_", "endoftext", "inst]",
+    "sys>>", "system", "assistant",
+)
+# An order to the assistant: the verb opens the message or a clause, or
+# follows "please", "now", "you must", "can you", …  "Can he ignore previous
+# instructions when refactoring?" has a subject of its own and does not match.
+_IMPERATIVE = (
+    r"(?:^|[.?!;:,]\s*|\b(?:please|now|just|also|then|you\s+(?:must|should|will|can|may|need\s+to)"
+    r"|(?:can|could|would|will)\s+you)\s+)"
+)
+_INJECTION_RE = re.compile(
+    # "ignore all previous instructions", "forget your rules", …
+    _IMPERATIVE + r"(?:ignore|disregard|forget|override|bypass|skip)\b[^.?!\n]{0,40}?"
+    r"\b(?:previous|prior|above|earlier|preceding|all|any|your|the|system|these|those)\b[^.?!\n]{0,20}?"
+    r"\b(?:instructions?|prompts?|rules|guidelines|directions|directives|constraints)\b"
+    # "reveal your system prompt", "print the hidden prompt", "what are your instructions"
+    r"|" + _IMPERATIVE + r"(?:reveal|show|print|repeat|output|display|leak|dump|give|tell)(?:\s+(?:me|us))?"
+    r"\s+(?:your\s+(?:\w+\s+)?|the\s+(?:hidden|initial|original|secret|internal)\s+)"
+    r"(?:prompts?|instructions?|rules|guidelines)\b"
+    r"|\bwhat\s+(?:is|are|were)\s+your\s+(?:system\s+prompt|instructions|rules|guidelines)\b"
+    # persona switches
+    r"|\byou\s+are\s+(?:now|no\s+longer)\b|" + _IMPERATIVE + r"pretend\s+(?:to\s+be|you\s*(?:'re|are))\b"
+    r"|\bfrom\s+now\s+on,?\s+you\b|\blet'?s\s+role-?play\b|\brole-?play\s+as\b"
+    r"|\b(?:you\s+are|you're)\s+(?:now\s+)?jailbr[eo]a?k(?:en)?\b|\bjailbreak\s+mode\b"
+    r"|" + _IMPERATIVE + r"(?:enable|enter|activate|switch\s+to)\s+developer\s+mode\b"
+    r"|\bdo\s+anything\s+now\b|\b(?:act|acting|respond|answer|reply|be)\s+as\s+DAN\b|\bDAN\s+mode\b"
+    # chat-template and role markers
+    r"|<\|?\s*(?:im_start|im_end|system|endoftext)\s*\|?>|\[/?INST\]|<<\s*/?SYS\s*>>"
+    r"|^\s*(?:system|assistant)\s*:",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_URL_RE    = re.compile(r"https?://|\bwww\.\S", re.IGNORECASE)
+_MAX_URLS  = 1         # one pasted link may be a question about it; more is link dropping
+_RUN_RE    = re.compile(r"(\S)\1\1\1\1\1\1\1\1\1")       # aaaaaaaaaa, !!!!!!!!!!
+_MAX_REPEATS = 4       # the same word five times in a row
+# Matched as substrings of the normalised message
+_SPAM_PHRASES = (
+    "click here", "buy now", "free money", "casino", "viagra", "backlink", "seo services",
+    "crypto airdrop", "crypto giveaway", "crypto signal", "make money fast", "make money online",
+    "limited offer",
+)
+
+# Matched against the normalised message
+_NOISE_RE    = re.compile(r"(?:test(?:ing)?|asdf\w*|qwerty\w*|hmm+|lol|xd|k)")
+_HELLO_RE    = re.compile(
+    r"(?:hi+|hello+|hey+|hiya|yo|howdy|greetings|good (?:morning|afternoon|evening|day))"
+    r"(?: there)?(?: bot| assistant)?"
+)
+_THANKS_RE   = re.compile(
+    r"(?:(?:ok(?:ay)?|great|cool|nice|awesome|perfect|got it) )?"
+    r"(?:thanks?(?: a lot| so much)?|thank you(?: so much| very much)?|thx|ty|cheers|ok(?:ay)?|great|cool"
+    r"|nice|awesome|perfect|got it|bye|goodbye|see you|see ya)"
+)
+_ALNUM_RE    = re.compile(r"[^\W_]")
+
+
+# ── Resume-section classifier ──────────────────────────────────────────────
+
+def _words(text: str) -> frozenset[str]:
+    return frozenset(tokenize(text))
+
+
+_INTENTS: dict[str, frozenset[str]] = {
+    "projects":       _words("project projects portfolio built build builds made make created create "
+                             "developed develop work"),
+    "skills":         _words("skill skills stack technologies technology tech languages language "
+                             "programming expertise strengths toolset tools"),
+    "certifications": _words("certification certifications certificate certificates certified cert certs "
+                             "credential credentials qualification qualifications courses course"),
+    "contact":        _words("contact email e-mail mail reach linkedin github twitter socials social "
+                             "hire touch connect"),
+    "about":          _words("background bio biography profile introduce introduction yourself"),
+}
+
+# Words that add nothing to a section question ("list his main skills")
+_FILLERS = _words(
+    "list main key all top technical core primary notable favourite favorite best some kind kinds "
+    "sort various different does hold holds held have has had worked done give show name names share "
+    "s t him get know detail details overview summary summarise summarize brief briefly "
+    "quick quickly short please currently current recent ever whats where"
+)
+
+# …and to a question about one project ("what tech stack does ChartGenie use")
+_PROJECT_WORDS = _words(
+    "project projects explain describe description overview tell detail details purpose goal idea "
+    "work works working built build made make tech stack technology technologies use used uses feature "
+    "features link links github demo live code repo repository source"
+)
+
+# Words that point back at the conversation; the section answer may be wrong there
+_REFERENCES = frozenset(
+    "it its that this those these they them their one ones same above earlier previous last "
+    "else other another again".split()
+)
+
+# Title words too generic to name a project on their own
+_GENERIC_TITLE_WORDS = frozenset("ai app application project system data web".split())
+
+
+@dataclass(frozen=True)
+class _Project:
+    key:    frozenset[str]      # distinctive title tokens
+    needed: int                 # how many of them name the project
+    words:  frozenset[str]      # every title token
+    answer: str
+
+
+@dataclass(frozen=True)
+class _Canned:
+    fingerprint: str
+    name:        str
+    first_name:  str
+    name_words:  frozenset[str]
+    sections:    dict[str, str]        # intent → answer
+    projects:    tuple[_Project, ...]
+
+
+def _sentence(text: str) -> str:
+    text = str(text).strip()
+    return text if not text or text[-1] in ".!?" else text + "."
+
+
+def _join(items: list[str]) -> str:
+    """'a', 'a and b', 'a, b and c'."""
+    return items[0] if len(items) == 1 else ", ".join(items[:-1]) + " and " + items[-1]
+
+
+def _render_sections(data: dict[str, Any], name: str, first: str) -> dict[str, str]:
+    owner    = data.get("owner", {})
+    sections: dict[str, str] = {}
+
+    about = [f"{name} — {owner['title']}." if owner.get("title") else "", owner.get("summary", "")]
+    sections["about"] = " ".join(part for part in about if part).strip() or (
+        f"This assistant answers questions about {name}'s projects, skills and certifications."
+    )
+
+    skills = data.get("skills", [])
+    if skills:
+        lines = [f"{first}'s skills span {len(skills)} areas."]
+        lines.extend(f"{cat['category']}: {', '.join(cat['skills'])}." for cat in skills)
+        sections["skills"] = "\n".join(lines)
+
+    projects = data.get("projects", [])
+    if projects:
+        lines = [f"{first} has built {len(projects)} projects."]
+        for p in projects:
+            lines.append(f"{p.get('title', 'Untitled')} ({p.get('year', 'N/A')}, {p.get('category', '')}): "
+                         f"{_sentence(p.get('description', ''))}")
+        lines.append("Ask about any of them for the details.")
+        sections["projects"] = "\n".join(lines)
+
+    certifications = data.get("certifications", [])
+    if certifications:
+        lines = [f"{first} holds {len(certifications)} certifications."]
+        for cert in certifications:
+            lines.append(f"{cert.get('name', '')} from {cert.get('issuer', '')} ({cert.get('year', '')}): "
+                         f"{_sentence(cert.get('description', ''))}")
+        sections["certifications"] = "\n".join(lines)
+
+    channels = [
+        f"{label} at {owner[field]}"
+        for field, label in (("email", "by email"), ("linkedin", "on LinkedIn"),
+                             ("github", "on GitHub"), ("twitter", "on X"))
+        if owner.get(field)
+    ]
+    if channels:
+        sections["contact"] = f"You can reach {name} {_join(channels)}."
+    return sections
+
+
+def _render_project(p: dict[str, Any]) -> str:
+    parts = [f"{p.get('title', 'Untitled')} ({p.get('year', 'N/A')}, {p.get('category', '')}).",
+             _sentence(p.get("description", ""))]
+    if p.get("longDescription"):
+        parts.append(_sentence(p["longDescription"]))
+    if p.get("technologies"):
+        parts.append(f"It is built with {_join(list(p['technologies']))}.")
+    if p.get("features"):
+        parts.append(f"Key features: {'; '.join(p['features'])}.")
+    if p.get("githubUrl"):
+        parts.append(f"Code: {p['githubUrl']}")
+    if p.get("liveUrl"):
+        parts.append(f"Live demo: {p['liveUrl']}")
+    return " ".join(part for part in parts if part)
+
+
+def _build_canned(fingerprint: str, data: dict[str, Any]) -> _Canned:
+    name  = data.get("owner", {}).get("name", "the portfolio owner")
+    first = name.split()[0]
+    projects = []
+    for p in data.get("projects", []):
+        key   = _words(p.get("title", ""))
+        words = key | {part for word in key for part in word.split("-")}     # "room-wise" or "room wise"
+        key   = key - _GENERIC_TITLE_WORDS or key
+        if key:
+            projects.append(_Project(key, (len(key) + 1) // 2, words, _render_project(p)))
+    return _Canned(
+        fingerprint=fingerprint,
+        name=name,
+        first_name=first,
+        name_words=_words(name),
+        sections=_render_sections(data, name, first),
+        projects=tuple(projects),
+    )
+
+
+_canned: _Canned | None = None
+
+
+def _current_canned() -> _Canned:
+    global _canned
+    fingerprint, data = context_builder.resume_snapshot()
+    canned = _canned
+    if canned is None or canned.fingerprint != fingerprint:
+        canned = _canned = _build_canned(fingerprint, data)
+    return canned
+
+
+def _classify(normalised: str, message: str, canned: _Canned) -> Verdict | None:
+    """A section or single-project answer, when that is all the message asks for."""
+    if _REFERENCES.intersection(normalised.split()):
+        return None
+    tokens = set(tokenize(message))
+    if not tokens:
+        return None
+    ignorable = _FILLERS | canned.name_words
+
+    named = [p for p in canned.projects if len(p.key & tokens) >= p.needed]
+    if named:
+        if len(named) > 1:
+            return None
+        project = named[0]
+        rest = {t for t in tokens - project.words - _PROJECT_WORDS - ignorable if len(t) > 1}
+        return None if rest else Verdict("retrieval", project.answer)
+
+    intents = [intent for intent, words in _INTENTS.items() if tokens & words]
+    if len(intents) > 1:
+        return None
+    if intents:
+        intent = intents[0]
+        rest   = tokens - _INTENTS[intent] - ignorable
+    else:
+        intent = "about"                        # "who is Hanzala?" tokenizes to the name alone
+        rest   = tokens - canned.name_words
+        if rest == tokens:
+            return None
+    rest = {t for t in rest if len(t) > 1}
+    answer = canned.sections.get(intent)
+    return Verdict("canned", answer) if answer and not rest else None
+
+
+# ── Near-duplicate detection ───────────────────────────────────────────────
+
+_SHINGLE = 5
+_BASE    = 257
+_MOD     = (1 << 61) - 1
+_TOP     = pow(_BASE, _SHINGLE - 1, _MOD)       # weight of the character leaving the window
+
+
+def _shingles(normalised: str) -> frozenset[int]:
+    """Rabin–Karp hashes of every ``_SHINGLE``-character window."""
+    data = normalised.encode()
+    if len(data) <= _SHINGLE:
+        return frozenset((hash(data),))
+    h = 0
+    for byte in data[:_SHINGLE]:
+        h = (h * _BASE + byte) % _MOD
+    hashes = {h}
+    add = hashes.add
+    for leaving, entering in zip(data, data[_SHINGLE:]):
+        h = ((h - leaving * _TOP) * _BASE + entering) % _MOD
+        add(h)
+    return frozenset(hashes)
+
+
+@dataclass(frozen=True)
+class _Seen:
+    length:      int                # of the normalised message
+    shingles:    frozenset[int]
+    answer:      str
+    fingerprint: str
+
+
+# Used from the event loop only, like the rest of the request path
+_recent: OrderedDict[str, deque[_Seen]] = OrderedDict()
+
+
+def _duplicate(normalised: str, session_id: str | None, fingerprint: str) -> str | None:
+    seen = _recent.get(session_id) if session_id else None
+    if not seen:
+        return None
+    # Near-duplicates have near-equal lengths; skip hashing when none is close
+    length     = len(normalised)
+    candidates = [e for e in seen if min(length, e.length) >= _SIMILARITY * max(length, e.length)]
+    if not candidates:
+        return None
+    shingles = _shingles(normalised)
+    size     = len(shingles)
+    for entry in reversed(candidates):
+        other = len(entry.shingles)
+        if min(size, other) < _SIMILARITY * max(size, other):     # Jaccard ≤ min / max
+            continue
+        common = len(shingles & entry.shingles)
+        if common >= _SIMILARITY * (size + other - common) and entry.fingerprint == fingerprint:
+            return entry.answer
+    return None
+
+
+def remember(session_id: str, message: str, answer: str) -> None:
+    """Keep ``message`` so a near-identical resend in this session is answered with ``answer``."""
+    if not _ENABLED or _SIMILARITY <= 0 or not answer:
+        return
+    normalised = normalise(message)
+    if len(normalised) < _MIN_CHARS:
+        return
+    seen = _recent.get(session_id)
+    if seen is None:
+        seen = _recent[session_id] = deque(maxlen=_RECENT)
+        while len(_recent) > _SESSIONS:
+            _recent.popitem(last=False)
+    else:
+        _recent.move_to_end(session_id)
+    seen.append(_Seen(len(normalised), _shingles(normalised), answer, context_builder.context_fingerprint()))
+
+
+# ── Checking ───────────────────────────────────────────────────────────────
+
+_counts: dict[str, int] = {"checked": 0, "passed": 0, **dict.fromkeys(DECISIONS, 0)}
+_timing: Histogram      = Histogram(metrics.STAGE_BUCKETS)
+
+
+def _is_spam(message: str, normalised: str) -> bool:
+    if any(phrase in normalised for phrase in _SPAM_PHRASES) or _RUN_RE.search(message):
+        return True
+    if len(_URL_RE.findall(message)) > _MAX_URLS:
+        return True
+    previous, repeats = None, 0
+    for word in normalised.split():
+        if word != previous:
+            previous, repeats = word, 0
+        else:
+            repeats += 1
+            if repeats >= _MAX_REPEATS:
+                return True
+    return False
+
+
+def _decide(message: str, session_id: str | None, history: list[dict[str, str]] | None) -> Verdict | None:
+    canned     = _current_canned()
+    normalised = normalise(message)
+    topics     = f"{canned.first_name}'s projects, skills, certifications or how to get in touch"
+
+    if not _ALNUM_RE.search(normalised) or _NOISE_RE.fullmatch(normalised):
+        return Verdict("noise", f"Could you ask that as a question? For example, ask about {topics}.")
+    if _HELLO_RE.fullmatch(normalised):
+        return Verdict("greeting", f"Hi! I can answer questions about {canned.name}. Ask me about {topics}.")
+    if _THANKS_RE.fullmatch(normalised):
+        return Verdict("greeting", f"You're welcome! Anything else you'd like to know about {topics}?")
+
+    refusal = f"I can only answer questions about {canned.name}'s background, projects, skills and certifications."
+    lowered = message.lower()
+    if any(hint in lowered for hint in _INJECTION_HINTS) and _INJECTION_RE.search(message):
+        return Verdict("injection", refusal)
+    if _is_spam(message, normalised):
+        return Verdict("spam", refusal)
+
+    if _SIMILARITY > 0 and len(normalised) >= _MIN_CHARS:
+        answer = _duplicate(normalised, session_id, canned.fingerprint)
+        if answer is not None:
+            return Verdict("duplicate", answer)
+
+    return _classify(normalised, message, canned) if _CANNED and not history else None
+
+
+def check(
+    message: str, session_id: str | None = None, history: list[dict[str, str]] | None = None
+) -> Verdict | None:
+    """
+    Return a reply for ``message`` that needs no model call, or ``None``
+    when it should be answered normally.  ``session_id`` scopes the
+    duplicate check; canned and retrieval answers are only given when
+    ``history`` (the prior turns) is empty.
+    """
+    if not _ENABLED:
+        return None
+    started = time.perf_counter()
+    verdict = _decide(message, session_id, history)
+    elapsed = time.perf_counter() - started
+
+    _counts["checked"] += 1
+    _counts[verdict.decision if verdict is not None else "passed"] += 1
+    _timing.observe(elapsed)
+    metrics.observe("prefilter", elapsed)
+    tracing.record("prefilter", started, started + elapsed,
+                   decision=verdict.decision if verdict is not None else "pass")
+    return verdict
+
+
+def stats() -> dict[str, Any]:
+    """Counters for ``/api/admin/status``: how often each stage answered, and how fast."""
+    checked = _counts["checked"]
+
+    def us(q: float) -> float | None:
+        value = _timing.quantile(q)
+        return None if value is None else round(value * 1e6, 1)
+
+    return {
+        "enabled":    _ENABLED,
+        "checked":    checked,
+        "passed":     _counts["passed"],
+        "hit_rate":   round(1 - _counts["passed"] / checked, 4) if checked else 0.0,
+        "decisions":  {d: _counts[d] for d in DECISIONS},
+        "hit_rates":  {d: round(_counts[d] / checked, 4) if checked else 0.0 for d in DECISIONS},
+        "sessions":   len(_recent),
+        "check_p50_us": us(0.50),
+        "check_p99_us": us(0.99),
+    }
@@ -0,0 +1,215 @@
+"""
+backend/app/services/rate_limit.py
+
+Per-client token buckets in front of the chat endpoints.
+
+Each chat request takes one token from the bucket of its ``session_id``, if
+it sent one, and one from the bucket of its client IP.  The session is
+checked first, so a session that is over its limit does not also drain the
+IP bucket it shares with other visitors behind the same address.  A bucket holds up
+to ``burst`` tokens and refills at ``per_minute / 60`` tokens a second.  A
+request that finds a bucket empty is refused straight away with the
+seconds until the next token, which the API returns as ``429`` with
+``Retry-After``.  It never waits and never reaches OpenRouter.
+
+The client IP is the socket peer address.  Behind a reverse proxy set
+``RATE_LIMIT_TRUST_PROXY=1`` to use the first ``X-Forwarded-For`` entry
+instead (only when the proxy overwrites that header).
+
+State
+─────
+  memory  (default) buckets live in an LRU dict of up to
+          ``RATE_LIMIT_MAX_KEYS`` keys per process.  With several uvicorn
+          workers each keeps its own buckets, so a client can get up to
+          ``workers ×`` the limit.
+  sqlite  buckets live in one small WAL database (``RATE_LIMIT_DB_PATH``)
+          shared by every worker on the host.  A check is a single
+          ``INSERT … ON CONFLICT DO UPDATE … RETURNING`` statement, so it
+          is atomic across processes.  Buckets idle long enough to be full
+          again are deleted now and then.  If the database fails, requests
+          are let through and counted as ``errors``.
+
+Public API
+──────────
+  check(ip, session_id) -> float | None   – None if admitted, else seconds to wait
+  client_ip(request) -> str
+  stats() -> dict
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+# A *_PER_MINUTE of 0 disables that limit.
+
+_ENABLED            = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+_IP_PER_MINUTE      = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "30"))
+_IP_BURST           = float(os.getenv("RATE_LIMIT_IP_BURST", "10"))
+_SESSION_PER_MINUTE = float(os.getenv("RATE_LIMIT_SESSION_PER_MINUTE", "12"))
+_SESSION_BURST      = float(os.getenv("RATE_LIMIT_SESSION_BURST", "5"))
+_TRUST_PROXY        = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+_STATE              = os.getenv("RATE_LIMIT_STATE", "memory")           # "memory" | "sqlite"
+_MAX_KEYS           = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+_DB_PATH            = Path(os.getenv(
+    "RATE_LIMIT_DB_PATH", str(Path(tempfile.gettempdir()) / "portfolio_rate_limits.db")
+))
+
+_PRUNE_EVERY = 1000   # sqlite: checks between deletions of idle buckets
+
+# (prefix, tokens per second, burst) of each enabled limit, in check order
+_LIMITS = [
+    (prefix, per_minute / 60, burst)
+    for prefix, per_minute, burst in (
+        ("session", _SESSION_PER_MINUTE, _SESSION_BURST),
+        ("ip", _IP_PER_MINUTE, _IP_BURST),
+    )
+    if per_minute > 0
+]
+
+_stats: dict[str, int] = {"allowed": 0, "limited_ip": 0, "limited_session": 0, "errors": 0}
+
+
+# ── Bucket stores ──────────────────────────────────────────────────────────
+# take(key, rate, burst) returns 0.0 when a token was taken, otherwise the
+# seconds until one is available.
+
+class _MemoryBuckets:
+    """Buckets of this process, least recently used evicted first."""
+
+    def __init__(self, max_keys: int) -> None:
+        self._max_keys = max_keys
+        self._lock     = threading.Lock()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()   # key → (tokens, at)
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - at) * rate)
+            taken  = tokens >= 1
+            self._buckets[key] = (tokens - 1 if taken else tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)   # an evicted bucket comes back full
+        return 0.0 if taken else (1 - tokens) / rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key     TEXT PRIMARY KEY,
+    tokens  REAL NOT NULL,
+    updated REAL NOT NULL       -- unix time
+) WITHOUT ROWID;
+"""
+
+# ?1 key, ?2 burst, ?3 now, ?4 rate.  Returns a row only when a token was taken.
+_REFILLED = "min(?2, tokens + max(?3 - updated, 0) * ?4)"
+_TAKE_SQL = f"""
+INSERT INTO buckets (key, tokens, updated) VALUES (?1, ?2 - 1, ?3)
+ON CONFLICT (key) DO UPDATE SET tokens = {_REFILLED} - 1, updated = ?3
+    WHERE {_REFILLED} >= 1
+RETURNING tokens;
+"""
+_PEEK_SQL = f"SELECT {_REFILLED} FROM buckets WHERE key = ?1;"
+
+
+class _SQLiteBuckets:
+    """Buckets shared by every process that opens the same database file."""
+
+    def __init__(self, path: Path) -> None:
+        self._path   = path
+        self._lock   = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._checks = 0
+        # a bucket untouched for this long has refilled completely
+        self._idle   = max((burst / rate for _, rate, burst in _LIMITS), default=0.0)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the shared database on first use.  Hold _lock."""
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self._path), timeout=1.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=OFF;")   # limiter state; losing it on a crash is harmless
+            conn.execute(_CREATE_SQL)
+            self._conn = conn
+        return self._conn
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            self._checks += 1
+            if self._checks % _PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM buckets WHERE updated < ?;", (now - self._idle,))
+            if conn.execute(_TAKE_SQL, (key, burst, now, rate)).fetchone() is not None:
+                return 0.0
+            row = conn.execute(_PEEK_SQL, (key, burst, now, rate)).fetchone()
+        tokens = row[0] if row else burst
+        return max((1 - tokens) / rate, 0.0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT count(*) FROM buckets;").fetchone()[0]
+
+
+_buckets: _MemoryBuckets | _SQLiteBuckets = (
+    _SQLiteBuckets(_DB_PATH) if _STATE == "sqlite" else _MemoryBuckets(_MAX_KEYS)
+)
+
+
+# ── Public API ─────────────────────────────────────────────────────────────
+
+def client_ip(request: Request) -> str:
+    """The address the request is accounted to (see the module docstring)."""
+    if _TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for", "")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def check(ip: str, session_id: str | None) -> float | None:
+    """
+    Take a token from the client's buckets.  Returns None when the request
+    may proceed, or the seconds until it could be retried.
+    """
+    if not _ENABLED:
+        return None
+    for prefix, rate, burst in _LIMITS:
+        if prefix == "session" and not session_id:
+            continue
+        key = f"{prefix}:{ip if prefix == 'ip' else session_id}"
+        try:
+            wait = _buckets.take(key, rate, burst)
+        except sqlite3.Error as exc:
+            _stats["errors"] += 1
+            logger.warning("Rate limit state unavailable, admitting request: %s", exc)
+            return None
+        if wait > 0:
+            _stats[f"limited_{prefix}"] += 1
+            return wait
+    _stats["allowed"] += 1
+    return None
+
+
+def stats() -> dict[str, int | bool | str]:
+    """Counters for ``/api/admin/status``."""
+    return {"enabled": _ENABLED, "state": _STATE, "buckets": len(_buckets), **_stats}
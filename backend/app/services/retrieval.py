@@ -0,0 +1,93 @@
+"""
+backend/app/services/retrieval.py
+
+Small in-memory BM25 index used to pick the resume chunks that are relevant
+to a question, so the prompt does not have to carry the whole resume.
+
+The index is generic — it ranks ``(chunk_id, text)`` pairs.  What a chunk
+is (a project, a skill category, a certification) is decided by
+``context_builder``, which owns the resume formatting.
+
+Public API
+──────────
+  BM25Index(chunks)            – build the index once (startup)
+  BM25Index.search(query, k)   – ids of the top-k chunks, best first
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+_STOPWORDS = frozenset(
+    "a an and are about any as at be by can could did do does for from has have "
+    "he his how i in is it its me more of on or over please show tell than that "
+    "the their them this to was what when which who with would you".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens with stopwords removed and plurals folded."""
+    tokens: list[str] = []
+    for raw in _TOKEN_RE.findall(text.lower()):
+        word = raw.rstrip(".-")
+        if not word or word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks.
+
+    Args:
+        chunks: ``(chunk_id, text)`` pairs.  Built once; the index is
+                read-only afterwards and safe to share between requests.
+        k1, b:  Standard BM25 term-saturation and length-normalisation knobs.
+    """
+
+    def __init__(self, chunks: list[tuple[str, str]], *, k1: float = 1.5, b: float = 0.75) -> None:
+        self._ids   = [chunk_id for chunk_id, _ in chunks]
+        self._tfs   = [Counter(tokenize(text)) for _, text in chunks]
+        self._lens  = [sum(tf.values()) for tf in self._tfs]
+        self._avg   = (sum(self._lens) / len(self._lens)) if self._lens else 0.0
+        self._k1    = k1
+        self._b     = b
+
+        doc_freq: Counter[str] = Counter()
+        for tf in self._tfs:
+            doc_freq.update(tf.keys())
+        n = len(self._tfs)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: str, k: int) -> list[str]:
+        """Return the ids of the ``k`` best-scoring chunks (score > 0), best first."""
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        if not terms or k <= 0:
+            return []
+
+        scored: list[tuple[float, int]] = []
+        for index, tf in enumerate(self._tfs):
+            score = 0.0
+            norm = self._k1 * (1 - self._b + self._b * self._lens[index] / self._avg)
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self._k1 + 1) / (freq + norm)
+            if score > 0:
+                scored.append((score, index))
+
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return [self._ids[index] for _, index in scored[:k]]
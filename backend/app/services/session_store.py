@@ -0,0 +1,167 @@
+"""
+backend/app/services/session_store.py
+
+Server-side conversation history, keyed by ``session_id``.
+
+Clients only need to send ``session_id`` and the new message; the server
+rebuilds the history itself.  The conversation lives in ``chat_logs``: a
+finished exchange (question and reply) is written there in one transaction
+before the reply is returned, with turn indices allocated inside that
+transaction (``db.append_turns``).  So every worker process sees the same
+history and the same turn numbers, whichever of them served the previous
+request, and a question whose answer failed never becomes part of it.
+
+Recent turns of active sessions are also kept in a per-process LRU
+(``SESSION_CACHE_SIZE`` sessions, ``SESSION_MAX_TURNS`` turns each).  An
+entry is only used while it is current: ``history()`` first reads the
+session's newest turn index (one indexed lookup) and reloads the recent
+turns with one indexed query when another process has written since, or
+when the session is not cached.  Rebuilding a history costs O(turns)
+rather than a table scan.
+
+Both reads and the write run under the chat log's connection lock, which
+a batch write may hold, so they run on a worker thread
+(``asyncio.to_thread``) and the event loop keeps serving other requests
+meanwhile.
+
+Public API
+──────────
+  await history(session_id) -> list[dict]          – recent turns, oldest first
+  await record(session_id, question, answer) -> int | None
+                                                   – write an exchange, return the
+                                                     question's turn index
+  stats() -> dict
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from app.database.db import append_turns, last_turn, recent_turns
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+_MAX_TURNS  = int(os.getenv("SESSION_MAX_TURNS", "40"))
+
+
+# ── State ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class _Session:
+    turns:     deque[dict[str, str]] = field(default_factory=lambda: deque(maxlen=_MAX_TURNS))
+    next_turn: int = 0      # turn index the session's next row in chat_logs gets
+
+
+_lock:     threading.Lock = threading.Lock()
+_sessions: OrderedDict[str, _Session] = OrderedDict()
+_stats:    dict[str, int] = {"hits": 0, "loads": 0, "evictions": 0, "write_errors": 0}
+
+
+def _current(session_id: str, next_turn: int) -> _Session | None:
+    """Return the cached session if chat_logs has nothing newer.  Hold _lock."""
+    session = _sessions.get(session_id)
+    if session is None or session.next_turn != next_turn:
+        return None
+    _sessions.move_to_end(session_id)
+    _stats["hits"] += 1
+    return session
+
+
+def _load(session_id: str, rows: list[tuple[str, str, int | None]]) -> _Session:
+    """Cache a session rebuilt from its ``recent_turns`` rows.  Hold _lock."""
+    session = _Session()
+    for role, message, _turn in rows:
+        session.turns.append({"role": role, "content": message})
+    known = [turn for _, _, turn in rows if turn is not None]
+    session.next_turn = (max(known) + 1) if known else 0
+    _stats["loads"] += 1
+
+    _sessions[session_id] = session
+    _sessions.move_to_end(session_id)
+    while len(_sessions) > _CACHE_SIZE:
+        _sessions.popitem(last=False)
+        _stats["evictions"] += 1
+    return session
+
+
+def _read(session_id: str, cached_next: int | None) -> tuple[int, list[tuple[str, str, int | None]] | None]:
+    """
+    The session's next turn index, and its recent turns unless the cached
+    copy (``cached_next``) is still current.  Runs on a worker thread.
+    """
+    try:
+        last = last_turn(session_id)
+    except Exception as exc:  # noqa: BLE001 — reload, which reports and degrades to no history
+        logger.warning("Failed to read session %s head: %s", session_id, exc)
+        last = None
+        cached_next = None
+    next_turn = 0 if last is None else last + 1
+    if cached_next is not None and cached_next == next_turn:
+        return next_turn, None
+    return next_turn, recent_turns(session_id, _MAX_TURNS)
+
+
+# ── Public API ─────────────────────────────────────────────────────────────
+
+async def history(session_id: str) -> list[dict[str, str]]:
+    """
+    Return the session's recent turns (oldest first) as prompt-ready dicts.
+    The cached copy is used only if no process has written to the session
+    since; otherwise the turns are reloaded from the database.
+    """
+    with _lock:
+        session     = _sessions.get(session_id)
+        cached_next = session.next_turn if session is not None else None
+    next_turn, rows = await asyncio.to_thread(_read, session_id, cached_next)
+    with _lock:
+        session = _current(session_id, next_turn)
+        if session is None and rows is not None:
+            session = _load(session_id, rows)
+    if session is None:
+        # Evicted or written to while the head was read: reload it
+        rows = await asyncio.to_thread(recent_turns, session_id, _MAX_TURNS)
+        with _lock:
+            session = _load(session_id, rows)
+    with _lock:
+        return list(session.turns)
+
+
+async def record(session_id: str, question: str, answer: str) -> int | None:
+    """
+    Write a question and its answer to the session as two consecutive turns
+    and return the question's turn index (``None`` if the write failed; the
+    exchange is then missing from the history, like any lost log row).
+    """
+    try:
+        first = await asyncio.to_thread(
+            append_turns, session_id, [("user", question), ("assistant", answer)]
+        )
+    except Exception as exc:  # noqa: BLE001 — never break the reply over its log
+        logger.warning("Failed to record session %s turns: %s", session_id, exc)
+        with _lock:
+            _stats["write_errors"] += 1
+        return None
+    with _lock:
+        session = _sessions.get(session_id)
+        if session is not None:
+            if session.next_turn == first:
+                session.turns.append({"role": "user", "content": question})
+                session.turns.append({"role": "assistant", "content": answer})
+                session.next_turn = first + 2
+            else:
+                del _sessions[session_id]       # another process wrote meanwhile
+    return first
+
+
+def stats() -> dict[str, int]:
+    """Counters for ``/api/admin/status``."""
+    with _lock:
+        return {"sessions": len(_sessions), **_stats}
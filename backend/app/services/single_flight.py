@@ -0,0 +1,63 @@
+"""
+backend/app/services/single_flight.py
+
+Request coalescing ("single-flight") for identical concurrent calls.
+
+When several coroutines ask for the same key at the same time, only the
+first one (the leader) runs the call; the others await the leader's result
+and receive the same value — or the same exception.  Once the call
+finishes the key is forgotten, so a later request starts a fresh call:
+this layer de-duplicates work that is in flight, it does not cache.
+
+The call runs in its own task and waiters await it through
+``asyncio.shield``, so a client that disconnects (cancelling its request)
+does not cancel the upstream call the other waiters depend on.
+
+Public API
+──────────
+  SingleFlight()
+  await SingleFlight.do(key, fn) -> T   – run fn() once per in-flight key
+  SingleFlight.stats() -> dict
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces concurrent calls that share a key into one execution."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task[T]] = {}
+        self._stats:    dict[str, int] = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return the result of ``fn()``, sharing one execution among all
+        callers that use ``key`` while it is in flight.
+        """
+        self._stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self._stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task[T]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the outcome as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Counters for ``/api/admin/status``."""
+        return {"in_flight": len(self._inflight), **self._stats}
@@ -0,0 +1,589 @@
+"""
+backend/app/services/tracing.py
+
+Request-scoped traces: where the time of one slow chat request went.
+
+The ``/metrics`` histograms say how slow a stage is in aggregate; a trace
+says which stage made *this* request slow — waiting for an upstream slot,
+the SQLite lock behind a session reload, a retried or hedged OpenRouter
+attempt.  Every ``POST /api/chat`` and ``POST /api/chat/stream`` opens a
+trace with a random 16-hex-digit id, tagged with its ``session_id`` and
+returned as ``X-Trace-Id``.  A streamed reply's trace stays open until the
+stream closes.  Code on the request path adds spans to it:
+
+  chat / chat_stream         the request, from arrival to response (stream closed)
+    validation               request read + JSON decode + model validation
+    rate_limit / history     limiter check, history rebuild (may read SQLite)
+    log_message              the exchange written to the session (turns=2), or an
+                             unanswered question queued for the chat log (turns=0)
+    warm_answers / answer_cache   lookups
+    build_prompt             context_builder.assemble_prompt
+    ask_openrouter           the whole call, coalesced or not
+    (stream_openrouter)      for a stream: the call up to its first token
+      upstream_queue         waiting for an admission slot (services/admission.py)
+      openrouter_attempt     one round trip per model / retry (model, status, ttfb);
+                             for a stream, up to its first token
+      retry_wait             backoff between attempts
+    (stream_body)            for a stream: the remaining tokens
+
+Sampling
+────────
+  Spans are only appended to an in-memory list while the request runs (a
+  ``perf_counter()`` pair each), so every request is traced; what is kept
+  is decided when it ends:
+
+    error    — the request failed (an exception, or a 5xx) — always kept
+    slow     — it took ``TRACE_SLOW_MS`` or longer — always kept
+    sampled  — the head decision: ``TRACE_SAMPLE_RATE`` of all requests,
+               drawn when the trace starts
+
+  Everything else is discarded.  With no active trace (scripts, other
+  routes) ``span()`` returns a shared no-op.  ``TRACING_ENABLED=0`` turns
+  tracing off entirely.
+
+Sink
+────
+  Kept traces go to a bounded queue; a daemon thread writes them in
+  batches (``TRACE_FLUSH_INTERVAL``), so no file or lock is touched on the
+  request path.  A full queue drops the trace and counts it.  The sink is
+  a SQLite table (``TRACE_SINK=sqlite``, the default; the oldest rows
+  beyond ``TRACE_MAX_TRACES`` are pruned) or a JSON-lines file
+  (``TRACE_SINK=jsonl``, one trace per line, appended with one write per
+  batch so workers do not interleave).  Each trace is stored as:
+
+      {"trace_id": "…", "name": "chat", "session_id": "…", "started": ISO-8601,
+       "duration_ms": 2431.7, "status": "ok" | "error", "error": "…" | null,
+       "kept": "error" | "slow" | "sampled", "pid": 123,
+       "spans": [{"id": 1, "parent": 0, "name": "…", "start_ms": 0.4,
+                  "duration_ms": 12.1, …attributes}, …]}
+
+  ``parent`` 0 is the trace itself.  To read them back:
+
+      python -m app.services.tracing [--slowest 10] [--since ISO] [--session ID] [--errors]
+
+  prints each of the slowest traces as an indented span tree with a bar
+  showing where in the request each span ran.
+
+Public API
+──────────
+  trace(name, session_id, started=None)   – context manager; the request's root
+    .active()                             – context manager; current without ending it
+    .finish(exc=None)                     – end a trace used through ``active()``
+  Trace                                   – the type ``trace()`` returns
+  span(name, **attrs)                     – context manager; a child of the current span
+  record(name, started, ended=None, **attrs)   – a span timed by the caller
+  annotate(**attrs)                       – add attributes to the current span
+  current_id() -> str | None
+  start_exporter() / stop_exporter()
+  tracing_stats() -> dict
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.database.db import DB_DIR
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_ENABLED        = os.getenv("TRACING_ENABLED", "1") != "0"
+_SAMPLE_RATE    = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+_SLOW_MS        = float(os.getenv("TRACE_SLOW_MS", "2000"))
+_SINK           = os.getenv("TRACE_SINK", "sqlite")                     # "sqlite" | "jsonl"
+_PATH           = Path(os.getenv("TRACE_PATH", str(DB_DIR / f"traces.{'jsonl' if _SINK == 'jsonl' else 'db'}")))
+_QUEUE_SIZE     = int(os.getenv("TRACE_QUEUE_SIZE", "1000"))
+_FLUSH_INTERVAL = float(os.getenv("TRACE_FLUSH_INTERVAL", "1"))         # seconds
+_MAX_TRACES     = int(os.getenv("TRACE_MAX_TRACES", "50000"))           # sqlite; 0 keeps all
+
+# ── State ──────────────────────────────────────────────────────────────────
+
+_STOP = object()   # queue sentinel
+
+_queue:    "queue.Queue[dict | object]" = queue.Queue(maxsize=_QUEUE_SIZE)
+_exporter: threading.Thread | None = None
+_stats:    dict[str, int] = {
+    "traces": 0, "sampled": 0, "slow": 0, "error": 0, "dropped": 0, "exported": 0, "failed": 0,
+}
+
+
+# ── Traces and spans ───────────────────────────────────────────────────────
+
+# (id, parent, name, started, ended, attrs) — perf_counter times
+_SpanRow = tuple[int, int, str, float, float, dict[str, Any] | None]
+
+
+class _Trace:
+    """The spans of one request; use through ``trace()``."""
+
+    __slots__ = ("id", "name", "session_id", "sampled", "started", "spans", "_next", "_tokens", "_finished")
+
+    def __init__(self, name: str, session_id: str | None, started: float | None) -> None:
+        self.id         = os.urandom(8).hex()
+        self.name       = name
+        self.session_id = session_id
+        self.sampled    = random.random() < _SAMPLE_RATE
+        self.started    = time.perf_counter() if started is None else started
+        self.spans: list[_SpanRow] = []
+        self._next      = 0
+        self._finished  = False
+
+    def next_id(self) -> int:
+        self._next += 1
+        return self._next
+
+    def __enter__(self) -> _Trace:
+        self._tokens = (_trace.set(self), _span.set(None))
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        ended = time.perf_counter()
+        _trace.reset(self._tokens[0])
+        _span.reset(self._tokens[1])
+        self._end(ended, exc)
+
+    @contextmanager
+    def active(self) -> Iterator[_Trace]:
+        """
+        Make this the current trace for a block without ending it — for a
+        streamed response, whose body runs after the route has returned.
+        The block must not span a ``yield``.
+        """
+        tokens = (_trace.set(self), _span.set(None))
+        try:
+            yield self
+        finally:
+            _trace.reset(tokens[0])
+            _span.reset(tokens[1])
+
+    def finish(self, exc: BaseException | None = None) -> None:
+        """End a trace used through ``active()``; later calls are ignored."""
+        self._end(time.perf_counter(), exc)
+
+    def _end(self, ended: float, exc: BaseException | None) -> None:
+        if not self._finished:
+            self._finished = True
+            _finish(self, ended, _error(exc))
+
+
+class _Span:
+    __slots__ = ("trace", "id", "parent", "name", "attrs", "started", "_token")
+
+    def __init__(self, trace: _Trace, name: str, attrs: dict[str, Any]) -> None:
+        self.trace = trace
+        self.name  = name
+        self.attrs = attrs
+
+    def __enter__(self) -> _Span:
+        parent       = _span.get()
+        self.parent  = parent.id if parent is not None else 0
+        self.id      = self.trace.next_id()
+        self._token  = _span.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        ended = time.perf_counter()
+        _span.reset(self._token)
+        error = _error(exc)
+        if error is not None:
+            self.attrs["error"] = error
+        self.trace.spans.append((self.id, self.parent, self.name, self.started, ended, self.attrs or None))
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class _NoSpan:
+    """Stands in for a span outside a trace, and for a trace when tracing is off."""
+
+    __slots__ = ()
+    id = None
+
+    def __enter__(self) -> _NoSpan:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        pass
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def active(self) -> _NoSpan:
+        return self
+
+    def finish(self, exc: BaseException | None = None) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+Trace = _Trace | _NoSpan          # what trace() returns
+_trace: ContextVar[_Trace | None] = ContextVar("trace", default=None)
+_span:  ContextVar[_Span | None]  = ContextVar("trace_span", default=None)
+
+
+def _error(exc: BaseException | None) -> str | None:
+    """What to record for an exception leaving a span; client errors are not failures."""
+    if exc is None:
+        return None
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return f"HTTP {status}" if status >= 500 else None
+    return getattr(exc, "category", None) or type(exc).__name__
+
+
+def trace(name: str, session_id: str | None = None, *, started: float | None = None) -> Trace:
+    """
+    Open the root of a request's trace (``with tracing.trace("chat", sid):``).
+    ``started`` backdates it to a ``perf_counter()`` value, e.g. the arrival
+    time stamped by ``RequestClockMiddleware``.
+    """
+    if not _ENABLED:
+        return _NO_SPAN
+    return _Trace(name, session_id, started)
+
+
+def span(name: str, **attrs: Any) -> _Span | _NoSpan:
+    """A child of the current span, timed by ``with``; a no-op outside a trace."""
+    trace_ = _trace.get()
+    if trace_ is None:
+        return _NO_SPAN
+    return _Span(trace_, name, attrs)
+
+
+def record(name: str, started: float, ended: float | None = None, **attrs: Any) -> None:
+    """Add a span the caller has already timed (``perf_counter()`` values)."""
+    trace_ = _trace.get()
+    if trace_ is None:
+        return
+    parent = _span.get()
+    trace_.spans.append((
+        trace_.next_id(), parent.id if parent is not None else 0, name,
+        started, time.perf_counter() if ended is None else ended, attrs or None,
+    ))
+
+
+def annotate(**attrs: Any) -> None:
+    """Add attributes to the current span (no-op outside one)."""
+    current = _span.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def current_id() -> str | None:
+    """The id of the trace this code runs in, if any."""
+    trace_ = _trace.get()
+    return trace_.id if trace_ is not None else None
+
+
+def _finish(trace_: _Trace, ended: float, error: str | None) -> None:
+    """Decide whether to keep a finished trace and queue it for the sink."""
+    _stats["traces"] += 1
+    duration = (ended - trace_.started) * 1000
+    if error is not None:
+        kept = "error"
+    elif duration >= _SLOW_MS:
+        kept = "slow"
+    elif trace_.sampled:
+        kept = "sampled"
+    else:
+        return
+    _stats[kept] += 1
+
+    origin = trace_.started
+    record_ = {
+        "trace_id":    trace_.id,
+        "name":        trace_.name,
+        "session_id":  trace_.session_id,
+        "started":     datetime.fromtimestamp(time.time() - (ended - origin), tz=timezone.utc).isoformat(),
+        "duration_ms": round(duration, 3),
+        "status":      "error" if error is not None else "ok",
+        "error":       error,
+        "kept":        kept,
+        "pid":         os.getpid(),
+        "spans": [
+            {"id": id_, "parent": parent, "name": name,
+             "start_ms": round((started - origin) * 1000, 3),
+             "duration_ms": round((ended_ - started) * 1000, 3), **(attrs or {})}
+            for id_, parent, name, started, ended_, attrs in sorted(trace_.spans, key=lambda s: s[3])
+        ],
+    }
+    if _exporter is None:
+        return
+    try:
+        _queue.put_nowait(record_)
+    except queue.Full:
+        _stats["dropped"] += 1
+
+
+# ── Sink ───────────────────────────────────────────────────────────────────
+
+_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS traces (
+    trace_id    TEXT PRIMARY KEY,
+    started     TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    session_id  TEXT,
+    duration_ms REAL NOT NULL,
+    status      TEXT NOT NULL,
+    kept        TEXT NOT NULL,
+    record      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_traces_duration ON traces (duration_ms);
+CREATE INDEX IF NOT EXISTS idx_traces_started  ON traces (started);
+CREATE INDEX IF NOT EXISTS idx_traces_session  ON traces (session_id);
+"""
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, isolation_level=None, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.executescript(_CREATE_SQL)
+    return conn
+
+
+class _SQLiteSink:
+    def __init__(self, path: Path) -> None:
+        self._conn   = _connect(path)
+        self._writes = 0
+
+    def write(self, batch: list[dict]) -> None:
+        rows = [
+            (r["trace_id"], r["started"], r["name"], r["session_id"], r["duration_ms"],
+             r["status"], r["kept"], json.dumps(r, separators=(",", ":")))
+            for r in batch
+        ]
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO traces VALUES (?, ?, ?, ?, ?, ?, ?, ?);", rows)
+            self._writes += len(rows)
+            if _MAX_TRACES and self._writes >= min(1000, _MAX_TRACES):
+                conn.execute(
+                    "DELETE FROM traces WHERE rowid <= (SELECT max(rowid) FROM traces) - ?;", (_MAX_TRACES,)
+                )
+                self._writes = 0
+            conn.execute("COMMIT;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _JSONLSink:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def write(self, batch: list[dict]) -> None:
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in batch).encode("utf-8")
+        os.write(self._fd, data)      # one append per batch: no interleaving with other workers
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _exporter_loop() -> None:
+    """Write queued traces in batches until the ``_STOP`` sentinel."""
+    try:
+        sink = _JSONLSink(_PATH) if _SINK == "jsonl" else _SQLiteSink(_PATH)
+    except (OSError, sqlite3.Error) as exc:
+        logger.warning("Trace sink %s unavailable, traces will be dropped: %s", _PATH, exc)
+        sink = None
+    stopping = False
+    try:
+        while not stopping:
+            batch: list[dict] = []
+            try:
+                item = _queue.get(timeout=_FLUSH_INTERVAL)
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)  # type: ignore[arg-type]
+                    item = _queue.get_nowait()
+            except queue.Empty:
+                pass
+            if not batch:
+                continue
+            if sink is None:
+                _stats["failed"] += len(batch)
+                continue
+            try:
+                sink.write(batch)
+                _stats["exported"] += len(batch)
+            except Exception as exc:  # noqa: BLE001
+                _stats["failed"] += len(batch)
+                logger.warning("Failed to write %d traces: %s", len(batch), exc)
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+def start_exporter() -> None:
+    """Start the background trace writer (no-op if running or tracing is off)."""
+    global _exporter
+    if _exporter is not None or not _ENABLED:
+        return
+    _exporter = threading.Thread(target=_exporter_loop, name="trace-exporter", daemon=True)
+    _exporter.start()
+
+
+def stop_exporter(timeout: float = 5.0) -> None:
+    """Write the queued traces and stop the writer."""
+    global _exporter
+    if _exporter is None:
+        return
+    exporter, _exporter = _exporter, None
+    _queue.put(_STOP)
+    exporter.join(timeout)
+
+
+def tracing_stats() -> dict[str, Any]:
+    """Settings and counters for ``/api/admin/status``."""
+    return {
+        "enabled":     _ENABLED,
+        "sample_rate": _SAMPLE_RATE,
+        "slow_ms":     _SLOW_MS,
+        "sink":        f"{_SINK}:{_PATH}",
+        "queued":      _queue.qsize(),
+        **_stats,
+    }
+
+
+# ── Reading traces back ────────────────────────────────────────────────────
+
+def _matches(record_: dict, since: str | None, session: str | None, errors: bool) -> bool:
+    return (
+        (since is None or record_["started"] >= since)
+        and (session is None or record_["session_id"] == session)
+        and (not errors or record_["status"] == "error")
+    )
+
+
+def slowest(
+    limit: int = 10,
+    *,
+    since: datetime | None = None,
+    session_id: str | None = None,
+    errors: bool = False,
+    path: Path | None = None,
+) -> list[dict]:
+    """The ``limit`` slowest stored traces, slowest first."""
+    path       = path or _PATH
+    since_text = since.astimezone(timezone.utc).isoformat() if since else None
+    if path.suffix == ".jsonl":
+        import heapq
+
+        def records() -> Iterator[dict]:
+            with path.open(encoding="utf-8") as lines:
+                for line in lines:
+                    try:
+                        record_ = json.loads(line)
+                    except ValueError:
+                        continue                # a line torn by a crash
+                    if _matches(record_, since_text, session_id, errors):
+                        yield record_
+
+        return heapq.nlargest(limit, records(), key=lambda r: r["duration_ms"])
+
+    conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+    try:
+        where, params = ["1"], []
+        if since_text:
+            where.append("started >= ?")
+            params.append(since_text)
+        if session_id:
+            where.append("session_id = ?")
+            params.append(session_id)
+        if errors:
+            where.append("status = 'error'")
+        rows = conn.execute(
+            f"SELECT record FROM traces WHERE {' AND '.join(where)} ORDER BY duration_ms DESC LIMIT ?;",
+            (*params, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+
+_SPAN_FIELDS = {"id", "parent", "name", "start_ms", "duration_ms"}
+
+
+def format_trace(record_: dict, width: int = 40) -> str:
+    """One trace as an indented span tree, each span with a bar for when it ran."""
+    total = record_["duration_ms"] or 1e-9
+    lines = [
+        f"{record_['trace_id']}  {record_['name']}  {record_['duration_ms']:.1f} ms  "
+        f"{record_['status']}{' (' + record_['error'] + ')' if record_.get('error') else ''}  "
+        f"kept={record_['kept']}  {record_['started'][:19]}  session={record_['session_id']}"
+    ]
+
+    def bar(start: float, duration: float) -> str:
+        left  = min(width - 1, int(start / total * width))
+        right = max(left + 1, min(width, round((start + duration) / total * width)))
+        return " " * left + "█" * (right - left) + " " * (width - right)
+
+    children: dict[int, list[dict]] = {}
+    for span_ in record_["spans"]:
+        children.setdefault(span_["parent"], []).append(span_)
+
+    def walk(parent: int, depth: int) -> None:
+        for span_ in children.get(parent, []):
+            attrs = " ".join(f"{k}={v}" for k, v in span_.items() if k not in _SPAN_FIELDS)
+            label = "  " * depth + span_["name"]
+            lines.append(
+                f"  {label:<30} {span_['duration_ms']:>9.2f} ms |{bar(span_['start_ms'], span_['duration_ms'])}|"
+                f" {attrs}".rstrip()
+            )
+            walk(span_["id"], depth + 1)
+
+    lines.append(f"  {record_['name']:<30} {record_['duration_ms']:>9.2f} ms |{'█' * width}|")
+    walk(0, 1)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print the slowest stored request traces.")
+    parser.add_argument("--slowest", type=int, default=10, metavar="N")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None,
+                        help="only traces started at or after this ISO-8601 time (naive = UTC)")
+    parser.add_argument("--session", default=None, help="only traces of this session_id")
+    parser.add_argument("--errors", action="store_true", help="only failed requests")
+    parser.add_argument("--path", type=Path, default=None, help=f"trace sink (default {_PATH})")
+    parser.add_argument("--width", type=int, default=40, help="width of the timeline bars")
+    args = parser.parse_args()
+
+    path = args.path or _PATH
+    if not path.exists():
+        parser.error(f"no traces at {path}")
+    since = args.since
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    records = slowest(args.slowest, since=since, session_id=args.session, errors=args.errors, path=path)
+    if not records:
+        print("no matching traces")
+    print("\n\n".join(format_trace(r, args.width) for r in records))
+
+
+if __name__ == "__main__":
+    main()
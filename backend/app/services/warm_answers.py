@@ -0,0 +1,291 @@
+"""
+backend/app/services/warm_answers.py
+
+Precomputed answers for the seed questions.
+
+Most visitors click one of the suggested questions instead of typing, so
+the answers to those questions (and to any configured FAQ list) are
+generated ahead of time and served from memory without building a prompt
+or calling OpenRouter.  Off unless ``WARM_ANSWERS_ENABLED=1``.
+
+Warming
+───────
+  ``start_warmer()`` (FastAPI ``lifespan``) starts a background task that
+  generates the missing answers in parallel (``WARM_ANSWERS_CONCURRENCY``
+  at a time, through the upstream admission gate) right after startup, and
+  then every ``WARM_ANSWERS_CHECK_INTERVAL`` seconds:
+
+    - regenerates every answer when the resume context fingerprint
+      changed (a hot reload of resume_data.json);
+    - refreshes answers older than ``WARM_ANSWERS_TTL`` seconds; the old
+      answer is served until the new one replaces it;
+    - retries questions whose generation failed.
+
+  The FAQ file (``WARM_ANSWERS_FAQ_PATH``) is read at each check; the
+  suggestions route and the status page use the list from the last one.
+
+  Answers are saved to ``WARM_ANSWERS_PATH`` (JSON, replaced atomically),
+  so a restart — or another worker — loads them from disk instead of
+  asking OpenRouter again.  An ``fcntl`` lock next to the file lets one
+  worker generate while the others pick up its results.
+
+Serving
+───────
+  ``lookup()`` matches the question after the answer cache's normalisation
+  (case, punctuation and spacing do not matter) and only without prior
+  conversation: a seed question asked mid-conversation may depend on what
+  came before, so it takes the normal path.  An answer generated for an
+  older resume context is never served.
+
+Public API
+──────────
+  SUGGESTIONS                        – the questions shown by the chat UI
+  lookup(question, history) -> str | None
+  warm_questions() -> set[str]       – seed questions with a current answer
+  await warm() -> int                – generate what is due; returns how many
+  start_warmer() / await stop_warmer()
+  stats() -> dict
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.database.db import DB_DIR
+from app.services.admission import Overloaded
+from app.services.answer_cache import normalise
+from app.services.context_builder import assemble_prompt, context_fingerprint
+from app.services.openrouter_service import OpenRouterError, ask_openrouter
+
+try:
+    import fcntl
+except ImportError:                     # Windows: workers do not coordinate
+    fcntl = None                        # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ───────────────────────────────────────────────────────────
+
+_ENABLED     = os.getenv("WARM_ANSWERS_ENABLED", "0") == "1"
+_FAQ_PATH    = os.getenv("WARM_ANSWERS_FAQ_PATH", "")                      # one question per line
+_STORE_PATH  = Path(os.getenv("WARM_ANSWERS_PATH", str(DB_DIR / "warm_answers.json")))
+_TTL         = float(os.getenv("WARM_ANSWERS_TTL", "86400"))               # seconds
+_CONCURRENCY = int(os.getenv("WARM_ANSWERS_CONCURRENCY", "3"))
+_INTERVAL    = float(os.getenv("WARM_ANSWERS_CHECK_INTERVAL", "10"))       # seconds
+
+SUGGESTIONS: tuple[str, ...] = (
+    "What projects has Hanzala built?",
+    "What are his main technical skills?",
+    "Explain the MarketMuse AI project.",
+    "What certifications does he hold?",
+    "Has he worked with RAG or LLMs?",
+    "What databases and cloud platforms does he use?",
+)
+
+
+@dataclass(frozen=True)
+class _Answer:
+    question:     str
+    answer:       str
+    fingerprint:  str       # resume context the answer was generated from
+    generated_at: float     # wall clock, so answers loaded from disk age correctly
+
+
+_answers: dict[str, _Answer] = {}              # normalised question → answer
+_questions: list[str] = list(SUGGESTIONS)      # as of the last warm run
+_task:    asyncio.Task | None = None
+_stats:   dict[str, Any] = {
+    "hits": 0, "generated": 0, "failures": 0, "loaded": 0, "runs": 0, "last_run_ms": None,
+}
+
+
+# ── Questions and storage ──────────────────────────────────────────────────
+
+def _read_questions() -> list[str]:
+    """The suggestions plus the FAQ file, without duplicates."""
+    questions = list(SUGGESTIONS)
+    if _FAQ_PATH:
+        try:
+            lines = Path(_FAQ_PATH).read_text(encoding="utf-8").splitlines()
+        except OSError as exc:
+            logger.warning("Cannot read the FAQ list %s: %s", _FAQ_PATH, exc)
+            lines = []
+        questions += [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+    unique: dict[str, str] = {}
+    for question in questions:
+        unique.setdefault(normalise(question), question)
+    return list(unique.values())
+
+
+def _load() -> None:
+    """Adopt answers from disk that are newer than the ones in memory."""
+    try:
+        stored = json.loads(_STORE_PATH.read_bytes())
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring %s: %s", _STORE_PATH, exc)
+        return
+    for item in stored.get("answers", []):
+        entry   = _Answer(**item)
+        key     = normalise(entry.question)
+        current = _answers.get(key)
+        if current is None or entry.generated_at > current.generated_at:
+            _answers[key] = entry
+            _stats["loaded"] += 1
+
+
+def _save() -> None:
+    _STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _STORE_PATH.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"answers": [asdict(a) for a in _answers.values()]}, indent=1), encoding="utf-8")
+    os.replace(tmp, _STORE_PATH)
+
+
+@contextlib.contextmanager
+def _generation_lock() -> Iterator[bool]:
+    """Yield True if this process may generate answers now."""
+    if fcntl is None:
+        yield True
+        return
+    _STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{_STORE_PATH}.lock", "a+") as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _due(questions: list[str], fingerprint: str, now: float) -> list[str]:
+    due = []
+    for question in questions:
+        entry = _answers.get(normalise(question))
+        if entry is None or entry.fingerprint != fingerprint or now - entry.generated_at > _TTL:
+            due.append(question)
+    return due
+
+
+# ── Generation ─────────────────────────────────────────────────────────────
+
+async def _generate(question: str, fingerprint: str, limit: asyncio.Semaphore) -> bool:
+    async with limit:
+        prompt = assemble_prompt(question, history=[]).parts
+        try:
+            answer = await ask_openrouter(prompt)
+        except (OpenRouterError, Overloaded) as exc:
+            logger.warning("Could not precompute an answer for %r: %s", question, exc)
+            _stats["failures"] += 1
+            return False
+    _answers[normalise(question)] = _Answer(question, answer, fingerprint, time.time())
+    _stats["generated"] += 1
+    return True
+
+
+async def warm() -> int:
+    """
+    Generate the answers that are missing, stale or from an older resume
+    context.  Returns how many were generated; 0 when nothing was due or
+    another worker is generating them.  The FAQ file is re-read here, once
+    per run; requests use the list parsed by the last run.
+    """
+    global _questions
+    _load()
+    questions   = _questions = _read_questions()
+    fingerprint = context_fingerprint()
+    if not _due(questions, fingerprint, time.time()):
+        return 0
+
+    with _generation_lock() as allowed:
+        if not allowed:
+            return 0
+        _load()                                   # another worker may just have finished
+        due = _due(questions, fingerprint, time.time())
+        if not due:
+            return 0
+        started = time.perf_counter()
+        limit   = asyncio.Semaphore(max(1, _CONCURRENCY))
+        results = await asyncio.gather(*(_generate(q, fingerprint, limit) for q in due))
+        if any(results):
+            keep = {normalise(q) for q in questions}
+            for key in [key for key in _answers if key not in keep]:
+                del _answers[key]                 # dropped from the FAQ list
+            _save()
+        _stats["runs"] += 1
+        _stats["last_run_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Precomputed %d of %d answers in %.0f ms", sum(results), len(due), _stats["last_run_ms"])
+        return sum(results)
+
+
+async def _warm_loop() -> None:
+    while True:
+        try:
+            await warm()
+        except Exception:  # noqa: BLE001 — keep refreshing
+            logger.exception("Precomputing answers failed")
+        await asyncio.sleep(_INTERVAL)
+
+
+# ── Public API ─────────────────────────────────────────────────────────────
+
+def lookup(question: str, history: list[dict[str, str]] | None = None) -> str | None:
+    """Return the precomputed answer for a seed question asked without history."""
+    if not _ENABLED or history:
+        return None
+    entry = _answers.get(normalise(question))
+    if entry is None or entry.fingerprint != context_fingerprint():
+        return None
+    _stats["hits"] += 1
+    return entry.answer
+
+
+def warm_questions() -> set[str]:
+    """The questions (as configured) that currently have an answer to serve."""
+    if not _ENABLED:
+        return set()
+    fingerprint = context_fingerprint()
+    return {
+        question for question in _questions
+        if (entry := _answers.get(normalise(question))) is not None and entry.fingerprint == fingerprint
+    }
+
+
+def start_warmer() -> None:
+    """Start warming in the background (no-op if disabled or running)."""
+    global _task
+    if not _ENABLED or _task is not None:
+        return
+    _task = asyncio.get_running_loop().create_task(_warm_loop(), name="warm-answers")
+
+
+async def stop_warmer() -> None:
+    """Cancel the background task."""
+    global _task
+    if _task is None:
+        return
+    task, _task = _task, None
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+def stats() -> dict[str, Any]:
+    """Warm-answer counters, for ``/api/admin/status``."""
+    return {
+        "enabled":   _ENABLED,
+        "questions": len(_questions) if _ENABLED else 0,
+        "warm":      len(warm_questions()),
+        **_stats,
+    }
@@ -0,0 +1,9 @@
+"""
+backend/benchmarks
+
+Offline benchmarks for the Portfolio AI Assistant backend.  Every script
+runs against a local fake OpenRouter server, so no API key or network
+access is required.  Run them from ``backend/``:
+
+    python -m benchmarks.bench_client
+"""
@@ -0,0 +1,104 @@
+"""
+backend/benchmarks/app_server.py
+
+Run the real backend (``app.main:app``) under uvicorn in a subprocess,
+pointed at a fake OpenRouter URL and a throw-away SQLite database, so that
+benchmarks exercise the full HTTP path without touching
+``app/database/chat_logs.db``.
+
+    with fake_server() as upstream, app_server(upstream) as base_url:
+        httpx.post(f"{base_url}/api/chat", json={"message": "..."})
+
+``app_process`` is the same but also yields the ``Popen`` handle, for
+scripts that sample the server's processes.  ``launcher="serve"`` starts
+the workers with ``python -m app.serve`` (forked from a preloaded parent)
+instead of ``uvicorn --workers``.  The admin API is enabled with
+``ADMIN_TOKEN``; ``admin_status(base_url)`` reads a worker's counters.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+
+from benchmarks.fake_openrouter import _BACKEND_DIR, _free_port, _wait_for_port
+
+ADMIN_TOKEN = "bench"
+
+
+@contextlib.contextmanager
+def app_process(
+    upstream_url: str,
+    *,
+    env: dict[str, str] | None = None,
+    workers: int = 1,
+    launcher: str = "uvicorn",
+) -> Iterator[tuple[str, subprocess.Popen]]:
+    """Start the backend and yield its base URL and the uvicorn process."""
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="bench-db-") as tmp:
+        child_env = {
+            **os.environ,
+            "OPENROUTER_API_URL": upstream_url,
+            "OPENROUTER_API_KEY": "bench",
+            "ADMIN_TOKEN":        ADMIN_TOKEN,
+            "CHAT_LOG_DB_PATH":   str(Path(tmp) / "chat_logs.db"),
+            # load generators hammer from one address: limits off unless asked for
+            "RATE_LIMIT_ENABLED":   "0",
+            "UPSTREAM_CONCURRENCY": "0",
+            "RATE_LIMIT_DB_PATH":   str(Path(tmp) / "rate_limits.db"),
+            # …and every message reaches the upstream: the prefilter would answer the seed questions
+            "PREFILTER_ENABLED":    "0",
+            **(env or {}),
+        }
+        module = ["app.serve"] if launcher == "serve" else ["uvicorn", "app.main:app"]
+        proc = subprocess.Popen(
+            [
+                sys.executable, "-m", *module,
+                "--host", "127.0.0.1",
+                "--port", str(port),
+                "--workers", str(workers),
+                "--log-level", "warning",
+            ],
+            cwd=_BACKEND_DIR,
+            env=child_env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_for_port(port, timeout=30)
+            yield f"http://127.0.0.1:{port}", proc
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+@contextlib.contextmanager
+def app_server(
+    upstream_url: str,
+    *,
+    env: dict[str, str] | None = None,
+    workers: int = 1,
+    launcher: str = "uvicorn",
+) -> Iterator[str]:
+    """Start the backend and yield its base URL (``http://127.0.0.1:<port>``)."""
+    with app_process(upstream_url, env=env, workers=workers, launcher=launcher) as (base_url, _):
+        yield base_url
+
+
+def admin_status(base_url: str, token: str = ADMIN_TOKEN) -> dict[str, Any]:
+    """``GET /api/admin/status`` of the worker that takes the (fresh) connection."""
+    response = httpx.get(
+        f"{base_url}/api/admin/status",
+        headers={"Authorization": f"Bearer {token}", "Connection": "close"},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()
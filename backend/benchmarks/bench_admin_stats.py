@@ -0,0 +1,229 @@
+"""
+backend/benchmarks/bench_admin_stats.py
+
+Latency of the admin stats queries (app/database/analytics.py) on a large
+synthetic chat log, and what the rollup trigger costs the writer.
+
+  1. generate  — ``--rows`` chat_logs rows spread evenly over ``--days``:
+                 question/reply pairs (2 % of replies are errors), questions
+                 drawn mostly from a few dozen popular ones with a long tail
+                 of rarer and unique ones, reply lengths ~ N(450, 200) chars.
+                 Rows are bulk-loaded without the trigger, then ``init_db()``
+                 backfills the rollups (timed).  Pass ``--db`` to keep the
+                 file and reuse it on the next run.
+  2. queries   — every analytics function over 1 h, 24 h, 7 d, 30 d and
+                 365 d windows ending at the newest row: p50 / max of
+                 ``--repeat`` runs, next to the equivalent query on chat_logs
+                 itself.  ``top_questions`` asks for the top 10.
+  3. writes    — batched inserts of 50 000 rows (200 per transaction) into
+                 a fresh database with and without the rollup trigger.
+
+Usage
+─────
+    python -m benchmarks.bench_admin_stats --rows 10000000 --db /tmp/chat_logs_10m.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+_POPULAR = [
+    "What projects has Hanzala built?",
+    "What are his main technical skills?",
+    "Explain the MarketMuse AI project.",
+    "What certifications does he hold?",
+    "Has he worked with RAG or LLMs?",
+    "What databases and cloud platforms does he use?",
+] + [f"Tell me about his experience with topic {i}" for i in range(34)]
+
+_WINDOWS = [("1h", timedelta(hours=1)), ("24h", timedelta(hours=24)),
+            ("7d", timedelta(days=7)), ("30d", timedelta(days=30)), ("365d", timedelta(days=365))]
+
+
+# ── Data generation ────────────────────────────────────────────────────────
+
+def _question(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.70:
+        return _POPULAR[min(int(rng.paretovariate(1.2)) - 1, len(_POPULAR) - 1)]
+    if roll < 0.95:
+        return f"Does he know framework number {rng.randrange(5000)}?"
+    return f"Unique question {rng.getrandbits(48):x}"
+
+
+def _generate(path: Path, rows: int, days: int) -> None:
+    from app.database import db
+
+    db.init_db()
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=OFF;")
+    # Bulk-load without the trigger, so the rollups are built afterwards by
+    # the backfill instead
+    conn.executescript(
+        "DROP TRIGGER IF EXISTS chat_logs_rollup; DROP INDEX IF EXISTS idx_chat_logs_timestamp; "
+        "DROP INDEX IF EXISTS idx_chat_logs_session;"
+    )
+
+    rng    = random.Random(42)
+    end    = datetime.now(tz=timezone.utc)
+    start  = end - timedelta(days=days)
+    step   = (end - start) / rows
+    filler = "x" * 2500
+    started = time.perf_counter()
+
+    def batches():
+        batch = []
+        for i in range(0, rows, 2):
+            ts      = (start + step * i).isoformat()
+            session = f"s{i // 8}"
+            batch.append(("user", _question(rng), ts, session, i % 8))
+            if rng.random() < 0.02:
+                batch.append(("error", "OpenRouter request timed out after 30s.", ts, session, None))
+            else:
+                length = max(20, int(rng.gauss(450, 200)))
+                batch.append(("assistant", filler[:length], ts, session, i % 8 + 1))
+            if len(batch) >= 100_000:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    for batch in batches():
+        conn.execute("BEGIN;")
+        conn.executemany(db._INSERT_SQL, batch)
+        conn.execute("COMMIT;")
+    conn.close()
+    print(f"generated {rows:,} rows over {days} days in {time.perf_counter() - started:.0f}s")
+
+
+# ── Queries ────────────────────────────────────────────────────────────────
+
+def _time(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def _raw_queries(path: Path):
+    """The same figures computed from chat_logs directly (timestamp index only)."""
+    conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+
+    def run(sql: str, since: datetime, until: datetime) -> None:
+        conn.execute(sql, (since.isoformat(), until.isoformat())).fetchall()
+
+    return {
+        "messages_per_hour": lambda s, u: run(
+            "SELECT substr(timestamp, 1, 13), role, count(*) FROM chat_logs "
+            "WHERE timestamp BETWEEN ? AND ? GROUP BY 1, 2;", s, u),
+        "top_questions": lambda s, u: run(
+            "SELECT lower(trim(substr(message, 1, 200))) q, count(*) n FROM chat_logs "
+            "WHERE timestamp BETWEEN ? AND ? AND role = 'user' GROUP BY q ORDER BY n DESC LIMIT 10;", s, u),
+        "reply_lengths": lambda s, u: run(
+            "SELECT min(length(message) / 100, 20), count(*) FROM chat_logs "
+            "WHERE timestamp BETWEEN ? AND ? AND role = 'assistant' GROUP BY 1;", s, u),
+    }
+
+
+def _queries(path: Path, repeat: int, raw_repeat: int) -> None:
+    from app.database import analytics
+
+    newest = sqlite3.connect(path).execute("SELECT max(timestamp) FROM chat_logs;").fetchone()[0]
+    until  = datetime.fromisoformat(newest)
+    raw    = _raw_queries(path)
+    functions = {
+        "overview":          analytics.overview,
+        "messages_per_hour": analytics.messages_per_hour,
+        "top_questions":     analytics.top_questions,
+        "error_rates":       analytics.error_rates,
+        "reply_lengths":     analytics.reply_lengths,
+    }
+
+    print(f"\n{'query':<18} {'window':>6} {'p50 ms':>8} {'max ms':>8} {'chat_logs scan ms':>18}")
+    for label, span in _WINDOWS:
+        since = until - span
+        for name, fn in functions.items():
+            p50, worst = _time(lambda: fn(since, until), repeat)
+            scan = ""
+            if name in raw:
+                scan_p50, _ = _time(lambda: raw[name](since, until), raw_repeat)
+                scan = f"{scan_p50:18.1f}"
+            print(f"{name:<18} {label:>6} {p50:8.2f} {worst:8.2f} {scan}")
+
+
+# ── Write cost of the trigger ──────────────────────────────────────────────
+
+def _write_cost(tmp: Path) -> None:
+    from app.database import db
+
+    rng  = random.Random(7)
+    now  = datetime.now(tz=timezone.utc)
+    rows = [
+        ("user" if i % 2 == 0 else "assistant", _question(rng) if i % 2 == 0 else "x" * 400,
+         (now + timedelta(seconds=i)).isoformat(), f"s{i // 8}", i % 8)
+        for i in range(50_000)
+    ]
+    for label, trigger in (("without trigger", False), ("with trigger", True)):
+        conn = sqlite3.connect(tmp / f"write-{trigger}.db", isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute(db._CREATE_TABLE_SQL)
+        conn.execute(db._CREATE_INDEX_SQL)
+        conn.execute(db._CREATE_SESSION_INDEX_SQL)
+        if trigger:
+            conn.executescript(db._CREATE_ROLLUPS_SQL)
+            conn.execute(db._CREATE_ROLLUP_TRIGGER_SQL)
+        started = time.perf_counter()
+        for i in range(0, len(rows), 200):
+            conn.execute("BEGIN;")
+            conn.executemany(db._INSERT_SQL, rows[i:i + 200])
+            conn.execute("COMMIT;")
+        elapsed = time.perf_counter() - started
+        conn.close()
+        print(f"writes {label:<16} {len(rows) / elapsed:10,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the admin stats queries on a large chat log.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--db", type=Path, default=None, help="keep (and reuse) the generated database here")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--raw-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-stats-") as tmp:
+        path = args.db or Path(tmp) / "chat_logs.db"
+        os.environ["CHAT_LOG_DB_PATH"] = str(path)
+        if not path.exists():
+            _generate(path, args.rows, args.days)
+
+        from app.database import db
+
+        started = time.perf_counter()
+        db.init_db()        # indexes + rollup backfill on first run
+        print(f"init_db (indexes, rollup backfill if needed): {time.perf_counter() - started:.1f}s")
+        rollup_rows = sum(
+            sqlite3.connect(path).execute(f"SELECT count(*) FROM {t};").fetchone()[0]
+            for t in ("chat_hourly", "chat_reply_lengths", "chat_questions")
+        )
+        print(f"rollup rows: {rollup_rows:,}")
+
+        _queries(path, args.repeat, args.raw_repeat)
+        print()
+        _write_cost(Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+backend/benchmarks/bench_chat_log.py
+
+Caller-side cost of ``log_message``: synchronous INSERT vs. the background
+batch writer.
+
+Each mode logs ``--rows`` rows from ``--threads`` concurrent threads into a
+throw-away database and reports per-call p50/p99 latency as seen by the
+caller, plus how long it took until every row was durable.
+
+Usage
+─────
+    python -m benchmarks.bench_chat_log --rows 20000 --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def _run(db, rows: int, threads: int) -> list[float]:
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def worker(count: int) -> None:
+        local: list[float] = []
+        for i in range(count):
+            started = time.perf_counter()
+            db.log_message("user", f"benchmark message {i}")
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(rows // threads,)) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark chat-log write paths.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-db-") as tmp:
+        os.environ["CHAT_LOG_DB_PATH"] = str(Path(tmp) / "chat_logs.db")
+        from app.database import db
+
+        db.init_db()
+        for mode in ("sync", "batched"):
+            if mode == "batched":
+                db.start_writer()
+            started = time.perf_counter()
+            latencies = _run(db, args.rows, args.threads)
+            if mode == "batched":
+                db.stop_writer()
+            durable = time.perf_counter() - started
+
+            latencies.sort()
+            print(
+                f"{mode:<8} per-call p50 {statistics.median(latencies) * 1e6:8.1f} µs   "
+                f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:8.1f} µs   "
+                f"all rows durable after {durable:6.2f} s"
+            )
+        print(db.writer_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+backend/benchmarks/bench_client.py
+
+Load benchmark: legacy blocking OpenRouter client vs. the pooled async one.
+
+  old  – ``requests.post`` per call (fresh connection every time) run on a
+         40-thread pool, which is the size of Starlette's default threadpool
+         that sync endpoints are dispatched to.
+  new  – ``ask_openrouter`` awaiting on the shared ``httpx.AsyncClient``.
+
+Both paths drive the same local fake OpenRouter server with the same number
+of concurrent callers and report requests/sec plus p50/p99 latency, where
+latency includes any time spent queueing for a worker.
+
+Usage
+─────
+    python -m benchmarks.bench_client --requests 500 --concurrency 100 --latency-ms 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_openrouter import fake_server
+
+_PROMPT = "What projects has Hanzala built?"
+_THREADPOOL_SIZE = 40
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(label: str, latencies: list[float], elapsed: float) -> None:
+    print(
+        f"{label:<4}  {len(latencies) / elapsed:8.1f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:8.1f} ms   "
+        f"p99 {_percentile(latencies, 99) * 1000:8.1f} ms"
+    )
+
+
+# ── Legacy path ─────────────────────────────────────────────────────────────
+
+def _legacy_call(url: str) -> None:
+    import requests
+
+    response = requests.post(
+        url,
+        headers={"Authorization": "Bearer bench", "Content-Type": "application/json"},
+        json={
+            "model":    "fake/model",
+            "messages": [{"role": "user", "content": _PROMPT}],
+        },
+        timeout=30,
+    )
+    response.raise_for_status()
+    response.json()["choices"][0]["message"]["content"].strip()
+
+
+async def _run_old(url: str, total: int, concurrency: int) -> tuple[list[float], float]:
+    loop    = asyncio.get_running_loop()
+    pool    = ThreadPoolExecutor(max_workers=_THREADPOOL_SIZE)
+    gate    = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with gate:
+            started = time.perf_counter()
+            await loop.run_in_executor(pool, _legacy_call, url)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    pool.shutdown()
+    return latencies, elapsed
+
+
+# ── Pooled async path ──────────────────────────────────────────────────────
+
+async def _run_new(total: int, concurrency: int) -> tuple[list[float], float]:
+    from app.services.openrouter_service import ask_openrouter, close_client, open_client
+
+    await open_client()
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with gate:
+            started = time.perf_counter()
+            await ask_openrouter(_PROMPT)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    await close_client()
+    return latencies, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark old vs. new OpenRouter client.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    with fake_server(latency_ms=args.latency_ms) as url:
+        # Module-level config is read at import, so set it before importing.
+        os.environ["OPENROUTER_API_URL"] = url
+        os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+
+        print(
+            f"{args.requests} requests, {args.concurrency} concurrent callers, "
+            f"upstream latency {args.latency_ms:.0f} ms"
+        )
+        _report("old", *asyncio.run(_run_old(url, args.requests, args.concurrency)))
+        _report("new", *asyncio.run(_run_new(args.requests, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+backend/benchmarks/bench_cold_start.py
+
+Cold start: time from spawning the server process until it answers.
+
+Each run starts a fresh server against a fake OpenRouter and a new
+database, then measures, from the moment the process is spawned:
+
+  listen   – the port accepts connections
+  health   – the first ``GET /health`` is answered
+  chat     – the first ``POST /api/chat`` is answered (context rendered,
+             OpenRouter client ready, first row queued for the chat log)
+
+for ``uvicorn app.main:app`` and for ``python -m app.serve --workers 1``.
+Medians over ``--runs`` runs.  For the breakdown by module and startup
+step see ``python -m app.serve --profile-startup``.
+
+Usage
+─────
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_openrouter import _BACKEND_DIR, _free_port, fake_server
+
+_LAUNCHERS = {
+    "uvicorn": ["-m", "uvicorn", "app.main:app"],
+    "serve":   ["-m", "app.serve", "--workers", "1"],
+}
+
+
+def _run(launcher: str, upstream: str) -> dict[str, float]:
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="cold-") as tmp:
+        env = {
+            **os.environ,
+            "OPENROUTER_API_URL": upstream,
+            "OPENROUTER_API_KEY": "bench",
+            "CHAT_LOG_DB_PATH":   str(Path(tmp) / "chat_logs.db"),
+            "RATE_LIMIT_ENABLED": "0",
+            "PREFILTER_ENABLED":  "0",
+        }
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, *_LAUNCHERS[launcher], "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            cwd=_BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                with socket.socket() as probe:
+                    if probe.connect_ex(("127.0.0.1", port)) == 0:
+                        break
+                time.sleep(0.002)
+            listen = time.perf_counter() - started
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+                client.get("/health").raise_for_status()
+                health = time.perf_counter() - started
+                client.post("/api/chat", json={"message": "What projects has Hanzala built?"}).raise_for_status()
+                chat = time.perf_counter() - started
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+    return {"listen": listen * 1000, "health": health * 1000, "chat": chat * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure time to first response from a cold process.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--launchers", default="uvicorn,serve")
+    args = parser.parse_args()
+
+    print(f"{'launcher':<8} {'listen ms':>10} {'health ms':>10} {'chat ms':>10}   (median of {args.runs})")
+    with fake_server(latency_ms=20) as upstream:
+        for launcher in args.launchers.split(","):
+            runs = [_run(launcher, upstream) for _ in range(args.runs)]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            print(f"{launcher:<8} {median['listen']:>10.0f} {median['health']:>10.0f} {median['chat']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
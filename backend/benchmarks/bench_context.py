@@ -0,0 +1,98 @@
+"""
+backend/benchmarks/bench_context.py
+
+Full-context vs. retrieval-mode prompts (``CONTEXT_MODE``).
+
+For every suggestion question (plus a follow-up with history) it reports
+the estimated prompt size in tokens (``assemble_prompt().tokens``) in both modes, then
+runs the backend in each mode against a fake OpenRouter whose time to first
+token grows with prompt length (``--prefill-us`` per prompt token) and
+reports end-to-end ``POST /api/chat`` latency.
+
+Usage
+─────
+    python -m benchmarks.bench_context --rounds 5 --latency-ms 150 --prefill-us 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import httpx
+
+from benchmarks.app_server import app_server
+from benchmarks.fake_openrouter import fake_server
+
+_FOLLOW_UP = {
+    "message": "Which technologies did it use?",
+    "history": [
+        {"role": "user", "content": "Explain the MarketMuse AI project."},
+        {"role": "assistant", "content": "MarketMuse AI is a multi-agent market research platform."},
+    ],
+}
+
+
+def _prompt_sizes(requests: list[dict]) -> dict[str, list[int]]:
+    from app.services import context_builder
+
+    sizes: dict[str, list[int]] = {}
+    for mode in ("full", "retrieval"):
+        context_builder._CONTEXT_MODE = mode
+        sizes[mode] = [
+            context_builder.assemble_prompt(r["message"], history=r.get("history")).tokens
+            for r in requests
+        ]
+    return sizes
+
+
+def _latencies(base_url: str, requests: list[dict], rounds: int) -> list[float]:
+    samples: list[float] = []
+    with httpx.Client(timeout=60) as client:
+        for _ in range(rounds):
+            for body in requests:
+                started = time.perf_counter()
+                client.post(f"{base_url}/api/chat", json=body).raise_for_status()
+                samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark full vs. retrieval context modes.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--prefill-us", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with fake_server(latency_ms=args.latency_ms, prefill_us=args.prefill_us) as upstream:
+        results: dict[str, list[float]] = {}
+        requests: list[dict] = []
+        for mode in ("full", "retrieval"):
+            env = {"CONTEXT_MODE": mode, "ANSWER_CACHE_ENABLED": "0"}
+            with app_server(upstream, env=env) as base_url:
+                if not requests:
+                    questions = httpx.get(f"{base_url}/api/chat/suggestions").json()["questions"]
+                    requests = [{"message": q} for q in questions] + [_FOLLOW_UP]
+                results[mode] = _latencies(base_url, requests, args.rounds)
+
+    sizes = _prompt_sizes(requests)
+
+    print(f"{'question':<50} {'full':>7} {'retrieval':>10}   (est. prompt tokens)")
+    for index, body in enumerate(requests):
+        label = body["message"] + (" [+history]" if body.get("history") else "")
+        print(f"{label[:50]:<50} {sizes['full'][index]:>7} {sizes['retrieval'][index]:>10}")
+    print(
+        f"{'mean':<50} {statistics.mean(sizes['full']):>7.0f} "
+        f"{statistics.mean(sizes['retrieval']):>10.0f}"
+    )
+    print()
+    for mode, samples in results.items():
+        print(
+            f"{mode:<10} end-to-end p50 {statistics.median(samples) * 1000:7.1f} ms   "
+            f"mean {statistics.mean(samples) * 1000:7.1f} ms   ({len(samples)} requests)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+backend/benchmarks/bench_evaluate.py
+
+Throughput and memory of the batch evaluation runner (``python -m
+app.evaluate``) against a fake OpenRouter.
+
+Runs ``--sizes`` questions (each with a four-turn history) and reports
+throughput, latency and the runner's peak RSS, which should stay flat as
+the input grows.  On a small machine throughput is bound by the CPU the
+runner and the fake server share, not by the upstream.
+
+Usage
+─────
+    python -m benchmarks.bench_evaluate --sizes 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.fake_openrouter import _BACKEND_DIR, fake_server
+
+_HISTORY = [
+    {"role": "user", "content": "What projects has Hanzala built? " * 6},
+    {"role": "assistant", "content": "He built MarketMuse AI and a RAG assistant. " * 6},
+    {"role": "user", "content": "Which of them used LangChain? " * 6},
+    {"role": "assistant", "content": "The RAG document assistant did. " * 6},
+]
+
+
+def _questions(path: Path, count: int) -> Path:
+    with open(path, "w", encoding="utf-8") as handle:
+        for i in range(count):
+            item = {"id": f"q{i}", "question": f"Tell me about his project number {i}?", "history": _HISTORY}
+            handle.write(json.dumps(item) + "\n")
+    return path
+
+
+def _run(questions: Path, out: Path, upstream: str, concurrency: int) -> tuple[dict, int]:
+    """Run the runner to completion; return its summary and peak RSS in MiB."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.evaluate", str(questions), "-o", str(out), "--api-url", upstream,
+         "--concurrency", str(concurrency), "--progress", "0"],
+        cwd=_BACKEND_DIR, env={**os.environ, "OPENROUTER_API_KEY": "bench"},
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    _, status, usage = os.wait4(proc.pid, 0)
+    stderr = proc.stderr.read()
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise SystemExit(stderr)
+    return json.loads(stderr[stderr.index("\n{") + 1:]), usage.ru_maxrss // 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the batch evaluation runner.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"{'questions':>10} {'input MiB':>10} {'seconds':>8} {'per s':>7} {'p50 ms':>7} {'peak RSS MiB':>13}")
+    with tempfile.TemporaryDirectory(prefix="bench-evaluate-") as tmp, \
+            fake_server(latency_ms=args.latency_ms) as upstream:
+        for count in args.sizes:
+            questions = _questions(Path(tmp) / f"{count}.jsonl", count)
+            summary, rss = _run(questions, Path(tmp) / f"{count}.out.jsonl", upstream, args.concurrency)
+            print(f"{count:>10,} {questions.stat().st_size / 2**20:>10.1f} {summary['seconds']:>8.1f} "
+                  f"{summary['per_second']:>7.0f} {summary['latency']['p50_ms']:>7} {rss:>13}")
+
+
+if __name__ == "__main__":
+    main()
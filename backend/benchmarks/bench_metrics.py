@@ -0,0 +1,152 @@
+"""
+backend/benchmarks/bench_metrics.py
+
+Cost of the ``/metrics`` instrumentation.
+
+End-to-end A/B timing cannot resolve microseconds next to an upstream
+call, so the overhead is measured bottom-up:
+
+  1. the unit cost of every recording primitive (a timed ``observe``,
+     ``count_error``, the in-flight gauge, the httpx trace hook, the
+     request-clock middleware);
+  2. how many of each one ``POST /api/chat`` actually performs, counted
+     over ``--requests`` in-process requests against the fake OpenRouter;
+  3. their product — the instrumentation cost per request — and the cost
+     of rendering ``/metrics`` for a scrape.
+
+Usage
+─────
+    python -m benchmarks.bench_metrics --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_openrouter import fake_server
+
+
+def _per_call(fn, loops: int = 200_000) -> float:
+    """Best-of-5 cost of ``fn()`` in nanoseconds."""
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best * 1e9
+
+
+def _per_await(fn, loops: int = 200_000) -> float:
+    async def run() -> float:
+        started = time.perf_counter()
+        for _ in range(loops):
+            await fn()
+        return (time.perf_counter() - started) / loops
+
+    return min(asyncio.run(run()) for _ in range(5)) * 1e9
+
+
+def _unit_costs() -> dict[str, float]:
+    from app.services import metrics
+    from app.services.openrouter_service import _ConnectTrace
+
+    def timed_observe() -> None:
+        started = time.perf_counter()
+        metrics.observe("bench_observe", time.perf_counter() - started)
+
+    def gauge_pair() -> None:
+        metrics.in_flight(1)
+        metrics.in_flight(-1)
+
+    trace = _ConnectTrace()
+
+    async def noop_app(scope, receive, send) -> None:
+        return None
+
+    middleware = metrics.RequestClockMiddleware(noop_app)
+    scope = {"type": "http"}
+
+    costs = {
+        "timed observe": _per_call(timed_observe),
+        "count_error":   _per_call(lambda: metrics.count_error("bench")),
+        "in_flight ±1":  _per_call(gauge_pair),
+        "prompt_tokens": _per_call(lambda: metrics.observe_prompt_tokens(2000)),
+        "trace event":   _per_await(lambda: trace("http11.send_request_headers.started", {})),
+        "middleware":    _per_await(lambda: middleware(scope, None, None)),
+    }
+    metrics._stages.pop("bench_observe", None)
+    metrics._errors.pop("bench", None)
+    return costs
+
+
+def _calls_per_request(requests: int) -> dict[str, float]:
+    """Run real /api/chat requests in-process and count recording calls."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services import metrics, openrouter_service
+
+    trace_events = 0
+    original = openrouter_service._ConnectTrace.__call__
+
+    async def counting(self, event, info):
+        nonlocal trace_events
+        trace_events += 1
+        await original(self, event, info)
+
+    openrouter_service._ConnectTrace.__call__ = counting
+    try:
+        with TestClient(app) as client:
+            for i in range(requests):
+                client.post("/api/chat", json={"message": f"What projects has Hanzala built? #{i}"})
+    finally:
+        openrouter_service._ConnectTrace.__call__ = original
+
+    observes = sum(h.count for h in metrics._stages.values())
+    return {
+        "timed observe": observes / requests,
+        "count_error":   0.0,
+        "in_flight ±1":  1.0,
+        "prompt_tokens": 1.0,
+        "trace event":   trace_events / requests,
+        "middleware":    1.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark metrics instrumentation overhead.")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-db-") as tmp, fake_server(latency_ms=5) as upstream:
+        os.environ.update({
+            "CHAT_LOG_DB_PATH":     str(Path(tmp) / "chat_logs.db"),
+            "OPENROUTER_API_URL":   upstream,
+            "OPENROUTER_API_KEY":   "bench",
+            "ANSWER_CACHE_ENABLED": "0",
+            "PREFILTER_ENABLED":    "0",
+        })
+        costs = _unit_costs()
+        calls = _calls_per_request(args.requests)
+
+        from app.services import metrics
+        render_us = _per_call(metrics.render, loops=200) / 1000
+
+    total = 0.0
+    print(f"{'primitive':<15} {'ns/call':>9} {'calls/request':>14} {'ns/request':>11}")
+    for name, cost in costs.items():
+        per_request = cost * calls[name]
+        total += per_request
+        print(f"{name:<15} {cost:9.0f} {calls[name]:14.1f} {per_request:11.0f}")
+    print(f"{'total':<15} {'':>9} {'':>14} {total:11.0f}   (= {total / 1000:.1f} µs per request)")
+    print(f"render /metrics: {render_us:.0f} µs per scrape")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+backend/benchmarks/bench_models.py
+
+Model pool fallback and hedged requests (``OPENROUTER_MODELS``,
+``OPENROUTER_HEDGE``).
+
+  1. fallback — with ``model-a`` failing every call, and then with it
+                slower than its per-model timeout, every request is still
+                answered by ``model-b``.
+  2. hedging  — both models share a latency distribution with a tail
+                (``--tail-rate`` of calls take ``--tail-ms`` longer).  Runs
+                ``--requests`` ``POST /api/chat`` calls at ``--concurrency``
+                with hedging off and on, and reports p50/p95/p99/max plus
+                the number of upstream calls each mode cost.
+
+Usage
+─────
+    python -m benchmarks.bench_models --requests 400 --tail-rate 0.03 --tail-ms 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.app_server import admin_status, app_server
+from benchmarks.fake_openrouter import fake_server
+
+_ENV = {
+    "ANSWER_CACHE_ENABLED": "0",
+    "OPENROUTER_COALESCE":  "0",
+    "OPENROUTER_RETRIES":   "0",
+}
+_BODY = {"message": "What projects has Hanzala built?"}
+
+
+def _control(upstream: str, path: str) -> str:
+    return upstream.split("/api/")[0] + path
+
+
+async def _load(base_url: str, count: int, concurrency: int) -> list[tuple[int, float]]:
+    results: list[tuple[int, float]] = []
+    queue = iter(range(count))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for _ in queue:
+            started  = time.perf_counter()
+            response = await client.post(f"{base_url}/api/chat", json=_BODY)
+            results.append((response.status_code, time.perf_counter() - started))
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return results
+
+
+def _fallback(upstream: str) -> None:
+    faults = _control(upstream, "/faults")
+    env = {**_ENV, "OPENROUTER_MODELS": "model-a@0.5,model-b"}
+    cases = [
+        ("model-a failing",      {"fail_models": ["model-a"], "model_latency_ms": {}}),
+        ("model-a over timeout", {"fail_models": [], "model_latency_ms": {"model-a": 3000}}),
+    ]
+    for label, fault in cases:
+        httpx.post(faults, json=fault)
+        with app_server(upstream, env=env) as base_url:      # fresh breakers per case
+            before  = httpx.get(_control(upstream, "/stats")).json()["by_model"]
+            results = asyncio.run(_load(base_url, 20, 5))
+            after   = httpx.get(_control(upstream, "/stats")).json()["by_model"]
+        ok    = sum(status == 200 for status, _ in results)
+        calls = {m: after.get(m, 0) - before.get(m, 0) for m in ("model-a", "model-b")}
+        print(
+            f"fallback, {label:<21} {ok}/{len(results)} ok, "
+            f"p50 {statistics.median(t for _, t in results) * 1000:6.0f} ms, upstream calls {calls}"
+        )
+        assert ok == len(results), "fallback did not answer every request"
+    httpx.post(faults, json={"fail_models": [], "model_latency_ms": {}})
+
+
+def _hedging(upstream: str, count: int, concurrency: int) -> None:
+    for hedge in ("0", "1"):
+        env = {**_ENV, "OPENROUTER_MODELS": "model-a,model-b", "OPENROUTER_HEDGE": hedge}
+        with app_server(upstream, env=env) as base_url:
+            asyncio.run(_load(base_url, 50, concurrency))          # warm the histograms
+            before   = httpx.get(_control(upstream, "/stats")).json()["requests"]
+            results  = asyncio.run(_load(base_url, count, concurrency))
+            calls    = httpx.get(_control(upstream, "/stats")).json()["requests"] - before
+            client   = admin_status(base_url)["openrouter"]
+        samples = sorted(t for _, t in results)
+        pick = lambda q: samples[min(int(len(samples) * q), len(samples) - 1)] * 1000  # noqa: E731
+        print(
+            f"hedge={hedge}  p50 {pick(0.50):6.0f} ms  p95 {pick(0.95):6.0f} ms  "
+            f"p99 {pick(0.99):6.0f} ms  max {samples[-1] * 1000:6.0f} ms   "
+            f"upstream calls {calls} for {len(results)} requests "
+            f"(hedged {client['hedged']}, hedge won {client['hedge_wins']}, "
+            f"model-a hedge delay {client['models']['model-a']['hedge_delay_s'] * 1000:.0f} ms)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark model fallback and hedged requests.")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--tail-ms", type=float, default=3000.0)
+    args = parser.parse_args()
+
+    with fake_server(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tail_rate=args.tail_rate,
+        tail_ms=args.tail_ms,
+    ) as upstream:
+        _fallback(upstream)
+        _hedging(upstream, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
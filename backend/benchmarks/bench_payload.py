@@ -0,0 +1,96 @@
+"""
+backend/benchmarks/bench_payload.py
+
+Cost of turning a question into an OpenRouter request body, per request.
+
+  build      — ``assemble_prompt`` (context + fitted history + question).
+  serialize  — producing the request body bytes.
+
+Three ways of doing it are compared, on the same questions and history:
+
+  dict + json.dumps  the previous path: join the prompt into one string,
+                     ``strip()`` it, put it in a payload dict and encode it
+                     the way ``httpx``'s ``json=`` does.
+  escape per call    ``_encode_payload`` with the context escaped on every
+                     call (what a plain-string prompt or a retrieval-mode
+                     context costs).
+  pre-escaped        ``_encode_payload`` splicing the context fragment that
+                     is escaped once per resume version (full mode).
+
+Every body is checked to be byte-identical to the ``dict + json.dumps`` one.
+
+Usage
+─────
+    python -m benchmarks.bench_payload --loops 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+_QUESTION = "Tell me more about MarketMuse AI — which \"agents\" does it run?"
+_HISTORY  = [
+    {"role": "user", "content": "What projects has Hanzala built?"},
+    {"role": "assistant", "content": "He has built MarketMuse AI, a multi-agent market research platform, "
+                                     "and a RAG-based document assistant, among others."},
+]
+
+
+def _per_call(fn, loops: int) -> float:
+    """Best-of-5 cost of ``fn()`` in microseconds."""
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark prompt build + request body serialization.")
+    parser.add_argument("--loops", type=int, default=20_000)
+    args = parser.parse_args()
+
+    from app.services.context_builder import assemble_prompt
+    from app.services.openrouter_service import PromptParts, _encode_payload
+
+    model = "mistralai/mistral-7b-instruct"
+
+    def previous_build() -> str:
+        return assemble_prompt(_QUESTION, history=_HISTORY).text          # one joined string
+
+    def previous_serialize(text: str) -> bytes:
+        payload = {
+            "model":       model,
+            "messages":    [{"role": "user", "content": text.strip()}],
+            "max_tokens":  512,
+            "temperature": 0.7,
+        }
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+    parts     = assemble_prompt(_QUESTION, history=_HISTORY).parts
+    unescaped = PromptParts(parts.context, parts.tail)
+    reference = previous_serialize(parts.text)
+    assert _encode_payload(parts, 512, 0.7, model=model) == reference
+    assert _encode_payload(unescaped, 512, 0.7, model=model) == reference
+
+    text  = previous_build()
+    build_joined = _per_call(previous_build, args.loops)
+    build_parts  = _per_call(lambda: assemble_prompt(_QUESTION, history=_HISTORY).parts, args.loops)
+    rows = [
+        ("dict + json.dumps", build_joined, _per_call(lambda: previous_serialize(text), args.loops)),
+        ("escape per call",   build_parts,  _per_call(lambda: _encode_payload(unescaped, 512, 0.7, model=model), args.loops)),
+        ("pre-escaped",       build_parts,  _per_call(lambda: _encode_payload(parts, 512, 0.7, model=model), args.loops)),
+    ]
+
+    print(f"request body: {len(reference)} bytes (context {len(parts.context)} chars, tail {len(parts.tail)} chars)")
+    print(f"{'path':<18} {'build µs':>9} {'serialize µs':>13} {'total µs':>9}")
+    for name, build, serialize in rows:
+        print(f"{name:<18} {build:9.1f} {serialize:13.1f} {build + serialize:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
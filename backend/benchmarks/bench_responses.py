@@ -0,0 +1,227 @@
+"""
+backend/benchmarks/bench_responses.py
+
+What it costs to turn a route's return value into bytes on the wire, per
+request, before and after api/responses.py and services/compression.py.
+
+  1. serialize — a whole in-process ASGI request (routing, handler,
+                 encoding, no network) per payload, for the default FastAPI
+                 path (``response_model`` re-validation + ``jsonable_encoder``
+                 + ``JSONResponse``) and for a returned ``FastJSONResponse``;
+                 then the encoders alone: Starlette's ``json.dumps``, the
+                 stdlib fallback and ``orjson`` (when installed).
+  2. wire      — body bytes and compression time per response for identity,
+                 gzip and Brotli (when installed) at the configured and the
+                 maximum levels.  Payloads: a short and a long chat answer,
+                 the suggestions, ``/api/admin/status``, and an admin search
+                 page.
+  3. streams   — an SSE response sent through ``CompressionMiddleware`` with
+                 ``Accept-Encoding: gzip, br`` arrives uncompressed and in as
+                 many chunks as were sent.
+
+Usage
+─────
+    python -m benchmarks.bench_responses --loops 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import time
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.responses import StreamingResponse
+
+_SHORT = ("Hanzala has built several production AI systems, including MarketMuse AI, a multi-agent "
+          "market research platform, and a RAG-based document assistant.")
+_LONG  = " ".join([_SHORT, "He built the backend in FastAPI with async OpenRouter calls, a SQLite chat "
+                   "log, retrieval over resume chunks and a Next.js frontend — deployed on Render "
+                   "and Vercel, with caching, rate limiting and Prometheus metrics."] * 4)
+
+
+def _payloads() -> dict[str, Any]:
+    import app.main  # noqa: F401  (registers the status sections)
+    from app.api.admin import status
+    from app.services import warm_answers
+
+    search_page = {
+        "total": 1284, "offset": 0, "limit": 20, "next_offset": 20, "partial": False,
+        "results": [
+            {"id": 90_000 + i, "role": "assistant", "timestamp": f"2026-10-{i % 28 + 1:02d}T12:00:00+00:00",
+             "session_id": f"session-{i:04d}", "turn": i % 8,
+             "snippet": "…a multi-agent <mark>market</mark> research platform built on FastAPI and "
+                        "LangChain, with retrieval over company filings…",
+             "score": -7.5 + i / 10}
+            for i in range(20)
+        ],
+    }
+    return {
+        "chat (short)": {"response": _SHORT, "session_id": "0f8fad5b-d9cb-469f-a165-70867728950e"},
+        "chat (long)":  {"response": _LONG, "session_id": "0f8fad5b-d9cb-469f-a165-70867728950e"},
+        "suggestions":  {"questions": list(warm_answers.SUGGESTIONS), "warm": []},
+        "admin status": asyncio.run(status()),
+        "admin search": search_page,
+    }
+
+
+# ── Serialization ──────────────────────────────────────────────────────────
+
+def _apps(payload: dict[str, Any]) -> dict[str, FastAPI]:
+    from app.api.chat import ChatResponse
+    from app.api.responses import FastJSONResponse
+
+    default, fast = FastAPI(), FastAPI()
+    if set(payload) == {"response", "session_id"}:
+        @default.get("/", response_model=ChatResponse)
+        async def chat_default() -> ChatResponse:
+            return ChatResponse(**payload)
+    else:
+        @default.get("/")
+        async def dict_default() -> dict:
+            return payload
+
+    @fast.get("/", response_class=FastJSONResponse)
+    async def fast_response() -> FastJSONResponse:
+        return FastJSONResponse(payload)
+
+    return {"default": default, "FastJSONResponse": fast}
+
+
+async def _request(app: Any, headers: list[tuple[bytes, bytes]] | None = None) -> list[dict]:
+    sent: list[dict] = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+        "headers": headers or [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+
+    received = False
+
+    async def receive() -> dict:
+        nonlocal received
+        if received:                    # a streaming response waits here for a disconnect
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def _per_request(app: FastAPI, loops: int) -> float:
+    """Best-of-5 µs per in-process request."""
+    async def run() -> float:
+        await _request(app)
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(loops):
+                await _request(app)
+            best = min(best, (time.perf_counter() - started) / loops)
+        return best * 1e6
+    return asyncio.run(run())
+
+
+def _per_call(fn, loops: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best * 1e6
+
+
+def _serialize(payloads: dict[str, Any], loops: int) -> None:
+    from app.api import responses
+
+    print(f"{'payload':<14} {'bytes':>6} {'default µs':>11} {'fast µs':>9} {'saved µs':>9}"
+          f"   (whole request, FastJSONResponse encoder: {responses.JSON_ENCODER})")
+    for name, payload in payloads.items():
+        apps  = _apps(payload)
+        times = {label: _per_request(app, loops) for label, app in apps.items()}
+        size  = len(responses.dumps(payload))
+        print(f"{name:<14} {size:>6} {times['default']:>11.1f} {times['FastJSONResponse']:>9.1f}"
+              f" {times['default'] - times['FastJSONResponse']:>9.1f}")
+
+    encoders = {"starlette": lambda p: JSONResponse(p).body, "stdlib": lambda p: responses._encode(p).encode()}
+    if responses.orjson is not None:
+        encoders["orjson"] = lambda p: responses.orjson.dumps(p, option=responses.orjson.OPT_NON_STR_KEYS)
+    print(f"\n{'encoder µs':<14} " + " ".join(f"{label:>10}" for label in encoders))
+    for name, payload in payloads.items():
+        print(f"{name:<14} " + " ".join(f"{_per_call(lambda: fn(payload), loops):>10.2f}"
+                                        for fn in encoders.values()))
+
+
+# ── Bytes on the wire ──────────────────────────────────────────────────────
+
+def _wire(payloads: dict[str, Any], loops: int) -> None:
+    from app.api.responses import dumps
+    from app.services import compression
+
+    codecs = {
+        f"gzip {compression._GZIP_LEVEL}": lambda b: gzip.compress(b, compression._GZIP_LEVEL, mtime=0),
+        "gzip 9": lambda b: gzip.compress(b, 9, mtime=0),
+    }
+    if compression.brotli is not None:
+        codecs[f"br {compression._BROTLI_QUALITY}"] = lambda b: compression.brotli.compress(
+            b, quality=compression._BROTLI_QUALITY)
+        codecs["br 11"] = lambda b: compression.brotli.compress(b, quality=11)
+    else:
+        print("(brotli is not installed: gzip only)")
+
+    print(f"\n{'bytes / µs':<14} {'identity':>9} " + " ".join(f"{label:>15}" for label in codecs)
+          + f"   (sent as is below {compression._MIN_SIZE} bytes)")
+    for name, payload in payloads.items():
+        body  = dumps(payload)
+        cells = []
+        for fn in codecs.values():
+            cost = _per_call(lambda: fn(body), max(1, loops // 10))
+            cells.append(f"{len(fn(body)):>6} {cost:>6.1f}µs")
+        print(f"{name:<14} {len(body):>9} " + " ".join(f"{cell:>15}" for cell in cells))
+
+
+# ── Streams stay uncompressed ──────────────────────────────────────────────
+
+def _streams() -> None:
+    from app.api.chat import _sse
+    from app.services.compression import CompressionMiddleware
+
+    frames = [_sse("token", {"token": f" word{i}"}) for i in range(200)]
+
+    async def events():
+        for frame in frames:
+            yield frame
+
+    async def app(scope, receive, send):
+        await StreamingResponse(events(), media_type="text/event-stream")(scope, receive, send)
+
+    sent   = asyncio.run(_request(CompressionMiddleware(app), [(b"accept-encoding", b"gzip, br")]))
+    bodies = [m["body"] for m in sent if m["type"] == "http.response.body" and m.get("body")]
+    start  = dict(sent[0]["headers"])
+    assert b"content-encoding" not in start, start
+    assert bodies == frames, "SSE frames were altered or merged"
+    print(f"\nSSE through CompressionMiddleware: {len(bodies)} frames in, {len(bodies)} chunks out, uncompressed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression.")
+    parser.add_argument("--loops", type=int, default=5_000)
+    args = parser.parse_args()
+
+    payloads = _payloads()
+    _serialize(payloads, args.loops)
+    _wire(payloads, args.loops)
+    _streams()
+
+
+if __name__ == "__main__":
+    main()
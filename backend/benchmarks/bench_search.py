@@ -0,0 +1,282 @@
+"""
+backend/benchmarks/bench_search.py
+
+Full-text search over the chat log (app/database/search.py): query latency
+against a ``LIKE '%…%'`` scan, what the index costs the writer, and how the
+backfill of an existing log shares the database with inserts.
+
+  1. generate  — ``--rows`` chat_logs rows over ``--days``: the question mix
+                 of bench_admin_stats, and replies of ~70 words drawn from a
+                 resume vocabulary with a Zipf tail, some of them naming
+                 MarketMuse, RAG or rarer technologies.  Rows are bulk-loaded
+                 with no search index, as in a database that predates it.
+                 Pass ``--db`` to keep the file and reuse it.
+  2. backfill  — the index is added and the old rows indexed in chunks
+                 (``search.backfill``) while a second thread keeps inserting
+                 200-row batches through ``db.log_message``'s path: backfill
+                 rows/s, the longest chunk, and the insert batches' p50 / max
+                 next to the same inserts with the database idle.
+  3. queries   — ``search()`` p50 for frequent, rarer and phrase queries
+                 over all time, 30 days and 24 hours, next to
+                 ``LIKE '%term%'`` returning the same count and first page;
+                 then deeper pages of one query.
+  4. writes    — batched inserts of 50 000 rows (200 per transaction) with
+                 the rollup trigger only and with the search triggers too,
+                 and the size of each database.
+
+Usage
+─────
+    python -m benchmarks.bench_search --rows 1000000 --db /tmp/chat_logs_search.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from benchmarks.bench_admin_stats import _question
+
+_VOCABULARY = (
+    "python fastapi react nextjs typescript postgres mongodb docker aws azure gcp "
+    "langchain openai embeddings vector database pipeline agents llm model prompt "
+    "retrieval project built deployed production team client latency dashboard api "
+    "experience skills research market analysis data scraping automation testing "
+    "he his the and with for using across a of to in on"
+).split()
+
+_NAMED = [("MarketMuse", 0.03), ("RAG", 0.05), ("Kubernetes", 0.002), ("Rust", 0.0005)]
+
+_QUERIES = [
+    ("frequent", "python"),
+    ("named", "MarketMuse"),
+    ("named", "RAG"),
+    ("rare", "Kubernetes"),
+    ("rarest", "Rust"),
+    ("phrase", '"vector database"'),
+    ("prefix", "deploy*"),
+]
+
+_WINDOWS = [("all", None), ("30d", timedelta(days=30)), ("24h", timedelta(hours=24))]
+
+
+# ── Data generation ────────────────────────────────────────────────────────
+
+def _reply(rng: random.Random) -> str:
+    words = [
+        _VOCABULARY[min(int(rng.paretovariate(0.9)) - 1, len(_VOCABULARY) - 1)]
+        if rng.random() < 0.9 else f"term{rng.randrange(20000)}"
+        for _ in range(max(10, int(rng.gauss(70, 25))))
+    ]
+    for name, share in _NAMED:
+        if rng.random() < share:
+            words.insert(rng.randrange(len(words)), name)
+    return " ".join(words).capitalize() + "."
+
+
+def _rows(rng: random.Random, count: int, start: datetime, step: timedelta):
+    for i in range(0, count, 2):
+        ts      = (start + step * i).isoformat()
+        session = f"s{i // 8}"
+        yield ("user", _question(rng), ts, session, i % 8)
+        yield ("assistant", _reply(rng), ts, session, i % 8 + 1)
+
+
+def _generate(path: Path, rows: int, days: int) -> None:
+    from app.database import db
+
+    db.init_db()
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=OFF;")
+    conn.executescript(db._DROP_SEARCH_SQL)     # a log from before the index
+
+    rng     = random.Random(42)
+    end     = datetime.now(tz=timezone.utc)
+    start   = end - timedelta(days=days)
+    started = time.perf_counter()
+    batch: list[tuple] = []
+    for row in _rows(rng, rows, start, (end - start) / rows):
+        batch.append(row)
+        if len(batch) >= 100_000:
+            conn.execute("BEGIN;")
+            conn.executemany(db._INSERT_SQL, batch)
+            conn.execute("COMMIT;")
+            batch = []
+    if batch:
+        conn.execute("BEGIN;")
+        conn.executemany(db._INSERT_SQL, batch)
+        conn.execute("COMMIT;")
+    conn.close()
+    print(f"generated {rows:,} rows over {days} days in {time.perf_counter() - started:.0f}s")
+
+
+# ── Backfill next to inserts ───────────────────────────────────────────────
+
+def _insert_batches(stop: threading.Event, samples: list[float], limit: int | None = None) -> None:
+    """200-row batches through the writer's path until ``stop`` (or ``limit`` batches)."""
+    from app.database import db
+
+    rng = random.Random(len(samples))
+    now = datetime.now(tz=timezone.utc)
+    while not stop.is_set() and (limit is None or len(samples) < limit):
+        batch = list(_rows(rng, 200, now, timedelta(0)))
+        started = time.perf_counter()
+        db._write_rows(batch)
+        samples.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.01)
+
+
+def _backfill(path: Path) -> None:
+    from app.database import db, search
+
+    idle: list[float] = []
+    _insert_batches(threading.Event(), idle, limit=100)
+
+    with db.connection() as conn:
+        with db.immediate(conn):
+            db._create_search(conn)
+        done, upto = conn.execute("SELECT done, upto FROM chat_search_backfill;").fetchone()
+
+    busy: list[float] = []
+    stop = threading.Event()
+    inserter = threading.Thread(target=_insert_batches, args=(stop, busy))
+    inserter.start()
+    started = time.perf_counter()
+    indexed = search.backfill()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    inserter.join()
+    with db.connection() as conn:   # the inserted rows would crowd the newest day of the queries below
+        conn.execute("DELETE FROM chat_logs WHERE id > ?;", (upto,))
+
+    stats = search.search_stats()
+    print(f"backfill: {indexed:,} rows (ids {done}..{upto}) in {elapsed:.1f}s = {indexed / elapsed:,.0f} rows/s, "
+          f"{stats['chunks']} chunks, longest {stats['max_lock_ms']:.1f} ms")
+    print(f"insert batch (200 rows) while idle:        p50 {statistics.median(idle):6.2f} ms  "
+          f"max {max(idle):6.2f} ms  ({len(idle)} batches)")
+    print(f"insert batch (200 rows) during backfill:   p50 {statistics.median(busy):6.2f} ms  "
+          f"max {max(busy):6.2f} ms  ({len(busy)} batches)")
+    check = sqlite3.connect(path)
+    check.execute("INSERT INTO chat_search (chat_search, rank) VALUES ('integrity-check', 1);")
+    check.close()
+    print("integrity-check: ok")
+
+
+# ── Queries ────────────────────────────────────────────────────────────────
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _like(conn: sqlite3.Connection, term: str, since: str | None) -> int:
+    """What the admin API needed before: a count and the newest page, by LIKE scan."""
+    pattern = f"%{term.strip(chr(34)).rstrip('*')}%"
+    where   = "message LIKE ?" + (" AND timestamp >= ?" if since else "")
+    params  = (pattern, since) if since else (pattern,)
+    total   = conn.execute(f"SELECT count(*) FROM chat_logs WHERE {where};", params).fetchone()[0]
+    conn.execute(f"SELECT id, message FROM chat_logs WHERE {where} ORDER BY id DESC LIMIT 20;", params).fetchall()
+    return total
+
+
+def _queries(path: Path, repeat: int, like_repeat: int) -> None:
+    from app.database import search
+
+    conn   = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+    newest = datetime.fromisoformat(conn.execute("SELECT max(timestamp) FROM chat_logs;").fetchone()[0])
+
+    print(f"\n{'query':<20} {'window':>6} {'matches':>9} {'search ms':>10} {'LIKE ms':>9} {'LIKE count':>11}")
+    for kind, query in _QUERIES:
+        for label, span in _WINDOWS:
+            since = None if span is None else newest - span
+            total = search.search(query, since=since)["total"]
+            fts   = _time(lambda: search.search(query, since=since), repeat)
+            like_total = _like(conn, query, since and since.isoformat())
+            like  = _time(lambda: _like(conn, query, since and since.isoformat()), like_repeat)
+            print(f"{kind + ' ' + query:<20} {label:>6} {total:>9,} {fts:>10.2f} {like:>9.1f} {like_total:>11,}")
+
+    print(f"\n{'pages of RAG':<20} {'offset':>6} {'rank ms':>10} {'newest ms':>10}")
+    for offset in (0, 100, 1000, 10_000):
+        rank   = _time(lambda: search.search("RAG", offset=offset), repeat)
+        newest = _time(lambda: search.search("RAG", order="newest", offset=offset), repeat)
+        print(f"{'':<20} {offset:>6} {rank:>10.2f} {newest:>10.2f}")
+
+
+# ── Write cost of the index ────────────────────────────────────────────────
+
+def _write_cost(tmp: Path) -> None:
+    from app.database import db
+
+    rng  = random.Random(7)
+    rows = list(_rows(rng, 50_000, datetime.now(tz=timezone.utc), timedelta(seconds=1)))
+    for label, indexed in (("rollups only", False), ("rollups + search", True)):
+        path = tmp / f"write-{indexed}.db"
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute(db._CREATE_TABLE_SQL)
+        conn.execute(db._CREATE_INDEX_SQL)
+        conn.execute(db._CREATE_SESSION_INDEX_SQL)
+        conn.executescript(db._CREATE_ROLLUPS_SQL)
+        conn.execute(db._CREATE_ROLLUP_TRIGGER_SQL)
+        if indexed:
+            conn.executescript(db._CREATE_SEARCH_SQL)
+            for trigger in db._CREATE_SEARCH_TRIGGERS_SQL:
+                conn.execute(trigger)
+        samples = []
+        started = time.perf_counter()
+        for i in range(0, len(rows), 200):
+            batch_started = time.perf_counter()
+            conn.execute("BEGIN;")
+            conn.executemany(db._INSERT_SQL, rows[i:i + 200])
+            conn.execute("COMMIT;")
+            samples.append((time.perf_counter() - batch_started) * 1000)
+        elapsed = time.perf_counter() - started
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        conn.close()
+        print(f"writes {label:<17} {len(rows) / elapsed:10,.0f} rows/s   batch p50 {statistics.median(samples):5.2f} ms"
+              f"   file {path.stat().st_size / 2**20:6.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark full-text search over the chat log.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--db", type=Path, default=None, help="keep (and reuse) the generated database here")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--like-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-search-") as tmp:
+        path = args.db or Path(tmp) / "chat_logs.db"
+        os.environ["CHAT_LOG_DB_PATH"] = str(path)
+        os.environ["CHAT_LOG_SEARCH"]  = "1"
+        if not path.exists():
+            _generate(path, args.rows, args.days)
+
+        from app.database import db
+
+        db.init_db()
+        if sqlite3.connect(path).execute("SELECT 1 FROM chat_search_backfill;").fetchone() is None:
+            print("index already built (reused --db); skipping the backfill step")
+        else:
+            _backfill(path)
+        _queries(path, args.repeat, args.like_repeat)
+        print()
+        _write_cost(Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+backend/benchmarks/bench_stream.py
+
+Time to first byte: ``POST /api/chat`` vs. ``POST /api/chat/stream``.
+
+Starts the backend against a fake OpenRouter that takes ``--latency-ms`` to
+produce its first token and ``--token-ms`` per following word, then issues
+sequential requests to both routes and reports the time until the first
+answer byte (for the stream: the first ``token`` event) and until the
+complete answer.  The streamed answer is checked against the full one.
+
+Usage
+─────
+    python -m benchmarks.bench_stream --requests 20 --latency-ms 300 --token-ms 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.app_server import app_server
+from benchmarks.fake_openrouter import fake_server
+
+_BODY = {"message": "What projects has Hanzala built?"}
+
+
+def _full(client: httpx.Client, base_url: str) -> tuple[float, float, str]:
+    started = time.perf_counter()
+    response = client.post(f"{base_url}/api/chat", json=_BODY)
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed, response.json()["response"]
+
+
+def _streamed(client: httpx.Client, base_url: str) -> tuple[float, float, str]:
+    started = time.perf_counter()
+    first   = 0.0
+    tokens: list[str] = []
+    event   = ""
+    with client.stream("POST", f"{base_url}/api/chat/stream", json=_BODY) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:") and event == "token":
+                if not tokens:
+                    first = time.perf_counter() - started
+                tokens.append(json.loads(line[5:])["token"])
+            elif line.startswith("data:") and event == "error":
+                raise RuntimeError(line)
+    return first, time.perf_counter() - started, "".join(tokens)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark streamed vs. full chat responses.")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    with fake_server(latency_ms=args.latency_ms, token_ms=args.token_ms) as upstream, \
+            app_server(upstream) as base_url, httpx.Client(timeout=60) as client:
+        print(
+            f"{args.requests} sequential requests, first token after "
+            f"{args.latency_ms:.0f} ms, {args.token_ms:.0f} ms per word"
+        )
+        for label, run in (("full", _full), ("stream", _streamed)):
+            firsts, totals, answers = [], [], set()
+            for _ in range(args.requests):
+                first, total, answer = run(client, base_url)
+                firsts.append(first)
+                totals.append(total)
+                answers.add(answer)
+            print(
+                f"{label:<7} ttfb p50 {statistics.median(firsts) * 1000:7.1f} ms   "
+                f"complete p50 {statistics.median(totals) * 1000:7.1f} ms"
+            )
+            assert len(answers) == 1, f"{label} answers differ between runs"
+        full_answer = _full(client, base_url)[2]
+        assert _streamed(client, base_url)[2] == full_answer, "streamed answer differs"
+        print("streamed answer matches the non-streamed answer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+backend/benchmarks/bench_tracing.py
+
+Cost of request tracing (app/services/tracing.py) on the request path.
+
+Times a trace with the ten spans of a chat request, discarded
+(``TRACE_SAMPLE_RATE=0``) and kept (``=1``), next to the same code without
+a trace.  Kept traces are written by the exporter thread and are not
+counted here.  Each variant runs in a fresh interpreter so the sample
+rate is read at import like in the server.
+
+Usage
+─────
+    python -m benchmarks.bench_tracing --loops 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks.fake_openrouter import _BACKEND_DIR
+
+_CODE = """
+import time
+from app.services import tracing
+
+def request():
+    tracing.record("validation", time.perf_counter())
+    for name in ("rate_limit", "history", "log_message", "warm_answers", "answer_cache", "log_message"):
+        with tracing.span(name):
+            pass
+    tracing.record("build_prompt", time.perf_counter(), tokens=2000, history_turns=4, mode="full")
+    with tracing.span("ask_openrouter"):
+        with tracing.span("openrouter_attempt", model="m", attempt=0):
+            tracing.annotate(status=200, ttfb_ms=1.0)
+
+def traced():
+    with tracing.trace("chat", "session"):
+        request()
+
+def per_call(fn):
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range({loops}):
+            fn()
+        best = min(best, (time.perf_counter() - started) / {loops})
+    return best * 1e6
+
+print(per_call(request), per_call(traced))
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the per-request cost of tracing.")
+    parser.add_argument("--loops", type=int, default=20_000)
+    args = parser.parse_args()
+
+    results = {}
+    for label, rate in (("discarded", "0"), ("kept", "1")):
+        env = {**os.environ, "TRACE_SAMPLE_RATE": rate}
+        out = subprocess.run([sys.executable, "-c", _CODE.format(loops=args.loops)], cwd=_BACKEND_DIR, env=env,
+                             capture_output=True, text=True, check=True).stdout.split()
+        results[label] = tuple(map(float, out))
+
+    print(f"{'per chat request (10 spans)':<30} {'µs':>7}")
+    print(f"{'untraced':<30} {results['discarded'][0]:>7.2f}")
+    print(f"{'traced, discarded':<30} {results['discarded'][1]:>7.2f}")
+    print(f"{'traced, kept':<30} {results['kept'][1]:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+backend/benchmarks/bench_workers.py
+
+Throughput and memory by worker count.
+
+For each worker count the backend is started against a fast fake OpenRouter
+(answer cache off, so every request does the full prompt/upstream/log path)
+and driven closed-loop by ``--concurrency`` clients for ``--seconds``.  It
+reports requests/sec, p50/p99 latency and the speed-up over one worker,
+then the memory of the worker processes: resident set (RSS) and
+proportional set (PSS, shared pages split between the processes sharing
+them) from ``/proc/<pid>/smaps_rollup``.
+
+Both launchers are measured: ``python -m app.serve`` (workers forked from
+a preloaded parent, sharing its heap copy-on-write) and
+``uvicorn --workers`` (each worker a fresh interpreter).  Throughput can
+only scale up to the number of CPUs; the script prints that count.
+
+Usage
+─────
+    python -m benchmarks.bench_workers --workers 1,2,4 --concurrency 64 --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import os
+import statistics
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.app_server import app_process
+from benchmarks.fake_openrouter import fake_server
+from benchmarks.loadgen import _workers
+
+_ENV = {"ANSWER_CACHE_ENABLED": "0"}
+
+
+def _memory(pid: int) -> tuple[int, int]:
+    """(RSS, PSS) in bytes, from smaps_rollup."""
+    values = {"Rss:": 0, "Pss:": 0}
+    with contextlib.suppress(OSError):
+        for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+            name, *rest = line.split()
+            if name in values:
+                values[name] = int(rest[0]) * 1024
+    return values["Rss:"], values["Pss:"]
+
+
+async def _drive(base_url: str, concurrency: int, seconds: float) -> tuple[int, list[float]]:
+    latencies: list[float] = []
+    errors    = 0
+    counter   = itertools.count()
+    deadline  = time.perf_counter() + seconds
+    limits    = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        async def loop() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(f"{base_url}/api/chat",
+                                                 json={"message": f"Question {next(counter)}?"})
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return errors, latencies
+
+
+def _run(upstream: str, launcher: str, workers: int, args: argparse.Namespace) -> dict:
+    with app_process(upstream, env=_ENV, workers=workers, launcher=launcher) as (base_url, proc):
+        time.sleep(1.0)
+        asyncio.run(_drive(base_url, args.concurrency, 1.0))           # warm-up
+        errors, latencies = asyncio.run(_drive(base_url, args.concurrency, args.seconds))
+        pids   = _workers(proc.pid) or [proc.pid]
+        memory = [_memory(pid) for pid in pids]
+    return {
+        "launcher": launcher,
+        "workers":  workers,
+        "rps":      len(latencies) / args.seconds,
+        "p50":      statistics.median(latencies) * 1000,
+        "p99":      sorted(latencies)[int(0.99 * (len(latencies) - 1))] * 1000,
+        "errors":   errors,
+        "rss":      sum(rss for rss, _ in memory) / 2**20,
+        "pss":      sum(pss for _, pss in memory) / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--launchers", default="serve,uvicorn")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake upstream latency")
+    args = parser.parse_args()
+
+    counts    = [int(n) for n in args.workers.split(",")]
+    launchers = args.launchers.split(",")
+    print(f"{os.cpu_count()} CPUs, {args.concurrency} clients, {args.seconds:.0f} s per run, "
+          f"upstream {args.latency_ms:.0f} ms\n")
+    print(f"{'launcher':<8} {'workers':>7} {'req/s':>8} {'speed-up':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>6} {'RSS MiB':>8} {'PSS MiB':>8}")
+    with fake_server(latency_ms=args.latency_ms) as upstream:
+        for launcher in launchers:
+            baseline = None
+            for workers in counts:
+                row      = _run(upstream, launcher, workers, args)
+                baseline = baseline or row["rps"]
+                print(f"{launcher:<8} {workers:>7} {row['rps']:>8.1f} {row['rps'] / baseline:>7.2f}x "
+                      f"{row['p50']:>8.1f} {row['p99']:>8.1f} {row['errors']:>6} "
+                      f"{row['rss']:>8.1f} {row['pss']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
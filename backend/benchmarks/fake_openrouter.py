@@ -0,0 +1,291 @@
+"""
+backend/benchmarks/fake_openrouter.py
+
+Minimal local stand-in for the OpenRouter Chat Completions API.
+
+Accepts ``POST /api/v1/chat/completions`` and answers with a fixed reply
+after a configurable delay, so benchmarks can measure the backend without
+touching the real provider.  Requests with ``"stream": true`` are answered
+with OpenRouter-style Server-Sent Events, one word per chunk.
+
+  --latency-ms   delay before the first byte of the reply (time to first token)
+  --latency-sigma  draw that delay from a log-normal distribution with the
+                 given sigma instead (median --latency-ms, a long right tail)
+  --token-ms     generation time per word; a non-streamed reply waits for
+                 all words before it is sent
+  --prefill-us   prompt-processing time per prompt token (tokens estimated
+                 as characters / 4), added before the first token
+  --tail-rate    fraction of completions that are slow …
+  --tail-ms      … by this much extra delay (a latency tail)
+  --error-rate   fraction of completions answered with --error-status
+                 (default 503) instead, after the same delay
+  --retry-after  Retry-After header (seconds) sent with injected errors
+  --burst-every  every this many seconds …
+  --burst-seconds  … answer every request with 429 for this long, with a
+                 Retry-After until the burst ends (a provider rate-limit wave)
+
+Faults can also be changed while the server runs, e.g. to simulate an
+outage and its recovery, or one model of a pool misbehaving::
+
+    POST /faults  {"error_rate": 1.0, "error_status": 429, "retry_after": 1}
+    POST /faults  {"fail_next": 3}     # the next 3 requests fail, then normal
+    POST /faults  {"fail_models": ["model-a"]}         # always fail for model-a
+    POST /faults  {"model_latency_ms": {"model-a": 5000}}
+    POST /faults  {"burst_every": 10, "burst_seconds": 2}
+
+``GET /stats`` returns the number of completion requests received (also
+per model), how many of them failed and how many were refused by a 429
+burst.
+
+Usage
+─────
+    python -m benchmarks.fake_openrouter --port 8099 --latency-ms 200 --token-ms 20
+
+    # or from another script
+    with fake_server(latency_ms=200) as url:
+        os.environ["OPENROUTER_API_URL"] = url
+        ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_REPLY = (
+    "Hanzala has built several production AI systems, including MarketMuse AI, "
+    "a multi-agent market research platform, and a RAG-based document assistant."
+)
+
+
+def create_app(
+    latency_ms: float = 200.0,
+    jitter_ms:  float = 0.0,
+    token_ms:   float = 0.0,
+    prefill_us: float = 0.0,
+    error_rate:   float = 0.0,
+    error_status: int   = 503,
+    retry_after:  float | None = None,
+    tail_rate:    float = 0.0,
+    tail_ms:      float = 0.0,
+    latency_sigma: float = 0.0,
+    burst_every:   float = 0.0,
+    burst_seconds: float = 0.0,
+) -> FastAPI:
+    """Return a FastAPI app that mimics the chat-completions endpoint."""
+    app = FastAPI(title="Fake OpenRouter")
+    words = _REPLY.split(" ")
+    counters: dict = {"requests": 0, "failed": 0, "rate_limited": 0, "by_model": {}}
+    started = time.monotonic()
+    faults: dict = {
+        "error_rate":       error_rate,
+        "error_status":     error_status,
+        "retry_after":      retry_after,
+        "fail_next":        0,
+        "tail_rate":        tail_rate,
+        "tail_ms":          tail_ms,
+        "fail_models":      [],
+        "model_latency_ms": {},
+        "burst_every":      burst_every,
+        "burst_seconds":    burst_seconds,
+    }
+
+    def rate_limit_burst() -> JSONResponse | None:
+        if faults["burst_every"] <= 0:
+            return None
+        into = (time.monotonic() - started) % faults["burst_every"]
+        if into >= faults["burst_seconds"]:
+            return None
+        counters["rate_limited"] += 1
+        return JSONResponse(
+            {"error": {"message": "rate limited (injected burst)"}},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(faults["burst_seconds"] - into))},
+        )
+
+    def injected_failure(model: str) -> JSONResponse | None:
+        if model in faults["fail_models"]:
+            pass
+        elif faults["fail_next"] > 0:
+            faults["fail_next"] -= 1
+        elif random.random() >= faults["error_rate"]:
+            return None
+        counters["failed"] += 1
+        headers = {}
+        if faults["retry_after"] is not None:
+            headers["Retry-After"] = str(faults["retry_after"])
+        return JSONResponse(
+            {"error": {"message": "injected failure"}},
+            status_code=faults["error_status"],
+            headers=headers,
+        )
+
+    async def stream(model: str) -> AsyncIterator[str]:
+        yield ": OPENROUTER PROCESSING\n\n"
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(token_ms / 1000)
+            token = word if index == 0 else f" {word}"
+            chunk = {"model": model, "choices": [{"delta": {"content": token}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/api/v1/chat/completions")
+    async def completions(request: Request):
+        counters["requests"] += 1
+        body  = await request.json()
+        model = body.get("model", "fake/model")
+        counters["by_model"][model] = counters["by_model"].get(model, 0) + 1
+        prompt_chars = sum(len(m.get("content", "")) for m in body.get("messages", []))
+        burst = rate_limit_burst()
+        if burst is not None:
+            return burst
+        delay = faults["model_latency_ms"].get(model, latency_ms)
+        if latency_sigma > 0:
+            delay *= random.lognormvariate(0.0, latency_sigma)
+        delay += random.uniform(-jitter_ms, jitter_ms)
+        delay += prefill_us * (prompt_chars / 4) / 1000
+        if random.random() < faults["tail_rate"]:
+            delay += faults["tail_ms"]
+        await asyncio.sleep(max(delay, 0.0) / 1000)
+
+        failure = injected_failure(model)
+        if failure is not None:
+            return failure
+
+        if body.get("stream"):
+            return StreamingResponse(stream(model), media_type="text/event-stream")
+
+        await asyncio.sleep(token_ms * (len(words) - 1) / 1000)
+        return {
+            "id":      "gen-fake",
+            "model":   model,
+            "choices": [{"message": {"role": "assistant", "content": _REPLY}}],
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return counters
+
+    @app.post("/faults")
+    async def set_faults(request: Request):
+        faults.update(await request.json())
+        return faults
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), 0.2):
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f"fake OpenRouter did not start on port {port}")
+
+
+@contextlib.contextmanager
+def fake_server(
+    latency_ms: float = 200.0,
+    jitter_ms:  float = 0.0,
+    token_ms:   float = 0.0,
+    prefill_us: float = 0.0,
+    error_rate:   float = 0.0,
+    error_status: int   = 503,
+    retry_after:  float | None = None,
+    tail_rate:    float = 0.0,
+    tail_ms:      float = 0.0,
+    latency_sigma: float = 0.0,
+    burst_every:   float = 0.0,
+    burst_seconds: float = 0.0,
+) -> Iterator[str]:
+    """
+    Run the fake server in a subprocess (so it does not share the GIL with
+    the code under test) and yield its chat-completions URL.
+    """
+    port = _free_port()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_openrouter",
+            "--port", str(port),
+            "--latency-ms", str(latency_ms),
+            "--jitter-ms", str(jitter_ms),
+            "--token-ms", str(token_ms),
+            "--prefill-us", str(prefill_us),
+            "--error-rate", str(error_rate),
+            "--error-status", str(error_status),
+            *(["--retry-after", str(retry_after)] if retry_after is not None else []),
+            "--tail-rate", str(tail_rate),
+            "--tail-ms", str(tail_ms),
+            "--latency-sigma", str(latency_sigma),
+            "--burst-every", str(burst_every),
+            "--burst-seconds", str(burst_seconds),
+        ],
+        cwd=_BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(port)
+        yield f"http://127.0.0.1:{port}/api/v1/chat/completions"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake OpenRouter server.")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--token-ms", type=float, default=0.0)
+    parser.add_argument("--prefill-us", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-ms", type=float, default=0.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=float, default=0.0)
+    parser.add_argument("--burst-seconds", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(
+            args.latency_ms, args.jitter_ms, args.token_ms, args.prefill_us,
+            args.error_rate, args.error_status, args.retry_after,
+            args.tail_rate, args.tail_ms,
+            args.latency_sigma, args.burst_every, args.burst_seconds,
+        ),
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning",
+        backlog=4096,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+backend/benchmarks/loadgen.py
+
+Open-loop load test of the backend against the fake OpenRouter, with a
+JSON report that later runs can be compared against.
+
+The backend (``--workers`` uvicorn workers, throw-away database) and the
+fake upstream are started locally unless ``--url`` points at a running
+server, so a run needs no network.  Requests are issued at a fixed target
+rate (``--rps``, evenly spaced or ``--arrivals poisson``) regardless of how
+fast the server answers.  A slow server therefore shows up as latency, not
+as a lower request rate.  Latency is measured from each request's
+*scheduled* start, so time spent queued behind the generator counts too.
+Requests that would exceed ``--max-in-flight`` are not sent and are
+reported as ``skipped``.
+
+Workload
+────────
+  ``--mix``   share of ``chat`` (POST /api/chat), ``stream`` (POST
+              /api/chat/stream) and ``suggestions`` (GET /api/chat/suggestions)
+  chat and stream requests either start a new session or, with probability
+  ``--followup``, continue one of the recent sessions with a follow-up, so
+  the server rebuilds a growing history.  New sessions ask one of the
+  suggested questions with probability ``--popular`` (answer-cache hits when
+  the backend runs with ``OPENROUTER_TEMPERATURE=0``), otherwise a question
+  that is never repeated.
+
+Upstream
+────────
+  ``--latency-ms`` / ``--latency-sigma`` (log-normal), ``--token-ms``,
+  ``--error-rate`` and ``--burst-every`` / ``--burst-seconds`` (429 waves)
+  are passed to ``fake_openrouter``.  ``--env KEY=VALUE`` sets backend
+  settings (e.g. ``--env ANSWER_CACHE_ENABLED=0``).
+
+Report
+──────
+  per endpoint   requests, status counts, transport errors, achieved
+                 throughput, latency p50/p90/p95/p99/max (stream: also time
+                 to the first token)
+  per process    CPU % (mean, max) and peak RSS of the uvicorn supervisor and
+                 each worker, sampled from /proc every ``--sample`` seconds,
+                 and the load generator's own CPU (near 100 % means the
+                 generator, not the server, is the limit)
+  sqlite         chat_logs rows written during the run, rows/s, database and
+                 WAL size, and the writer counters from ``/api/admin/status``
+                 (``ADMIN_TOKEN`` for a server given with ``--url``)
+  upstream       completions the fake server received, failed and refused
+
+``--out`` writes the report as JSON.  ``--compare`` reads an earlier report
+and prints throughput and latency changes per endpoint.  It exits 1 if a
+p50/p95/p99 grew, or throughput fell, by more than ``--tolerance`` percent.
+
+Usage
+─────
+    python -m benchmarks.loadgen --rps 50 --duration 30 --workers 2 --out base.json
+    python -m benchmarks.loadgen --rps 50 --duration 30 --workers 2 --compare base.json
+    python -m benchmarks.loadgen --rps 20 --latency-sigma 0.6 --burst-every 15 --burst-seconds 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.app_server import ADMIN_TOKEN, admin_status, app_process
+from benchmarks.fake_openrouter import _BACKEND_DIR, fake_server
+
+_SUGGESTED = [
+    "What projects has Hanzala built?",
+    "What are his main technical skills?",
+    "Explain the MarketMuse AI project.",
+    "What certifications does he hold?",
+    "Has he worked with RAG or LLMs?",
+    "What databases and cloud platforms does he use?",
+]
+_FOLLOWUPS = [
+    "Tell me more about that.",
+    "Which technologies did he use for it?",
+    "How long did that take him?",
+    "What was the hardest part?",
+    "Can you give an example?",
+]
+_TOPICS = ["Kubernetes", "LangChain", "PostgreSQL", "React", "AWS Lambda", "PyTorch", "Redis", "GraphQL"]
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+_PAGE    = os.sysconf("SC_PAGE_SIZE")
+
+
+# ── Workload ───────────────────────────────────────────────────────────────
+
+class _Workload:
+    """Draws the next request: endpoint, message and session."""
+
+    def __init__(self, mix: dict[str, float], followup: float, popular: float, seed: int) -> None:
+        self._rng      = random.Random(seed)
+        self._kinds    = list(mix)
+        self._weights  = list(mix.values())
+        self._followup = followup
+        self._popular  = popular
+        self._sessions: list[str] = []
+        self._serial   = 0
+
+    def next(self) -> tuple[str, dict[str, Any] | None]:
+        kind = self._rng.choices(self._kinds, self._weights)[0]
+        if kind == "suggestions":
+            return kind, None
+        self._serial += 1
+        if self._sessions and self._rng.random() < self._followup:
+            session = self._rng.choice(self._sessions)
+            message = self._rng.choice(_FOLLOWUPS)
+        else:
+            session = f"load-{self._serial}"
+            self._sessions = (self._sessions + [session])[-200:]
+            if self._rng.random() < self._popular:
+                message = self._rng.choice(_SUGGESTED)
+            else:
+                message = f"Has he used {self._rng.choice(_TOPICS)} in project #{self._serial}?"
+        return kind, {"message": message, "session_id": session}
+
+
+async def _send(
+    client: httpx.AsyncClient, base_url: str, kind: str, body: dict | None, scheduled: float
+) -> dict[str, Any]:
+    """One request; latencies are measured from ``scheduled``."""
+    result: dict[str, Any] = {"kind": kind, "lag": time.perf_counter() - scheduled}
+    try:
+        if kind == "suggestions":
+            response = await client.get(f"{base_url}/api/chat/suggestions")
+        elif kind == "chat":
+            response = await client.post(f"{base_url}/api/chat", json=body)
+        else:
+            async with client.stream("POST", f"{base_url}/api/chat/stream", json=body) as response:
+                async for line in response.aiter_lines():
+                    if "first_token" not in result and line.startswith("event: token"):
+                        result["first_token"] = time.perf_counter() - scheduled
+        result["status"] = response.status_code
+    except httpx.HTTPError as exc:
+        result["error"] = type(exc).__name__
+    result["latency"] = time.perf_counter() - scheduled
+    return result
+
+
+async def _drive(args: argparse.Namespace, base_url: str, workload: _Workload) -> tuple[list[dict], int, float]:
+    """Issue requests at the target rate for the duration; returns results, skipped, elapsed."""
+    rng      = random.Random(args.seed + 1)
+    results: list[dict] = []
+    tasks:   set[asyncio.Task] = set()
+    skipped  = 0
+    limits   = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+
+    def finished(task: asyncio.Task) -> None:
+        tasks.discard(task)
+        results.append(task.result())
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        next_at = started
+        while next_at - started < args.duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= args.max_in_flight:
+                skipped += 1
+            else:
+                kind, body = workload.next()
+                task = asyncio.create_task(_send(client, base_url, kind, body, next_at))
+                task.add_done_callback(finished)
+                tasks.add(task)
+            next_at += rng.expovariate(args.rps) if args.arrivals == "poisson" else 1 / args.rps
+        if tasks:
+            await asyncio.wait(tasks)
+        elapsed = time.perf_counter() - started
+    return results, skipped, elapsed
+
+
+# ── Process sampling ───────────────────────────────────────────────────────
+
+def _workers(pid: int) -> list[int]:
+    """Child processes of ``pid``, except multiprocessing's resource tracker."""
+    found = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            with contextlib.suppress(OSError):
+                stat = Path(f"/proc/{entry}/stat").read_text()
+                if int(stat.rsplit(")", 1)[1].split()[1]) != pid:
+                    continue
+                if b"resource_tracker" not in Path(f"/proc/{entry}/cmdline").read_bytes():
+                    found.append(int(entry))
+    return found
+
+
+def _cpu_ticks_and_rss(pid: int) -> tuple[int, int] | None:
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        rss    = int(Path(f"/proc/{pid}/statm").read_text().split()[1]) * _PAGE
+    except OSError:
+        return None
+    return int(fields[11]) + int(fields[12]), rss     # utime + stime, resident bytes
+
+
+class _Sampler(threading.Thread):
+    """
+    CPU % and RSS of the server process and its workers, every ``interval``
+    seconds.  With one worker uvicorn serves from the supervisor itself.
+    """
+
+    def __init__(self, pid: int | None, interval: float) -> None:
+        super().__init__(daemon=True)
+        self._pid      = pid
+        self._interval = interval
+        self._stop     = threading.Event()
+        self.samples: dict[int, dict[str, Any]] = {}
+
+    def run(self) -> None:
+        if self._pid is None:
+            return
+        last: dict[int, tuple[float, int]] = {}
+        while not self._stop.wait(self._interval):
+            now = time.monotonic()
+            for role, pid in [("supervisor", self._pid)] + [("worker", c) for c in _workers(self._pid)]:
+                reading = _cpu_ticks_and_rss(pid)
+                if reading is None:
+                    continue
+                ticks, rss = reading
+                entry = self.samples.setdefault(pid, {"role": role, "cpu": [], "rss": []})
+                if pid in last:
+                    then, before = last[pid]
+                    entry["cpu"].append(100 * (ticks - before) / _CLK_TCK / (now - then))
+                entry["rss"].append(rss)
+                last[pid] = (now, ticks)
+
+    def stop(self) -> dict[str, Any]:
+        self._stop.set()
+        self.join()
+        report = {}
+        for pid, entry in self.samples.items():
+            cpu = entry["cpu"] or [0.0]
+            report[str(pid)] = {
+                "role":        entry["role"],
+                "cpu_mean":    round(sum(cpu) / len(cpu), 1),
+                "cpu_max":     round(max(cpu), 1),
+                "rss_max_mb":  round(max(entry["rss"]) / 2**20, 1),
+            }
+        return report
+
+
+# ── Report ─────────────────────────────────────────────────────────────────
+
+def _percentiles(samples: list[float]) -> dict[str, float] | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"p50": at(0.50), "p90": at(0.90), "p95": at(0.95), "p99": at(0.99), "max": at(1.0)}
+
+
+def _endpoint_report(results: list[dict], elapsed: float) -> dict[str, Any]:
+    report: dict[str, Any] = {}
+    for kind in sorted({r["kind"] for r in results}):
+        rows     = [r for r in results if r["kind"] == kind]
+        statuses: dict[str, int] = {}
+        errors:   dict[str, int] = {}
+        for r in rows:
+            if "status" in r:
+                statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+            else:
+                errors[r["error"]] = errors.get(r["error"], 0) + 1
+        ok = [r for r in rows if r.get("status") == 200]
+        report[kind] = {
+            "requests":    len(rows),
+            "statuses":    statuses,
+            "errors":      errors,
+            "throughput":  round(len(ok) / elapsed, 2),
+            "latency_ms":  _percentiles([r["latency"] for r in ok]),
+            "send_lag_ms": _percentiles([r["lag"] for r in rows]),
+        }
+        if kind == "stream":
+            report[kind]["first_token_ms"] = _percentiles([r["first_token"] for r in ok if "first_token" in r])
+    return report
+
+
+def _sqlite_report(db_path: Path | None, rows_before: int, elapsed: float, status: dict | None) -> dict[str, Any]:
+    report: dict[str, Any] = {}
+    if db_path is not None and db_path.exists():
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+        rows = conn.execute("SELECT count(*) FROM chat_logs;").fetchone()[0]
+        conn.close()
+        wal = db_path.with_name(db_path.name + "-wal")
+        report.update({
+            "rows_written":  rows - rows_before,
+            "rows_per_s":    round((rows - rows_before) / elapsed, 1),
+            "db_mb":         round(db_path.stat().st_size / 2**20, 2),
+            "wal_mb":        round(wal.stat().st_size / 2**20, 2) if wal.exists() else 0.0,
+        })
+    if status is not None:
+        report["writer"] = status.get("chat_log")     # of the worker that answered
+    return report
+
+
+def _count_rows(db_path: Path | None) -> int:
+    if db_path is None or not db_path.exists():
+        return 0
+    conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT count(*) FROM chat_logs;").fetchone()[0]
+    except sqlite3.Error:
+        return 0
+    finally:
+        conn.close()
+
+
+def _git_revision() -> str | None:
+    with contextlib.suppress(OSError, subprocess.CalledProcessError):
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    return None
+
+
+def _compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    """Print changes against ``baseline``; True if any exceeds ``tolerance`` %."""
+    regressed = False
+    print(f"\n{'endpoint':<12} {'metric':<11} {'baseline':>10} {'now':>10} {'change':>8}")
+    for kind, now in report["endpoints"].items():
+        then = baseline.get("endpoints", {}).get(kind)
+        if then is None:
+            continue
+        pairs = [("throughput", then["throughput"], now["throughput"], -1)]
+        for q in ("p50", "p95", "p99"):
+            if then["latency_ms"] and now["latency_ms"]:
+                pairs.append((q, then["latency_ms"][q], now["latency_ms"][q], 1))
+        for metric, old, new, worse in pairs:
+            change = (new - old) / old * 100 if old else 0.0
+            flag   = change * worse > tolerance
+            regressed |= flag
+            print(f"{kind:<12} {metric:<11} {old:10.2f} {new:10.2f} {change:+7.1f}%{'  REGRESSED' if flag else ''}")
+    return regressed
+
+
+# ── Main ───────────────────────────────────────────────────────────────────
+
+def _parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ("chat", "stream", "suggestions"):
+            raise argparse.ArgumentTypeError(f"unknown request kind {kind!r}")
+        mix[kind] = float(weight)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Open-loop load test of the chat backend.")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--arrivals", choices=("uniform", "poisson"), default="uniform")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("chat=0.7,stream=0.2,suggestions=0.1"))
+    parser.add_argument("--followup", type=float, default=0.4, help="share of chat requests continuing a session")
+    parser.add_argument("--popular", type=float, default=0.5, help="share of new sessions asking a suggested question")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sample", type=float, default=0.5, help="seconds between CPU / RSS samples")
+    parser.add_argument("--url", default=None, help="load a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="backend setting")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.0)
+    parser.add_argument("--token-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=float, default=0.0)
+    parser.add_argument("--burst-seconds", type=float, default=0.0)
+    parser.add_argument("--out", type=Path, default=None, help="write the report here (JSON)")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+
+    report: dict[str, Any] = {
+        "started_at": datetime.now(tz=timezone.utc).isoformat(),
+        "revision":   _git_revision(),
+        "config":     {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "host":       {"cpus": os.cpu_count(), "python": sys.version.split()[0]},
+    }
+    workload = _Workload(args.mix, args.followup, args.popular, args.seed)
+
+    with contextlib.ExitStack() as stack:
+        upstream = db_path = pid = None
+        base_url = args.url
+        if base_url is None:
+            upstream = stack.enter_context(fake_server(
+                latency_ms=args.latency_ms, token_ms=args.token_ms, error_rate=args.error_rate,
+                error_status=503, latency_sigma=args.latency_sigma,
+                burst_every=args.burst_every, burst_seconds=args.burst_seconds,
+            ))
+            tmp     = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="loadgen-")))
+            db_path = tmp / "chat_logs.db"
+            env     = {"CHAT_LOG_DB_PATH": str(db_path), **dict(e.split("=", 1) for e in args.env)}
+            base_url, proc = stack.enter_context(app_process(upstream, env=env, workers=args.workers))
+            pid = proc.pid
+            time.sleep(1.0 if args.workers > 1 else 0.2)    # let every worker start accepting
+
+        rows_before = _count_rows(db_path)
+        sampler = _Sampler(pid, args.sample)
+        sampler.start()
+        cpu_before = os.times()
+        results, skipped, elapsed = asyncio.run(_drive(args, base_url, workload))
+        cpu_after = os.times()
+        report["processes"] = sampler.stop()
+        report["processes"]["loadgen"] = {
+            "role": "load generator",
+            "cpu_mean": round(100 * ((cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)) / elapsed, 1),
+        }
+
+        time.sleep(1.0)      # let the chat-log writer flush its last batch
+        status = None
+        with contextlib.suppress(httpx.HTTPError, ValueError):
+            token  = os.getenv("ADMIN_TOKEN", ADMIN_TOKEN) if args.url else ADMIN_TOKEN
+            status = admin_status(base_url, token)
+        report["endpoints"] = _endpoint_report(results, elapsed)
+        report["generator"] = {"sent": len(results), "skipped": skipped, "elapsed_s": round(elapsed, 2),
+                               "offered_rps": args.rps, "achieved_rps": round(len(results) / elapsed, 2)}
+        report["sqlite"]    = _sqlite_report(db_path, rows_before, elapsed, status)
+        if upstream is not None:
+            report["upstream"] = httpx.get(upstream.split("/api/")[0] + "/stats", timeout=10).json()
+
+    print(json.dumps({k: report[k] for k in ("generator", "endpoints", "processes", "sqlite")}, indent=2))
+    if args.out is not None:
+        args.out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"report written to {args.out}")
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if _compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
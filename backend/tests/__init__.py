@@ -0,0 +1,13 @@
+"""
+backend/tests
+
+Correctness tests for the Portfolio AI Assistant backend.  Unit tests run
+in process; the rest start the real backend against the local fake
+OpenRouter (benchmarks/fake_openrouter.py), so no API key or network
+access is required.  Run them from ``backend/``:
+
+    pip install -r tests/requirements.txt
+    python -m pytest -q
+
+Load and performance tools live in ``benchmarks/``.
+"""
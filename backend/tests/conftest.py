@@ -0,0 +1,31 @@
+"""
+backend/tests/conftest.py
+
+Every service reads its configuration when it is imported, so the paths it
+writes to are pointed at a throw-away directory here, before any test
+imports ``app``.  Servers started by the tests get their own (see
+benchmarks/app_server.py).
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="backend-tests-"))
+
+for _name, _file in (
+    ("CHAT_LOG_DB_PATH",     "chat_logs.db"),
+    ("CHAT_LOG_ARCHIVE_DIR", "archive"),
+    ("RATE_LIMIT_DB_PATH",   "rate_limit.db"),
+    ("TRACE_PATH",           "traces.db"),
+    ("WARM_ANSWERS_PATH",    "warm_answers.json"),
+):
+    os.environ[_name] = str(_TMP / _file)
+os.environ["ADMIN_TOKEN"] = ADMIN_TOKEN = "test-admin-token"
+
+
+def pytest_unconfigure(config) -> None:
+    shutil.rmtree(_TMP, ignore_errors=True)
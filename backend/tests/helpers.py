@@ -0,0 +1,36 @@
+"""
+backend/tests/helpers.py
+
+Small helpers shared by the tests that talk to the fake OpenRouter.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+import httpx
+
+
+def control(upstream: str, path: str) -> str:
+    """A control endpoint of the fake OpenRouter (``/stats``, ``/faults``)."""
+    return upstream.split("/api/")[0] + path
+
+
+def upstream_calls(upstream: str) -> int:
+    """Completion requests the fake OpenRouter has received so far."""
+    return httpx.get(control(upstream, "/stats")).json()["requests"]
+
+
+def set_faults(upstream: str, **faults) -> None:
+    httpx.post(control(upstream, "/faults"), json=faults).raise_for_status()
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float = 15.0, interval: float = 0.05) -> bool:
+    """Poll ``predicate`` until it holds or ``timeout`` seconds pass."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return False
@@ -0,0 +1,80 @@
+"""
+backend/tests/test_admin.py
+
+The admin API (app/api/admin.py) and ``/health``, in process.  Stats and
+search windows may mix naive (UTC) and offset-aware times.
+"""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.conftest import ADMIN_TOKEN
+
+_AUTH = {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:          # runs the lifespan: the chat log exists
+        yield client
+
+
+def test_health_is_a_liveness_check_with_the_breakers(client):
+    health = client.get("/health").json()
+    assert set(health) == {"status", "service", "pid", "breakers"}
+    assert health["breakers"] and set(health["breakers"].values()) == {"closed"}
+
+
+def test_status_requires_the_admin_token(client):
+    assert client.get("/api/admin/status").status_code == 401
+    assert client.get("/api/admin/status", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_status_reports_every_subsystem(client):
+    status = client.get("/api/admin/status", headers=_AUTH).json()
+    for section in ("startup", "answer_cache", "chat_log", "context", "openrouter", "rate_limit", "admission",
+                    "tracing"):
+        assert section in status, section
+    assert {"active", "waiting", "limit"} <= set(status["admission"])
+
+
+# ── Windows ────────────────────────────────────────────────────────────────
+
+_NAIVE = "2026-03-01T10:00:00"
+_AWARE = "2026-03-01T14:00:00+02:00"         # 12:00 UTC
+
+
+@pytest.mark.parametrize("since, until", [
+    (_NAIVE, "2026-03-01T12:00:00"),
+    ("2026-03-01T10:00:00+00:00", _AWARE),
+    (_NAIVE, _AWARE),
+    ("2026-03-01T08:00:00-02:00", "2026-03-01T12:00:00"),
+], ids=["naive", "aware", "naive-aware", "aware-naive"])
+@pytest.mark.parametrize("path", ["/api/admin/stats", "/api/admin/stats/questions", "/api/admin/stats/errors"])
+def test_windows_mix_naive_and_aware_times(client, path, since, until):
+    response = client.get(path, headers=_AUTH, params={"since": since, "until": until})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["since"], body["until"]) == ("2026-03-01T10:00:00+00:00", "2026-03-01T12:00:00+00:00")
+
+
+def test_long_question_windows_mix_naive_and_aware_times(client):
+    params   = {"since": "2026-01-01T00:00:00", "until": _AWARE}
+    response = client.get("/api/admin/stats/questions", headers=_AUTH, params=params)
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize("since, until", [(_NAIVE, _AWARE), (_AWARE, "2026-03-01T13:00:00")])
+def test_search_mixes_naive_and_aware_times(client, since, until):
+    response = client.get("/api/admin/search", headers=_AUTH, params={"q": "portfolio", "since": since, "until": until})
+    assert response.status_code in (200, 503), response.text
+
+
+@pytest.mark.parametrize("path, extra", [("/api/admin/stats", {}), ("/api/admin/search", {"q": "portfolio"})])
+def test_reversed_mixed_window_is_rejected(client, path, extra):
+    params   = {"since": "2026-03-01T13:00:00", "until": _AWARE, **extra}
+    response = client.get(path, headers=_AUTH, params=params)
+    assert response.status_code == 422 and "since" in response.json()["detail"]
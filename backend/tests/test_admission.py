@@ -0,0 +1,144 @@
+"""
+backend/tests/test_admission.py
+
+The upstream admission gate (app/services/admission.py), in process and on
+a running server with a 500 ms upstream: distinct questions beyond the
+concurrency and the queue are refused at once, identical ones share the
+single-flight leader's slot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.admission import AdmissionGate, Overloaded
+from benchmarks.app_server import admin_status, app_server
+from benchmarks.fake_openrouter import fake_server
+from tests.helpers import upstream_calls
+
+
+# ── The gate ───────────────────────────────────────────────────────────────
+
+def test_admits_up_to_limit_then_queues_then_refuses():
+    async def run():
+        gate  = AdmissionGate(limit=2, queue_size=1, timeout=5)
+        slots = [await gate.acquire(), await gate.acquire()]
+        queued = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.stats()["waiting"] == 1
+
+        with pytest.raises(Overloaded) as refused:
+            await gate.acquire()
+        assert refused.value.retry_after >= 1
+
+        slots[0].release()
+        slots[0].release()                   # idempotent
+        third = await queued
+        assert gate.stats()["active"] == 2
+        for slot in (slots[1], third):
+            slot.release()
+        return gate.stats()
+
+    stats = asyncio.run(run())
+    assert stats == {"limit": 2, "active": 0, "waiting": 0, "admitted": 3, "queued": 1,
+                     "rejected_full": 1, "rejected_timeout": 0}
+
+
+def test_waiters_are_served_in_arrival_order():
+    async def run():
+        gate  = AdmissionGate(limit=1, queue_size=3, timeout=5)
+        order = []
+
+        async def waiter(i: int) -> None:
+            async with gate.slot():
+                order.append(i)
+                await asyncio.sleep(0.01)
+
+        async with gate.slot():
+            tasks = [asyncio.create_task(waiter(i)) for i in range(3)]
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        return order, gate.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == [0, 1, 2] and stats["active"] == 0
+
+
+def test_wait_times_out():
+    async def run():
+        gate = AdmissionGate(limit=1, queue_size=1, timeout=0.05)
+        slot = await gate.acquire()
+        started = time.perf_counter()
+        with pytest.raises(Overloaded):
+            await gate.acquire()
+        assert time.perf_counter() - started < 1
+        slot.release()
+        return gate.stats()
+
+    stats = asyncio.run(run())
+    assert stats["rejected_timeout"] == 1 and stats["waiting"] == 0 and stats["active"] == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def run():
+        gate  = AdmissionGate(limit=1, queue_size=2, timeout=5)
+        slot  = await gate.acquire()
+        first = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        assert gate.stats()["waiting"] == 0
+        slot.release()
+        (await gate.acquire()).release()
+        return gate.stats()
+
+    assert asyncio.run(run())["active"] == 0
+
+
+def test_zero_limit_disables_the_gate():
+    async def run():
+        gate  = AdmissionGate(limit=0, queue_size=0, timeout=1)
+        slots = [await gate.acquire() for _ in range(100)]
+        for slot in slots:
+            slot.release()
+        return gate.stats()
+
+    assert asyncio.run(run())["active"] == 0
+
+
+# ── On a server ────────────────────────────────────────────────────────────
+
+def test_server_refuses_beyond_concurrency_and_queue():
+    env = {"UPSTREAM_CONCURRENCY": "4", "UPSTREAM_QUEUE": "4", "UPSTREAM_QUEUE_TIMEOUT": "5"}
+
+    async def run(upstream: str, base_url: str):
+        async with httpx.AsyncClient(timeout=30) as client:
+            async def ask(i: int, path: str = "/api/chat") -> tuple[int, float]:
+                started  = time.perf_counter()
+                response = await client.post(f"{base_url}{path}", json={"message": f"Question {i}?"})
+                await response.aread()
+                return response.status_code, time.perf_counter() - started
+
+            before  = upstream_calls(upstream)
+            results = await asyncio.gather(*(ask(i) for i in range(16)))
+            refused = [t for status, t in results if status == 429]
+            assert [status for status, _ in results].count(200) == 8 and len(refused) == 8
+            assert upstream_calls(upstream) - before == 8
+            assert max(refused) < 0.25, "refusals were not immediate"
+
+            before  = upstream_calls(upstream)
+            same    = await asyncio.gather(*(ask(50) for _ in range(20)))
+            assert [status for status, _ in same] == [200] * 20, "coalesced callers took a slot each"
+            assert upstream_calls(upstream) - before == 1
+
+            streams = await asyncio.gather(*(ask(100 + i, "/api/chat/stream") for i in range(12)))
+            assert [status for status, _ in streams].count(200) == 8
+            admission = (await asyncio.to_thread(admin_status, base_url))["admission"]
+            assert admission["active"] == 0 and admission["waiting"] == 0, "a stream kept its slot"
+
+    with fake_server(latency_ms=500) as upstream, app_server(upstream, env=env) as base_url:
+        asyncio.run(run(upstream, base_url))
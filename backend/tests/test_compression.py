@@ -0,0 +1,38 @@
+"""
+backend/tests/test_compression.py
+
+Picking the response encoding from ``Accept-Encoding``
+(app/services/compression.py), with and without Brotli.  What compression
+costs and saves is measured by benchmarks/bench_responses.py.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from app.services import compression
+
+# Accept-Encoding → (encoding with Brotli, encoding without)
+CASES: dict[str, tuple[str | None, str | None]] = {
+    "":                      (None, None),
+    "identity":              (None, None),
+    "gzip":                  ("gzip", "gzip"),
+    "gzip, deflate, br":     ("br", "gzip"),
+    "br;q=0.5, gzip;q=1":    ("br", "gzip"),
+    "*":                     ("br", "gzip"),
+    "gzip;q=0":              (None, None),
+    "gzip;q=0, *":           ("br", None),
+    "br;q=0, *":             ("gzip", "gzip"),
+    "br;q=0, gzip;q=0, *":   (None, None),
+    "*;q=0":                 (None, None),
+    "gzip;q=0.0, deflate":   (None, None),
+    "GZIP;Q=0, *":           ("br", None),
+    "gzip;q=bogus":          (None, None),
+}
+
+
+@pytest.mark.parametrize("header, expected", CASES.items(), ids=list(CASES))
+def test_accepted(monkeypatch, header, expected):
+    for brotli, coding in zip((True, False), expected):
+        monkeypatch.setattr(compression, "_BROTLI", brotli)
+        assert compression._accepted(header.encode()) == coding, (header, brotli)
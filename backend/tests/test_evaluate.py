@@ -0,0 +1,115 @@
+"""
+backend/tests/test_evaluate.py
+
+The batch evaluation runner (``python -m app.evaluate``) against a fake
+OpenRouter.  Its memory use at scale is measured by
+benchmarks/bench_evaluate.py.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_openrouter import _BACKEND_DIR, fake_server
+from tests.helpers import control, upstream_calls
+
+_HISTORY = [
+    {"role": "user", "content": "What projects has Hanzala built? " * 6},
+    {"role": "assistant", "content": "He built MarketMuse AI and a RAG assistant. " * 6},
+    {"role": "user", "content": "Which of them used LangChain? " * 6},
+    {"role": "assistant", "content": "The RAG document assistant did. " * 6},
+]
+
+
+def _questions(path: Path, count: int, *, history: bool = True) -> Path:
+    with open(path, "w", encoding="utf-8") as handle:
+        for i in range(count):
+            item = {"id": f"q{i}", "question": f"Tell me about his project number {i}?", "batch": path.stem}
+            if history:
+                item["history"] = _HISTORY
+            handle.write(json.dumps(item) + "\n")
+    return path
+
+
+def _evaluate(*args: str, env: dict[str, str] | None = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.evaluate", *args, "--progress", "0"],
+        cwd=_BACKEND_DIR, env={**os.environ, "OPENROUTER_API_KEY": "test", **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+
+
+def _finish(proc: subprocess.Popen) -> dict:
+    """Wait for the runner; return the summary it prints last."""
+    stderr = proc.communicate()[1]
+    assert proc.returncode == 0, stderr
+    return json.loads(stderr[stderr.index("\n{") + 1:])
+
+
+def _results(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_stub_run(tmp_path):
+    questions = _questions(tmp_path / "stub.jsonl", 50, history=False)
+    with open(questions, "a", encoding="utf-8") as handle:
+        handle.write("not json\n")
+        handle.write(json.dumps({"id": "follow-up", "question": "And the second one?", "history": _HISTORY}) + "\n")
+        handle.write(json.dumps({"id": "empty", "question": "  "}) + "\n")
+    out = tmp_path / "stub.out.jsonl"
+    summary = _finish(_evaluate(str(questions), "-o", str(out), "--stub", "--stub-latency-ms", "20"))
+    by_id = {r["id"]: r for r in _results(out)}
+    assert summary["ok"] == 51 and summary["error_categories"] == {"input": 2}
+    assert by_id["follow-up"]["history_turns"] == 4 and by_id["q7"]["meta"] == {"batch": "stub"}
+    assert all(r["answer"] for r in by_id.values() if r["error"] is None)
+
+
+def test_resume_after_interrupt(tmp_path):
+    questions = _questions(tmp_path / "resume.jsonl", 1_000)
+    out = tmp_path / "resume.out.jsonl"
+    with fake_server(latency_ms=100) as upstream:
+        args = (str(questions), "-o", str(out), "--api-url", upstream, "--concurrency", "16")
+        proc = _evaluate(*args)
+        time.sleep(2.5)
+        proc.send_signal(signal.SIGINT)
+        proc.wait(timeout=30)
+        with open(out, "a", encoding="utf-8") as handle:
+            handle.write('{"id": "q999", "answ')             # torn write
+        first = len(out.read_text(encoding="utf-8").splitlines()) - 1
+        calls = upstream_calls(upstream)
+        summary = _finish(_evaluate(*args, "--resume"))
+        more  = upstream_calls(upstream) - calls
+    ids = [r["id"] for r in _results(out)]
+    assert 0 < first < 1_000 and summary["skipped"] == first
+    assert more == 1_000 - first and len(ids) == len(set(ids)) == 1_000
+
+
+def test_rate_limit_bursts_pause_every_worker(tmp_path):
+    questions = _questions(tmp_path / "limits.jsonl", 400, history=False)
+    env = {"OPENROUTER_RETRIES": "0", "OPENROUTER_BREAKER_OPEN_SECONDS": "1"}
+    with fake_server(latency_ms=20, burst_every=3, burst_seconds=1) as upstream:
+        summary = _finish(_evaluate(
+            str(questions), "-o", str(tmp_path / "limits.out.jsonl"), "--api-url", upstream,
+            "--concurrency", "16", "--retries", "20", env=env,
+        ))
+        refused = httpx.get(control(upstream, "/stats")).json()["rate_limited"]
+    assert summary["ok"] == 400 and summary["errors"] == 0 and summary["rate_limit_pauses"] > 0, summary
+    assert refused < 200, "workers kept calling during the bursts"
+
+
+def test_rps_caps_the_request_rate(tmp_path):
+    questions = _questions(tmp_path / "rps.jsonl", 300, history=False)
+    with fake_server(latency_ms=5) as upstream:
+        summary = _finish(_evaluate(
+            str(questions), "-o", str(tmp_path / "rps.out.jsonl"), "--api-url", upstream,
+            "--concurrency", "32", "--rps", "100",
+        ))
+    assert summary["ok"] == 300 and 80 <= summary["per_second"] <= 105
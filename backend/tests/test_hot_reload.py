@@ -0,0 +1,100 @@
+"""
+backend/tests/test_hot_reload.py
+
+Hot reload of resume_data.json on a running server.
+
+The backend is pointed at a temp copy of the resume (``RESUME_DATA_PATH``)
+with a short ``RESUME_RELOAD_INTERVAL`` while a background client keeps
+``POST /api/chat`` busy; every one of its requests must succeed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import httpx
+import pytest
+
+from benchmarks.app_server import admin_status, app_server
+from benchmarks.fake_openrouter import _BACKEND_DIR, fake_server
+from tests.helpers import wait_for
+
+_RESUME   = Path(_BACKEND_DIR) / "app" / "data" / "resume_data.json"
+_QUESTION = {"message": "What projects has Hanzala built?"}
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _background_load(base_url: str, stop: threading.Event, statuses: list[int]) -> None:
+    with httpx.Client(timeout=30) as client:
+        i = 0
+        while not stop.is_set():
+            statuses.append(client.post(f"{base_url}/api/chat", json={"message": f"Tell me about project {i}"}).status_code)
+            i += 1
+
+
+@pytest.fixture
+def server(tmp_path):
+    original = _RESUME.read_text(encoding="utf-8")
+    path     = tmp_path / "resume_data.json"
+    path.write_text(original, encoding="utf-8")
+    env = {
+        "RESUME_DATA_PATH":       str(path),
+        "RESUME_RELOAD_INTERVAL": "0.2",
+        "ANSWER_CACHE_ENABLED":   "1",
+        "OPENROUTER_TEMPERATURE": "0",       # cacheable answers
+    }
+    with fake_server(latency_ms=20) as upstream, app_server(upstream, env=env) as base_url, \
+            httpx.Client(timeout=30) as client:
+        stop, statuses = threading.Event(), []
+        load = threading.Thread(target=_background_load, args=(base_url, stop, statuses))
+        load.start()
+        try:
+            yield client, base_url, path, original
+        finally:
+            stop.set()
+            load.join()
+    assert statuses and set(statuses) == {200}, "requests failed during a reload"
+
+
+def test_edit_torn_write_and_repair(server):
+    client, base_url, path, original = server
+
+    # ── edit one project ───────────────────────────────────────────────────
+    client.post(f"{base_url}/api/chat", json=_QUESTION)
+    client.post(f"{base_url}/api/chat", json=_QUESTION)
+    hits_before = admin_status(base_url)["answer_cache"]["hits"]
+    assert hits_before >= 1, "the repeated question was not answered from the cache"
+    before = admin_status(base_url)["context"]
+
+    data = json.loads(original)
+    data["projects"][0]["description"] += " Now with hot reload."
+    _write_atomically(path, json.dumps(data, indent=2, ensure_ascii=False))
+    assert wait_for(lambda: admin_status(base_url)["context"]["fingerprint"] != before["fingerprint"], 5)
+    after = admin_status(base_url)["context"]
+    assert after["sections_rendered"] - before["sections_rendered"] == 2, \
+        "only the projects section and one chunk should re-render"
+
+    client.post(f"{base_url}/api/chat", json=_QUESTION)
+    assert admin_status(base_url)["answer_cache"]["hits"] == hits_before, "a stale cached answer was served"
+
+    # ── torn write: the current context is kept ────────────────────────────
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text[: len(text) // 2], encoding="utf-8")
+    assert wait_for(lambda: admin_status(base_url)["context"]["reload_errors"] > after["reload_errors"], 5)
+    torn = admin_status(base_url)["context"]
+    assert torn["reload_errors"] == after["reload_errors"] + 1
+    assert torn["fingerprint"] == after["fingerprint"], "a broken file replaced the context"
+    assert client.post(f"{base_url}/api/chat", json=_QUESTION).status_code == 200
+
+    # ── repair ─────────────────────────────────────────────────────────────
+    path.write_text(original, encoding="utf-8")
+    assert wait_for(lambda: admin_status(base_url)["context"]["fingerprint"] == before["fingerprint"], 5), \
+        "repaired file was not picked up"
@@ -0,0 +1,99 @@
+"""
+backend/tests/test_rate_limit.py
+
+The token buckets of app/services/rate_limit.py, in process and on a
+running server.
+"""
+
+from __future__ import annotations
+
+import time
+
+import httpx
+import pytest
+
+from app.services.rate_limit import _MemoryBuckets, _SQLiteBuckets
+from benchmarks.app_server import app_server
+from benchmarks.fake_openrouter import fake_server
+
+
+@pytest.fixture(scope="module")
+def upstream():
+    with fake_server(latency_ms=50) as url:
+        yield url
+
+
+# ── Buckets ────────────────────────────────────────────────────────────────
+
+def test_memory_bucket_allows_burst_then_reports_wait():
+    buckets = _MemoryBuckets(max_keys=10)
+    assert [buckets.take("ip:a", 1.0, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = buckets.take("ip:a", 1.0, 3)
+    assert 0.9 < wait <= 1.0
+    assert buckets.take("ip:b", 1.0, 3) == 0.0, "another key has its own bucket"
+
+
+def test_memory_bucket_refills_at_rate():
+    buckets = _MemoryBuckets(max_keys=10)
+    buckets.take("k", 20.0, 1)
+    assert buckets.take("k", 20.0, 1) > 0
+    time.sleep(0.06)
+    assert buckets.take("k", 20.0, 1) == 0.0
+
+
+def test_memory_buckets_evict_least_recently_used():
+    buckets = _MemoryBuckets(max_keys=2)
+    buckets.take("a", 1.0, 1)
+    buckets.take("b", 1.0, 1)
+    buckets.take("c", 1.0, 1)
+    assert len(buckets) == 2
+    assert buckets.take("a", 1.0, 1) == 0.0, "an evicted bucket comes back full"
+    assert buckets.take("c", 1.0, 1) > 0
+
+
+def test_sqlite_buckets_are_shared_between_instances(tmp_path):
+    path  = tmp_path / "rate_limit.db"
+    first, second = _SQLiteBuckets(path), _SQLiteBuckets(path)
+    taken = [(first if i % 2 else second).take("ip:a", 0.01, 5) == 0.0 for i in range(10)]
+    assert taken == [True] * 5 + [False] * 5
+    assert len(first) == len(second) == 1
+
+
+# ── On a server ────────────────────────────────────────────────────────────
+
+def test_ip_and_session_buckets(upstream):
+    env = {
+        "RATE_LIMIT_ENABLED": "1", "RATE_LIMIT_TRUST_PROXY": "1",
+        "RATE_LIMIT_IP_PER_MINUTE": "6", "RATE_LIMIT_IP_BURST": "5",
+        "RATE_LIMIT_SESSION_PER_MINUTE": "6", "RATE_LIMIT_SESSION_BURST": "3",
+    }
+    with app_server(upstream, env=env) as base_url, httpx.Client(timeout=30) as client:
+        def ask(ip: str, session: str | None = None) -> httpx.Response:
+            return client.post(
+                f"{base_url}/api/chat",
+                json={"message": "What projects has Hanzala built?", "session_id": session},
+                headers={"X-Forwarded-For": ip},
+            )
+
+        results = [ask("203.0.113.1") for _ in range(12)]
+        assert [r.status_code for r in results] == [200] * 5 + [429] * 7
+        assert int(results[-1].headers["retry-after"]) >= 1
+
+        busy  = [ask("203.0.113.2", "busy").status_code for _ in range(5)]
+        other = ask("203.0.113.2", "other").status_code
+        assert busy == [200] * 3 + [429] * 2 and other == 200
+
+
+def test_sqlite_state_holds_across_workers(upstream):
+    env = {
+        "RATE_LIMIT_ENABLED": "1", "RATE_LIMIT_STATE": "sqlite",
+        "RATE_LIMIT_IP_PER_MINUTE": "1", "RATE_LIMIT_IP_BURST": "10",
+    }
+    with app_server(upstream, env=env, workers=2) as base_url:
+        time.sleep(1.0)    # let both workers start accepting
+        statuses = [
+            httpx.post(f"{base_url}/api/chat", json={"message": "Hi"},
+                       headers={"Connection": "close"}, timeout=30).status_code
+            for _ in range(30)
+        ]
+    assert statuses.count(200) == 10
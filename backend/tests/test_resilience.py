@@ -0,0 +1,211 @@
+"""
+backend/tests/test_resilience.py
+
+The circuit breaker (app/services/circuit_breaker.py) on a fake clock,
+hedging over the model pool with stubbed calls, and retries, Retry-After
+handling and the breaker against the fault-injecting fake OpenRouter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import openrouter_service
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.openrouter_service import OpenRouterError, PromptParts
+from benchmarks.app_server import admin_status, app_server
+from benchmarks.fake_openrouter import fake_server
+from tests.helpers import set_faults, upstream_calls
+
+_ENV = {
+    "ANSWER_CACHE_ENABLED":            "0",
+    "OPENROUTER_RETRY_BASE":           "0.05",
+    "OPENROUTER_RETRY_MAX_DELAY":      "2",
+    "OPENROUTER_BREAKER_OPEN_SECONDS": "2",
+}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def breaker_and_clock():
+    clock = _Clock()
+    return CircuitBreaker(window=10, min_calls=4, error_rate=0.5, open_seconds=30, clock=clock), clock
+
+
+def _fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        breaker.record(breaker.allow(), ok=False)
+
+
+# ── The breaker ────────────────────────────────────────────────────────────
+
+def test_stays_closed_below_min_calls(breaker_and_clock):
+    breaker, _ = breaker_and_clock
+    _fail(breaker, 3)
+    assert breaker.state == "closed"
+
+
+def test_stays_closed_below_error_rate(breaker_and_clock):
+    breaker, _ = breaker_and_clock
+    for _ in range(4):
+        breaker.record(breaker.allow(), ok=True)
+    _fail(breaker, 3)
+    assert breaker.state == "closed", "3 of 7 failed, under the 50% threshold"
+
+
+def test_opens_and_fails_fast(breaker_and_clock):
+    breaker, clock = breaker_and_clock
+    _fail(breaker, 4)
+    assert breaker.state == "open" and breaker.allow() is None
+    clock.now = 10
+    assert breaker.retry_in() == pytest.approx(20)
+    assert breaker.stats()["opened"] == 1 and breaker.stats()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens(breaker_and_clock):
+    breaker, clock = breaker_and_clock
+    _fail(breaker, 4)
+    clock.now = 30
+    assert breaker.state == "half_open"
+    probe = breaker.allow()
+    assert probe is not None and probe.probe
+    assert breaker.allow() is None, "only one probe at a time"
+    breaker.record(probe, ok=False)
+    assert breaker.state == "open" and breaker.stats()["opened"] == 2
+
+    clock.now = 60
+    probe = breaker.allow()
+    breaker.record(probe, ok=True)
+    assert breaker.state == "closed" and breaker.stats()["error_rate"] == 0.0
+
+
+def test_released_probe_lets_another_through(breaker_and_clock):
+    breaker, clock = breaker_and_clock
+    _fail(breaker, 4)
+    clock.now = 30
+    breaker.release(breaker.allow())
+    assert breaker.allow() is not None
+
+
+def test_outcomes_admitted_before_opening_are_ignored(breaker_and_clock):
+    breaker, clock = breaker_and_clock
+    late = breaker.allow()
+    _fail(breaker, 4)
+    breaker.record(late, ok=True)
+    assert breaker.state == "open"
+
+
+# ── Hedging ────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Hedge after 10 ms; ``behaviour[model]`` is (seconds, reply or error) per call."""
+    behaviour: dict[str, tuple[float, str | OpenRouterError]] = {}
+    delays:    list[float] = []
+
+    async def complete_on(route, *_):
+        seconds, outcome = behaviour[route.model]
+        await asyncio.sleep(seconds)
+        if isinstance(outcome, OpenRouterError):
+            raise outcome
+        return outcome
+
+    def hedge_delay(_route) -> float:
+        delays.append(0.01)
+        return 0.01
+
+    def use(*models: str) -> None:
+        monkeypatch.setattr(openrouter_service, "_ROUTES", openrouter_service._parse_models(",".join(models)))
+
+    monkeypatch.setattr(openrouter_service, "_HEDGE", True)
+    monkeypatch.setattr(openrouter_service, "_hedge_delay", hedge_delay)
+    monkeypatch.setattr(openrouter_service, "_complete_on", complete_on)
+    monkeypatch.setattr(openrouter_service, "_stats", dict(openrouter_service._stats, hedged=0, hedge_wins=0))
+    return use, behaviour, delays
+
+
+def _complete() -> str:
+    return asyncio.run(openrouter_service._complete(PromptParts("context", "tail"), 16, 0.0))
+
+
+def test_hedge_timer_stops_once_every_model_is_in_flight(pool):
+    use, behaviour, delays = pool
+    use("only")
+    behaviour["only"] = (0.3, "slow answer")
+    assert _complete() == "slow answer"
+    assert len(delays) == 1, f"the hedge timer was armed {len(delays)} times with no model left"
+    assert openrouter_service.stats()["hedged"] == 0
+
+
+def test_hedge_wins_count_after_the_hedged_model_failed(pool):
+    use, behaviour, _ = pool
+    use("a", "b")
+    behaviour.update(a=(0.05, OpenRouterError("down", category="server")), b=(0.1, "from b"))
+    assert _complete() == "from b"
+    stats = openrouter_service.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1 and stats["fallbacks"] == 0
+
+
+# ── On a server ────────────────────────────────────────────────────────────
+
+def _ask(client: httpx.Client, base_url: str) -> tuple[int, float, str]:
+    started  = time.perf_counter()
+    response = client.post(f"{base_url}/api/chat", json={"message": "What projects has Hanzala built?"})
+    detail   = "" if response.status_code == 200 else response.json().get("detail", "")
+    return response.status_code, time.perf_counter() - started, detail
+
+
+def _breaker(base_url: str) -> dict:
+    """Breaker state of the (only) model."""
+    models = admin_status(base_url)["openrouter"]["models"]
+    return next(iter(models.values()))["breaker"]
+
+
+def test_retries_ride_out_a_flaky_upstream():
+    with fake_server(latency_ms=20, error_rate=0.2, error_status=503) as upstream:
+        with app_server(upstream, env={**_ENV, "OPENROUTER_RETRIES": "3"}) as base_url:
+            with httpx.Client(timeout=60) as client:
+                ok = sum(_ask(client, base_url)[0] == 200 for _ in range(30))
+    assert ok >= 29
+
+
+def test_retry_after_and_breaker():
+    with fake_server(latency_ms=20) as upstream, \
+            app_server(upstream, env={**_ENV, "OPENROUTER_RETRIES": "3"}) as base_url, \
+            httpx.Client(timeout=60) as client:
+        set_faults(upstream, error_rate=0, error_status=429, retry_after=1, fail_next=1)
+        status, elapsed, _ = _ask(client, base_url)
+        assert status == 200 and elapsed >= 1.0, "Retry-After was not honoured"
+
+        set_faults(upstream, retry_after=60, fail_next=1)
+        status, elapsed, _ = _ask(client, base_url)
+        assert status == 502 and elapsed < 1.0, "a long Retry-After should fail fast"
+
+        # Outage: the breaker opens and later requests never reach the upstream
+        set_faults(upstream, error_rate=1.0, error_status=503, retry_after=None)
+        before  = upstream_calls(upstream)
+        results = [_ask(client, base_url) for _ in range(10)]
+        fast    = [r for r in results if "circuit open" in r[2]]
+        breaker = _breaker(base_url)
+        assert all(r[0] == 502 for r in results)
+        assert fast and breaker["state"] == "open", "breaker did not open"
+        assert set(client.get(f"{base_url}/health").json()["breakers"].values()) == {"open"}
+        assert upstream_calls(upstream) - before < 10 * 4
+
+        # Recovery: a half-open probe closes it
+        set_faults(upstream, error_rate=0.0)
+        time.sleep(breaker["retry_in"] + 0.2)
+        assert _ask(client, base_url)[0] == 200
+        assert _breaker(base_url)["state"] == "closed", "breaker did not close"
+        assert set(client.get(f"{base_url}/health").json()["breakers"].values()) == {"closed"}
@@ -0,0 +1,102 @@
+"""
+backend/tests/test_retention.py
+
+Chat-log retention (app/database/retention.py) on a synthetic database,
+while a background thread keeps inserting rows the way the chat-log writer
+does (``db._write_rows``, one small batch at a time).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+_ROWS           = 20_000
+_DAYS           = 60
+_RETENTION_DAYS = 30
+
+
+def _generate() -> None:
+    from app.database import db
+
+    end   = datetime.now(tz=timezone.utc)
+    start = end - timedelta(days=_DAYS)
+    step  = (end - start) / _ROWS
+    rows  = []
+    for i in range(_ROWS):
+        role = "user" if i % 2 == 0 else "assistant"
+        text = f"Question number {i % 500}?" if role == "user" else "x" * (200 + i % 600)
+        rows.append((role, text, (start + step * i).isoformat(), f"s{i // 8}", i % 8))
+    db._write_rows(rows)
+
+
+def _background_inserts(stop: threading.Event, batches: list[int]) -> None:
+    from app.database import db
+
+    i = 0
+    while not stop.is_set():
+        db._write_rows([("user", f"live {i}-{j}", db._utc_now(), "live", j) for j in range(20)])
+        batches.append(i)
+        i += 1
+        time.sleep(0.005)
+
+
+def _read_archive(archive_dir: Path) -> tuple[list[dict], int]:
+    records, files = [], 0
+    for path in sorted(archive_dir.rglob("*.ndjson.gz")):
+        files += 1
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            records.extend(json.loads(line) for line in handle)
+    return records, files
+
+
+def test_expiry_under_concurrent_writes():
+    from app.database import db, retention
+
+    path = Path(os.environ["CHAT_LOG_DB_PATH"])
+    _generate()
+    db._get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+    probe  = sqlite3.connect(path)
+    cutoff = (datetime.now(tz=timezone.utc) - timedelta(days=_RETENTION_DAYS)).isoformat()
+    expected_ids = {row[0] for row in probe.execute("SELECT id FROM chat_logs WHERE timestamp < ?;", (cutoff,))}
+    kept = probe.execute("SELECT count(*) FROM chat_logs WHERE timestamp >= ?;", (cutoff,)).fetchone()[0]
+    hourly_before = probe.execute("SELECT sum(messages) FROM chat_hourly;").fetchone()[0]
+    assert probe.execute("PRAGMA auto_vacuum;").fetchone()[0] == 2, "new database is not incremental"
+
+    stop, batches = threading.Event(), []
+    writer = threading.Thread(target=_background_inserts, args=(stop, batches))
+    writer.start()
+    time.sleep(0.2)
+    try:
+        report = retention.run_maintenance(retention_days=_RETENTION_DAYS)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert report["expired_rows"] == len(expected_ids)
+    # rows logged during the pass are newer than the cutoff; none are lost
+    left_old = probe.execute("SELECT count(*) FROM chat_logs WHERE timestamp < ?;", (report["cutoff"],)).fetchone()[0]
+    left_new = probe.execute("SELECT count(*) FROM chat_logs WHERE session_id != 'live';").fetchone()[0]
+    live     = probe.execute("SELECT count(*) FROM chat_logs WHERE session_id = 'live';").fetchone()[0]
+    assert left_old == 0, "expired rows were left behind"
+    assert left_new >= kept - 1 and live == 20 * len(batches), "rows outside the window were deleted"
+
+    records, files = _read_archive(Path(os.environ["CHAT_LOG_ARCHIVE_DIR"]))
+    assert {r["id"] for r in records} == expected_ids and len(records) == len(expected_ids), \
+        "archive does not match the expired rows"
+    assert files == len({r["timestamp"][:10] for r in records}), "expected one archive file per day"
+
+    hourly_after = probe.execute("SELECT sum(messages) FROM chat_hourly;").fetchone()[0]
+    assert hourly_after == hourly_before + live, "count rollups changed"
+    oldest_question = probe.execute("SELECT min(hour) FROM chat_questions;").fetchone()[0]
+    assert oldest_question >= report["cutoff"][:13], "question rollups were not pruned"
+    assert report["vacuumed_pages"] > 0 and report["reclaimed_bytes"] > 0
+    assert not report["checkpoint"]["busy"], "WAL checkpoint could not complete"
+    probe.close()
@@ -0,0 +1,133 @@
+"""
+backend/tests/test_serve.py
+
+The multi-worker launcher (``python -m app.serve``) on a running server:
+schema creation racing across processes, worker supervision, one session
+served by both workers, and a graceful drain on ``SIGTERM``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.services import tracing
+from benchmarks.app_server import app_process
+from benchmarks.fake_openrouter import _BACKEND_DIR, fake_server
+from tests.helpers import wait_for
+
+
+def _pids(base_url: str, tries: int = 40) -> set[int]:
+    return {
+        httpx.get(f"{base_url}/health", headers={"Connection": "close"}, timeout=10).json()["pid"]
+        for _ in range(tries)
+    }
+
+
+def test_concurrent_schema_creation(tmp_path):
+    path  = tmp_path / "chat_logs.db"
+    env   = {**os.environ, "CHAT_LOG_DB_PATH": str(path)}
+    procs = [
+        subprocess.Popen([sys.executable, "-c", "from app.database import db; db.init_db()"], cwd=_BACKEND_DIR, env=env)
+        for _ in range(6)
+    ]
+    assert [proc.wait(timeout=60) for proc in procs] == [0] * 6
+    with sqlite3.connect(path) as conn:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")]
+    assert tables.count("chat_logs") == 1
+
+
+def test_workers_are_supervised():
+    with fake_server(latency_ms=50) as upstream, \
+            app_process(upstream, workers=2, launcher="serve") as (base_url, proc):
+        assert wait_for(lambda: len(_pids(base_url)) == 2, interval=0.3)
+
+        victim = min(_pids(base_url))
+        os.kill(victim, signal.SIGKILL)
+        assert wait_for(lambda: len(_pids(base_url)) == 2 and victim not in _pids(base_url), interval=0.3), \
+            "a killed worker was not replaced"
+
+        os.kill(proc.pid, signal.SIGTTIN)
+        assert wait_for(lambda: len(_pids(base_url)) == 3, interval=0.3)
+        os.kill(proc.pid, signal.SIGTTOU)
+        assert wait_for(lambda: len(_pids(base_url)) == 2, interval=0.3)
+
+
+def test_sessions_hold_across_workers(tmp_path):
+    db_path, traces = tmp_path / "chat_logs.db", tmp_path / "traces.db"
+    env = {
+        "CHAT_LOG_DB_PATH":     str(db_path),
+        "ANSWER_CACHE_ENABLED": "0",
+        "TRACE_SAMPLE_RATE":    "1",
+        "TRACE_SINK":           "sqlite",
+        "TRACE_PATH":           str(traces),
+    }
+    with fake_server(latency_ms=10) as upstream, \
+            app_process(upstream, env=env, workers=2, launcher="serve") as (base_url, _):
+        assert wait_for(lambda: len(_pids(base_url)) == 2, interval=0.3)
+        ids = []
+        for i in range(12):
+            response = httpx.post(f"{base_url}/api/chat", json={"message": f"And project {i}?", "session_id": "shared"},
+                                  headers={"Connection": "close"}, timeout=30)
+            assert response.status_code == 200
+            ids.append(response.headers["X-Trace-Id"])
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT role, turn FROM chat_logs WHERE session_id = 'shared' ORDER BY id;").fetchall()
+    assert rows == [("user" if turn % 2 == 0 else "assistant", turn) for turn in range(24)], "turn indices repeat"
+
+    records = {r["trace_id"]: r for r in tracing.slowest(100, path=traces)}
+    assert len({records[i]["pid"] for i in ids}) == 2, "one worker served the whole session"
+    history = [next(s["history_turns"] for s in records[i]["spans"] if s["name"] == "build_prompt") for i in ids]
+    assert history == list(range(0, 24, 2)), "a worker prompted with a stale history"
+
+
+async def _stream(client: httpx.AsyncClient, base_url: str, i: int, started: asyncio.Event) -> list[str]:
+    events: list[str] = []
+    async with client.stream("POST", f"{base_url}/api/chat/stream",
+                             json={"message": f"Tell me about project {i}?"}) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                events.append(line[7:])
+                started.set()
+    return events
+
+
+def test_sigterm_drains_open_streams(tmp_path):
+    db_path = tmp_path / "chat_logs.db"
+
+    async def run(base_url: str, proc: subprocess.Popen):
+        async with httpx.AsyncClient(timeout=60) as client:
+            starts  = [asyncio.Event() for _ in range(4)]
+            streams = [asyncio.create_task(_stream(client, base_url, i, starts[i])) for i in range(4)]
+            await asyncio.gather(*(event.wait() for event in starts))
+
+            signalled = time.perf_counter()
+            proc.send_signal(signal.SIGTERM)
+            await asyncio.sleep(0.5)
+            try:
+                await client.get(f"{base_url}/health", timeout=2)
+                refused = False
+            except httpx.TransportError:
+                refused = True
+            results = await asyncio.gather(*streams)
+        code = await asyncio.to_thread(proc.wait, 60)
+        return results, refused, code, time.perf_counter() - signalled
+
+    with fake_server(latency_ms=50, token_ms=150) as upstream, \
+            app_process(upstream, env={"CHAT_LOG_DB_PATH": str(db_path)}, workers=2, launcher="serve") as (base_url, proc):
+        results, refused, code, exited = asyncio.run(run(base_url, proc))
+
+    with sqlite3.connect(db_path) as conn:
+        logged = conn.execute("SELECT COUNT(*) FROM chat_logs WHERE role = 'assistant'").fetchone()[0]
+    assert all(events[-1:] == ["done"] for events in results), "a stream was cut off"
+    assert refused and code == 0
+    assert exited < 15, "the launcher waited for its kill deadline"
+    assert logged == 4, "a drained stream was not recorded"
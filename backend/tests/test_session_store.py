@@ -0,0 +1,96 @@
+"""
+backend/tests/test_session_store.py
+
+Server-side history (app/services/session_store.py): a session is read
+from the chat log on a worker thread, so a slow read — here the chat log's
+lock held by another thread — does not stall the event loop; a cached
+session follows turns written by another process; and on a running
+server, a question that failed stays out of the history.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import httpx
+
+from app.database import db
+from app.services import session_store
+from benchmarks.app_server import app_process
+from benchmarks.fake_openrouter import fake_server
+from tests.helpers import set_faults
+
+_HELD = 0.3     # seconds the chat log's lock is held
+
+
+def test_reload_runs_off_the_event_loop():
+    db.init_db()
+    db.log_message("user", "What has he built?", session_id="reload", turn=0)
+    db.log_message("assistant", "Several projects.", session_id="reload", turn=1)
+
+    async def run() -> tuple[list[dict[str, str]], int]:
+        ticks = 0
+        held  = threading.Event()
+
+        def hold_lock() -> None:
+            with db._lock:
+                held.set()
+                time.sleep(_HELD)
+
+        holder = threading.Thread(target=hold_lock)
+
+        async def tick() -> None:
+            nonlocal ticks
+            while holder.is_alive():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        holder.start()
+        held.wait()
+        turns, _ = await asyncio.gather(session_store.history("reload"), tick())
+        holder.join()
+        return turns, ticks
+
+    turns, ticks = asyncio.run(run())
+    assert [t["content"] for t in turns] == ["What has he built?", "Several projects."]
+    assert ticks >= 10, "the event loop stalled while the history was read"
+    assert asyncio.run(session_store.record("reload", "And since then?", "Two more.")) == 2
+
+
+def test_cached_sessions_follow_other_writers():
+    async def run() -> tuple[list[str], int | None]:
+        await session_store.record("shared", "First question?", "First answer.")
+        assert len(await session_store.history("shared")) == 2        # cached from here on
+        db.append_turns("shared", [("user", "Asked elsewhere?"), ("assistant", "Answered elsewhere.")])
+        turns = [t["content"] for t in await session_store.history("shared")]
+        return turns, await session_store.record("shared", "Third question?", "Third answer.")
+
+    turns, turn = asyncio.run(run())
+    assert turns == ["First question?", "First answer.", "Asked elsewhere?", "Answered elsewhere."]
+    assert turn == 4
+
+
+# ── On a server ────────────────────────────────────────────────────────────
+
+def test_failed_questions_stay_out_of_the_history(tmp_path):
+    db_path = tmp_path / "chat_logs.db"
+    env     = {"CHAT_LOG_DB_PATH": str(db_path), "ANSWER_CACHE_ENABLED": "0", "OPENROUTER_RETRIES": "0"}
+    with fake_server(latency_ms=10) as upstream, app_process(upstream, env=env) as (base_url, _), \
+            httpx.Client(timeout=30) as client:
+        def ask(message: str) -> int:
+            return client.post(f"{base_url}/api/chat", json={"message": message, "session_id": "retry"}).status_code
+
+        assert ask("What has he built?") == 200
+        set_faults(upstream, fail_next=1)
+        assert ask("Which of those used FastAPI?") == 502
+        assert ask("Which of those used FastAPI?") == 200
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT role, message, turn FROM chat_logs WHERE session_id = 'retry' ORDER BY id;").fetchall()
+    turns = [(role, message) for role, message, turn in rows if turn is not None]
+    assert [turn for *_, turn in rows if turn is not None] == [0, 1, 2, 3]
+    assert [message for role, message in turns if role == "user"] == ["What has he built?", "Which of those used FastAPI?"]
+    assert ("user", "Which of those used FastAPI?", None) in rows, "the failed question was not logged"
@@ -0,0 +1,99 @@
+"""
+backend/tests/test_single_flight.py
+
+Request coalescing: ``SingleFlight`` in process, and identical concurrent
+``POST /api/chat`` requests against a slow fake OpenRouter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.single_flight import SingleFlight
+from benchmarks.app_server import app_server
+from benchmarks.fake_openrouter import fake_server
+from tests.helpers import upstream_calls
+
+_QUESTION = "What projects has Hanzala built?"
+
+
+# ── SingleFlight ───────────────────────────────────────────────────────────
+
+def test_concurrent_calls_share_one_execution():
+    async def run():
+        flights, calls = SingleFlight(), []
+
+        async def fn() -> str:
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "answer"
+
+        results = await asyncio.gather(*(flights.do("key", fn) for _ in range(10)))
+        again   = await flights.do("key", fn)
+        return results, again, len(calls), flights.stats()
+
+    results, again, calls, stats = asyncio.run(run())
+    assert results == ["answer"] * 10 and again == "answer"
+    assert calls == 2, "a finished call must not be reused"
+    assert stats == {"in_flight": 0, "calls": 11, "executions": 2, "coalesced": 9}
+
+
+def test_every_waiter_gets_the_same_exception():
+    async def run():
+        flights = SingleFlight()
+
+        async def fn() -> str:
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        return await asyncio.gather(*(flights.do("key", fn) for _ in range(5)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(e, ValueError) for e in errors) and len({id(e) for e in errors}) == 1
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    async def run():
+        flights = SingleFlight()
+
+        async def fn() -> str:
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader   = asyncio.ensure_future(flights.do("key", fn))
+        follower = asyncio.ensure_future(flights.do("key", fn))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "answer"
+
+
+# ── On a server ────────────────────────────────────────────────────────────
+
+async def _burst(base_url: str, count: int) -> list[httpx.Response]:
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=count)) as client:
+        return await asyncio.gather(
+            *(client.post(f"{base_url}/api/chat", json={"message": _QUESTION}) for _ in range(count))
+        )
+
+
+@pytest.mark.parametrize("status, coalesce", [(200, True), (503, True), (200, False)])
+def test_identical_requests_reach_upstream_once(status, coalesce):
+    env = {
+        "ANSWER_CACHE_ENABLED": "0",
+        "OPENROUTER_RETRIES":   "0",
+        "OPENROUTER_COALESCE":  "1" if coalesce else "0",
+    }
+    error_rate = 0.0 if status == 200 else 1.0
+    with fake_server(latency_ms=500, error_rate=error_rate, error_status=status) as upstream:
+        with app_server(upstream, env=env) as base_url:
+            responses = asyncio.run(_burst(base_url, 20))
+        calls = upstream_calls(upstream)
+
+    assert {r.status_code for r in responses} == {200 if status == 200 else 502}
+    assert len({r.json().get("response") or r.json().get("detail") for r in responses}) == 1
+    assert calls == (1 if coalesce else 20)
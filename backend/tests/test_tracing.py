@@ -0,0 +1,209 @@
+"""
+backend/tests/test_tracing.py
+
+Request tracing (app/services/tracing.py): keep rules and span nesting in
+process, then end to end against the fake OpenRouter — every slow and
+failed request is in the sink under the ``X-Trace-Id`` it was answered
+with, with its OpenRouter attempts nested under ``ask_openrouter``, and a
+streamed reply's trace is stored once the stream closes.  The cost of
+tracing is measured by benchmarks/bench_tracing.py.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.services import tracing
+from benchmarks.app_server import app_server
+from benchmarks.fake_openrouter import _BACKEND_DIR, fake_server
+from tests.helpers import set_faults
+
+_MODEL   = "mistralai/mistral-7b-instruct"
+_SLOW_MS = 300
+
+
+# ── In process ─────────────────────────────────────────────────────────────
+
+def test_spans_nest_under_the_current_span():
+    with tracing.trace("chat", "s") as trace_:
+        with tracing.span("ask_openrouter"):
+            with tracing.span("openrouter_attempt", attempt=0):
+                tracing.annotate(status=200)
+            tracing.record("retry_wait", time.perf_counter())
+        assert tracing.current_id() == trace_.id
+    assert tracing.current_id() is None
+
+    by_name = {name: (id_, parent, attrs) for id_, parent, name, _, _, attrs in trace_.spans}
+    ask_id = by_name["ask_openrouter"][0]
+    assert by_name["ask_openrouter"][1] == 0
+    assert by_name["openrouter_attempt"][1] == ask_id and by_name["retry_wait"][1] == ask_id
+    assert by_name["openrouter_attempt"][2] == {"attempt": 0, "status": 200}
+
+
+def test_spans_outside_a_trace_are_no_ops():
+    with tracing.span("orphan") as span:
+        span.set(ignored=True)
+    tracing.record("orphan", time.perf_counter())
+    assert tracing.current_id() is None
+
+
+def test_keep_rules(monkeypatch):
+    monkeypatch.setattr(tracing, "_SAMPLE_RATE", 0.0)
+    tracing.start_exporter()
+    try:
+        with pytest.raises(RuntimeError):
+            with tracing.trace("chat", "error"):
+                raise RuntimeError("boom")
+        with tracing.trace("chat", "slow", started=time.perf_counter() - tracing._SLOW_MS / 1000):
+            pass
+        with tracing.trace("chat", "discarded"):
+            pass
+        monkeypatch.setattr(tracing, "_SAMPLE_RATE", 1.0)
+        with tracing.trace("chat", "sampled"):
+            pass
+    finally:
+        tracing.stop_exporter()
+
+    kept = {r["session_id"]: r for r in tracing.slowest(100, path=tracing._PATH)}
+    assert {kept[s]["kept"] for s in ("error", "slow", "sampled")} == {"error", "slow", "sampled"}
+    assert "discarded" not in kept
+    assert kept["error"]["status"] == "error" and kept["error"]["error"] == "RuntimeError"
+
+
+# ── End to end ─────────────────────────────────────────────────────────────
+
+def _env(path: Path, sink: str) -> dict[str, str]:
+    return {
+        "TRACE_SAMPLE_RATE":            "0.1",
+        "TRACE_SLOW_MS":                str(_SLOW_MS),
+        "TRACE_SINK":                   sink,
+        "TRACE_PATH":                   str(path),
+        "TRACE_FLUSH_INTERVAL":         "0.2",
+        "OPENROUTER_MODEL":             _MODEL,
+        "OPENROUTER_RETRIES":           "1",
+        "OPENROUTER_RETRY_BASE":        "0.05",
+        "OPENROUTER_BREAKER_MIN_CALLS": "100000",
+    }
+
+
+def _run(upstream: str, path: Path, sink: str, fast: int, slow: int, errors: int) -> dict[str, list[str]]:
+    """Send the three kinds of request; return the trace ids of each."""
+    ids: dict[str, list[str]] = {"fast": [], "slow": [], "error": []}
+    set_faults(upstream, model_latency_ms={}, error_rate=0.0)
+    with app_server(upstream, env=_env(path, sink)) as base_url, httpx.Client(timeout=30) as client:
+        def ask(i: int, expected: int) -> str:
+            response = client.post(f"{base_url}/api/chat",
+                                   json={"message": f"Question {i}: what has Hanzala built?", "session_id": f"s{i}"})
+            assert response.status_code == expected
+            return response.headers.get("x-trace-id", "")
+
+        ids["fast"] = [ask(i, 200) for i in range(fast)]
+        set_faults(upstream, model_latency_ms={_MODEL: _SLOW_MS + 100})
+        ids["slow"] = [ask(fast + i, 200) for i in range(slow)]
+        set_faults(upstream, model_latency_ms={}, error_rate=1.0, error_status=503)
+        ids["error"] = [ask(fast + slow + i, 502) for i in range(errors)]
+        set_faults(upstream, error_rate=0.0)
+        time.sleep(0.5)                                   # one more flush before shutdown
+    return ids
+
+
+def _check_spans(record: dict, kind: str) -> None:
+    by_id = {s["id"]: s for s in record["spans"]}
+    names = [s["name"] for s in record["spans"]]
+    ask   = next(s for s in record["spans"] if s["name"] == "ask_openrouter")
+    attempts = [s for s in record["spans"] if s["name"] == "openrouter_attempt"]
+    assert all(by_id[s["parent"]] is ask for s in attempts), "attempts not nested under ask_openrouter"
+    if kind == "error":
+        assert len(attempts) == 2 and "retry_wait" in names, names
+        assert record["error"] == "HTTP 502" and ask["error"] == "server", (record["error"], ask)
+        assert all(s["status"] == 503 for s in attempts)
+    else:
+        assert attempts[0]["duration_ms"] >= _SLOW_MS and record["duration_ms"] >= _SLOW_MS
+    for required in ("validation", "rate_limit", "history", "log_message", "build_prompt"):
+        assert required in names, (required, names)
+
+
+@pytest.fixture(scope="module")
+def upstream():
+    with fake_server(latency_ms=10) as url:
+        yield url
+
+
+def test_sqlite_sink_keeps_slow_failed_and_sampled(upstream, tmp_path):
+    fast, path = 150, tmp_path / "traces.db"
+    ids = _run(upstream, path, "sqlite", fast, 5, 4)
+    with sqlite3.connect(path) as conn:
+        records = {row[0]: json.loads(row[1]) for row in conn.execute("SELECT trace_id, record FROM traces;")}
+
+    every = sum(ids.values(), [])
+    assert all(every) and len(set(every)) == len(every), "missing or duplicate X-Trace-Id"
+    for kind in ("slow", "error"):
+        assert all(records[i]["kept"] == kind for i in ids[kind]), f"{kind} traces missing"
+    sampled = [i for i in ids["fast"] if i in records]
+    assert all(records[i]["kept"] == "sampled" for i in sampled)
+    assert fast * 0.02 <= len(sampled) <= fast * 0.25, f"{len(sampled)} of {fast} fast requests sampled"
+    assert len(records) == len(sampled) + len(ids["slow"]) + len(ids["error"]), "unexpected traces in the sink"
+
+    _check_spans(records[ids["error"][0]], "error")
+    _check_spans(records[ids["slow"][0]], "slow")
+
+    out = subprocess.run(
+        [sys.executable, "-m", "app.services.tracing", "--slowest", "3", "--path", str(path)],
+        cwd=_BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    assert out.count("kept=") == 3 and "openrouter_attempt" in out, out
+    assert tracing.format_trace(tracing.slowest(1, path=path)[0]).splitlines()[0] in out
+
+
+def test_jsonl_sink(upstream, tmp_path):
+    path   = tmp_path / "traces.jsonl"
+    ids    = _run(upstream, path, "jsonl", 0, 0, 3)
+    stored = {r["trace_id"]: r for r in tracing.slowest(100, errors=True, path=path)}
+    assert set(ids["error"]) == set(stored), "jsonl sink is missing failed traces"
+    _check_spans(stored[ids["error"][0]], "error")
+
+
+def _stream(client: httpx.Client, base_url: str, message: str) -> tuple[int, str]:
+    body = {"message": message, "session_id": "stream"}
+    with client.stream("POST", f"{base_url}/api/chat/stream", json=body) as response:
+        response.read()
+        return response.status_code, response.headers.get("x-trace-id", "")
+
+
+def test_streams_are_traced_until_they_close(upstream, tmp_path):
+    path = tmp_path / "streams.db"
+    set_faults(upstream, model_latency_ms={}, error_rate=0.0)
+    with app_server(upstream, env={**_env(path, "sqlite"), "TRACE_SAMPLE_RATE": "1"}) as base_url, \
+            httpx.Client(timeout=30) as client:
+        ok = _stream(client, base_url, "What did he build with FastAPI?")
+        set_faults(upstream, error_rate=1.0, error_status=503)
+        failed = _stream(client, base_url, "What did he build with Django?")
+        set_faults(upstream, error_rate=0.0)
+        time.sleep(0.5)
+
+    assert ok[0] == 200 and failed[0] == 502 and ok[1] and failed[1], (ok, failed)
+    records = {r["trace_id"]: r for r in tracing.slowest(100, path=path)}
+    done, error = records[ok[1]], records[failed[1]]
+    assert done["name"] == "chat_stream" and done["status"] == "ok"
+    assert error["status"] == "error" and error["error"] == "HTTP 502"
+
+    for record in (done, error):
+        names    = [s["name"] for s in record["spans"]]
+        call     = next(s for s in record["spans"] if s["name"] == "stream_openrouter")
+        attempts = [s for s in record["spans"] if s["name"] == "openrouter_attempt"]
+        assert attempts and all(s["parent"] == call["id"] for s in attempts), "attempts not nested"
+        for required in ("validation", "rate_limit", "history", "log_message", "warm_answers", "build_prompt",
+                         "answer_cache"):
+            assert required in names, (required, names)
+    assert [s["turns"] for s in done["spans"] if s["name"] == "log_message"] == [2]
+    assert "stream_body" in [s["name"] for s in done["spans"]]
+    assert len([s for s in error["spans"] if s["name"] == "openrouter_attempt"]) == 2
+    assert "retry_wait" in [s["name"] for s in error["spans"]]
@@ -0,0 +1,139 @@
+"""
+backend/tests/test_warm_answers.py
+
+Precomputed seed answers (``WARM_ANSWERS_ENABLED=1``): how often the FAQ
+list is read, in process, then on a running server against a fake
+OpenRouter with a 300 ms reply time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.services import warm_answers
+from benchmarks.app_server import admin_status, app_server
+from benchmarks.fake_openrouter import _BACKEND_DIR, fake_server
+from tests.helpers import upstream_calls, wait_for
+
+_RESUME = Path(_BACKEND_DIR) / "app" / "data" / "resume_data.json"
+
+
+# ── In process ─────────────────────────────────────────────────────────────
+
+def test_faq_is_read_once_per_run(monkeypatch, tmp_path):
+    faq = tmp_path / "faq.txt"
+    faq.write_text("Does he mentor juniors?\n# not a question\nwhat projects has hanzala built\n", encoding="utf-8")
+    reads = []
+    read  = warm_answers._read_questions
+    monkeypatch.setattr(warm_answers, "_ENABLED", True)
+    monkeypatch.setattr(warm_answers, "_FAQ_PATH", str(faq))
+    monkeypatch.setattr(warm_answers, "_questions", list(warm_answers.SUGGESTIONS))
+    monkeypatch.setattr(warm_answers, "_read_questions", lambda: reads.append(1) or read())
+    monkeypatch.setattr(warm_answers, "_due", lambda *_: [])           # nothing to generate
+
+    assert asyncio.run(warm_answers.warm()) == 0
+    for _ in range(50):
+        warm_answers.warm_questions()
+        warm_answers.stats()
+    assert len(reads) == 1 and warm_answers.stats()["questions"] == len(warm_answers.SUGGESTIONS) + 1
+
+
+# ── On a server ────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def upstream():
+    with fake_server(latency_ms=300) as url:
+        yield url
+
+
+def _env(store: Path, **extra: str) -> dict[str, str]:
+    return {"WARM_ANSWERS_ENABLED": "1", "WARM_ANSWERS_PATH": str(store), "WARM_ANSWERS_CHECK_INTERVAL": "0.2",
+            **extra}
+
+
+def _warm(base_url: str) -> list[str]:
+    return httpx.get(f"{base_url}/api/chat/suggestions", headers={"Connection": "close"}).json()["warm"]
+
+
+def _wait_warm(base_url: str, count: int = 6) -> float:
+    started = time.perf_counter()
+    assert wait_for(lambda: len(_warm(base_url)) == count), f"only {_warm(base_url)} became warm"
+    return time.perf_counter() - started
+
+
+def _p50_ms(client: httpx.Client, base_url: str, messages: list[str]) -> float:
+    samples = []
+    for message in messages:
+        started = time.perf_counter()
+        client.post(f"{base_url}/api/chat", json={"message": message}).raise_for_status()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def test_boot_then_restart_from_disk(upstream, tmp_path):
+    env    = _env(tmp_path / "boot.json")
+    before = upstream_calls(upstream)
+    with app_server(upstream, env=env) as base_url, httpx.Client(timeout=30) as client:
+        took  = _wait_warm(base_url)
+        assert upstream_calls(upstream) - before == 6 and took < 1.5, "the six answers were not generated in parallel"
+        seeds = client.get(f"{base_url}/api/chat/suggestions").json()["questions"]
+        warm  = _p50_ms(client, base_url, [seeds[i % 6].lower() for i in range(30)])
+        typed = _p50_ms(client, base_url, [f"Typed question {i}?" for i in range(3)])
+        assert warm < 20 and typed > 250
+        assert admin_status(base_url)["warm_answers"]["hits"] == 30
+
+    before = upstream_calls(upstream)
+    with app_server(upstream, env=env) as base_url:
+        _wait_warm(base_url)
+        assert upstream_calls(upstream) == before, "a restart regenerated stored answers"
+
+
+def test_resume_edit_makes_answers_stale(upstream, tmp_path):
+    resume = tmp_path / "resume_data.json"
+    resume.write_text(_RESUME.read_text(encoding="utf-8"), encoding="utf-8")
+    store = tmp_path / "reload.json"
+    env   = _env(store, RESUME_DATA_PATH=str(resume), RESUME_RELOAD_INTERVAL="0.1")
+    with app_server(upstream, env=env) as base_url:
+        _wait_warm(base_url)
+        old    = admin_status(base_url)["context"]["fingerprint"]
+        before = upstream_calls(upstream)
+        data = json.loads(resume.read_text(encoding="utf-8"))
+        data["projects"][0]["description"] += " Now with precomputed answers."
+        resume.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        assert wait_for(lambda: admin_status(base_url)["context"]["fingerprint"] != old, 5, 0.02)
+        assert len(_warm(base_url)) == 0, "stale answers were served"
+        _wait_warm(base_url)
+        context = admin_status(base_url)["context"]["fingerprint"]
+        stored  = {a["fingerprint"] for a in json.loads(store.read_text(encoding="utf-8"))["answers"]}
+        assert upstream_calls(upstream) - before == 6 and stored == {context}
+
+
+def test_expired_answers_refresh_in_background(upstream, tmp_path):
+    env = _env(tmp_path / "refresh.json", WARM_ANSWERS_TTL="1")
+    with app_server(upstream, env=env) as base_url, httpx.Client(timeout=30) as client:
+        _wait_warm(base_url)
+        samples  = []
+        deadline = time.perf_counter() + 3.0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.post(f"{base_url}/api/chat", json={"message": "What are his main technical skills?"})
+            samples.append((time.perf_counter() - started) * 1000)
+        assert admin_status(base_url)["warm_answers"]["generated"] >= 12
+        assert max(samples) < 100, "a refresh blocked a request"
+
+
+def test_one_worker_generates_both_serve(upstream, tmp_path):
+    before = upstream_calls(upstream)
+    with app_server(upstream, env=_env(tmp_path / "workers.json"), workers=2, launcher="serve") as base_url:
+        _wait_warm(base_url)
+        time.sleep(0.5)
+        views = {(status["pid"], status["warm_answers"]["warm"]) for status in (admin_status(base_url) for _ in range(30))}
+    assert len({pid for pid, _ in views}) == 2 and {warm for _, warm in views} == {6}
+    assert upstream_calls(upstream) - before == 6
@@ -24,19 +24,21 @@ export default function ChatWidget() {
   const [unread,      setUnread]      = useState(0)
   const [showBubble,  setShowBubble]  = useState(true)
 
-  const { messages, isLoading, sendMessage, clearChat } = useChat()
+  const { messages, isLoading, isStreaming, sendMessage, clearChat } = useChat()
 
   // Avoid hydration mismatch — portal-like fixed elements need client-only render
   useEffect(() => { setHasMounted(true) }, [])
 
-  // Increment unread badge when a new assistant message arrives while closed
+  // Increment unread badge when a new assistant message arrives while closed.
+  // Keyed on the message id so a streamed answer counts once, not per token.
+  const last = messages[messages.length - 1]
   useEffect(() => {
     if (isOpen) { setUnread(0); return }
-    const last = messages[messages.length - 1]
     if (last && last.role === "assistant" && last.id !== "welcome") {
       setUnread((n) => n + 1)
     }
-  }, [messages, isOpen])
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [last?.id, isOpen])
 
   // Clear badge on open
   const handleOpen = () => {
@@ -77,6 +79,7 @@ export default function ChatWidget() {
             <ChatWindow
               messages={messages}
               isLoading={isLoading}
+              isStreaming={isStreaming}
               onSend={sendMessage}
               onClear={clearChat}
               onClose={handleClose}
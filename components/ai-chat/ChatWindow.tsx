@@ -11,6 +11,7 @@ import QuickPrompts from "@/components/ai-chat/QuickPrompts"
 interface ChatWindowProps {
   messages:  UIChatMessage[]
   isLoading: boolean
+  isStreaming?: boolean
   onSend:    (text: string) => void
   onClear:   () => void
   onClose:   () => void
@@ -19,6 +20,7 @@ interface ChatWindowProps {
 export default function ChatWindow({
   messages,
   isLoading,
+  isStreaming = false,
   onSend,
   onClear,
   onClose,
@@ -32,7 +34,8 @@ export default function ChatWindow({
     el.scrollTo({ top: el.scrollHeight, behavior: "smooth" })
   }, [messages, isLoading])
 
-  const showQuickPrompts = messages.length <= 1 && !isLoading
+  const isBusy           = isLoading || isStreaming
+  const showQuickPrompts = messages.length <= 1 && !isBusy
 
   return (
     <div className="flex h-full flex-col">
@@ -113,11 +116,11 @@ export default function ChatWindow({
 
       {/* ── Quick prompts (only on fresh window) ─────────────────────── */}
       {showQuickPrompts && (
-        <QuickPrompts onSelect={onSend} disabled={isLoading} />
+        <QuickPrompts onSelect={onSend} disabled={isBusy} />
       )}
 
       {/* ── Input ────────────────────────────────────────────────────── */}
-      <ChatInput onSend={onSend} isLoading={isLoading} />
+      <ChatInput onSend={onSend} isLoading={isBusy} />
     </div>
   )
 }
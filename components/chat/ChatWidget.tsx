@@ -23,7 +23,7 @@ const SUGGESTIONS = [
 export default function ChatWidget() {
   const [isOpen, setIsOpen] = useState(false)
   const [hasMounted, setHasMounted] = useState(false)
-  const { messages, isLoading, sendMessage, clearChat } = useChat()
+  const { messages, isLoading, isStreaming, sendMessage, clearChat } = useChat()
 
   // Avoid SSR mismatch — only render after mount
   useEffect(() => {
@@ -100,7 +100,7 @@ export default function ChatWidget() {
             <ChatMessages messages={messages} isLoading={isLoading} />
 
             {/* Suggestion chips — only shown when only welcome message present */}
-            {messages.length === 1 && !isLoading && (
+            {messages.length === 1 && !isLoading && !isStreaming && (
               <div className="px-4 pb-2 flex flex-wrap gap-1.5">
                 {SUGGESTIONS.map((q) => (
                   <button
@@ -120,7 +120,7 @@ export default function ChatWidget() {
             )}
 
             {/* Input */}
-            <ChatInput onSend={sendMessage} disabled={isLoading} />
+            <ChatInput onSend={sendMessage} disabled={isLoading || isStreaming} />
           </m.div>
         )}
       </AnimatePresence>
@@ -1,11 +1,13 @@
 // lib/hooks/useChat.ts
 // Manages AI chat state: messages, loading, error, and session tracking.
+// Answers are streamed: the assistant message is created on the first token
+// and grows in place as further tokens arrive.
 
 "use client"
 
 import { useState, useCallback, useRef } from "react"
-import type { UIChatMessage, ChatRequest, ChatResponse, ChatRole } from "@/types/chat"
-import { sendChatRequest, ChatServiceError } from "@/lib/services/chatService"
+import type { UIChatMessage, ChatRequest, ChatResponse } from "@/types/chat"
+import { streamChatRequest, ChatServiceError } from "@/lib/services/chatService"
 
 const uid = () => crypto.randomUUID()
 
@@ -19,7 +21,10 @@ const WELCOME_MESSAGE: UIChatMessage = {
 
 interface UseChatReturn {
   messages: UIChatMessage[]
+  /** Waiting for the first token of the answer. */
   isLoading: boolean
+  /** Tokens are arriving; the last message is still growing. */
+  isStreaming: boolean
   error: string | null
   sendMessage: (text: string) => Promise<void>
   clearChat: () => void
@@ -28,12 +33,13 @@ interface UseChatReturn {
 export function useChat(): UseChatReturn {
   const [messages, setMessages] = useState<UIChatMessage[]>([WELCOME_MESSAGE])
   const [isLoading, setIsLoading] = useState(false)
+  const [isStreaming, setIsStreaming] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const sessionIdRef = useRef<string>(uid())
 
   const sendMessage = useCallback(async (text: string) => {
     const trimmed = text.trim()
-    if (!trimmed || isLoading) return
+    if (!trimmed || isLoading || isStreaming) return
 
     setError(null)
 
@@ -48,29 +54,32 @@ export function useChat(): UseChatReturn {
     setIsLoading(true)
 
     try {
-      // Build history (exclude welcome & error messages)
-      const history = messages
-        .filter((m) => m.id !== "welcome" && m.role !== "error")
-        .map((m) => ({ role: m.role as ChatRole, content: m.content }))
-
+      // The backend keeps the conversation history per session_id, so only
+      // the new message is sent.
       const body: ChatRequest = {
         message: trimmed,
         session_id: sessionIdRef.current,
-        history,
       }
 
-      const data: ChatResponse = await sendChatRequest(body)
+      // The assistant message is created on the first token, then extended
+      const assistantId = uid()
+      const data: ChatResponse = await streamChatRequest(body, (token) => {
+        setIsLoading(false)
+        setIsStreaming(true)
+        setMessages((prev) => {
+          const last = prev[prev.length - 1]
+          if (last?.id === assistantId) {
+            return [...prev.slice(0, -1), { ...last, content: last.content + token }]
+          }
+          return [
+            ...prev,
+            { id: assistantId, role: "assistant", content: token.trimStart(), timestamp: new Date() },
+          ]
+        })
+      })
 
       // Store session id returned by backend after first turn
       sessionIdRef.current = data.session_id
-
-      const assistantMsg: UIChatMessage = {
-        id: uid(),
-        role: "assistant",
-        content: data.response,
-        timestamp: new Date(),
-      }
-      setMessages((prev) => [...prev, assistantMsg])
     } catch (err) {
       const message =
         err instanceof ChatServiceError
@@ -90,8 +99,9 @@ export function useChat(): UseChatReturn {
       ])
     } finally {
       setIsLoading(false)
+      setIsStreaming(false)
     }
-  }, [messages, isLoading])
+  }, [isLoading, isStreaming])
 
   const clearChat = useCallback(() => {
     sessionIdRef.current = uid()
@@ -99,5 +109,5 @@ export function useChat(): UseChatReturn {
     setError(null)
   }, [])
 
-  return { messages, isLoading, error, sendMessage, clearChat }
+  return { messages, isLoading, isStreaming, error, sendMessage, clearChat }
 }
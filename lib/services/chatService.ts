@@ -9,7 +9,7 @@
  * the built-in Next.js proxy at app/api/chat/route.ts).
  */
 
-import type { ChatRequest, ChatResponse } from "@/types/chat"
+import type { ChatRequest, ChatResponse, ChatStreamDone } from "@/types/chat"
 
 // ── Config ─────────────────────────────────────────────────────────────────
 
@@ -22,6 +22,7 @@ const BASE_URL =
   process.env.NEXT_PUBLIC_CHAT_API?.replace(/\/$/, "") ?? ""
 
 const CHAT_ENDPOINT = `${BASE_URL}/api/chat`
+const STREAM_ENDPOINT = `${BASE_URL}/api/chat/stream`
 
 const DEFAULT_TIMEOUT_MS = 30_000
 
@@ -73,6 +74,68 @@ async function parseResponse(res: Response): Promise<ChatResponse> {
   return data
 }
 
+/** Map a fetch / abort failure to a user-facing ChatServiceError. */
+function toServiceError(err: unknown): ChatServiceError {
+  if (err instanceof DOMException && err.name === "AbortError") {
+    return new ChatServiceError(
+      "Request timed out. The AI assistant took too long to respond.",
+      0,
+    )
+  }
+
+  const msg =
+    err instanceof Error ? err.message : "Unexpected network error."
+
+  // Surface a user-friendly hint when the backend is simply offline
+  if (
+    msg.includes("ECONNREFUSED") ||
+    msg.includes("fetch failed") ||
+    msg.includes("Failed to fetch") ||
+    msg.includes("NetworkError")
+  ) {
+    return new ChatServiceError(
+      "AI assistant is currently unavailable. Please try again later.",
+      0,
+    )
+  }
+
+  return new ChatServiceError(msg, 0)
+}
+
+/**
+ * Split a Server-Sent Events byte stream into `{ event, data }` frames.
+ * Frames are separated by a blank line; `data:` lines are joined.
+ */
+async function* readEvents(
+  body: ReadableStream<Uint8Array>,
+  onChunk: () => void,
+): AsyncGenerator<{ event: string; data: string }> {
+  const reader = body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    onChunk()
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary: number
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+
+      let event = "message"
+      const data: string[] = []
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim()
+        else if (line.startsWith("data:")) data.push(line.slice(5).trimStart())
+      }
+      if (data.length) yield { event, data: data.join("\n") }
+    }
+  }
+}
+
 // ── Public API ─────────────────────────────────────────────────────────────
 
 /**
@@ -98,31 +161,7 @@ export async function sendChatRequest(
     return await parseResponse(res)
   } catch (err) {
     if (err instanceof ChatServiceError) throw err
-
-    if (err instanceof DOMException && err.name === "AbortError") {
-      throw new ChatServiceError(
-        "Request timed out. The AI assistant took too long to respond.",
-        0,
-      )
-    }
-
-    const msg =
-      err instanceof Error ? err.message : "Unexpected network error."
-
-    // Surface a user-friendly hint when the backend is simply offline
-    if (
-      msg.includes("ECONNREFUSED") ||
-      msg.includes("fetch failed") ||
-      msg.includes("Failed to fetch") ||
-      msg.includes("NetworkError")
-    ) {
-      throw new ChatServiceError(
-        "AI assistant is currently unavailable. Please try again later.",
-        0,
-      )
-    }
-
-    throw new ChatServiceError(msg, 0)
+    throw toServiceError(err)
   } finally {
     clearTimeout(timer)
   }
@@ -141,3 +180,62 @@ export async function sendMessage(message: string): Promise<string> {
   const { response } = await sendChatRequest(payload)
   return response
 }
+
+/**
+ * Send a ChatRequest to the streaming endpoint and deliver the answer token
+ * by token through `onToken`. Resolves with the full ChatResponse once the
+ * backend signals completion.
+ *
+ * The timeout is an idle timeout: it is reset whenever bytes arrive, so
+ * long answers are not cut off while tokens are still flowing.
+ *
+ * @throws {ChatServiceError} on network failure, timeout, or API error
+ *         (including errors reported mid-stream).
+ */
+export async function streamChatRequest(
+  request: ChatRequest,
+  onToken: (token: string) => void,
+): Promise<ChatResponse> {
+  const controller = new AbortController()
+  let timer = setTimeout(() => controller.abort(), DEFAULT_TIMEOUT_MS)
+  const resetTimer = () => {
+    clearTimeout(timer)
+    timer = setTimeout(() => controller.abort(), DEFAULT_TIMEOUT_MS)
+  }
+
+  try {
+    const res = await fetch(STREAM_ENDPOINT, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(request),
+      signal: controller.signal,
+    })
+
+    // Errors before the stream starts come back as regular JSON bodies
+    if (!res.ok || !res.body) {
+      await parseResponse(res)
+      throw new ChatServiceError("Empty response stream.", res.status)
+    }
+
+    let response = ""
+    for await (const { event, data } of readEvents(res.body, resetTimer)) {
+      const payload = JSON.parse(data)
+      if (event === "token") {
+        response += payload.token
+        onToken(payload.token)
+      } else if (event === "error") {
+        throw new ChatServiceError(payload.detail ?? "AI backend error", 502)
+      } else if (event === "done") {
+        const done = payload as ChatStreamDone
+        return { response: response.trim(), session_id: done.session_id, model: "" }
+      }
+    }
+
+    throw new ChatServiceError("The response stream ended unexpectedly.", 0)
+  } catch (err) {
+    if (err instanceof ChatServiceError) throw err
+    throw toServiceError(err)
+  } finally {
+    clearTimeout(timer)
+  }
+}
@@ -22,7 +22,10 @@ export interface ChatRequest {
   message: string
   /** Optional session identifier for multi-turn continuity. */
   session_id?: string
-  /** Prior conversation turns (optional for single-shot queries). */
+  /**
+   * Prior conversation turns. Optional — the backend rebuilds the history
+   * from session_id when this is omitted.
+   */
   history?: Array<{ role: ChatRole; content: string }>
 }
 
@@ -35,6 +38,14 @@ export interface ChatResponse {
   model: string
 }
 
+/**
+ * Final event of POST /api/chat/stream. The answer itself arrives earlier
+ * as a sequence of `token` events (`{ token: string }`).
+ */
+export interface ChatStreamDone {
+  session_id: string
+}
+
 // ── UI-layer extension ─────────────────────────────────────────────────────
 
 /**